@@ -0,0 +1,21 @@
+import { NextRequest, NextResponse } from "next/server";
+import { proxyPost } from "../../../proxy";
+
+/** POST /api/sumit-sync/runs/[id]/idom-paste → Python POST /runs/{id}/idom-paste */
+export async function POST(
+  request: NextRequest,
+  { params }: { params: { id: string } }
+) {
+  const { id } = params;
+  try {
+    const body = await request.json();
+    const res = await proxyPost(`/runs/${id}/idom-paste`, body);
+    const data = await res.json();
+    return NextResponse.json(data, { status: res.status });
+  } catch (err) {
+    return NextResponse.json(
+      { error: "שירות Sumit Sync לא זמין", detail: String(err) },
+      { status: 502 }
+    );
+  }
+}
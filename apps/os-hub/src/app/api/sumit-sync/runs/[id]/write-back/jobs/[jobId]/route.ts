@@ -0,0 +1,20 @@
+import { NextResponse } from "next/server";
+import { proxyGet } from "../../../../../proxy";
+
+/** GET /api/sumit-sync/runs/[id]/write-back/jobs/[jobId] → Python GET (write-back progress) */
+export async function GET(
+  _request: Request,
+  { params }: { params: { id: string; jobId: string } }
+) {
+  const { id, jobId } = params;
+  try {
+    const res = await proxyGet(`/runs/${id}/write-back/jobs/${jobId}`);
+    const data = await res.json();
+    return NextResponse.json(data, { status: res.status });
+  } catch (err) {
+    return NextResponse.json(
+      { error: "שירות Sumit Sync לא זמין", detail: String(err) },
+      { status: 502 }
+    );
+  }
+}
@@ -3,7 +3,9 @@ import { BASE_URL } from "../../../proxy";
 
 /**
  * POST /api/sumit-sync/runs/[id]/write-back?mode=dry-run|live
- * → Python POST /runs/{id}/write-back/dry-run  OR  /runs/{id}/write-back
+ * → Python POST /runs/{id}/write-back/dry-run  OR  /runs/{id}/write-back?background=true
+ *
+ * Live write-back returns a job_id at once — poll ./write-back/jobs/[jobId].
  */
 export async function POST(
   request: NextRequest,
@@ -12,7 +14,7 @@ export async function POST(
   const { id } = params;
   const { searchParams } = new URL(request.url);
   const mode = searchParams.get("mode") || "dry-run";
-  const endpoint = mode === "live" ? "write-back" : "write-back/dry-run";
+  const endpoint = mode === "live" ? "write-back?background=true" : "write-back/dry-run";
 
   try {
     const url = `${BASE_URL}/runs/${id}/${endpoint}`;
@@ -0,0 +1,39 @@
+import { NextResponse } from "next/server";
+import { proxyGet, proxyPost } from "../../../../proxy";
+
+/** GET /api/sumit-sync/runs/[id]/write-plan/approval → Python GET (approved / held ops, history) */
+export async function GET(
+  _request: Request,
+  { params }: { params: { id: string } }
+) {
+  const { id } = params;
+  try {
+    const res = await proxyGet(`/runs/${id}/write-plan/approval`);
+    const data = await res.json();
+    return NextResponse.json(data, { status: res.status });
+  } catch (err) {
+    return NextResponse.json(
+      { error: "שירות Sumit Sync לא זמין", detail: String(err) },
+      { status: 502 }
+    );
+  }
+}
+
+/** POST /api/sumit-sync/runs/[id]/write-plan/approval → Python POST (approve / exclude / reset ops) */
+export async function POST(
+  request: Request,
+  { params }: { params: { id: string } }
+) {
+  const { id } = params;
+  try {
+    const body = await request.json();
+    const res = await proxyPost(`/runs/${id}/write-plan/approval`, body);
+    const data = await res.json();
+    return NextResponse.json(data, { status: res.status });
+  } catch (err) {
+    return NextResponse.json(
+      { error: "שירות Sumit Sync לא זמין", detail: String(err) },
+      { status: 502 }
+    );
+  }
+}
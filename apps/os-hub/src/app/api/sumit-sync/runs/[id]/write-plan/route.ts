@@ -1,14 +1,15 @@
 import { NextResponse } from "next/server";
 import { BASE_URL } from "../../../proxy";
 
-/** GET /api/sumit-sync/runs/[id]/write-plan → Python GET /runs/{id}/write-plan */
+/** GET /api/sumit-sync/runs/[id]/write-plan → Python GET /runs/{id}/write-plan (query string forwarded) */
 export async function GET(
-  _request: Request,
+  request: Request,
   { params }: { params: { id: string } }
 ) {
   const { id } = params;
   try {
-    const url = `${BASE_URL}/runs/${id}/write-plan`;
+    const { search } = new URL(request.url);
+    const url = `${BASE_URL}/runs/${id}/write-plan${search}`;
     console.log(`[sumit-sync proxy] GET ${url}`);
     const res = await fetch(url, {
       cache: "no-store",
@@ -793,11 +793,27 @@ interface WriteResultData {
   errors: Array<Record<string, string>>;
 }
 
+interface WriteJobData {
+  job_id: string;
+  status: "running" | "completed" | "failed";
+  total_ops: number | null;
+  done_ops: number;
+  succeeded: number;
+  failed: number;
+  skipped: number;
+  ops_per_minute: number;
+  eta_seconds: number | null;
+  error: string | null;
+}
+
+const WRITE_JOB_POLL_MS = 2000;
+
 function WritePlanSection({ runId }: { runId: string }) {
   const [plan, setPlan] = useState<WritePlanData | null>(null);
   const [loading, setLoading] = useState(false);
   const [executing, setExecuting] = useState(false);
   const [result, setResult] = useState<WriteResultData | null>(null);
+  const [job, setJob] = useState<WriteJobData | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [liveConfirm, setLiveConfirm] = useState(false);
 
@@ -833,11 +849,35 @@ function WritePlanSection({ runId }: { runId: string }) {
         throw new Error(data.detail || data.error || `${res.status}`);
       }
       const data = await res.json();
-      setResult(data);
+      if (mode === "live") {
+        // Live write-back runs in the background — poll until it finishes
+        let current: WriteJobData | null = null;
+        while (!current || current.status === "running") {
+          await new Promise((r) => setTimeout(r, WRITE_JOB_POLL_MS));
+          const jobRes = await fetch(`/api/sumit-sync/runs/${runId}/write-back/jobs/${data.job_id}`);
+          if (!jobRes.ok) continue;
+          current = (await jobRes.json()) as WriteJobData;
+          setJob(current);
+        }
+        if (current.status === "failed") {
+          throw new Error(current.error || "הכתיבה נכשלה");
+        }
+        setResult({
+          dry_run: false,
+          total_attempted: current.done_ops,
+          succeeded: current.succeeded,
+          failed: current.failed,
+          skipped: current.skipped,
+          errors: [],
+        });
+      } else {
+        setResult(data);
+      }
     } catch (err) {
       setError(err instanceof Error ? err.message : "שגיאה בביצוע כתיבה");
     } finally {
       setExecuting(false);
+      setJob(null);
     }
   }, [runId]);
 
@@ -859,6 +899,17 @@ function WritePlanSection({ runId }: { runId: string }) {
         </div>
       )}
 
+      {/* Live write-back progress */}
+      {job && job.status === "running" && (
+        <div className={styles.writeResultBanner}>
+          <strong>כותב ל-Summit:</strong>
+          {" "}{job.done_ops}{job.total_ops != null ? ` / ${job.total_ops}` : ""} פעולות
+          {" · "}{job.ops_per_minute} לדקה
+          {job.eta_seconds != null && ` · עוד כ-${Math.ceil(job.eta_seconds / 60)} דק׳`}
+          {job.failed > 0 && ` · ${job.failed} נכשלו`}
+        </div>
+      )}
+
       {/* Result banner */}
       {result && (
         <div className={`${styles.writeResultBanner} ${result.failed > 0 ? styles.writeResultError : styles.writeResultSuccess}`}>
@@ -0,0 +1,33 @@
+"""Add run_metrics.carried_over_count for incremental re-sync.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    # Startup create_all may already have built the table from the models
+    inspector = sa.inspect(op.get_bind())
+    return column in {c["name"] for c in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    if not _has_column("run_metrics", "carried_over_count"):
+        op.add_column(
+            "run_metrics",
+            sa.Column("carried_over_count", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("run_metrics", "carried_over_count")
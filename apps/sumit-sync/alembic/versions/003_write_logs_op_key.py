@@ -0,0 +1,32 @@
+"""Add write_logs.op_key — per-op checkpoint for resumable write-back.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # write_logs is created by startup create_all, not by 001 — it may be
+    # missing entirely, or already carry the column
+    inspector = sa.inspect(op.get_bind())
+    if "write_logs" not in inspector.get_table_names():
+        return
+    if "op_key" not in {c["name"] for c in inspector.get_columns("write_logs")}:
+        op.add_column("write_logs", sa.Column("op_key", sa.String(32), nullable=True))
+    if "idx_write_logs_run_op_key" not in {i["name"] for i in inspector.get_indexes("write_logs")}:
+        op.create_index("idx_write_logs_run_op_key", "write_logs", ["run_id", "op_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_write_logs_run_op_key", table_name="write_logs")
+    op.drop_column("write_logs", "op_key")
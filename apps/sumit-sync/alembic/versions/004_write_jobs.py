@@ -0,0 +1,45 @@
+"""Add write_jobs — background live write-back progress.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Startup create_all may have created it already
+    inspector = sa.inspect(op.get_bind())
+    if "write_jobs" in inspector.get_table_names():
+        return
+    op.create_table(
+        "write_jobs",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("run_id", sa.Uuid(), sa.ForeignKey("runs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("streaming", sa.Boolean(), nullable=False),
+        sa.Column("total_ops", sa.Integer(), nullable=True),
+        sa.Column("done_ops", sa.Integer(), nullable=False),
+        sa.Column("succeeded", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("skipped", sa.Integer(), nullable=False),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint("status IN ('running', 'completed', 'failed')", name="valid_write_job_status"),
+    )
+    op.create_index("idx_write_jobs_run", "write_jobs", ["run_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_write_jobs_run", table_name="write_jobs")
+    op.drop_table("write_jobs")
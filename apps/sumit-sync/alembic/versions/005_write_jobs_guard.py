@@ -0,0 +1,41 @@
+"""write_jobs: one running job per run, enforced by the DB; planning warnings.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RUNNING = sa.text("status = 'running'")
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "write_jobs" not in inspector.get_table_names():
+        return
+    if "warnings" not in {c["name"] for c in inspector.get_columns("write_jobs")}:
+        op.add_column("write_jobs", sa.Column("warnings", sa.JSON(), nullable=True))
+    # A deploy restarts the service: nothing is still running, and leftover
+    # rows would break the unique index
+    op.execute(
+        "UPDATE write_jobs SET status = 'failed', error_message = 'interrupted', "
+        "completed_at = CURRENT_TIMESTAMP WHERE status = 'running'"
+    )
+    if "uq_write_jobs_running_run" not in {i["name"] for i in inspector.get_indexes("write_jobs")}:
+        op.create_index(
+            "uq_write_jobs_running_run", "write_jobs", ["run_id"], unique=True,
+            sqlite_where=RUNNING, postgresql_where=RUNNING,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_write_jobs_running_run", table_name="write_jobs")
+    op.drop_column("write_jobs", "warnings")
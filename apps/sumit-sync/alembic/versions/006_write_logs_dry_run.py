@@ -0,0 +1,33 @@
+"""Add write_logs.dry_run — dry-run audits are not retried or resumed.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "write_logs" not in inspector.get_table_names():
+        return
+    if "dry_run" not in {c["name"] for c in inspector.get_columns("write_logs")}:
+        op.add_column(
+            "write_logs",
+            sa.Column("dry_run", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+        )
+    # Only dry runs log these; their failed rows can't be told apart from
+    # live ones and stay as they are
+    op.execute("UPDATE write_logs SET dry_run = true WHERE status IN ('dry_run_ok', 'dry_run_ok_deep')")
+
+
+def downgrade() -> None:
+    op.drop_column("write_logs", "dry_run")
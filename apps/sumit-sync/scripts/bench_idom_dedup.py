@@ -0,0 +1,99 @@
+"""
+IDOM deduplication: the per-group loop vs the single sort.
+
+"legacy" replays IDOMParser.deduplicate as it was — groupby, a sort and
+iloc per duplicate group, every duplicate row copied as a Series and both
+frames rebuilt from lists of rows. "sorted" is IDOMParser.deduplicate now.
+--dup-ratio is the share of rows whose key appears more than once.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_idom_dedup.py [--rows 100000] [--dup-ratio 0.6]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from src.core.idom_parser import IDOMParser  # noqa: E402
+
+
+def make_frame(rows: int, dup_ratio: float) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    singles = int(rows * (1 - dup_ratio))
+    # Duplicated keys appear 2-4 times
+    dup_keys = rng.integers(0, max(1, (rows - singles) // 3), rows - singles)
+    keys = np.concatenate([np.arange(singles) + 10**8, dup_keys + 5 * 10**8])
+    rng.shuffle(keys)
+
+    def dates(missing):
+        out = pd.Series(pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"))
+        return out.where(rng.random(rows) >= missing)
+
+    return pd.DataFrame({
+        "מספר_תיק": keys.astype(str),
+        "שם": [f"לקוח {i}" for i in range(rows)],
+        "תאריך_ארכה": dates(0.3),
+        "תאריך_הגשה": dates(0.7),
+        "פקיד_שומה": rng.integers(1, 90, rows),
+        "קוד_שידור": "1",
+    })
+
+
+def legacy_deduplicate(df: pd.DataFrame):
+    unique_records = []
+    conflict_records = []
+    for _, group in df.groupby("מספר_תיק"):
+        if len(group) == 1:
+            unique_records.append(group.iloc[0])
+            continue
+        has_submission = group[group["תאריך_הגשה"].notna()]
+        if len(has_submission) > 0:
+            unique_records.append(has_submission.sort_values("תאריך_הגשה", ascending=False).iloc[0])
+        else:
+            unique_records.append(group.sort_values("תאריך_ארכה", ascending=False, na_position="last").iloc[0])
+        for _, row in group.iterrows():
+            conflict_row = row.copy()
+            conflict_row["_conflict_reason"] = "duplicate_מספר_תיק"
+            conflict_records.append(conflict_row)
+    return pd.DataFrame(unique_records), pd.DataFrame(conflict_records) if conflict_records else pd.DataFrame()
+
+
+def measure(label, fn, df):
+    start = time.perf_counter()
+    out = fn(df)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<8} {elapsed * 1000:9.0f} ms   {len(df) / elapsed:11,.0f} rows/s")
+    return out, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dup-ratio", type=float, default=0.6)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    df = make_frame(args.rows, args.dup_ratio)
+    print(f"rows={args.rows}  keys={df['מספר_תיק'].nunique()}  "
+          f"duplicated rows={int(df['מספר_תיק'].duplicated(keep=False).sum())}")
+    (legacy_dedup, legacy_conflicts), slow = measure("legacy", legacy_deduplicate, df)
+    (dedup, conflicts), fast = measure("sorted", IDOMParser().deduplicate, df)
+    print(f"  speedup  {slow / fast:.0f}x")
+
+    same = legacy_dedup.equals(dedup) and legacy_conflicts.equals(conflicts)
+    same = same and legacy_dedup.index.equals(dedup.index) and legacy_conflicts.index.equals(conflicts.index)
+    print("same records and conflicts:", same)
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+IDOM workbook parsing: parse time and peak memory on a four-sheet workbook.
+
+"legacy" replays what parse_idom_workbook did before IDOMWorkbook: every
+data sheet parsed, each opened twice more (an nrows=5 template sniff and
+the full read). "all sheets" parses every data sheet from one open
+workbook; "one sheet" parses only the run's report-type sheet, as
+_load_idom_dataframe now does. Time is measured on its own; peak memory
+on a second pass under tracemalloc (Python allocations — openpyxl and
+pandas' object columns), which would distort the timing.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_idom_workbook.py [--rows 5000]
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+
+from src.core.idom_workbook import IDOMWorkbook, _parse_sheet, parse_idom_workbook  # noqa: E402
+
+TEMPLATE_HEADERS = ["מספר תיק", "שם משפחה ופרטי", "תאריך ארכה", "תאריך הגשה", "פקיד שומה", "קוד שידור"]
+
+
+def make_workbook(path: Path, rows: int) -> Path:
+    """הוראות + עצמאים / חברות (template) + מנהלים (freeform 7-col), `rows` rows per data sheet."""
+    wb = Workbook()
+    wb.active.title = "הוראות"
+    wb.active.append(["הוראות מילוי"])
+    for sheet, base in (("עצמאים", 100_000_000), ("חברות", 510_000_000)):
+        ws = wb.create_sheet(sheet)
+        ws.append(["תבנית אידום"])
+        ws.append(["יש למלא שורה לכל תיק"])
+        ws.append(TEMPLATE_HEADERS)
+        ws.append(["9 ספרות", "", "DD/MM/YYYY", "DD/MM/YYYY", "", ""])
+        for i in range(rows):
+            ws.append([str(base + i), f"לקוח {i}", f"{1 + i % 28:02d}/06/2025", "", 20 + i % 40, 1 + i % 3])
+    ws = wb.create_sheet("מנהלים")
+    for i in range(rows):
+        ws.append([None, f"{1 + i % 28:02d}/06/2025", 1 + i % 3, "", 20 + i % 40, f"מנהל {i}", str(200_000_000 + i)])
+    wb.save(path)
+    return path
+
+
+def legacy_parse(path: Path):
+    sheet_names = pd.ExcelFile(path).sheet_names
+    results = []
+    for sheet in [s for s in sheet_names if s not in ("הוראות", "Sheet1")]:
+        pd.read_excel(path, sheet_name=sheet, header=None, nrows=5)
+        results.append(_parse_sheet(pd.ExcelFile(path), sheet))
+    return results
+
+
+def one_sheet(path: Path):
+    with IDOMWorkbook(str(path)) as wb:
+        return [wb.sheet(name) for name in wb.sheets_for("financial")]
+
+
+def measure(label, fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<11} {elapsed * 1000:8.0f} ms   peak {peak / 2**20:7.1f} MiB")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_workbook(Path(tmp) / "idom.xlsx", args.rows)
+        print(f"rows per sheet={args.rows}  file={path.stat().st_size / 2**10:.0f} KiB")
+        legacy = measure("legacy", legacy_parse, path)
+        current = measure("all sheets", lambda p: parse_idom_workbook(str(p)).sheets, path)
+        single = measure("one sheet", one_sheet, path)
+
+    same = all(a.records.equals(b.records) for a, b in zip(legacy, current))
+    same = same and single[0].records.equals(next(s for s in current if s.sheet_name == "חברות").records)
+    print("same records:", same)
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Normalization kernel: per-row .apply of the scalar rules vs the Series versions.
+
+Columns shaped like the real inputs — ח.פ keys as IDOM / SUMIT hand them
+over (strings, "123456.0" float renderings, separators, blanks), naive
+report dates, and the repetitive "ID: Label" / tax-year cells. Each case
+checks that both sides give the same values before timing them.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_normalize.py [--rows 200000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from src.core.normalize import (  # noqa: E402
+    encode_israel_midnight, extract_year, extract_years, israel_day, israel_days,
+    israel_midnights, normalize_key, normalize_keys, split_id_label, split_id_labels,
+)
+
+
+def make_columns(rows: int):
+    rng = np.random.default_rng(7)
+    base = rng.integers(1_000_000, 999_999_999, rows)
+    shapes = rng.integers(0, 5, rows)
+    keys = np.where(shapes == 0, [f"{k}.0" for k in base],
+                    np.where(shapes == 1, [f"0{k}" for k in base],
+                             np.where(shapes == 2, [f"{k // 1000}-{k % 1000:03d}" for k in base],
+                                      base.astype(str))))
+    keys = pd.Series(keys, dtype=object)
+    keys[shapes == 4] = None
+    floats = pd.Series(base.astype(float))
+    floats[rng.random(rows) < 0.1] = np.nan
+
+    days = pd.Series(pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D"))
+    days[rng.random(rows) < 0.2] = pd.NaT
+    statuses = pd.Series([f"11258862{i:02d}: {i}) סטטוס" for i in rng.integers(0, 12, rows)])
+    years = pd.Series([f"11255755{y - 2000}: {y}" for y in rng.integers(2021, 2027, rows)])
+    return {
+        "keys (str)": (keys, normalize_key, normalize_keys),
+        "keys (float)": (floats, normalize_key, normalize_keys),
+        "israel midnight": (days, lambda d: encode_israel_midnight(d) if pd.notna(d) else "", israel_midnights),
+        "israel day": (days, israel_day, israel_days),
+        "ID: Label": (statuses, split_id_label, lambda s: list(split_id_labels(s).itertuples(index=False, name=None))),
+        "tax year": (years, extract_year, extract_years),
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"rows={args.rows}")
+    print(f"  {'column':<16} {'apply':>9} {'series':>9} {'speedup':>8}")
+    ok = True
+    for label, (values, scalar, vectorized) in make_columns(args.rows).items():
+        expected, slow = timed(lambda v: [scalar(x) for x in v], values)
+        got, fast = timed(vectorized, values)
+        ok = ok and list(got) == expected
+        print(f"  {label:<16} {slow * 1000:7.0f}ms {fast * 1000:7.0f}ms {slow / fast:7.1f}x")
+    print("same values:", ok)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+OutputWriter: cell-by-cell workbooks vs write-only streaming.
+
+"legacy" replays how the import file and the report sheets were written —
+a regular workbook, _prepare_for_export's per-column .apply(_clean_value),
+a Border per cell and _auto_width re-scanning every cell. "streaming" is
+OutputWriter now. Each variant runs in its own process on the same
+synthetic SyncResult (bench_sync_engine.make_frames through the engine);
+peak RSS is the process high-water mark above what it held before writing.
+The import files and the diff reports' change sheets of both variants are
+then compared cell by cell: values, fonts, fills, borders, alignment and
+column widths.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_output_writer.py [--rows 50000]
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pandas as pd  # noqa: E402
+from openpyxl import Workbook, load_workbook  # noqa: E402
+from openpyxl.styles import Alignment  # noqa: E402
+
+from bench_sync_engine import make_frames  # noqa: E402
+from src.core.config import FINANCIAL_CONFIG  # noqa: E402
+from src.core.output_writer import OutputWriter  # noqa: E402
+from src.core.sumit_parser import SUMITParser  # noqa: E402
+from src.core.sync_engine import SyncEngine  # noqa: E402
+
+W = OutputWriter
+
+
+def legacy_auto_width(ws, min_width=10, max_width=50):
+    for column in ws.columns:
+        max_length = 0
+        for cell in column:
+            max_length = max(max_length, len(str(cell.value)) if cell.value else 0)
+        ws.column_dimensions[column[0].column_letter].width = min(max(max_length + 2, min_width), max_width)
+
+
+def legacy_frame_sheet(ws, df, clean):
+    for col_idx, header in enumerate(df.columns, 1):
+        cell = ws.cell(row=1, column=col_idx, value=header)
+        cell.font = W.HEADER_FONT
+        cell.fill = W.HEADER_FILL
+        cell.alignment = Alignment(horizontal='center')
+    for row_idx, row in enumerate(df.itertuples(index=False), 2):
+        for col_idx, value in enumerate(row, 1):
+            cell = ws.cell(row=row_idx, column=col_idx, value=clean(value))
+            cell.border = W.THIN_BORDER
+    legacy_auto_width(ws)
+
+
+def legacy_write(result, out_dir: Path):
+    import_df = result.import_df.copy()
+    for col in import_df.columns:
+        import_df[col] = import_df[col].apply(W._clean_value)
+    wb = Workbook()
+    wb.active.title = "ייבוא"
+    legacy_frame_sheet(wb.active, import_df, lambda v: v)
+    wb.save(out_dir / "import.xlsx")
+
+    wb = Workbook()
+    wb.active.title = "שינויים"
+    legacy_frame_sheet(wb.active, result.diff_df, W._clean_value)
+    for title, field in (("שינויי סטטוס", "סטטוס"), ("עדכוני ארכה", "אורכה משרד")):
+        legacy_frame_sheet(wb.create_sheet(title), result.diff_df[result.diff_df['field'] == field], W._clean_value)
+    wb.save(out_dir / "diff.xlsx")
+
+
+def streaming_write(result, out_dir: Path):
+    writer = OutputWriter(FINANCIAL_CONFIG, str(out_dir))
+    wb = Workbook(write_only=True)
+    writer._write_frame(wb.create_sheet("ייבוא"), result.import_df)
+    wb.save(out_dir / "import.xlsx")
+
+    wb = Workbook(write_only=True)
+    writer._write_changes_sheet(wb.create_sheet("שינויים"), result.diff_df)
+    for title, field in (("שינויי סטטוס", "סטטוס"), ("עדכוני ארכה", "אורכה משרד")):
+        writer._write_changes_sheet(wb.create_sheet(title), result.diff_df[result.diff_df['field'] == field])
+    wb.save(out_dir / "diff.xlsx")
+
+
+def _rss_kb(field: str) -> int:
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1])
+    return 0
+
+
+def child(variant: str, rows: int, out_dir: Path) -> None:
+    logging.disable(logging.INFO)
+    idom_df, sumit_df = make_frames(rows)
+    lookup = SUMITParser(FINANCIAL_CONFIG).build_lookup(sumit_df)
+    result = SyncEngine(FINANCIAL_CONFIG).sync(idom_df, sumit_df, lookup, 2024)
+    del idom_df, sumit_df, lookup
+    try:
+        Path("/proc/self/clear_refs").write_text("5")   # reset the RSS high-water mark
+    except OSError:
+        pass
+    before = _rss_kb("VmRSS")
+    start = time.perf_counter()
+    (legacy_write if variant == "legacy" else streaming_write)(result, out_dir)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": elapsed,
+        "peak_mb": (_rss_kb("VmHWM") - before) / 1024,
+        "import_rows": len(result.import_df),
+        "diff_rows": len(result.diff_df),
+    }))
+
+
+def _cell_sig(cell):
+    return (
+        cell.value, cell.font.b, cell.font.color.rgb if cell.font.color else None,
+        cell.fill.fill_type, cell.fill.fgColor.rgb, cell.border.left.style, cell.alignment.horizontal,
+    )
+
+
+def same_render(a: Path, b: Path) -> bool:
+    wa, wb = load_workbook(a), load_workbook(b)
+    if wa.sheetnames != wb.sheetnames:
+        return False
+    for name in wa.sheetnames:
+        x, y = wa[name], wb[name]
+        for rx, ry in zip(x.iter_rows(), y.iter_rows()):
+            if [_cell_sig(c) for c in rx] != [_cell_sig(c) for c in ry]:
+                return False
+        if x.max_row != y.max_row:
+            return False
+        widths = [{k: d.width for k, d in ws.column_dimensions.items() if d.customWidth} for ws in (x, y)]
+        if widths[0] != widths[1]:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--child", choices=["legacy", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.rows, Path(args.out))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = {}
+        for variant in ("legacy", "streaming"):
+            out = Path(tmp) / variant
+            out.mkdir()
+            proc = subprocess.run(
+                [sys.executable, __file__, "--rows", str(args.rows), "--child", variant, "--out", str(out)],
+                check=True, capture_output=True, text=True,
+            )
+            stats[variant] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+        first = stats["legacy"]
+        print(f"idom rows={args.rows}  import rows={first['import_rows']}  diff rows={first['diff_rows']}")
+        for variant, s in stats.items():
+            print(f"  {variant:<10} {s['seconds']:8.2f} s   peak +{s['peak_mb']:7.1f} MB")
+        print(f"  speedup  {stats['legacy']['seconds'] / stats['streaming']['seconds']:.1f}x   "
+              f"peak RSS {stats['legacy']['peak_mb'] / max(stats['streaming']['peak_mb'], 0.1):.1f}x lower")
+
+        same = all(
+            same_render(Path(tmp) / "legacy" / name, Path(tmp) / "streaming" / name)
+            for name in ("import.xlsx", "diff.xlsx")
+        )
+        print("same cells, styles and widths:", same)
+        if not same:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Scaling benchmark for sharded parallel reconciliation (src/core/parallel.py).
+
+Times SyncEngine.sync and build_write_plan serially and over 2/4/8 worker
+processes on the synthetic frames from bench_sync_engine.py, and checks
+every sharded result equals the serial one.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_parallel.py [N ...] [--workers 2,4,8]
+
+Default size: 100000. Speedup is bounded by the cores the machine actually
+has — on a single-core container the sharded path only adds overhead.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_sync_engine import make_frames  # noqa: E402
+from src.core import parallel  # noqa: E402
+from src.core.config import FINANCIAL_CONFIG  # noqa: E402
+from src.core.sumit_parser import SUMITParser  # noqa: E402
+from src.core.sync_engine import SyncEngine  # noqa: E402
+
+
+def _time(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def _same_sync(a, b) -> bool:
+    return (
+        a.matched_count == b.matched_count
+        and a.warnings == b.warnings
+        and a.regression_records == b.regression_records
+        and a.import_df.equals(b.import_df)
+        and a.diff_df.equals(b.diff_df)
+        and a.exceptions_df.equals(b.exceptions_df)
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sizes", nargs="*", type=int, default=[100_000])
+    parser.add_argument("--workers", default="2,4,8")
+    args = parser.parse_args()
+    worker_counts = [int(w) for w in args.workers.split(",")]
+
+    parallel.PARALLEL_MIN_ROWS = 0
+    engine = SyncEngine(FINANCIAL_CONFIG)
+    print("cores: %s" % os.cpu_count())
+    print("%8s  %8s  %10s  %8s  %10s  %8s" % ("rows", "workers", "sync", "speedup", "plan", "speedup"))
+    for n in args.sizes:
+        idom_df, sumit_df = make_frames(n)
+        lookup = SUMITParser(FINANCIAL_CONFIG).build_lookup(sumit_df)
+
+        t_sync, serial = _time(engine.sync, idom_df, sumit_df, lookup, 2024)
+        t_plan, serial_plan = _time(engine.build_write_plan, idom_df, sumit_df, lookup, 2024)
+        serial_ops = [op.to_dict() for op in serial_plan.operations]
+        print("%8d  %8s  %9.3fs  %8s  %9.3fs  %8s" % (n, "serial", t_sync, "", t_plan, ""))
+
+        for w in worker_counts:
+            ts, res = _time(parallel.sync, engine, idom_df, sumit_df, lookup, 2024, workers=w)
+            tp, plan = _time(parallel.build_write_plan, engine, idom_df, sumit_df, lookup, 2024, workers=w)
+            if not _same_sync(res, serial) or [op.to_dict() for op in plan.operations] != serial_ops:
+                print("MISMATCH at %d rows, %d workers" % (n, w))
+                return 1
+            print("%8d  %8d  %9.3fs  %7.2fx  %9.3fs  %7.2fx" % (n, w, ts, t_sync / ts, tp, t_plan / tp))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Deep dry-run validation cost: per-op rules vs one compiled PlanValidator.
+
+"per-op" compiles the rules afresh for every op — what
+WriteExecutor._validate_operation_deep did before plan_validator (a
+taxonomy snapshot and strptime per property). "compiled" validates the
+whole plan with one PlanValidator. Both must report the same problems.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_plan_validator.py [--ops 50000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core.plan_validator import PlanValidator  # noqa: E402
+from src.core.taxonomy import resolve_tax_year  # noqa: E402
+from src.core.write_plan import CLIENTS_FOLDER_ID, OpType, WriteOperation  # noqa: E402
+
+FOLDER = "1124761700"
+
+
+def make_ops(n: int):
+    year = resolve_tax_year(2024)
+    ops = []
+    for i in range(n):
+        day = "2024-%02d-%02dT00:00:00+03:00" % (1 + i % 12, 1 + i % 28)
+        if i % 5 == 0:
+            ops.append(WriteOperation(OpType.CREATE_REPORT, None, FOLDER, "x", str(i),
+                                      {"לקוח": i, "שנת מס": year, "תאריך הגשה": day}, {}, "", client_entity_id=i))
+        elif i % 5 == 1:
+            ops.append(WriteOperation(OpType.UPDATE_CLIENT, i, CLIENTS_FOLDER_ID, "x", str(i),
+                                      {"פקיד שומה": 1000 + i % 40}, {}, ""))
+        else:
+            ops.append(WriteOperation(OpType.UPDATE_REPORT, i, FOLDER, "x", str(i),
+                                      {'תאריך אורכה מ"ה': day, "תאריך הגשה": "2024-05-01" if i % 97 else "1/5/24"},
+                                      {}, ""))
+    return ops
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ops", type=int, default=50_000)
+    args = parser.parse_args()
+    ops = make_ops(args.ops)
+
+    start = time.perf_counter()
+    per_op = [[m for _, m in PlanValidator().check(op)] for op in ops]
+    per_op_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = PlanValidator().validate(ops)
+    compiled_s = time.perf_counter() - start
+
+    expected = sorted((i, m) for i, msgs in enumerate(per_op) for m in msgs)
+    got = sorted((p.op_index, p.message) for items in report.problems.values() for p in items)
+    print(f"ops={len(ops)}  problems={len(got)}  rules={ {r: len(p) for r, p in report.problems.items()} }")
+    print(f"  per-op:   {per_op_s * 1000:8.1f} ms")
+    print(f"  compiled: {compiled_s * 1000:8.1f} ms  ({per_op_s / compiled_s:.1f}x)")
+    print("same problems:", expected == got)
+    if expected != got:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+SUMIT export reading: full read_excel vs the streamed, column-projected reader.
+
+The export has the financial schema's columns plus unused ones, and rows
+of three tax years. "read_excel" is SUMITParser.parse as it was — every
+column read, then a per-row extract_year filter; "streamed" is
+SUMITParser.parse now. Throughput is rows of the file per second; peak
+memory is measured on a second pass under tracemalloc.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_sumit_reader.py [--rows 50000] [--extra-columns 12]
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+
+from src.core.config import FINANCIAL_CONFIG  # noqa: E402
+from src.core.normalize import extract_year, normalize_key  # noqa: E402
+from src.core.sumit_parser import SUMITParser  # noqa: E402
+
+YEARS = ("1125575563: 2023", "1125575564: 2024", "1125575565: 2025")
+
+
+def make_export(path: Path, rows: int, extra_columns: int) -> Path:
+    headers = FINANCIAL_CONFIG.export_schema.all_columns + [f"שדה נוסף {i}" for i in range(extra_columns)]
+    # Regular workbook: shared strings and a <dimension>, as Excel / Summit write them
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "SUMIT Export"
+    ws.append(headers)
+    for i in range(rows):
+        values = {
+            "מזהה": 1_000_000 + i, "שנת מס": YEARS[i % 3], "כרטיס לקוח": f"{i}: לקוח {i}",
+            "מספר לקוח": i, "ח.פ": 510_000_000 + i // 3, "מנהל תיק": "דנה", "סטטוס": "1125886200: בתהליך",
+            "הערות": "הערה" if i % 7 == 0 else None, "הגשה": datetime(2024, 5, 1 + i % 28),
+            "אורכה מ\"ה": datetime(2025, 6, 30) if i % 2 else None, "חבות מס": i * 10,
+        }
+        ws.append([values.get(h, f"ערך {i % 50}" if h.startswith("שדה נוסף") else None) for h in headers])
+    wb.save(path)
+    return path
+
+
+def read_excel_parse(path: Path, tax_year: int) -> pd.DataFrame:
+    df = pd.read_excel(path, header=0)
+    df = df[df["שנת מס"].apply(extract_year) == tax_year].copy()
+    parser = SUMITParser(FINANCIAL_CONFIG)
+    df = parser._parse_data(df)
+    df["_match_key"] = df["ח.פ"].apply(normalize_key)
+    return df
+
+
+def streamed_parse(path: Path, tax_year: int) -> pd.DataFrame:
+    return SUMITParser(FINANCIAL_CONFIG).parse(str(path), tax_year)
+
+
+def measure(label, fn, path, rows):
+    start = time.perf_counter()
+    out = fn(path, 2024)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(path, 2024)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<11} {elapsed:6.2f} s   {rows / elapsed:9,.0f} rows/s   peak {peak / 2**20:7.1f} MiB")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--extra-columns", type=int, default=12)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_export(Path(tmp) / "sumit.xlsx", args.rows, args.extra_columns)
+        print(f"rows={args.rows}  columns={len(FINANCIAL_CONFIG.export_schema.all_columns) + args.extra_columns}  "
+              f"file={path.stat().st_size / 2**20:.1f} MiB")
+        full = measure("read_excel", read_excel_parse, path, args.rows)
+        streamed = measure("streamed", streamed_parse, path, args.rows)
+
+    same = (full["_match_key"].tolist() == streamed["_match_key"].tolist()
+            and full.index.tolist() == streamed.index.tolist()
+            and full["מזהה"].tolist() == streamed["מזהה"].tolist())
+    print(f"kept rows={len(streamed)}  same keys, ids and index: {same}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark SyncEngine.sync (columnar) against the row-by-row reference.
+
+Builds synthetic Financial IDOM/SUMIT frames — ~80% matched, a slice of
+keys with leading zeros (secondary match), mixed status/dates — and times
+both paths at each size. Also checks both paths agree on the counts.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_sync_engine.py [N ...]
+
+Default sizes: 1000 10000 100000. The row path at 100k takes minutes — its
+zero-stripped fallback scans the whole lookup for every padded key.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from src.core.config import FINANCIAL_CONFIG  # noqa: E402
+from src.core.sumit_parser import SUMITParser  # noqa: E402
+from src.core.sync_engine import SyncEngine  # noqa: E402
+from tests.sync_reference import sync_rowwise  # noqa: E402
+
+IN_PROGRESS = "1125886200: 3) בעבודה"
+COMPLETED = "1125886300: 9) תהליך הושלם"
+
+
+def make_frames(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    keys = np.array(["%09d" % k for k in rng.choice(10 ** 8, size=n, replace=False)], dtype=object)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, size=n), unit="D")
+
+    # A handful of IDOM keys carry an extra leading zero → secondary match path
+    idom_keys = keys.copy()
+    zero_padded = rng.random(n) < 0.001
+    idom_keys[zero_padded] = ["0" + k for k in idom_keys[zero_padded]]
+    idom_df = pd.DataFrame({
+        "מספר_תיק": idom_keys,
+        "שם": "לקוח",
+        "תאריך_ארכה": pd.Series(dates).where(rng.random(n) < 0.6),
+        "תאריך_הגשה": pd.Series(dates).where(rng.random(n) < 0.3),
+        "קוד_שידור": "100",
+    })
+
+    m = int(n * 0.8)
+    sumit_df = pd.DataFrame({
+        "מזהה": np.arange(10 ** 6, 10 ** 6 + m),
+        "שנת מס": "1125575564: 2024",
+        "כרטיס לקוח": ["%d: לקוח" % i for i in range(m)],
+        "עובד ע. מקדימה": "משה",
+        "עובד מטפל": "יונתן",
+        "סטטוס": np.where(rng.random(m) < 0.3, COMPLETED, IN_PROGRESS),
+        "הערות": "",
+        "חבות מס": 0,
+        "תחילת עבודה": pd.NaT,
+        'אורכה מ"ה': pd.Series(dates[:m]),
+        "אורכה משרד": pd.Series(dates[:m]).where(rng.random(m) < 0.5),
+        "סיום עבודה מקדימה": pd.NaT,
+        "הגשה": pd.Series(dates[:m]).where(rng.random(m) < 0.2),
+        "_match_key": keys[:m],
+    })
+    return idom_df, sumit_df
+
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> int:
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    engine = SyncEngine(FINANCIAL_CONFIG)
+
+    print("%8s  %10s  %10s  %8s" % ("rows", "row-wise", "columnar", "speedup"))
+    for n in sizes:
+        idom_df, sumit_df = make_frames(n)
+        lookup = SUMITParser(FINANCIAL_CONFIG).build_lookup(sumit_df)
+
+        t_rows, r_rows = _time(sync_rowwise, engine, idom_df, sumit_df, lookup, 2024)
+        t_cols, r_cols = _time(engine.sync, idom_df, sumit_df, lookup, 2024)
+
+        for attr in ("matched_count", "unmatched_count", "changed_count",
+                     "status_completed_count", "status_regression_flags"):
+            if getattr(r_rows, attr) != getattr(r_cols, attr):
+                print("MISMATCH at %d rows: %s %s != %s" % (
+                    n, attr, getattr(r_rows, attr), getattr(r_cols, attr)))
+                return 1
+
+        print("%8d  %9.3fs  %9.3fs  %7.1fx" % (n, t_rows, t_cols, t_rows / t_cols))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
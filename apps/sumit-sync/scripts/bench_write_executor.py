@@ -0,0 +1,84 @@
+"""
+Live write-back throughput vs WriteExecutor concurrency.
+
+Executes one synthetic 700-op plan (report updates, creates, client updates,
+some sharing a report or client) at concurrency 1/2/4/8 against the fake
+Summit from bench_write_stream.py — real SummitAPIClient slot limiter, fixed
+per-call latency — and checks every run's audit log equals the serial one.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_write_executor.py [--ops 700] [--scale 20] [--latency 0.5] [--concurrency 1,2,4,8]
+
+Timings are scaled like bench_write_stream.py (multiply by --scale). The
+serial executor is latency-bound (one round trip per op); with concurrency
+the limiter's slot spacing and the 60-call cooldowns are the ceiling.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_write_stream import LatencySummitAPI  # noqa: E402
+from src.core import sumit_api_client  # noqa: E402
+from src.core.write_executor import WriteExecutor  # noqa: E402
+from src.core.write_plan import OpType, WriteOperation, WritePlan  # noqa: E402
+
+FOLDER = "1124761700"
+CLIENTS = "557688522"
+
+
+def make_plan(n: int) -> WritePlan:
+    plan = WritePlan()
+    for i in range(n):
+        mk = "5%08d" % i
+        if i % 10 == 0:
+            plan.add(WriteOperation(OpType.SKIP, 70_000 + i, FOLDER, "x", mk, {}, {}, "up to date"))
+        elif i % 6 == 0:
+            plan.add(WriteOperation(OpType.CREATE_REPORT, None, FOLDER, "x", mk,
+                                    {"לקוח": 10_000 + i // 2}, {}, "new", client_entity_id=10_000 + i // 2))
+        elif i % 6 == 1:
+            # Same client as the create just before it → must wait for it
+            plan.add(WriteOperation(OpType.UPDATE_CLIENT, 10_000 + (i - 1) // 2, CLIENTS, "x", mk,
+                                    {"פקיד שומה": 1}, {}, "refs"))
+        else:
+            # Every 50th report is written twice (duplicate IDOM rows)
+            plan.add(WriteOperation(OpType.UPDATE_REPORT, 70_000 + (i if i % 50 else i - 1), FOLDER, "x", mk,
+                                    {"סטטוס": 1125886300}, {}, "dates"))
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ops", type=int, default=700)
+    parser.add_argument("--scale", type=float, default=20.0, help="divide limiter + latency timings by this")
+    parser.add_argument("--latency", type=float, default=0.5, help="production per-call latency, seconds")
+    parser.add_argument("--concurrency", default="1,2,4,8")
+    args = parser.parse_args()
+
+    sumit_api_client.DELAY_BETWEEN_CALLS = 0.2 / args.scale
+    sumit_api_client.BATCH_COOLDOWN = 35 / args.scale
+    latency = args.latency / args.scale
+    plan = make_plan(args.ops)
+    print(f"ops={plan.total} writes={plan.total - plan.skips} spacing={sumit_api_client.DELAY_BETWEEN_CALLS * 1000:.0f}ms "
+          f"latency={latency * 1000:.0f}ms cooldown={sumit_api_client.BATCH_COOLDOWN:.2f}s/60 calls")
+
+    baseline = None
+    for c in (int(x) for x in args.concurrency.split(",")):
+        api = LatencySummitAPI({}, {}, latency)
+        start = time.perf_counter()
+        result = WriteExecutor(client=api, dry_run=False, concurrency=c).execute(plan)
+        elapsed = time.perf_counter() - start
+        log = [{k: v for k, v in e.items() if k != "timestamp"} for e in result.audit_log]
+        baseline = baseline or (elapsed, log)
+        print(f"concurrency={c}: {elapsed:6.2f}s  ({baseline[0] / elapsed:4.2f}x)  "
+              f"succeeded={result.succeeded}  audit {'==' if log == baseline[1] else '!='} serial  "
+              f"(x{args.scale:g} → {elapsed * args.scale / 60:.1f} min)")
+
+
+if __name__ == "__main__":
+    main()
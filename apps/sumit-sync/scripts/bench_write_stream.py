@@ -0,0 +1,176 @@
+"""
+Wall-time benchmark: batch vs streaming live write-back (src/core/write_stream.py).
+
+Both modes run a cold-cache targeted fetch plus live writes for a synthetic
+IDOM file against a fake Summit that sleeps a fixed latency per call. The
+fake goes through the real SummitAPIClient slot limiter, so the fetch and
+write phases compete for the same rate budget exactly as in production.
+
+Timings are scaled down (--scale 20 → 10ms spacing, 25ms latency, 1.75s
+cooldown every 60 calls) so a 700-row run takes minutes, not an hour; multiply by the
+scale for production-sized numbers.
+
+Run:
+  cd apps/sumit-sync
+  python scripts/bench_write_stream.py [--rows 700] [--scale 20] [--latency 0.5]
+
+The gain is bounded by the limiter: both modes make the same calls, and at
+~5 calls/sec the fetch alone already uses most of the budget. Streaming
+saves the writer's per-call latency that the batch path spends after the
+fetch has finished.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd  # noqa: E402
+
+from src.core import sumit_api_client  # noqa: E402
+from src.core.config import FINANCIAL_CONFIG  # noqa: E402
+from src.core.mapping_store import MappingStore  # noqa: E402
+from src.core.report_cache import ReportCache  # noqa: E402
+from src.core.sumit_api_source import fetch_client_refs, fetch_sumit_data_targeted  # noqa: E402
+from src.core.sync_engine import SyncEngine  # noqa: E402
+from src.core.taxonomy import resolve_tax_year  # noqa: E402
+from src.core.write_executor import WriteExecutor  # noqa: E402
+from src.core.write_stream import stream_write_back  # noqa: E402
+
+
+class LatencySummitAPI(sumit_api_client.SummitAPIClient):
+    """Real slot limiter, canned responses, fixed per-call latency."""
+
+    def __init__(self, clients, reports, latency):
+        super().__init__(company_id=1, api_key="bench")
+        self.clients = clients
+        self.reports = reports
+        self.by_id = {r["ID"]: r for r in reports.values()}
+        self.latency = latency
+
+    def _call(self):
+        self._rate_limit_pause()
+        time.sleep(self.latency)
+
+    def find_client_id_by_company_number(self, cn):
+        self._call()
+        return self.clients.get(cn)
+
+    def find_report_id(self, folder_id, client_id, year_entity_id):
+        self._call()
+        report = self.reports.get(client_id)
+        return report["ID"] if report else None
+
+    def get_entity(self, entity_id, folder_id):
+        self._call()
+        return self.by_id.get(entity_id, {})
+
+    def get_client_refs(self, client_id):
+        self._call()
+        return {"פקיד שומה": None, "סוג תיק": None}
+
+    def update_entity(self, entity_id, folder_id, properties):
+        self._call()
+        return {"ID": entity_id}
+
+    def create_entity(self, folder_id, properties):
+        self._call()
+        return {"ID": 900000 + properties["לקוח"]}
+
+
+def make_fixture(n: int):
+    year_id = resolve_tax_year(2024)
+    clients, reports = {}, {}
+    keys = ["5%08d" % i for i in range(n)]
+    for i, cn in enumerate(keys):
+        if i % 7 == 6:
+            continue                     # no client in Summit → FLAG
+        clients[cn] = 10_000 + i
+        if i % 5 == 4:
+            continue                     # no report yet → CREATE
+        reports[10_000 + i] = {
+            "ID": 70_000 + i,
+            "לקוח": [{"ID": 10_000 + i, "Name": "לקוח"}],
+            "סטטוס": [{"ID": 1125886200, "Name": "3) בעבודה"}],
+            "שנת מס": [{"ID": year_id, "Name": "2024"}],
+            # Every third report already holds the IDOM extension → SKIP
+            'תאריך אורכה מ"ה': ["2024-06-30T00:00:00+03:00"] if i % 3 == 0 else None,
+        }
+    idom_df = pd.DataFrame({
+        "מספר_תיק": keys,
+        "שם": "לקוח",
+        "תאריך_ארכה": pd.to_datetime(["2024-06-30"] * n),
+        "תאריך_הגשה": pd.NaT,
+        "קוד_שידור": "1",
+        # Every fourth row carries a פקיד שומה code → client refs + UPDATE_CLIENT
+        "פקיד_שומה": ["38" if i % 4 == 0 else "" for i in range(n)],
+        "סוג_תיק": "",
+    })
+    return idom_df, clients, reports
+
+
+def run_batch(idom_df, api, workdir):
+    mapping = MappingStore(path=workdir / "batch_mapping.json")
+    cache = ReportCache(path=workdir / "batch_reports.json")
+    start = time.perf_counter()
+    sumit_df, lookup, _ = fetch_sumit_data_targeted(
+        FINANCIAL_CONFIG, 2024, list(idom_df["מספר_תיק"]), client=api, mapping=mapping, reports=cache,
+    )
+    # As the write-plan route: refs only for rows carrying פקיד_שומה / סוג_תיק codes
+    coded = (idom_df["פקיד_שומה"].astype(str).str.strip() != "") | (idom_df["סוג_תיק"].astype(str).str.strip() != "")
+    fetch_client_refs(list(idom_df.loc[coded, "מספר_תיק"]), mapping, client=api)
+    plan = SyncEngine(FINANCIAL_CONFIG).build_write_plan(idom_df, sumit_df, lookup, 2024, client_mapping=mapping)
+    first_write = time.perf_counter() - start
+    result = WriteExecutor(client=api, dry_run=False).execute(plan)
+    return time.perf_counter() - start, first_write, plan, result
+
+
+def run_streaming(idom_df, api, workdir):
+    start = time.perf_counter()
+    out = stream_write_back(
+        FINANCIAL_CONFIG, 2024, idom_df, WriteExecutor(client=api, dry_run=False),
+        mapping=MappingStore(path=workdir / "stream_mapping.json"),
+        reports=ReportCache(path=workdir / "stream_reports.json"),
+    )
+    return time.perf_counter() - start, out.first_write_seconds, out.plan, out.result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=700)
+    parser.add_argument("--scale", type=float, default=20.0, help="divide limiter + latency timings by this")
+    parser.add_argument("--latency", type=float, default=0.5, help="production per-call latency, seconds")
+    args = parser.parse_args()
+
+    sumit_api_client.DELAY_BETWEEN_CALLS = 0.2 / args.scale
+    sumit_api_client.BATCH_COOLDOWN = 35 / args.scale
+    latency = args.latency / args.scale
+
+    idom_df, clients, reports = make_fixture(args.rows)
+    print(f"rows={args.rows} spacing={sumit_api_client.DELAY_BETWEEN_CALLS * 1000:.0f}ms "
+          f"latency={latency * 1000:.0f}ms cooldown={sumit_api_client.BATCH_COOLDOWN:.1f}s/60 calls")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        results = {}
+        for name, fn in (("batch", run_batch), ("streaming", run_streaming)):
+            api = LatencySummitAPI(clients, reports, latency)
+            total, first, plan, result = fn(idom_df, api, workdir)
+            results[name] = (plan, result)
+            print(f"{name:>10}: total {total:6.2f}s  first write after {first:6.2f}s  "
+                  f"api_calls={api.call_count}  writes={result.succeeded}  audit={len(result.audit_log)}  "
+                  f"(x{args.scale:g} → {total * args.scale / 60:.1f} min)")
+
+    batch_plan, _ = results["batch"]
+    stream_plan, _ = results["streaming"]
+    same = [op.to_dict() for op in batch_plan.operations] == [op.to_dict() for op in stream_plan.operations]
+    print("plans equal:", same)
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ FastAPI routes for IDOM-SUMIT Sync.
 
 POST   /runs                         — create a new reconciliation run
 POST   /runs/{id}/upload             — upload IDOM or SUMIT file
+POST   /runs/{id}/idom-paste         — IDOM records pasted from SHAAM, instead of an upload
 POST   /runs/{id}/execute            — run reconciliation engine
+POST   /runs/{id}/execute-api        — run reconciliation against the Summit API (background; poll the run)
 GET    /runs/{id}                    — get run detail (metrics, exceptions, files)
 GET    /runs                         — list runs
 DELETE /runs/{id}                    — delete run, its DB records, and stored files
@@ -12,12 +14,25 @@ GET    /runs/{id}/drill-down/{metric} — drill-down into metric data
 PATCH  /runs/{id}/exceptions/{eid}   — update exception resolution
 PATCH  /runs/{id}/exceptions/bulk    — bulk update exceptions
 POST   /runs/{id}/complete           — mark run as completed (locks mutations)
+GET    /runs/{id}/write-plan         — write plan for Summit (cached per run; filters + paging)
+GET    /runs/{id}/write-plan/export.ndjson — the write plan streamed as NDJSON
+GET    /runs/{id}/write-plan/approval — approved / held ops of the saved plan + approval history
+POST   /runs/{id}/write-plan/approval — approve / exclude ops, or reset to the whole plan
+POST   /runs/{id}/write-back/dry-run — validate the write plan without writing
+POST   /runs/{id}/write-back         — write approved ops to Summit LIVE (streaming / background)
+GET    /runs/{id}/write-back/jobs    — live write-back jobs of the run
+GET    /runs/{id}/write-back/jobs/{jid} — poll one job: progress, ops/minute, ETA
+POST   /runs/{id}/write-back/retry-failed — re-send the live writes whose last attempt failed
+GET    /runs/mapping/summary         — client ↔ ח.פ mapping cache stats
+POST   /runs/mapping/refresh         — rebuild the mapping from every Summit client (slow)
+GET    /runs/prewarm/status          — off-hours cache prewarm status + last report + taxonomy version
+POST   /runs/prewarm/run             — trigger a prewarm pass now
 """
 
 import time
 import uuid as uuid_mod
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -32,6 +47,8 @@ from .schemas import (
     CreateRunRequest,
     PatchExceptionRequest,
     BulkPatchExceptionsRequest,
+    PlanApprovalRequest,
+    IdomPasteRequest,
     RunOut,
     RunDetailOut,
     RunFileOut,
@@ -122,6 +139,7 @@ def _serialize_run_detail(run: models.Run) -> RunDetailOut:
             status_completed_count=m.status_completed_count,
             status_preserved_count=m.status_preserved_count,
             status_regression_flags=m.status_regression_flags,
+            carried_over_count=m.carried_over_count or 0,
             processing_seconds=m.processing_seconds,
         )
     exceptions = [_serialize_exception(e) for e in run.exceptions]
@@ -165,6 +183,9 @@ def create_run(body: CreateRunRequest, db: Session = Depends(get_db)):
 
 VALID_FILE_ROLES = {"idom_upload", "sumit_upload"}
 
+# Stored name of an IDOM upload posted as text (POST /runs/{id}/idom-paste)
+IDOM_PASTE_FILENAME = "idom_paste.tsv"
+
 @router.post("/{run_id}/upload", response_model=RunFileOut)
 async def upload_file(
     run_id: str,
@@ -173,6 +194,24 @@ async def upload_file(
     db: Session = Depends(get_db),
 ):
     run = _run_or_404(run_id, db)
+    content = await file.read()
+    return _store_run_file(run, db, file_role, file.filename, content, file.content_type)
+
+
+@router.post("/{run_id}/idom-paste", response_model=RunFileOut)
+def paste_idom(run_id: str, body: IdomPasteRequest, db: Session = Depends(get_db)):
+    """
+    SHAAM rows pasted as text become the run's IDOM upload (stored as .tsv)
+    and are parsed as text from then on — no paste-into-Excel step.
+    """
+    run = _run_or_404(run_id, db)
+    content = body.text.encode("utf-8")
+    return _store_run_file(run, db, "idom_upload", IDOM_PASTE_FILENAME, content, "text/tab-separated-values")
+
+
+def _store_run_file(
+    run: models.Run, db: Session, file_role: str, filename: str, content: bytes, mime_type: Optional[str],
+) -> RunFileOut:
     _ensure_not_completed(run)
 
     if run.status not in ("uploading", "review"):
@@ -190,22 +229,21 @@ async def upload_file(
     if existing:
         raise HTTPException(409, f"קובץ בתפקיד '{file_role}' כבר הועלה להרצה זו")
 
-    content = await file.read()
-    stored_path = file_store.store_upload(str(run.id), file.filename, content)
+    stored_path = file_store.store_upload(str(run.id), filename, content)
 
     run_file = models.RunFile(
         run_id=run.id,
         file_role=file_role,
-        original_name=file.filename,
+        original_name=filename,
         stored_path=str(stored_path),
         size_bytes=len(content),
-        mime_type=file.content_type,
+        mime_type=mime_type,
     )
     db.add(run_file)
     db.commit()
     db.refresh(run_file)
 
-    logger.info("Uploaded %s for run %s (%d bytes)", file_role, run_id, len(content))
+    logger.info("Uploaded %s for run %s (%d bytes)", file_role, run.id, len(content))
     return RunFileOut(
         id=str(run_file.id),
         file_role=run_file.file_role,
@@ -269,6 +307,7 @@ def execute_run(run_id: str, db: Session = Depends(get_db)):
         status_completed_count=result.status_completed_count,
         status_preserved_count=result.status_preserved_count,
         status_regression_flags=result.status_regression_flags,
+        carried_over_count=result.carried_over_count,
         processing_seconds=round(elapsed, 3),
     )
     db.add(metrics)
@@ -474,17 +513,32 @@ RESOLUTION_LABELS_HE = {
 }
 
 
-def _read_excel_rows(
-    path: str, sheet_name: Optional[str], limit: int, offset: int
-) -> DrillDownOut:
-    """Read an Excel sheet and return paginated rows for drill-down."""
+def _sheet_rows(path: str, sheet_name: Optional[str]) -> List[tuple]:
     from openpyxl import load_workbook
+    from ..core.idom_workbook import decode_paste, is_paste_file
+
+    if is_paste_file(path):
+        # Pasted IDOM text: the rows as pasted, empty cells as None
+        with open(path, "rb") as f:
+            lines = decode_paste(f.read()).splitlines()
+        return [tuple(v.strip() or None for v in line.split("\t")) for line in lines if line.strip()]
 
     wb = load_workbook(path, read_only=True, data_only=True)
     ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
-
     all_rows = list(ws.iter_rows(values_only=True))
     wb.close()
+    return all_rows
+
+
+def _read_excel_rows(
+    path: str, sheet_name: Optional[str], limit: int, offset: int
+) -> DrillDownOut:
+    """
+    Read an Excel sheet and return paginated rows for drill-down. The sheet
+    is read once per file content (parse cache); later pages and metrics
+    over the same file are sliced from the cached rows.
+    """
+    all_rows = _parsed_input(path, "sheet-rows", [sheet_name], lambda: _sheet_rows(path, sheet_name))
 
     if not all_rows:
         return DrillDownOut(metric="", total_rows=0, columns=[], rows=[])
@@ -671,6 +725,25 @@ def complete_run(run_id: str, db: Session = Depends(get_db)):
 #  Internal: run the reconciliation pipeline
 # ------------------------------------------------------------------ #
 
+MATCH_RESULT_FILE = "match_result.json"
+
+
+def _save_match_result(run_id: str, match_result):
+    """Persist the run's matching pass so write-back stages replay it."""
+    if match_result is None:
+        return
+    try:
+        match_result.save(file_store.artifacts_dir(run_id) / MATCH_RESULT_FILE)
+    except OSError as exc:
+        logger.warning("Could not persist match result for run %s: %s", run_id, exc)
+
+
+def _load_match_result(run_id: str):
+    """The run's persisted matching pass, or None (write plan then matches itself)."""
+    from ..core.matching import MatchResult
+    return MatchResult.load(file_store.artifacts_dir(run_id) / MATCH_RESULT_FILE)
+
+
 def _run_reconciliation(
     idom_path: str,
     sumit_path: str,
@@ -686,18 +759,30 @@ def _run_reconciliation(
     """
     from ..core.config import get_config
     from ..core.idom_parser import parse_idom_file
-    from ..core.sumit_parser import parse_sumit_file
+    from ..core.idom_workbook import is_paste_file
+    from ..core.sumit_parser import SUMITParser
     from ..core.sync_engine import run_sync
     from ..core.output_writer import write_outputs
 
     config = get_config(report_type)
 
-    # Parse inputs
-    idom_df, idom_conflicts, idom_warnings = parse_idom_file(idom_path)
-    sumit_df, sumit_lookup, sumit_warnings = parse_sumit_file(sumit_path, config, tax_year)
+    def _parse_idom():
+        if is_paste_file(idom_path):
+            return _parse_idom_paste(idom_path, report_type)
+        return parse_idom_file(idom_path)
+
+    def _parse_sumit():
+        parser = SUMITParser(config)
+        return parser.parse(sumit_path, tax_year), parser.parse_warnings
 
-    # Run sync
+    # Parse inputs (parse cache: the same upload parsed before is not re-parsed)
+    idom_df, idom_conflicts, idom_warnings = _parsed_input(idom_path, "idom-file", [report_type], _parse_idom)
+    sumit_df, sumit_warnings = _parsed_input(sumit_path, "sumit", [report_type, tax_year], _parse_sumit)
+    sumit_lookup = SUMITParser(config).build_lookup(sumit_df)
+
+    # Run sync — the matching pass is persisted for the write-back stages
     result = run_sync(idom_df, sumit_df, sumit_lookup, config, tax_year)
+    _save_match_result(run_id, result.match_result)
 
     # Write outputs to volume
     output_dir = str(file_store.outputs_dir(run_id))
@@ -718,11 +803,18 @@ def _run_reconciliation(
 # ------------------------------------------------------------------ #
 
 @router.post("/{run_id}/execute-api")
-def execute_run_api(run_id: str, db: Session = Depends(get_db)):
+def execute_run_api(
+    run_id: str,
+    full: bool = Query(default=False, description="Re-fetch every row (skip incremental carry-over)"),
+    db: Session = Depends(get_db),
+):
     """
     Run reconciliation using Summit API as SUMIT data source.
     Returns immediately — sync runs in background thread.
     Frontend polls GET /runs/{id} for status updates.
+
+    Unchanged IDOM rows reuse the previous run's Summit snapshot unless
+    full=true (see core/incremental.py).
     """
     import threading
 
@@ -776,6 +868,7 @@ def execute_run_api(run_id: str, db: Session = Depends(get_db)):
                 report_type=bg_report_type,
                 tax_year=bg_tax_year,
                 run_id=bg_run_id,
+                previous=None if full else _previous_snapshot(bg_db, bg_run),
             )
 
             elapsed = time.monotonic() - t0
@@ -792,6 +885,7 @@ def execute_run_api(run_id: str, db: Session = Depends(get_db)):
                 status_completed_count=result.status_completed_count,
                 status_preserved_count=result.status_preserved_count,
                 status_regression_flags=result.status_regression_flags,
+                carried_over_count=result.carried_over_count,
                 processing_seconds=round(elapsed, 3),
             )
             bg_db.add(metrics)
@@ -906,12 +1000,13 @@ def refresh_mapping():
     """
     from ..core.sumit_api_client import SummitAPIClient
     from ..core.mapping_store import MappingStore
+    from ..core.write_plan import CLIENTS_FOLDER_ID
 
     api = SummitAPIClient()
     store = MappingStore()
 
     # Fetch all client IDs
-    client_ids = api.list_entities("557688522")  # לקוחות folder
+    client_ids = api.list_entities(CLIENTS_FOLDER_ID)
 
     resolved = 0
     for cid in client_ids:
@@ -931,53 +1026,165 @@ def refresh_mapping():
     }
 
 
+# ------------------------------------------------------------------ #
+#  GET /prewarm/status  — off-hours cache prewarm status
+#  POST /prewarm/run    — trigger a prewarm pass now
+# ------------------------------------------------------------------ #
+
+@router.get("/prewarm/status", tags=["prewarm"])
+def get_prewarm_status():
+    """Scheduler state plus what the last pass warmed and what it cost."""
+    from ..core.prewarm import get_scheduler
+    from ..core.report_cache import ReportCache
+    from ..core import taxonomy
+    status = get_scheduler().status()
+    status["report_cache"] = ReportCache().to_summary()
+    status["taxonomy"] = taxonomy.registry.snapshot().to_summary()
+    return status
+
+
+@router.post("/prewarm/run", tags=["prewarm"])
+def trigger_prewarm():
+    """Run the warm-up jobs now (background, low-priority lane)."""
+    from ..core.prewarm import get_scheduler
+    if not get_scheduler().trigger():
+        raise HTTPException(409, "חימום מטמון כבר רץ")
+    return {"status": "started", "message": "חימום המטמון הופעל ברקע"}
+
+
 # ------------------------------------------------------------------ #
 #  Internal: run reconciliation with API source
 # ------------------------------------------------------------------ #
 
+def _parsed_input(path: str, kind: str, params, parse):
+    """parse()'s result for this upload, from the shared parse cache when the content was parsed before."""
+    from ..core.parse_cache import ParseCache
+    return ParseCache(file_store.parse_cache_dir()).get_or_parse(path, kind, params, parse)
+
+
 def _load_idom_dataframe(idom_path: str, report_type: str):
     """
     Parse an IDOM upload as either a multi-sheet workbook or a single-sheet
     file, returning (df, conflicts, warnings). Mirrors the workbook-first /
     single-sheet-fallback logic used by both execute-api and write-plan paths
-    so they stay in sync.
+    so they stay in sync. Served from the parse cache after the first stage.
     """
+    return _parsed_input(
+        idom_path, "idom", [report_type], lambda: _parse_idom_upload(idom_path, report_type),
+    )
+
+
+def _parse_idom_paste(idom_path: str, report_type: str):
+    """(df, conflicts, warnings) of an IDOM upload that is SHAAM paste text."""
+    from ..core.idom_workbook import parse_idom_paste_file
+
+    sheet = parse_idom_paste_file(idom_path, report_type)
+    if sheet.error is not None:
+        raise ValueError(f"IDOM paste parse failed: {sheet.error}")
+    if sheet.records.empty:
+        raise ValueError("IDOM paste has no rows with מספר_תיק")
+    return sheet.records, sheet.conflicts, sheet.warnings
+
+
+def _parse_idom_upload(idom_path: str, report_type: str):
     from ..core.idom_parser import parse_idom_file
-    from ..core.idom_workbook import parse_idom_workbook
+    from ..core.idom_workbook import IDOMWorkbook, is_paste_file
+
+    if is_paste_file(idom_path):
+        return _parse_idom_paste(idom_path, report_type)
 
     try:
-        wb_result = parse_idom_workbook(idom_path)
-        matching = [s for s in wb_result.sheets if s.report_type == report_type and s.error is None and len(s.records) > 0]
-        if matching:
-            sheet = matching[0]
-            logger.info("Workbook: using sheet '%s' (%d records) for %s", sheet.sheet_name, len(sheet.records), report_type)
-            return sheet.records, sheet.conflicts, sheet.warnings
-        if wb_result.total_records > 0:
-            first_good = next((s for s in wb_result.sheets if s.error is None and len(s.records) > 0), None)
-            if first_good:
-                warnings = first_good.warnings + [
-                    "Sheet '{}' used (no exact match for report type '{}')".format(first_good.sheet_name, report_type)
-                ]
-                logger.info("Workbook: no '%s' sheet, using '%s' (%d records)", report_type, first_good.sheet_name, len(first_good.records))
-                return first_good.records, first_good.conflicts, warnings
+        # Only the report type's sheet is parsed; the others only if it has no records
+        with IDOMWorkbook(idom_path) as wb:
+            for name in wb.sheets_for(report_type):
+                sheet = wb.sheet(name)
+                if sheet.error is None and len(sheet.records) > 0:
+                    logger.info("Workbook: using sheet '%s' (%d records) for %s", sheet.sheet_name, len(sheet.records), report_type)
+                    return sheet.records, sheet.conflicts, sheet.warnings
+            for name in wb.data_sheets:
+                first_good = wb.sheet(name)
+                if first_good.error is None and len(first_good.records) > 0:
+                    warnings = first_good.warnings + [
+                        "Sheet '{}' used (no exact match for report type '{}')".format(first_good.sheet_name, report_type)
+                    ]
+                    logger.info("Workbook: no '%s' sheet, using '%s' (%d records)", report_type, first_good.sheet_name, len(first_good.records))
+                    return first_good.records, first_good.conflicts, warnings
         raise ValueError("Workbook parsed but no usable sheets")
     except Exception as wb_err:
         logger.info("Workbook parse failed (%s), falling back to single-sheet parser", wb_err)
         return parse_idom_file(idom_path)
 
 
+SNAPSHOT_LOOKBACK_RUNS = 5
+
+
+def _previous_snapshot(db: Session, run: models.Run):
+    """
+    The latest earlier run of the same year/report type that left a Summit
+    snapshot: (snapshot, match_result, last_writes) or None.
+    last_writes maps SUMIT record IDs to their latest successful live write
+    since that snapshot.
+    """
+    from ..core.incremental import RESYNC_MAX_AGE_HOURS, SNAPSHOT_FILE, SummitSnapshot
+
+    candidates = (
+        db.query(models.Run)
+        .filter(
+            models.Run.year == run.year,
+            models.Run.report_type == run.report_type,
+            models.Run.id != run.id,
+            models.Run.status.in_(("review", "completed")),
+        )
+        .order_by(models.Run.completed_at.desc())
+        .limit(SNAPSHOT_LOOKBACK_RUNS)
+        .all()
+    )
+    for prev in candidates:
+        prev_id = str(prev.id)
+        snapshot = SummitSnapshot.load(file_store.artifacts_dir(prev_id) / SNAPSHOT_FILE)
+        match_result = _load_match_result(prev_id) if snapshot else None
+        if snapshot is None or match_result is None:
+            continue
+
+        # Records older than the staleness window are re-fetched anyway
+        cutoff = datetime.utcnow() - timedelta(hours=RESYNC_MAX_AGE_HOURS)
+        last_writes: Dict[str, datetime] = {}
+        writes = (
+            db.query(models.WriteLog.entity_id, models.WriteLog.created_at)
+            .filter(
+                models.WriteLog.status == "success",
+                models.WriteLog.entity_id.isnot(None),
+                models.WriteLog.created_at >= cutoff,
+            )
+            .all()
+        )
+        for entity_id, created_at in writes:
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            rid = str(entity_id)
+            if rid not in last_writes or created_at > last_writes[rid]:
+                last_writes[rid] = created_at
+        return snapshot, match_result, last_writes
+    return None
+
+
 def _run_reconciliation_api(
     idom_path: str,
     report_type: str,
     tax_year: int,
     run_id: str,
+    previous=None,
 ):
     """
     Orchestrates reconciliation using Summit API as data source.
     Only requires IDOM file — SUMIT data comes from API.
     Supports both multi-sheet workbooks and single-sheet files.
+
+    previous is _previous_snapshot()'s result: unchanged rows are carried
+    over from it instead of re-fetched. Every run leaves its own snapshot.
     """
     from ..core.config import get_config
+    from ..core.incremental import SNAPSHOT_FILE, SummitSnapshot, fetch_incremental, mark_carried_over
     from ..core.sumit_api_source import fetch_sumit_data_targeted
     from ..core.sync_engine import run_sync
     from ..core.output_writer import write_outputs
@@ -996,14 +1203,23 @@ def _run_reconciliation_api(
         "Targeted Summit fetch: %d IDOM rows → %d distinct ח.פ values",
         len(idom_df), len(set(idom_company_numbers)),
     )
-    sumit_df, sumit_lookup, sumit_warnings = fetch_sumit_data_targeted(
-        config=config,
-        tax_year=tax_year,
-        idom_company_numbers=idom_company_numbers,
+    snapshot, prev_match, last_writes = previous or (None, None, {})
+    fetched = fetch_incremental(
+        config, tax_year, idom_df, fetch_sumit_data_targeted,
+        previous=snapshot, previous_match=prev_match, last_writes=last_writes,
     )
+    sumit_df, sumit_lookup, sumit_warnings = fetched.sumit_df, fetched.sumit_lookup, fetched.warnings
 
-    # Run sync
+    # Run sync — the matching pass is persisted for the write-back stages
     result = run_sync(idom_df, sumit_df, sumit_lookup, config, tax_year)
+    mark_carried_over(result, fetched.plan)
+    _save_match_result(run_id, result.match_result)
+    try:
+        SummitSnapshot.build(
+            run_id, tax_year, report_type, idom_df, sumit_df, fetched.fetched_at,
+        ).save(file_store.artifacts_dir(run_id) / SNAPSHOT_FILE)
+    except OSError as exc:
+        logger.warning("Could not persist Summit snapshot for run %s: %s", run_id, exc)
 
     # Write outputs
     output_dir = str(file_store.outputs_dir(run_id))
@@ -1021,18 +1237,14 @@ def _run_reconciliation_api(
 #  Write-back endpoints
 # ------------------------------------------------------------------ #
 
-def _build_write_plan_for_run(run: models.Run):
-    """Helper: build write plan from a run's data."""
+def _write_back_inputs(run: models.Run):
+    """(config, idom_df, idom_company_numbers, match_result) for a run's write-back."""
     files_by_role = {f.file_role: f for f in run.files}
     if "idom_upload" not in files_by_role:
         raise HTTPException(400, "קובץ IDOM לא נמצא")
 
     from ..core.config import get_config
-    from ..core.sumit_api_source import fetch_sumit_data_targeted
-    from ..core.sync_engine import SyncEngine
-    from ..core.mapping_store import MappingStore
-    from ..core.taxonomy import load_full_taxonomies, is_loaded
-    from ..core.sumit_api_client import SummitAPIClient
+    from ..core import taxonomy
 
     config = get_config(run.report_type)
     idom_df, _, _ = _load_idom_dataframe(files_by_role["idom_upload"].stored_path, run.report_type)
@@ -1041,90 +1253,864 @@ def _build_write_plan_for_run(run: models.Run):
     idom_company_numbers = [
         str(v).strip() for v in idom_df["מספר_תיק"].dropna().tolist() if str(v).strip()
     ]
+
+    # Taxonomies are preloaded at startup. On the seed tables alone unknown
+    # פקיד שומה / סוג תיק codes could not be written, so wait (bounded) for
+    # the preload rather than plan without them
+    if not taxonomy.registry.snapshot().complete:
+        from ..core.sumit_api_client import SummitAPIClient
+
+        snap = taxonomy.registry.ensure_complete(
+            lambda: SummitAPIClient(priority="low"), taxonomy.TAXONOMY_WAIT_SECONDS,
+        )
+        if not snap.complete:
+            logger.warning("Write plan refused: taxonomy still partial (v%d, %s)", snap.version, snap.source)
+            raise HTTPException(503, "טבלאות פקיד שומה / סוג תיק עדיין נטענות מ-Summit — נסו שוב בעוד דקה")
+
+    match_result = _load_match_result(str(run.id))
+    if match_result is not None and not match_result.covers(idom_company_numbers):
+        logger.warning("Match result for run %s does not cover the IDOM file — re-matching", run.id)
+        match_result = None
+    return config, idom_df, idom_company_numbers, match_result
+
+
+def _build_write_plan_for_run(run: models.Run, only_keys: Optional[List[str]] = None):
+    """
+    Helper: build write plan from a run's data.
+
+    only_keys: plan just the IDOM rows with these מספר_תיק values (fresh
+    matching — used to re-plan entities written since a cached plan).
+    Returns (plan, fetch start, report cache).
+    """
+    from ..core.sumit_api_source import fetch_client_refs, fetch_sumit_data_targeted
+    from ..core.sync_engine import SyncEngine
+    from ..core.mapping_store import MappingStore
+    from ..core.report_cache import ReportCache
+    from ..core import parallel
+
+    config, idom_df, idom_company_numbers, match_result = _write_back_inputs(run)
+    if only_keys is not None:
+        idom_df = idom_df[idom_df["מספר_תיק"].astype(str).isin(set(only_keys))]
+        idom_company_numbers = [cn for cn in idom_company_numbers if cn in set(only_keys)]
+        match_result = None
+    started = datetime.now(timezone.utc)
+    reports = ReportCache()
+    # Live: a no-op SKIP must compare against Summit as it is now, not the
+    # folder mirror or the refs cache (read-only reconciliation still uses them)
     sumit_df, sumit_lookup, _ = fetch_sumit_data_targeted(
         config=config,
         tax_year=run.year,
         idom_company_numbers=idom_company_numbers,
+        reports=reports,
+        live=True,
     )
     mapping = MappingStore()
 
-    # Ensure full taxonomy tables are loaded
-    if not is_loaded():
-        try:
-            api = SummitAPIClient()
-            load_full_taxonomies(api)
-        except Exception as e:
-            logger.warning("Could not load full taxonomies: %s", e)
+    # Current פקיד שומה / סוג תיק of the clients we may update — lets the
+    # planner skip client writes that would not change anything
+    client_keys = [
+        str(row.get("מספר_תיק", "")).strip()
+        for row in idom_df.to_dict("records")
+        if any(str(row.get(col, "")).strip() not in ("", "nan", "None") for col in ("פקיד_שומה", "סוג_תיק"))
+    ]
+    fetch_client_refs(client_keys, mapping, live=True)
 
     engine = SyncEngine(config)
-    return engine.build_write_plan(idom_df, sumit_df, sumit_lookup, run.year, mapping)
+    plan = parallel.build_write_plan(
+        engine, idom_df, sumit_df, sumit_lookup, run.year, mapping, match_result=match_result,
+    )
+    return plan, started, reports
+
+
+def _idom_sha256(run: models.Run) -> str:
+    from ..core.plan_cache import file_sha256
+
+    files_by_role = {f.file_role: f for f in run.files}
+    if "idom_upload" not in files_by_role:
+        raise HTTPException(400, "קובץ IDOM לא נמצא")
+    return file_sha256(files_by_role["idom_upload"].stored_path)
+
+
+def _saved_write_plan(run: models.Run, allow_unreadable: bool = False):
+    """
+    (path, CachedWritePlan or None) of the run's saved plan. The file is the
+    only copy of the approval, so one that exists but can't be read is
+    refused (409) rather than treated as "nothing saved" — that would
+    approve the whole plan. allow_unreadable: return None for it instead.
+    """
+    from ..core.plan_cache import PLAN_FILE, CachedWritePlan
+
+    path = file_store.artifacts_dir(str(run.id)) / PLAN_FILE
+    cached = CachedWritePlan.load(path)
+    if cached is None and path.exists() and not allow_unreadable:
+        logger.error("Run %s: write plan file %s unreadable — approval unknown", run.id, path)
+        raise HTTPException(
+            409, "קובץ תוכנית הכתיבה והאישורים אינו קריא — יש לבנות מחדש (rebuild=true) ולאשר שוב",
+        )
+    return path, cached
+
+
+def _write_plan_for_run(run: models.Run, rebuild: bool = False):
+    """
+    The run's write plan: the cached one while it matches the IDOM upload and
+    is fresh, else a new build (saved for the next stage) that inherits the
+    cached plan's approval. An unreadable plan file is refused unless
+    rebuild, which then starts with nothing approved. Returns
+    (CachedWritePlan, reused).
+    """
+    from ..core.plan_cache import CachedWritePlan, PlanApproval, snapshot_time
+
+    path, previous = _saved_write_plan(run, allow_unreadable=rebuild)
+    idom_sha256 = _idom_sha256(run)
+    if not rebuild and previous is not None and previous.is_fresh(idom_sha256):
+        logger.info("Run %s: reusing write plan from %s (%d ops)", run.id, previous.created_at, previous.plan.total)
+        return previous, True
+
+    plan, started, reports = _build_write_plan_for_run(run)
+    cached = CachedWritePlan.build(plan, idom_sha256, snapshot_time(started, plan, reports))
+    if previous is not None:
+        # Approvals are by op key: unchanged ops stay approved, changed ones are held
+        cached.approval = previous.approval
+    elif path.exists():
+        # The approval went with the unreadable file: hold everything until it is given again
+        cached.approval = PlanApproval(approved=set())
+    try:
+        cached.save(path, keep_saved_approval=True)
+    except OSError as exc:
+        logger.warning("Could not persist write plan for run %s: %s", run.id, exc)
+    return cached, False
+
+
+def _refresh_touched_ops(run: models.Run, cached, db: Session):
+    """
+    A cached plan with the ops of every entity this service wrote to since
+    the plan's Summit snapshot (any run) re-fetched and re-planned. Returns
+    (plan, number of IDOM keys re-planned).
+    """
+    from ..core.plan_cache import splice, touched_keys
 
+    since = cached.snapshot_datetime.astimezone(timezone.utc).replace(tzinfo=None)
+    logs = (
+        db.query(models.WriteLog)
+        .filter(models.WriteLog.status == "success", models.WriteLog.created_at >= since)
+        .all()
+    )
+    report_ids, client_ids = set(), set()
+    for log in logs:
+        if log.op_type == "update_client" and log.entity_id:
+            client_ids.add(int(log.entity_id))
+        elif log.op_type == "update_report" and log.entity_id:
+            report_ids.add(int(log.entity_id))
+        elif log.op_type == "create_report" and (log.properties_written or {}).get("לקוח"):
+            client_ids.add(int(log.properties_written["לקוח"]))
+
+    keys = touched_keys(cached.plan, report_ids, client_ids)
+    if not keys:
+        return cached.plan, 0
+
+    # The re-plan reads them live, as every plan build does
+    logger.info("Run %s: re-planning %d keys written since %s", run.id, len(keys), cached.snapshot_at)
+    replacement, _, _ = _build_write_plan_for_run(run, only_keys=keys)
+    return splice(cached.plan, replacement, keys), len(keys)
+
+
+def _write_log_row(run_id, entry: dict, dry_run: bool = False) -> models.WriteLog:
+    return models.WriteLog(
+        run_id=run_id,
+        op_key=entry.get("op_key"),
+        dry_run=dry_run,
+        op_type=entry.get("op_type", ""),
+        entity_id=entry.get("entity_id"),
+        folder_id=entry.get("folder_id", ""),
+        match_key=entry.get("match_key", ""),
+        client_name=entry.get("client_name", ""),
+        properties_written=entry.get("properties_written"),
+        old_values=entry.get("old_values"),
+        status=entry.get("status", ""),
+        error_message=entry.get("error", ""),
+    )
 
-def _save_write_logs(run_id, audit_log, db: Session):
+
+def _save_write_logs(run_id, audit_log, db: Session, dry_run: bool = False):
     """Persist audit log entries to DB."""
     for entry in audit_log:
-        log = models.WriteLog(
-            run_id=run_id,
-            op_type=entry.get("op_type", ""),
-            entity_id=entry.get("entity_id"),
-            folder_id=entry.get("folder_id", ""),
-            match_key=entry.get("match_key", ""),
-            client_name=entry.get("client_name", ""),
-            properties_written=entry.get("properties_written"),
-            old_values=entry.get("old_values"),
-            status=entry.get("status", ""),
-            error_message=entry.get("error", ""),
+        db.add(_write_log_row(run_id, entry, dry_run=dry_run))
+    db.commit()
+
+
+def _write_log_sink(run_id, db: Session, job: Optional[models.WriteJob] = None):
+    """
+    WriteExecutor on_send + on_audit callback — a write-ahead checkpoint.
+    A "pending" row is committed before each create / update is sent, and
+    becomes the op's outcome once it completes, so a write-back that dies
+    halfway leaves an exact record — including calls whose outcome it never
+    saw (see _settle_pending_writes). Called from executor worker threads —
+    serialized here.
+
+    A checkpoint that can't be committed raises CheckpointError, which stops
+    the executor: writing on unrecorded would send those ops again on resume.
+
+    job: write job whose counters advance in the same commit.
+
+    Returns (sink, set_total): set_total(n) records job.total_ops — for a
+    streamed write-back, called from the planner thread once planning
+    ends — serialized with the sink.
+    """
+    import threading
+
+    from ..core.write_executor import CheckpointError
+
+    lock = threading.Lock()
+    pending: Dict[str, models.WriteLog] = {}
+
+    def _sink(entry: dict) -> None:
+        with lock:
+            try:
+                if entry.get("status") == "pending":
+                    row = _write_log_row(run_id, entry)
+                    db.add(row)
+                    pending[entry.get("op_key")] = row
+                else:
+                    row = pending.pop(entry.get("op_key"), None)
+                    if row is None:
+                        db.add(_write_log_row(run_id, entry))
+                    else:
+                        row.properties_written = entry.get("properties_written")
+                        row.status = entry.get("status", "")
+                        row.error_message = entry.get("error", "")
+                    if job is not None:
+                        _advance_write_job(job, entry.get("status", ""))
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                logger.error("Could not persist write log for op %s: %s", entry.get("op_key"), exc)
+                raise CheckpointError("write log for op %s not saved: %s" % (entry.get("op_key"), exc)) from exc
+
+    def _set_total(total: int) -> None:
+        if job is None:
+            return
+        with lock:
+            try:
+                job.total_ops = total
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                logger.warning("Could not record total ops of write job %s: %s", job.id, exc)
+
+    return _sink, _set_total
+
+
+def _settle_pending_writes(run_id, db: Session) -> set:
+    """
+    Ops a previous write-back sent but never saw complete: their last log row
+    is still "pending". Updates are simply sent again (same values). A create
+    may have gone through, so Summit is asked first: found → logged as
+    written, and its op key returned so it is skipped; not found → logged
+    "interrupted" and sent again.
+    """
+    from ..core.write_plan import OpType
+
+    logs = (
+        db.query(models.WriteLog)
+        .filter(
+            models.WriteLog.run_id == run_id,
+            models.WriteLog.dry_run.is_(False),
+            models.WriteLog.op_key.isnot(None),
+        )
+        .order_by(models.WriteLog.created_at)
+        .all()
+    )
+    latest: Dict[str, models.WriteLog] = {}
+    for log in logs:
+        latest[log.op_key] = log
+    cut_off = [log for log in latest.values() if log.status == "pending"]
+    if not cut_off:
+        return set()
+
+    from ..core.sumit_api_client import SummitAPIClient
+
+    api = None
+    settled = set()
+    for log in cut_off:
+        found = None
+        props = log.properties_written or {}
+        if log.op_type == OpType.CREATE_REPORT.value and props.get("לקוח") and props.get("שנת מס"):
+            api = api or SummitAPIClient()
+            found = api.find_report_id(log.folder_id, int(props["לקוח"]), int(props["שנת מס"]))
+        if found:
+            log.status = "success"
+            log.properties_written = dict(props, _created_entity_id=int(found))
+            log.error_message = "Interrupted — report found in Summit, not created again"
+            settled.add(log.op_key)
+        else:
+            log.status = "interrupted"
+            log.error_message = "Interrupted before the outcome was recorded — sent again"
+    db.commit()
+    logger.warning(
+        "Run %s: %d writes were cut off mid-call; %d creates found in Summit",
+        run_id, len(cut_off), len(settled),
+    )
+    return settled
+
+
+def _advance_write_job(job: models.WriteJob, status: str) -> None:
+    job.done_ops = (job.done_ops or 0) + 1
+    if status == "success":
+        job.succeeded = (job.succeeded or 0) + 1
+    elif status == "failed":
+        job.failed = (job.failed or 0) + 1
+    else:
+        job.skipped = (job.skipped or 0) + 1
+    job.updated_at = datetime.now(timezone.utc)
+
+
+def _start_write_job(run: models.Run, db: Session, streaming: bool) -> models.WriteJob:
+    """
+    Claim the run for a live write-back. Every live path goes through here;
+    the partial unique index on running jobs decides between racing
+    requests, and the loser gets 409.
+    """
+    from sqlalchemy.exc import IntegrityError
+
+    job = models.WriteJob(run_id=run.id, status="running", streaming=streaming, started_at=datetime.now(timezone.utc))
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        active = (
+            db.query(models.WriteJob)
+            .filter(models.WriteJob.run_id == run.id, models.WriteJob.status == "running")
+            .first()
         )
-        db.add(log)
+        raise HTTPException(409, f"כתיבה לריצה זו כבר פעילה (job {active.id if active else '?'})")
+    return job
+
+
+def _finish_write_job(
+    job: models.WriteJob, db: Session, response: Optional[dict] = None, error: Optional[BaseException] = None,
+) -> None:
+    """Close a write job: failed on an exception or a streamed run that stopped partway."""
+    if error is not None:
+        job.status, job.error_message = "failed", str(error)[:500]
+    elif response.get("status") == "failed":
+        job.status, job.error_message = "failed", response["error"][:500]
+    else:
+        job.status = "completed"
+    job.warnings = ((response or {}).get("streaming") or {}).get("warnings") or None
+    job.completed_at = datetime.now(timezone.utc)
     db.commit()
 
 
+def _serialize_write_job(job: models.WriteJob) -> dict:
+    """Job row plus derived throughput: ops per minute and ETA (seconds)."""
+    def _utc(dt):
+        return dt.replace(tzinfo=timezone.utc) if dt is not None and dt.tzinfo is None else dt
+
+    started = _utc(job.started_at)
+    end = _utc(job.completed_at) or datetime.now(timezone.utc)
+    minutes = max((end - started).total_seconds(), 1e-6) / 60
+    ops_per_minute = job.done_ops / minutes if job.done_ops else 0.0
+    eta_seconds = None
+    if job.status == "running" and job.total_ops is not None and ops_per_minute > 0:
+        eta_seconds = round(max(job.total_ops - job.done_ops, 0) / ops_per_minute * 60, 1)
+    return {
+        "job_id": str(job.id),
+        "run_id": str(job.run_id),
+        "status": job.status,
+        "streaming": bool(job.streaming),
+        "total_ops": job.total_ops,
+        "done_ops": job.done_ops,
+        "succeeded": job.succeeded,
+        "failed": job.failed,
+        "skipped": job.skipped,
+        "ops_per_minute": round(ops_per_minute, 1),
+        "eta_seconds": eta_seconds,
+        "error": job.error_message,
+        "warnings": job.warnings or [],
+        "started_at": started.isoformat() if started else None,
+        "updated_at": _utc(job.updated_at).isoformat() if job.updated_at else None,
+        "completed_at": _utc(job.completed_at).isoformat() if job.completed_at else None,
+    }
+
+
+def _written_op_keys(run_id, db: Session) -> set:
+    """Op keys of this run already written to Summit (any WriteLog success)."""
+    rows = (
+        db.query(models.WriteLog.op_key)
+        .filter(
+            models.WriteLog.run_id == run_id,
+            models.WriteLog.status == "success",
+            models.WriteLog.op_key.isnot(None),
+        )
+        .distinct()
+        .all()
+    )
+    return {r.op_key for r in rows}
+
+
+def _failed_write_logs(run_id, db: Session) -> List[models.WriteLog]:
+    """Latest log row of each op whose last live attempt failed (plan order)."""
+    logs = (
+        db.query(models.WriteLog)
+        .filter(
+            models.WriteLog.run_id == run_id,
+            models.WriteLog.dry_run.is_(False),
+            models.WriteLog.op_key.isnot(None),
+            models.WriteLog.status.in_(("success", "failed")),
+        )
+        .order_by(models.WriteLog.created_at)
+        .all()
+    )
+    latest: Dict[str, models.WriteLog] = {}
+    written = set()
+    for log in logs:
+        latest.pop(log.op_key, None)   # re-insert → dict order follows the latest attempt
+        latest[log.op_key] = log
+        if log.status == "success":
+            written.add(log.op_key)
+    return [log for key, log in latest.items() if log.status == "failed" and key not in written]
+
+
+def _op_from_write_log(log: models.WriteLog):
+    """Rebuild the WriteOperation a failed WriteLog row was written from."""
+    from ..core.write_plan import OpType, WriteOperation
+
+    properties = dict(log.properties_written or {})
+    properties.pop("_created_entity_id", None)
+    op_type = OpType(log.op_type)
+    return WriteOperation(
+        op_type=op_type,
+        entity_id=log.entity_id,
+        folder_id=log.folder_id,
+        client_name=log.client_name or "",
+        match_key=log.match_key or "",
+        properties=properties,
+        old_values=dict(log.old_values or {}),
+        reason="Retry of failed write",
+        client_entity_id=properties.get("לקוח") if op_type == OpType.CREATE_REPORT else None,
+    )
+
+
+def _parse_op_types(op_type: Optional[str]):
+    """Comma-separated OpType values → list of OpType (None = all)."""
+    if not op_type:
+        return None
+    from ..core.write_plan import OpType
+
+    valid = {t.value: t for t in OpType}
+    types = [t.strip() for t in op_type.split(",") if t.strip()]
+    unknown = [t for t in types if t not in valid]
+    if unknown:
+        raise HTTPException(400, f"סוג פעולה לא תקין: {', '.join(unknown)}. אפשרויות: {', '.join(valid)}")
+    return [valid[t] for t in types]
+
+
 @router.get("/{run_id}/write-plan", tags=["write-back"])
-def get_write_plan(run_id: str, db: Session = Depends(get_db)):
-    """Generate write plan for a completed sync run."""
+def get_write_plan(
+    run_id: str,
+    rebuild: bool = Query(default=False, description="Ignore the cached plan and re-fetch Summit"),
+    op_type: Optional[str] = Query(default=None, description="Comma-separated op types, e.g. update_report,create_report"),
+    match_key: Optional[str] = Query(default=None, description="ח.פ / ת\"ז substring"),
+    client_name: Optional[str] = Query(default=None, description="Client name substring"),
+    limit: Optional[int] = Query(default=None, ge=1, le=5000, description="Page size (default: all matching ops)"),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Generate write plan for a completed sync run.
+
+    `summary` always covers the whole plan; `operations` holds the page of
+    ops matching the filters, `page.matched` how many matched in total.
+    """
     run = _run_or_404(run_id, db)
     if run.status not in ("review", "completed"):
         raise HTTPException(400, "תוכנית כתיבה דורשת הרצת סנכרון שהושלמה")
 
-    plan = _build_write_plan_for_run(run)
+    types = _parse_op_types(op_type)
+    cached, reused = _write_plan_for_run(run, rebuild=rebuild)
+    plan = cached.plan
+    positions = plan.select(types, match_key=match_key, client_name=client_name)
+    page = positions[offset:offset + limit] if limit is not None else positions[offset:]
 
     return {
         "summary": plan.summary(),
-        "operations": [op.to_dict() for op in plan.operations],
+        "operations": [dict(plan.operations[i].to_dict(), index=i) for i in page],
+        "page": {"offset": offset, "limit": limit, "matched": len(positions), "returned": len(page)},
+        "plan_cache": cached.info(reused),
+    }
+
+
+@router.get("/{run_id}/write-plan/export.ndjson", tags=["write-back"])
+def export_write_plan(
+    run_id: str,
+    op_type: Optional[str] = Query(default=None, description="Comma-separated op types"),
+    match_key: Optional[str] = Query(default=None),
+    client_name: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+):
+    """The run's write plan as NDJSON, one op per line, streamed."""
+    from fastapi.responses import StreamingResponse
+
+    run = _run_or_404(run_id, db)
+    if run.status not in ("review", "completed"):
+        raise HTTPException(400, "תוכנית כתיבה דורשת הרצת סנכרון שהושלמה")
+
+    types = _parse_op_types(op_type)
+    cached, _ = _write_plan_for_run(run)
+    plan = cached.plan
+    positions = plan.select(types, match_key=match_key, client_name=client_name)
+    return StreamingResponse(
+        plan.iter_ndjson(positions),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="write_plan_{run.id}.ndjson"'},
+    )
+
+
+def _plan_approval(run: models.Run):
+    """
+    Approval of the run's saved plan, without building one (streaming and
+    retry-failed write-back). It is by op key, so it carries over a changed
+    upload as it does a rebuild: ops that changed are held. No plan saved
+    yet = the whole plan, as a first build has it.
+    """
+    from ..core.plan_cache import PlanApproval
+
+    _, cached = _saved_write_plan(run)
+    return PlanApproval() if cached is None else cached.approval
+
+
+def _approvable_write_plan(run: models.Run):
+    """
+    The saved plan an approval reads or changes. Never built here — a
+    rebuild is minutes of Summit calls and can change the op keys under the
+    operator — so a missing or stale plan is 409: refresh it first.
+    """
+    path, cached = _saved_write_plan(run)
+    if cached is None or not cached.is_fresh(_idom_sha256(run)):
+        raise HTTPException(409, "תוכנית הכתיבה אינה עדכנית — יש לרענן את התוכנית לפני אישור")
+    return path, cached
+
+
+@router.get("/{run_id}/write-plan/approval", tags=["write-back"])
+def get_write_plan_approval(run_id: str, db: Session = Depends(get_db)):
+    """Approved / held op counts of the run's saved write plan, and the approval history."""
+    run = _run_or_404(run_id, db)
+    if run.status not in ("review", "completed"):
+        raise HTTPException(400, "תוכנית כתיבה דורשת הרצת סנכרון שהושלמה")
+
+    _, cached = _approvable_write_plan(run)
+    return {
+        "approval": cached.approval.summary(cached.plan),
+        "history": cached.approval.history,
+        "plan_cache": cached.info(True),
+    }
+
+
+@router.post("/{run_id}/write-plan/approval", tags=["write-back"])
+def set_write_plan_approval(run_id: str, body: PlanApprovalRequest, db: Session = Depends(get_db)):
+    """
+    Approve or exclude write-plan ops, by op key and/or the write-plan
+    filters (no selector = every writing op), or reset to the whole plan.
+    A live write-back sends only approved ops; the rest are audited as
+    not_approved.
+    """
+    from ..core.plan_cache import CachedWritePlan, PlanFileError
+    from ..core.write_plan import OpType
+
+    run = _run_or_404(run_id, db)
+    if run.status not in ("review", "completed"):
+        raise HTTPException(400, "תוכנית כתיבה דורשת הרצת סנכרון שהושלמה")
+
+    types = _parse_op_types(",".join(body.op_types)) if body.op_types else None
+    path, cached = _approvable_write_plan(run)
+    plan = cached.plan
+
+    positions = plan.select(types, match_key=body.match_key, client_name=body.client_name, prop=body.prop)
+    keys = [
+        plan.operations[i].op_key for i in positions
+        if plan.operations[i].op_type not in (OpType.SKIP, OpType.FLAG)
+    ]
+    if body.op_keys is not None:
+        unknown = set(body.op_keys) - {op.op_key for op in plan.operations}
+        if unknown:
+            raise HTTPException(400, f"{len(unknown)} מפתחות פעולה לא נמצאו בתוכנית הנוכחית — יש לרענן את התוכנית")
+        wanted = set(body.op_keys)
+        keys = [k for k in keys if k in wanted]
+
+    selector = body.model_dump(exclude={"action", "note"})
+    # Applied to the saved plan under its file lock — overlapping approval
+    # posts each keep their change
+    try:
+        cached, selected = CachedWritePlan.update(
+            path,
+            lambda saved: saved.approval.apply(body.action, saved.plan, keys, selector, note=body.note),
+            expect_created_at=cached.created_at,
+        )
+    except PlanFileError as exc:
+        logger.warning("Run %s: write plan approval refused: %s", run.id, exc)
+        raise HTTPException(409, "תוכנית הכתיבה השתנתה בינתיים — יש לרענן את התוכנית")
+    except OSError as exc:
+        logger.error("Could not persist write plan approval for run %s: %s", run.id, exc)
+        raise HTTPException(500, "שמירת האישור נכשלה")
+
+    summary = cached.approval.summary(plan)
+    logger.info(
+        "Run %s: write plan %s on %d ops → %d approved, %d held",
+        run.id, body.action, selected, summary["approved"], summary["held"],
+    )
+    return {
+        "selected": selected,
+        "approval": summary,
+        "history": cached.approval.history,
+        "plan_cache": cached.info(True),
     }
 
 
 @router.post("/{run_id}/write-back/dry-run", tags=["write-back"])
-def write_back_dry_run(run_id: str, db: Session = Depends(get_db)):
-    """Execute write plan in dry-run mode (validates without writing)."""
+def write_back_dry_run(
+    run_id: str,
+    rebuild: bool = Query(default=False, description="Ignore the cached plan and re-fetch Summit"),
+    deep: bool = Query(default=False, description="Also check folders, taxonomy IDs and date formats"),
+    db: Session = Depends(get_db),
+):
+    """
+    Execute write plan in dry-run mode (validates without writing).
+
+    deep=true adds a `validation` report: problems grouped by rule.
+    """
     run = _run_or_404(run_id, db)
     if run.status not in ("review", "completed"):
         raise HTTPException(400, "כתיבה חוזרת דורשת הרצת סנכרון שהושלמה")
 
-    plan = _build_write_plan_for_run(run)
+    cached, reused = _write_plan_for_run(run, rebuild=rebuild)
 
     from ..core.write_executor import WriteExecutor
-    executor = WriteExecutor(dry_run=True)
-    result = executor.execute(plan)
+    executor = WriteExecutor(
+        dry_run=True, validation_mode="deep" if deep else "shallow",
+        approved_op_keys=cached.approval.approved_keys(),
+    )
+    result = executor.execute(cached.plan)
 
-    _save_write_logs(run.id, result.audit_log, db)
+    # Flagged dry_run: an op that only failed validation was never sent, so
+    # retry-failed must not pick it up
+    _save_write_logs(run.id, result.audit_log, db, dry_run=True)
 
-    return result.to_dict()
+    response = {
+        **result.to_dict(),
+        "plan_cache": cached.info(reused),
+        "approval": cached.approval.summary(cached.plan),
+    }
+    if deep:
+        from ..core.plan_validator import PlanValidator
+
+        response["validation"] = PlanValidator().validate(cached.plan.operations).to_dict()
+    return response
+
+
+def _execute_live_write_back(
+    run: models.Run, db: Session, streaming: bool, rebuild: bool, job: Optional[models.WriteJob] = None,
+) -> dict:
+    """
+    Live write-back of a run's plan; shared by the request and background paths.
+    A streamed run whose planning stopped partway comes back with
+    status "failed" and the error — callers must not report it as done.
+    """
+    from ..core.mapping_store import MappingStore
+    from ..core.report_cache import ReportCache
+    from ..core.write_executor import WriteExecutor
+    from ..core.write_through import WriteThrough
+
+    # Resumable: ops this run already wrote are not sent again, and every op
+    # is logged before it is sent and again the moment it completes
+    _settle_pending_writes(run.id, db)
+    written = _written_op_keys(run.id, db)
+    if written:
+        logger.info("Write-back for run %s resumes: %d ops already written", run.id, len(written))
+
+    sink, set_total = _write_log_sink(run.id, db, job)
+
+    def _executor(reports, mapping, approved):
+        # Written values go straight into the caches the next sync reads;
+        # only ops the operator approved are sent
+        return WriteExecutor(
+            dry_run=False, skip_op_keys=written, approved_op_keys=approved,
+            on_send=sink, on_audit=sink, write_through=WriteThrough(reports, mapping),
+        )
+
+    if streaming:
+        from ..core.write_stream import stream_write_back
+
+        config, idom_df, _, match_result = _write_back_inputs(run)
+        reports, mapping = ReportCache(), MappingStore()
+        # One cache pair → the planner's lookups and the write-through don't
+        # overwrite each other
+        streamed = stream_write_back(
+            config, run.year, idom_df, _executor(reports, mapping, _plan_approval(run).approved_keys()),
+            mapping=mapping, reports=reports, match_result=match_result,
+            on_planned=set_total,   # the job's total is known once planning ends
+        )
+        return streamed.to_dict()
+
+    # Reuse the previewed plan; only entities written since its snapshot are
+    # fetched and planned again
+    cached, reused = _write_plan_for_run(run, rebuild=rebuild)
+    plan, rechecked = _refresh_touched_ops(run, cached, db) if reused else (cached.plan, 0)
+    set_total(plan.total)
+    # Caches loaded after planning, which saved its own fetch results first
+    result = _executor(ReportCache(), MappingStore(), cached.approval.approved_keys()).execute(plan)
+    return {
+        **result.to_dict(),
+        "plan_cache": {**cached.info(reused), "rechecked_keys": rechecked},
+        "approval": cached.approval.summary(plan),
+    }
 
 
 @router.post("/{run_id}/write-back", tags=["write-back"])
-def write_back_live(run_id: str, db: Session = Depends(get_db)):
-    """Execute write plan LIVE — writes to Summit CRM. Use with caution."""
+def write_back_live(
+    run_id: str,
+    streaming: bool = Query(default=False, description="Write each report as soon as its Summit lookup resolves"),
+    rebuild: bool = Query(default=False, description="Ignore the cached plan and re-fetch Summit"),
+    background: bool = Query(default=False, description="Return at once; poll GET /write-back/jobs/{job_id}"),
+    db: Session = Depends(get_db),
+):
+    """
+    Execute write plan LIVE — writes to Summit CRM. Use with caution.
+
+    background=true runs it in a background thread, like execute-api, so a
+    long write-back is not cut off by proxy / request timeouts.
+    """
     run = _run_or_404(run_id, db)
     if run.status not in ("review", "completed"):
         raise HTTPException(400, "כתיבה חוזרת דורשת הרצת סנכרון שהושלמה")
 
-    plan = _build_write_plan_for_run(run)
+    # Only one live write-back per run at a time, however it was started
+    job = _start_write_job(run, db, streaming)
 
-    from ..core.write_executor import WriteExecutor
-    executor = WriteExecutor(dry_run=False)
-    result = executor.execute(plan)
+    if not background:
+        try:
+            response = _execute_live_write_back(run, db, streaming, rebuild, job=job)
+        except BaseException as exc:
+            db.rollback()
+            _finish_write_job(job, db, error=exc)
+            raise
+        _finish_write_job(job, db, response)
+        response["job_id"] = str(job.id)
+        if job.status == "failed":
+            # Some ops were written and logged; the rest were never planned
+            raise HTTPException(502, {"message": f"הכתיבה נעצרה באמצע: {response['error']}", **response})
+        return response
+
+    import threading
+
+    # Resolve imports and capture values BEFORE spawning thread
+    from ..db import connection as _connection
+
+    bg_run_id = str(run.id)
+    bg_job_id = str(job.id)
+    session_factory = _connection.SessionLocal
 
-    _save_write_logs(run.id, result.audit_log, db)
+    def _background_write():
+        """Runs in a separate thread with its own DB session."""
+        bg_db = session_factory()
+        try:
+            bg_run = bg_db.query(models.Run).filter(models.Run.id == _to_uuid(bg_run_id)).first()
+            bg_job = bg_db.query(models.WriteJob).filter(models.WriteJob.id == _to_uuid(bg_job_id)).first()
+            if not bg_run or not bg_job:
+                logger.error("Background write-back: run %s / job %s not found", bg_run_id, bg_job_id)
+                return
+            try:
+                response = _execute_live_write_back(bg_run, bg_db, streaming, rebuild, job=bg_job)
+                _finish_write_job(bg_job, bg_db, response)
+            except BaseException as exc:
+                logger.error("Background write-back %s failed: %s", bg_job_id, exc, exc_info=True)
+                bg_db.rollback()
+                _finish_write_job(bg_job, bg_db, error=exc)
+            logger.info(
+                "Background write-back %s %s: %d ops, %d succeeded, %d failed",
+                bg_job_id, bg_job.status, bg_job.done_ops, bg_job.succeeded, bg_job.failed,
+            )
+        finally:
+            bg_db.close()
+
+    thread = threading.Thread(target=_background_write, daemon=True, name=f"write-{bg_job_id[:8]}")
+    thread.start()
+    logger.info("BG write-back thread launched for run %s (job %s)", bg_run_id, bg_job_id)
+
+    return {"run_id": bg_run_id, "job_id": bg_job_id, "status": "running", "message": "הכתיבה הופעלה ברקע"}
+
+
+@router.get("/{run_id}/write-back/jobs", tags=["write-back"])
+def list_write_jobs(run_id: str, db: Session = Depends(get_db)):
+    """Live write-back jobs of a run (synchronous, background, retry-failed), newest first."""
+    run = _run_or_404(run_id, db)
+    jobs = (
+        db.query(models.WriteJob)
+        .filter(models.WriteJob.run_id == run.id)
+        .order_by(models.WriteJob.started_at.desc())
+        .all()
+    )
+    return [_serialize_write_job(job) for job in jobs]
 
-    return result.to_dict()
+
+@router.get("/{run_id}/write-back/jobs/{job_id}", tags=["write-back"])
+def get_write_job(run_id: str, job_id: str, db: Session = Depends(get_db)):
+    """Poll a background write-back: ops done, ops/minute, ETA, failures."""
+    run = _run_or_404(run_id, db)
+    job = (
+        db.query(models.WriteJob)
+        .filter(models.WriteJob.id == _to_uuid(job_id), models.WriteJob.run_id == run.id)
+        .first()
+    )
+    if job is None:
+        raise HTTPException(404, f"משימת כתיבה {job_id} לא נמצאה")
+    db.refresh(job)
+    return _serialize_write_job(job)
+
+
+@router.post("/{run_id}/write-back/retry-failed", tags=["write-back"])
+def write_back_retry_failed(run_id: str, db: Session = Depends(get_db)):
+    """
+    Re-send only the live writes whose last attempt failed, as logged —
+    those the plan's approval still holds are audited not_approved.
+    """
+    run = _run_or_404(run_id, db)
+    if run.status not in ("review", "completed"):
+        raise HTTPException(400, "כתיבה חוזרת דורשת הרצת סנכרון שהושלמה")
+
+    # Claimed before reading the failures, so a write-back still running
+    # cannot change them underneath
+    job = _start_write_job(run, db, streaming=False)
+    try:
+        response = _retry_failed_writes(run, db, job)
+    except BaseException as exc:
+        db.rollback()
+        _finish_write_job(job, db, error=exc)
+        raise
+    _finish_write_job(job, db, response)
+    return {**response, "job_id": str(job.id)}
+
+
+def _retry_failed_writes(run: models.Run, db: Session, job: models.WriteJob) -> dict:
+    from ..core.write_executor import WriteExecutor
+    from ..core.write_plan import WritePlan, WriteResult
+    from ..core.write_through import WriteThrough
+
+    _settle_pending_writes(run.id, db)
+    plan = WritePlan()
+    for log in _failed_write_logs(run.id, db):
+        plan.add(_op_from_write_log(log))
+    job.total_ops = plan.total
+    db.commit()
+    if not plan.total:
+        return {**WriteResult(dry_run=False).to_dict(), "retried": 0}
+
+    # The approval gate still applies: an op held since it failed is audited
+    # not_approved, and stays failed for a later retry
+    approval = _plan_approval(run)
+    sink, _ = _write_log_sink(run.id, db, job)
+    executor = WriteExecutor(
+        dry_run=False, approved_op_keys=approval.approved_keys(),
+        on_send=sink, on_audit=sink, write_through=WriteThrough(),
+    )
+    return {**executor.execute(plan).to_dict(), "retried": plan.total, "approval": approval.summary(plan)}
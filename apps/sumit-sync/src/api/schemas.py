@@ -24,6 +24,22 @@ class BulkPatchExceptionsRequest(BaseModel):
     resolution: str = Field(..., pattern=r"^(acknowledged|dismissed)$")
 
 
+class PlanApprovalRequest(BaseModel):
+    """Select write-plan ops by key and/or filters; no selector = every writing op."""
+    action: str = Field(..., pattern=r"^(approve|exclude|reset)$")
+    op_keys: Optional[List[str]] = None
+    op_types: Optional[List[str]] = None
+    match_key: Optional[str] = None
+    client_name: Optional[str] = None
+    prop: Optional[str] = None
+    note: Optional[str] = None
+
+
+class IdomPasteRequest(BaseModel):
+    """SHAAM rows as copied: tab-separated text, one row per line."""
+    text: str = Field(..., min_length=1)
+
+
 # ---------- Responses ----------
 
 class RunFileOut(BaseModel):
@@ -46,6 +62,7 @@ class RunMetricsOut(BaseModel):
     status_completed_count: int
     status_preserved_count: int
     status_regression_flags: int
+    carried_over_count: int = 0
     processing_seconds: Optional[float]
 
     model_config = {"from_attributes": True}
@@ -111,6 +128,7 @@ class MappingSummaryOut(BaseModel):
     total_mappings: int
     with_names: int
     known_absent: int = 0
+    client_refs: int = 0
 
 
 class WriteOperationOut(BaseModel):
@@ -24,6 +24,10 @@ from .sumit_parser import (
     parse_sumit_file,
 )
 
+from .matching import (
+    MatchIndex,
+)
+
 from .sync_engine import (
     SyncEngine,
     SyncResult,
@@ -51,6 +55,7 @@ __all__ = [
     'parse_idom_file',
     'SUMITParser',
     'parse_sumit_file',
+    'MatchIndex',
     'SyncEngine',
     'SyncResult',
     'run_sync',
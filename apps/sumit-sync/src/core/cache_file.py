@@ -0,0 +1,73 @@
+"""
+Shared JSON cache files on the volume (report_cache.json, client_mapping.json).
+
+Several holders write the same file, each from its own in-memory copy —
+request threads, the prewarm scheduler, a CLI script. save_merged() makes
+that safe. Under an exclusive lock on a sidecar .lock file it reads what is
+on disk now and lets the caller merge its own changes into that. The result
+goes to a temp file that os.replace() swaps in, as ParseCache.store does. A
+reader never sees a half-written file, and one writer's entries don't wipe
+out another's.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+try:
+    import fcntl
+except ImportError:  # not POSIX — atomic replace still holds, merges aren't serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def read_json(path: Path) -> Dict[str, Any]:
+    """The file's JSON object, or {} if it is missing or unreadable."""
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            loaded = json.load(f)
+    except (json.JSONDecodeError, OSError, UnicodeDecodeError) as e:
+        logger.warning("Failed to read %s, starting fresh: %s", path.name, e)
+        return {}
+    return loaded if isinstance(loaded, dict) else {}
+
+
+@contextmanager
+def _locked(path: Path):
+    with open(path.with_name(path.name + ".lock"), "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def save_merged(path: Path, merge: Callable[[Dict[str, Any]], Dict[str, Any]], **dump_kwargs) -> Dict[str, Any]:
+    """
+    Write merge(current file contents) to path atomically, holding the file
+    lock from the read to the replace. Returns what was written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _locked(path):
+        payload = merge(read_json(path))
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, **dump_kwargs)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+    return payload
@@ -11,6 +11,7 @@ import re
 import logging
 
 from .config import IDOMSchema
+from .normalize import normalize_keys
 
 logger = logging.getLogger(__name__)
 
@@ -170,7 +171,7 @@ class IDOMParser:
         
         # Normalize מספר_תיק - digits only, preserve leading zeros
         if 'מספר_תיק' in df.columns:
-            df['מספר_תיק'] = df['מספר_תיק'].apply(self._normalize_key)
+            df['מספר_תיק'] = normalize_keys(df['מספר_תיק'])
         
         # Clean string fields
         for str_col in ['שם', 'קוד_שידור']:
@@ -180,29 +181,6 @@ class IDOMParser:
         
         return df
     
-    @staticmethod
-    def _normalize_key(value) -> str:
-        """
-        Normalize match key: extract digits only, preserve leading zeros.
-        """
-        if pd.isna(value):
-            return ''
-        
-        # Convert to string
-        val_str = str(value)
-        
-        # Handle float formatting (e.g., 123456.0)
-        if '.' in val_str:
-            try:
-                val_str = str(int(float(val_str)))
-            except (ValueError, OverflowError):
-                pass
-        
-        # Extract digits only
-        digits = re.sub(r'[^\d]', '', val_str)
-        
-        return digits
-    
     def deduplicate(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Deduplicate IDOM records by מספר_תיק.
@@ -218,41 +196,34 @@ class IDOMParser:
         if df.empty:
             return df, pd.DataFrame()
         
-        # Group by מספר_תיק
-        groups = df.groupby('מספר_תיק')
-        
-        unique_records = []
-        conflict_records = []
-        
-        for key, group in groups:
-            if len(group) == 1:
-                unique_records.append(group.iloc[0])
-                continue
-            
-            # Multiple records - need to choose
-            logger.debug(f"Duplicate מספר_תיק: {key} ({len(group)} records)")
-            
-            # Sort by תאריך_הגשה (descending, nulls last)
-            has_submission = group[group['תאריך_הגשה'].notna()]
-            
-            if len(has_submission) > 0:
-                # Choose latest submission
-                best = has_submission.sort_values('תאריך_הגשה', ascending=False).iloc[0]
-                unique_records.append(best)
-            else:
-                # No submissions - choose latest extension
-                sorted_group = group.sort_values('תאריך_ארכה', ascending=False, na_position='last')
-                best = sorted_group.iloc[0]
-                unique_records.append(best)
-            
-            # Report all duplicates as potential conflicts
-            for _, row in group.iterrows():
-                conflict_row = row.copy()
-                conflict_row['_conflict_reason'] = 'duplicate_מספר_תיק'
-                conflict_records.append(conflict_row)
-        
-        dedup_df = pd.DataFrame(unique_records)
-        conflict_df = pd.DataFrame(conflict_records) if conflict_records else pd.DataFrame()
+        key = df['מספר_תיק']
+        duplicated = key.duplicated(keep=False)
+        if not duplicated.any():
+            # Nothing to choose between — groupby's key order, no conflicts
+            dedup_df = df.sort_values('מספר_תיק', kind='stable')
+            logger.info(f"Deduplication: {len(df)} → {len(dedup_df)} records, 0 conflicts")
+            return dedup_df, pd.DataFrame()
+        
+        no_date = pd.Series(pd.NaT, index=df.index)
+        submission = df.get('תאריך_הגשה', no_date)
+        extension = df.get('תאריך_ארכה', no_date)
+        
+        # Rank date per row: a key with any submission picks by submission
+        # (rows without one can't win), otherwise by extension
+        any_submission = submission.notna().groupby(key, sort=False).transform('any')
+        ranked = df.assign(_rank_date=submission.where(any_submission, extension))
+        
+        # One stable sort: key order as groupby's, latest date first, ties in
+        # file order; the first row per key wins
+        ranked = ranked.sort_values(
+            ['מספר_תיק', '_rank_date'], ascending=[True, False], na_position='last', kind='stable',
+        )
+        dedup_df = ranked.drop_duplicates('מספר_תיק', keep='first').drop(columns='_rank_date')
+        
+        # Report all duplicates as potential conflicts
+        conflict_df = df[duplicated].sort_values('מספר_תיק', kind='stable')
+        conflict_df = conflict_df.assign(_conflict_reason='duplicate_מספר_תיק')
+        logger.debug(f"Duplicate מספר_תיק: {conflict_df['מספר_תיק'].nunique()} keys")
         
         logger.info(f"Deduplication: {len(df)} → {len(dedup_df)} records, {len(conflict_df)} conflicts")
         
@@ -7,15 +7,30 @@ to the appropriate report type for sync.
 
 This is a NEW file — does NOT modify idom_parser.py.
 Uses IDOMParser internally for per-sheet parsing.
+
+The workbook is opened once (IDOMWorkbook — openpyxl read-only, streaming
+rows) and each sheet is read once: template detection sniffs the first rows
+of that same read instead of re-opening the file with nrows=5. Sheets are
+parsed on first use, so a run that needs one report type parses one sheet.
+
+SHAAM data is copied as tab-separated text. parse_idom_paste takes that
+text directly — a .tsv/.txt upload or POST /runs/{id}/idom-paste — with no
+paste-into-Excel step: pandas' C reader splits it into the same headerless
+raw frame a sheet read gives, which then goes through the same template /
+positional detection, IDOMParser normalization and dedup. Cells are text,
+so dates are read day-first (30/06/2025) rather than left to inference.
 """
 
+import csv
+import io
 import pandas as pd
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
+from pathlib import Path
 
 from .idom_parser import IDOMParser
-from .config import ReportType
+from .config import IDOMSchema, ReportType
 
 logger = logging.getLogger(__name__)
 
@@ -71,23 +86,32 @@ class WorkbookResult:
         return "\n".join(lines)
 
 
-def _is_template_format(filepath: str, sheet_name: str) -> bool:
+# Header strings of the structured template (row 3 in Excel)
+TEMPLATE_KNOWN_HEADERS = {'מספר תיק', 'שם משפחה ופרטי', 'תאריך ארכה', 'תאריך הגשה', 'פקיד שומה', 'קוד שידור'}
+
+# Rows sniffed for the template signature
+SNIFF_ROWS = 5
+
+
+def _is_template_format(df_raw: pd.DataFrame, sheet_name: str) -> bool:
     """
     Detect if a sheet uses the structured template format
     (title row, instructions row, headers in row 3, hints in row 4).
 
     Template signature: row 2 (0-indexed) contains known Hebrew header strings
     like 'מספר תיק', 'שם משפחה ופרטי', 'תאריך ארכה'.
+
+    df_raw: the sheet read with header=None; only its first SNIFF_ROWS rows
+    are looked at.
     """
     try:
-        df_raw = pd.read_excel(filepath, sheet_name=sheet_name, header=None, nrows=5)
-        if len(df_raw) < 4:
+        head = df_raw.head(SNIFF_ROWS)
+        if len(head) < 4:
             return False
 
         # Check if row 2 contains known IDOM header strings
-        row2_values = [str(v).strip() for v in df_raw.iloc[2].tolist() if pd.notna(v)]
-        known_headers = {'מספר תיק', 'שם משפחה ופרטי', 'תאריך ארכה', 'תאריך הגשה', 'פקיד שומה', 'קוד שידור'}
-        matches = sum(1 for v in row2_values if v in known_headers)
+        row2_values = [str(v).strip() for v in head.iloc[2].tolist() if pd.notna(v)]
+        matches = sum(1 for v in row2_values if v in TEMPLATE_KNOWN_HEADERS)
 
         if matches >= 3:
             logger.info(f"  Sheet '{sheet_name}': detected template format ({matches} header matches)")
@@ -121,14 +145,18 @@ POSITIONAL_MAP_7COL = {
 }
 
 
-def _read_sheet(filepath: str, sheet_name: str) -> pd.DataFrame:
+def _read_sheet(xl: pd.ExcelFile, sheet_name: str) -> pd.DataFrame:
     """
-    Read a single sheet, auto-detecting format (template vs freeform).
-    Returns a DataFrame with proper column names.
+    Read a single sheet of an open workbook — once — auto-detecting format
+    (template vs freeform). Returns a DataFrame with proper column names.
     """
-    if _is_template_format(filepath, sheet_name):
+    return _frame_from_raw(xl.parse(sheet_name=sheet_name, header=None), sheet_name)
+
+
+def _frame_from_raw(df_raw: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
+    """Template / freeform detection and positional mapping of a headerless raw read."""
+    if _is_template_format(df_raw, sheet_name):
         # Template: headers at row 2 (0-indexed), data from row 4
-        df_raw = pd.read_excel(filepath, sheet_name=sheet_name, header=None)
         headers = df_raw.iloc[2].tolist()  # Row 3 in Excel
         data = df_raw.iloc[4:]  # Row 5+ in Excel
         data.columns = headers
@@ -138,7 +166,6 @@ def _read_sheet(filepath: str, sheet_name: str) -> pd.DataFrame:
         return data
     else:
         # Freeform headerless paste — assign columns by position
-        df_raw = pd.read_excel(filepath, sheet_name=sheet_name, header=None)
 
         # Drop fully empty rows (leading blank rows)
         df_raw = df_raw.dropna(how='all').reset_index(drop=True)
@@ -167,12 +194,18 @@ def _read_sheet(filepath: str, sheet_name: str) -> pd.DataFrame:
         return df_raw
 
 
-def _parse_sheet(filepath: str, sheet_name: str) -> SheetResult:
-    """Parse a single sheet using the existing IDOMParser."""
-    report_type = SHEET_REPORT_MAP.get(sheet_name)
+def _parse_sheet(xl: pd.ExcelFile, sheet_name: str) -> SheetResult:
+    """Parse a single sheet of an open workbook using the existing IDOMParser."""
+    return _parse_frame(lambda: _read_sheet(xl, sheet_name), sheet_name, SHEET_REPORT_MAP.get(sheet_name))
+
 
+def _parse_frame(read, sheet_name: str, report_type: Optional[str], text_dates: bool = False) -> SheetResult:
+    """
+    read() → column-named frame → IDOMParser detection, normalization and
+    dedup. text_dates: date cells are text (a paste), read day-first.
+    """
     try:
-        df = _read_sheet(filepath, sheet_name)
+        df = read()
 
         if df.empty or len(df) == 0:
             return SheetResult(
@@ -195,12 +228,13 @@ def _parse_sheet(filepath: str, sheet_name: str) -> SheetResult:
         if has_named_cols:
             # Columns already named — skip detection, just parse data
             logger.info(f"  Columns pre-mapped: {[c for c in df.columns if c in known_cols]}")
-            df = parser._parse_data(df)
         else:
             # Unknown headers — use IDOMParser's detection pipeline
             parser._detect_columns(df)
             df = parser._rename_columns(df)
-            df = parser._parse_data(df)
+        if text_dates:
+            df = _day_first_dates(df)
+        df = parser._parse_data(df)
 
         # Remove rows without match key
         initial = len(df)
@@ -232,48 +266,68 @@ def _parse_sheet(filepath: str, sheet_name: str) -> SheetResult:
         )
 
 
-def parse_idom_workbook(filepath: str) -> WorkbookResult:
+class IDOMWorkbook:
     """
-    Parse a multi-sheet IDOM workbook.
+    An IDOM workbook opened once; each sheet is parsed on first use and kept.
 
-    Reads all sheets, detects format (template vs freeform), parses each
-    with the existing IDOMParser, and routes to report types.
+        with IDOMWorkbook(path) as wb:
+            sheet = wb.sheet('חברות')
+    """
 
-    Args:
-        filepath: Path to the IDOM XLSX file
+    def __init__(self, filepath: str):
+        logger.info(f"Opening IDOM workbook: {filepath}")
+        self.filepath = filepath
+        try:
+            # openpyxl engine loads .xlsx read-only: rows stream from the zip
+            self._xl = pd.ExcelFile(filepath)
+        except Exception as e:
+            raise ValueError(f"Failed to open workbook: {e}")
+        self.sheet_names: List[str] = list(self._xl.sheet_names)
+        logger.info(f"Found {len(self.sheet_names)} sheets: {self.sheet_names}")
+        self._parsed: Dict[str, SheetResult] = {}
 
-    Returns:
-        WorkbookResult with per-sheet results and summary
-    """
-    logger.info(f"Opening IDOM workbook: {filepath}")
+    @property
+    def data_sheets(self) -> List[str]:
+        """Sheets holding data (skip הוראות and any unknown sheets)."""
+        return [s for s in self.sheet_names if s in SHEET_REPORT_MAP or s not in ['הוראות', 'Sheet1']]
 
-    # Get sheet names
-    try:
-        xl = pd.ExcelFile(filepath)
-        sheet_names = xl.sheet_names
-        logger.info(f"Found {len(sheet_names)} sheets: {sheet_names}")
-    except Exception as e:
-        raise ValueError(f"Failed to open workbook: {e}")
+    def sheets_for(self, report_type: str) -> List[str]:
+        """Data sheets that route to report_type."""
+        return [s for s in self.data_sheets if SHEET_REPORT_MAP.get(s) == report_type]
+
+    def sheet(self, sheet_name: str) -> SheetResult:
+        """The parsed sheet (parsed now if it wasn't yet)."""
+        if sheet_name not in self._parsed:
+            logger.info(f"Parsing sheet: {sheet_name}")
+            self._parsed[sheet_name] = _parse_sheet(self._xl, sheet_name)
+        return self._parsed[sheet_name]
+
+    def result(self, sheet_names: Optional[Iterable[str]] = None) -> WorkbookResult:
+        """WorkbookResult over sheet_names (default: every data sheet), in workbook order."""
+        wanted = set(self.data_sheets if sheet_names is None else sheet_names)
+        return _workbook_result([self.sheet(s) for s in self.data_sheets if s in wanted])
+
+    def close(self):
+        self._xl.close()
+
+    def __enter__(self) -> "IDOMWorkbook":
+        return self
 
-    # Filter to data sheets (skip הוראות and any unknown sheets)
-    data_sheets = [s for s in sheet_names if s in SHEET_REPORT_MAP or s not in ['הוראות', 'Sheet1']]
+    def __exit__(self, *exc):
+        self.close()
 
-    results = []
+
+def _workbook_result(results: List[SheetResult]) -> WorkbookResult:
     total_records = 0
     total_conflicts = 0
     unmapped = []
-
-    for sheet_name in data_sheets:
-        logger.info(f"Parsing sheet: {sheet_name}")
-        result = _parse_sheet(filepath, sheet_name)
-        results.append(result)
-
+    for result in results:
         if result.error is None:
             total_records += len(result.records)
             total_conflicts += len(result.conflicts)
 
         if result.report_type is None and result.error is None and len(result.records) > 0:
-            unmapped.append(sheet_name)
+            unmapped.append(result.sheet_name)
 
     workbook_result = WorkbookResult(
         sheets=results,
@@ -284,3 +338,129 @@ def parse_idom_workbook(filepath: str) -> WorkbookResult:
 
     logger.info(workbook_result.summary())
     return workbook_result
+
+
+def parse_idom_workbook(filepath: str, sheet_names: Optional[Iterable[str]] = None) -> WorkbookResult:
+    """
+    Parse a multi-sheet IDOM workbook.
+
+    Reads the data sheets (all, or only sheet_names), detects format
+    (template vs freeform), parses each with the existing IDOMParser, and
+    routes to report types.
+
+    Args:
+        filepath: Path to the IDOM XLSX file
+        sheet_names: Sheets to parse (default: every data sheet)
+
+    Returns:
+        WorkbookResult with per-sheet results and summary
+    """
+    with IDOMWorkbook(filepath) as wb:
+        return wb.result(sheet_names)
+
+
+# ------------------------------------------------------------ text pastes
+
+PASTE_SUFFIXES = {'.tsv', '.txt'}
+PASTE_SHEET = 'הדבקה'
+
+# A first pasted row with this many known header strings is the header row
+_PASTE_HEADER_MATCHES = 3
+_KNOWN_HEADER_STRINGS = TEMPLATE_KNOWN_HEADERS | {h for hs in IDOMSchema.HEADERS.values() for h in hs}
+
+
+def is_paste_file(filepath: str) -> bool:
+    return Path(filepath).suffix.lower() in PASTE_SUFFIXES
+
+
+def decode_paste(content: bytes) -> str:
+    """Clipboard / saved-text bytes → str: UTF-16 ("Unicode text" from Excel) by BOM, UTF-8, else Windows-1255."""
+    if content[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        return content.decode('utf-16')
+    try:
+        return content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return content.decode('cp1255', errors='replace')
+
+
+def read_paste(text: str) -> pd.DataFrame:
+    """
+    Tab-separated text → the raw frame a headerless sheet read gives:
+    positional integer columns, empty cells NaN, empty rows and trailing
+    empty columns dropped, numbers typed as numbers. A first row of known
+    IDOM headers becomes the column names. SHAAM pastes raw TSV, so quote
+    marks are data ("גל" בע"מ), not CSV quoting.
+    """
+    width = max((line.count('\t') for line in text.splitlines()), default=0) + 1
+    df = pd.read_csv(
+        io.StringIO(text), sep='\t', header=None, names=range(width), dtype=str,
+        keep_default_na=False, skip_blank_lines=True, quoting=csv.QUOTE_NONE,
+    )
+    df = df.apply(lambda col: col.str.strip())
+    df = df.mask(df == '').dropna(how='all').reset_index(drop=True)
+
+    filled = df.notna().any().to_numpy().nonzero()[0]
+    df = df.iloc[:, :filled.max() + 1] if len(filled) else df.iloc[:, :0]
+
+    if len(df):
+        first = [str(v).strip() for v in df.iloc[0] if pd.notna(v)]
+        if sum(v in _KNOWN_HEADER_STRINGS for v in first) >= _PASTE_HEADER_MATCHES:
+            df.columns = [v if pd.notna(v) else f'_unnamed_{i}' for i, v in enumerate(df.iloc[0])]
+            df = df.iloc[1:].reset_index(drop=True)
+    return df.apply(_cell_values) if df.shape[1] else df
+
+
+def _cell_values(col: pd.Series) -> pd.Series:
+    """
+    Numeric-looking cells → numbers, as Excel types them on paste and a
+    sheet read returns them (051234567 → 51234567, 01 → 1); the rest stay text.
+    """
+    num = pd.to_numeric(col, errors='coerce')
+    hit = num.notna()
+    if not hit.any():
+        return col
+    if hit.sum() == col.notna().sum():
+        return num
+    out = col.astype(object)
+    out[hit] = num[hit].map(lambda v: int(v) if v.is_integer() else v)
+    return out
+
+
+def _paste_frame(text: str) -> pd.DataFrame:
+    raw = read_paste(text)
+    if all(isinstance(c, int) for c in raw.columns):
+        return _frame_from_raw(raw, PASTE_SHEET)
+    data = raw.dropna(how='all').reset_index(drop=True)
+    logger.info(f"  Paste: header row, {len(data)} data rows")
+    return data
+
+
+def _day_first_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """Text date columns → datetimes, DD/MM/YYYY first, then any day-first shape (30.06.2025)."""
+    df = df.copy()
+    for col in ('תאריך_ארכה', 'תאריך_הגשה'):
+        if col not in df.columns or df[col].dtype != object:
+            continue
+        text = df[col]
+        parsed = pd.to_datetime(text, format='%d/%m/%Y', errors='coerce')
+        rest = parsed.isna() & text.notna()
+        if rest.any():
+            parsed[rest] = pd.to_datetime(text[rest], dayfirst=True, errors='coerce', format='mixed')
+        df[col] = parsed
+    return df
+
+
+def parse_idom_paste(text: str, report_type: Optional[str] = None) -> SheetResult:
+    """
+    Parse SHAAM paste text (tab-separated) like a workbook sheet, without
+    the Excel round trip. report_type labels the result (a paste has no
+    sheet name to route by).
+    """
+    logger.info(f"Parsing IDOM paste: {len(text)} chars")
+    return _parse_frame(lambda: _paste_frame(text), PASTE_SHEET, report_type, text_dates=True)
+
+
+def parse_idom_paste_file(filepath: str, report_type: Optional[str] = None) -> SheetResult:
+    """parse_idom_paste over a stored .tsv/.txt upload."""
+    with open(filepath, 'rb') as f:
+        return parse_idom_paste(decode_paste(f.read()), report_type)
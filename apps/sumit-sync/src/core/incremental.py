@@ -0,0 +1,346 @@
+"""
+Incremental re-sync driven by IDOM row hashes.
+
+Operators re-run the same year/report type many times a season, usually
+after editing a handful of IDOM rows. Every execute-api run used to re-fetch
+every report from Summit (up to 3 API calls per row) even though most rows
+and their Summit reports had not moved since the previous run.
+
+Each API-sourced run now leaves a SummitSnapshot next to its match result:
+  row_hashes — IDOM key → content hash of that key's IDOM row
+  records    — SUMIT record ID → the fetched record + when it was fetched
+
+The next run for the same year and report type compares its IDOM hashes with
+the snapshot. A row is carried over (no Summit fetch) only if:
+  - its hash is unchanged and the key appears once in both files
+  - it was matched last time and the snapshot holds the matched record
+  - that record is younger than SUMIT_RESYNC_MAX_AGE_HOURS
+  - no successful live write touched the record after it was fetched
+Everything else — new, changed, previously unmatched, stale or written —
+is fetched fresh. Carried records are merged with the fresh ones and the
+full reconcile runs over both (it is vectorized and cheap; the Summit fetch
+is what the carry-over saves). Carried keys are reported on the SyncResult
+and counted in the run metrics.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import ReportConfig
+from .matching import MatchResult, record_id
+from .sumit_parser import SUMITParser
+from .sync_engine import SyncResult
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "summit_snapshot.json"
+
+# Carried Summit records older than this are re-fetched
+RESYNC_MAX_AGE_HOURS = float(os.environ.get("SUMIT_RESYNC_MAX_AGE_HOURS", "72"))
+
+# Reasons a key is fetched instead of carried (counted for the run log)
+REASON_NEW = "new"
+REASON_CHANGED = "changed"
+REASON_UNMATCHED = "unmatched"
+REASON_STALE = "stale"
+REASON_WRITTEN = "written"
+REASON_DUPLICATE = "duplicate"
+
+
+def row_hashes(idom_df: pd.DataFrame) -> Dict[str, str]:
+    """
+    IDOM key (str of מספר_תיק) → hex content hash of the row.
+
+    Columns are hashed in sorted-name order so a reordered sheet hashes the
+    same. Keys that occur more than once map to "" — they are never carried.
+    """
+    if idom_df.empty or "מספר_תיק" not in idom_df.columns:
+        return {}
+    df = idom_df.reset_index(drop=True)
+    cols = sorted(df.columns, key=str)
+    canonical = df[cols].astype(object).where(df[cols].notna(), "").astype(str)
+    hashed = pd.util.hash_pandas_object(canonical, index=False)
+    keys = df["מספר_תיק"].astype(str)
+    dup = keys.duplicated(keep=False).to_numpy()
+    return {
+        k: "" if d else format(int(h), "016x")
+        for k, h, d in zip(keys, hashed.to_numpy(dtype=np.uint64), dup)
+    }
+
+
+def _to_json_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return None if pd.isna(value) else value.isoformat()
+    if isinstance(value, (float, np.floating)) and np.isnan(value):
+        return None
+    if value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _parse_time(value: str) -> Optional[datetime]:
+    try:
+        ts = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class SummitSnapshot:
+    """One run's IDOM row hashes and the Summit records it reconciled against."""
+    run_id: str = ""
+    tax_year: int = 0
+    report_type: str = ""
+    created_at: str = ""
+    columns: List[str] = field(default_factory=list)
+    row_hashes: Dict[str, str] = field(default_factory=dict)
+    # SUMIT record ID → {"fetched_at": iso, "record": {column: value}}
+    records: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        run_id: str,
+        tax_year: int,
+        report_type: str,
+        idom_df: pd.DataFrame,
+        sumit_df: pd.DataFrame,
+        fetched_at: Dict[str, str],
+        now: Optional[datetime] = None,
+    ) -> "SummitSnapshot":
+        """
+        Snapshot a finished run. fetched_at maps carried record IDs to their
+        original fetch time; every other record counts as fetched now.
+        """
+        now_iso = (now or datetime.now(timezone.utc)).isoformat()
+        records: Dict[str, Dict[str, Any]] = {}
+        columns = [str(c) for c in sumit_df.columns]
+        for row in sumit_df.to_dict("records"):
+            rid = record_id(row)
+            if not rid or rid in records:
+                continue
+            records[rid] = {
+                "fetched_at": fetched_at.get(rid, now_iso),
+                "record": {str(k): _to_json_value(v) for k, v in row.items()},
+            }
+        return cls(
+            run_id=run_id,
+            tax_year=int(tax_year),
+            report_type=report_type,
+            created_at=now_iso,
+            columns=columns,
+            row_hashes=row_hashes(idom_df),
+            records=records,
+        )
+
+    def frame(self, record_ids: Iterable[str]) -> pd.DataFrame:
+        """The given snapshot records as a SUMIT frame (dates restored)."""
+        from .sumit_api_source import DATE_FIELDS
+
+        rows = [self.records[rid]["record"] for rid in record_ids if rid in self.records]
+        df = pd.DataFrame(rows, columns=self.columns or None)
+        for col in df.columns:
+            if col in DATE_FIELDS:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        if "מזהה" in df.columns:
+            df["מזהה"] = df["מזהה"].astype(str)
+        return df
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "tax_year": self.tax_year,
+            "report_type": self.report_type,
+            "created_at": self.created_at,
+            "columns": self.columns,
+            "row_hashes": self.row_hashes,
+            "records": self.records,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SummitSnapshot":
+        return cls(
+            run_id=data.get("run_id", ""),
+            tax_year=int(data.get("tax_year", 0)),
+            report_type=data.get("report_type", ""),
+            created_at=data.get("created_at", ""),
+            columns=list(data.get("columns", [])),
+            row_hashes=dict(data["row_hashes"]),
+            records=dict(data["records"]),
+        )
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        logger.info("Saved Summit snapshot to %s (%d rows, %d records)",
+                    path, len(self.row_hashes), len(self.records))
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["SummitSnapshot"]:
+        """Load a persisted snapshot, or None if missing / unreadable."""
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (json.JSONDecodeError, OSError, KeyError, TypeError, ValueError) as e:
+            logger.warning("Failed to load Summit snapshot %s: %s", path, e)
+            return None
+
+
+@dataclass
+class CarryOverPlan:
+    """Which IDOM keys reuse the previous run's Summit record and which are fetched."""
+    source_run_id: str = ""
+    carried: Dict[str, str] = field(default_factory=dict)     # IDOM key → SUMIT record ID
+    fetch_keys: List[str] = field(default_factory=list)
+    reasons: Dict[str, int] = field(default_factory=dict)     # fetch reason → count
+
+
+def plan_carry_over(
+    idom_df: pd.DataFrame,
+    previous: Optional[SummitSnapshot],
+    previous_match: Optional[MatchResult],
+    last_writes: Optional[Dict[str, datetime]] = None,
+    now: Optional[datetime] = None,
+    max_age_hours: Optional[float] = None,
+) -> CarryOverPlan:
+    """
+    Split the IDOM keys into carried-over and to-fetch.
+
+    last_writes maps SUMIT record IDs to their latest successful live write;
+    a record written at or after its snapshot fetch time is re-fetched.
+    """
+    now = now or datetime.now(timezone.utc)
+    max_age = timedelta(hours=RESYNC_MAX_AGE_HOURS if max_age_hours is None else max_age_hours)
+    last_writes = last_writes or {}
+    hashes = row_hashes(idom_df)
+
+    plan = CarryOverPlan(source_run_id=previous.run_id if previous else "")
+    reasons: Dict[str, int] = {}
+
+    def _fetch(key: str, reason: str):
+        plan.fetch_keys.append(key)
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+    for key, digest in hashes.items():
+        if previous is None or previous_match is None or key not in previous.row_hashes:
+            _fetch(key, REASON_NEW)
+            continue
+        if not digest or not previous.row_hashes[key]:
+            _fetch(key, REASON_DUPLICATE)
+            continue
+        if previous.row_hashes[key] != digest:
+            _fetch(key, REASON_CHANGED)
+            continue
+        pair = previous_match.pairs.get(key)
+        entry = previous.records.get(pair.sumit_id) if pair is not None else None
+        if entry is None:
+            _fetch(key, REASON_UNMATCHED)
+            continue
+        fetched_at = _parse_time(entry.get("fetched_at", ""))
+        if fetched_at is None or now - fetched_at > max_age:
+            _fetch(key, REASON_STALE)
+            continue
+        last_write = last_writes.get(pair.sumit_id)
+        if last_write is not None and last_write >= fetched_at:
+            _fetch(key, REASON_WRITTEN)
+            continue
+        plan.carried[key] = pair.sumit_id
+
+    plan.reasons = reasons
+    return plan
+
+
+@dataclass
+class IncrementalFetch:
+    """SUMIT data for a run assembled from fresh and carried-over records."""
+    sumit_df: pd.DataFrame
+    sumit_lookup: Dict[str, pd.Series]
+    warnings: List[str]
+    plan: CarryOverPlan
+    fetched_at: Dict[str, str]    # carried record ID → original fetch time
+
+
+def fetch_incremental(
+    config: ReportConfig,
+    tax_year: int,
+    idom_df: pd.DataFrame,
+    fetch: Callable[..., Any],
+    previous: Optional[SummitSnapshot] = None,
+    previous_match: Optional[MatchResult] = None,
+    last_writes: Optional[Dict[str, datetime]] = None,
+    max_age_hours: Optional[float] = None,
+) -> IncrementalFetch:
+    """
+    Fetch Summit data for only the IDOM keys that need it and merge in the
+    carried-over records from the previous snapshot.
+
+    fetch has the fetch_sumit_data_targeted signature (config, tax_year,
+    idom_company_numbers) → (df, lookup, warnings).
+    """
+    plan = plan_carry_over(
+        idom_df, previous, previous_match,
+        last_writes=last_writes, max_age_hours=max_age_hours,
+    )
+    fetch_keys = [k.strip() for k in plan.fetch_keys if k.strip() and k.strip() != "nan"]
+
+    logger.info(
+        "Incremental fetch: %d carried from run %s, %d to fetch (%s)",
+        len(plan.carried), plan.source_run_id or "-", len(fetch_keys),
+        ", ".join(f"{r}={n}" for r, n in sorted(plan.reasons.items())) or "-",
+    )
+
+    if fetch_keys or not plan.carried:
+        fresh_df, fresh_lookup, warnings = fetch(
+            config=config, tax_year=tax_year, idom_company_numbers=fetch_keys,
+        )
+    else:
+        fresh_df, fresh_lookup, warnings = pd.DataFrame(), {}, []
+
+    if not plan.carried:
+        return IncrementalFetch(fresh_df, fresh_lookup, list(warnings), plan, {})
+
+    # Fresh records first — the lookup is first-occurrence-wins, so a record
+    # that was fetched again beats its carried copy.
+    carried_ids = list(dict.fromkeys(plan.carried.values()))
+    carried_df = previous.frame(carried_ids)
+    if "מזהה" in fresh_df.columns and not fresh_df.empty:
+        fresh_ids = set(fresh_df["מזהה"].map(lambda v: record_id({"מזהה": v})))
+        carried_df = carried_df[~carried_df["מזהה"].isin(fresh_ids)]
+    frames = [f for f in (fresh_df, carried_df) if not f.empty]
+    sumit_df = pd.concat(frames, ignore_index=True) if frames else carried_df
+    sumit_lookup = SUMITParser(config).build_lookup(sumit_df)
+
+    fetched_at = {rid: previous.records[rid]["fetched_at"] for rid in carried_df["מזהה"]}
+    return IncrementalFetch(sumit_df, sumit_lookup, list(warnings), plan, fetched_at)
+
+
+def mark_carried_over(result: SyncResult, plan: CarryOverPlan):
+    """Record the carried-over keys that the sync actually matched on the result."""
+    if not plan.carried or result.match_result is None:
+        return
+    pairs = result.match_result.pairs
+    result.carried_over_keys = [
+        k for k, rid in plan.carried.items() if k in pairs and pairs[k].sumit_id == rid
+    ]
+    result.carried_over_count = len(result.carried_over_keys)
+    if result.carried_over_count:
+        result.warnings.append(
+            f"{result.carried_over_count} רשומות ללא שינוי ב-IDOM הותאמו לנתוני Summit "
+            f"מהרצה {plan.source_run_id[:8]} (ללא שליפה מחדש)"
+        )
@@ -6,20 +6,35 @@ it's cached permanently (company numbers don't change).
 
 The mapping is shared across report types — a single client may have both
 annual and financial reports.
+
+It also keeps each client's פקיד שומה / סוג תיק entity refs, which the
+write planner reads to skip client updates that would write the same value.
+Write planning re-reads them live first (fetch_client_refs(live=True)); they
+can change in Summit, so cached entries expire after
+SUMIT_CLIENT_REFS_MAX_AGE_HOURS.
+
+Several instances can hold the file at once (prewarm, request threads);
+save() merges into what is on disk (src/core/cache_file.py) rather than
+overwriting it.
 """
 
-import json
 import logging
 import os
 import threading
+import time
 from pathlib import Path
-from typing import Dict, Optional, Set
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .cache_file import read_json, save_merged
 
 logger = logging.getLogger(__name__)
 
 DATA_DIR = Path(os.environ.get("DATA_DIR", "/data"))
 MAPPING_FILE = DATA_DIR / "client_mapping.json"
 
+# Cached client taxonomy refs older than this are treated as unknown
+CLIENT_REFS_MAX_AGE_HOURS = float(os.environ.get("SUMIT_CLIENT_REFS_MAX_AGE_HOURS", "24"))
+
 
 class MappingStore:
     """
@@ -31,12 +46,20 @@ class MappingStore:
         "company_to_client": { "516582061": "1223591798", ... },
         "client_names": { "1223591798": "גו סווימינג בע\"מ", ... },
         "known_absent": [ "999999990", ... ]   # company numbers known to have NO Summit client
+        "client_refs": { "1223591798": {"פקיד שומה": 1099384290, "סוג תיק": null, "fetched_at": 1.7e9}, ... }
     }
 
     Thread-safe: all mutations are guarded by an internal lock so concurrent
-    fetchers can update the store without races.
+    fetchers can update the store without races. Saves merge this instance's
+    changes since its last save into the file: mappings and the negative
+    cache are unioned (a mapped ח.פ is never absent), refs set here replace
+    the file's unless those were read later, and refs forgotten here are
+    dropped unless the file's were read after the forget. After
+    clear_absent() the file's negative cache is replaced, not merged.
     """
 
+    MAPPING_KEYS = ("client_to_company", "company_to_client", "client_names")
+
     def __init__(self, path: Optional[Path] = None):
         self.path = path or MAPPING_FILE
         self._data: Dict[str, Dict[str, str]] = {
@@ -45,34 +68,58 @@ class MappingStore:
             "client_names": {},
         }
         self._known_absent: Set[str] = set()
+        self._client_refs: Dict[str, Dict[str, object]] = {}
+        self._changed_refs: Set[str] = set()          # client IDs set since the last save
+        self._forgotten_refs: Dict[str, float] = {}   # client ID → when forget_client_refs dropped it
+        self._absent_added: Set[str] = set()
+        self._absent_cleared = False
         self._lock = threading.Lock()
         self._load()
 
     def _load(self):
         """Load mapping from disk if it exists."""
         if self.path.exists():
-            try:
-                with open(self.path, "r", encoding="utf-8") as f:
-                    loaded = json.load(f)
-                self._data["client_to_company"] = loaded.get("client_to_company", {})
-                self._data["company_to_client"] = loaded.get("company_to_client", {})
-                self._data["client_names"] = loaded.get("client_names", {})
-                self._known_absent = set(loaded.get("known_absent", []))
-                logger.info(
-                    "Loaded mapping: %d client↔company entries, %d known-absent",
-                    len(self._data["client_to_company"]),
-                    len(self._known_absent),
-                )
-            except (json.JSONDecodeError, OSError) as e:
-                logger.warning("Failed to load mapping file, starting fresh: %s", e)
+            self._adopt(read_json(self.path))
+            logger.info(
+                "Loaded mapping: %d client↔company entries, %d known-absent",
+                len(self._data["client_to_company"]),
+                len(self._known_absent),
+            )
+
+    def _adopt(self, loaded: Dict[str, Any]):
+        for key in self.MAPPING_KEYS:
+            self._data[key] = dict(loaded.get(key, {}))
+        self._known_absent = set(loaded.get("known_absent", []))
+        self._client_refs = dict(loaded.get("client_refs", {}))
+
+    def _merge(self, on_disk: Dict[str, Any]) -> Dict[str, Any]:
+        """This instance's changes since its last save, merged into the file's state."""
+        payload: Dict[str, Any] = {
+            key: {**on_disk.get(key, {}), **self._data[key]} for key in self.MAPPING_KEYS
+        }
+        absent = set(self._absent_added)
+        if not self._absent_cleared:
+            absent |= set(on_disk.get("known_absent", []))
+        payload["known_absent"] = sorted(absent - set(payload["company_to_client"]))
+        refs = {
+            cid: entry for cid, entry in on_disk.get("client_refs", {}).items()
+            if float(entry.get("fetched_at", 0)) > self._forgotten_refs.get(cid, float("-inf"))
+        }
+        for cid in self._changed_refs:
+            entry = self._client_refs.get(cid)
+            if entry is not None and float(entry["fetched_at"]) >= float(refs.get(cid, {}).get("fetched_at", float("-inf"))):
+                refs[cid] = entry
+        payload["client_refs"] = refs
+        return payload
 
     def _save(self):
-        """Persist mapping to disk."""
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        payload = dict(self._data)
-        payload["known_absent"] = sorted(self._known_absent)
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        """Merge this instance's changes into the file on disk and adopt the result."""
+        with self._lock:
+            self._adopt(save_merged(self.path, self._merge, indent=2))
+            self._changed_refs.clear()
+            self._forgotten_refs.clear()
+            self._absent_added.clear()
+            self._absent_cleared = False
 
     def add(self, client_id: int, company_number: str, client_name: str = ""):
         """Add a client → company number mapping. Clears any negative-cache entry."""
@@ -87,6 +134,7 @@ class MappingStore:
             if client_name:
                 self._data["client_names"][cid] = client_name
             self._known_absent.discard(cn)
+            self._absent_added.discard(cn)
 
     def is_known_absent(self, company_number: str) -> bool:
         """True if this ח.פ has been resolved before and returned no Summit client."""
@@ -99,11 +147,14 @@ class MappingStore:
             return
         with self._lock:
             self._known_absent.add(cn)
+            self._absent_added.add(cn)
 
     def clear_absent(self):
         """Drop the entire negative cache (use when adding new clients to Summit)."""
         with self._lock:
             self._known_absent.clear()
+            self._absent_added.clear()
+            self._absent_cleared = True
 
     def get_company_number(self, client_id: int) -> Optional[str]:
         """Look up company number by client entity ID."""
@@ -125,6 +176,34 @@ class MappingStore:
         """Return client IDs that don't have a mapping yet."""
         return {cid for cid in client_ids if str(cid) not in self._data["client_to_company"]}
 
+    def get_client_refs(self, client_id) -> Optional[Dict[str, Optional[int]]]:
+        """
+        Cached {"פקיד שומה": id, "סוג תיק": id} for a client (None values = unset
+        in Summit), or None if unknown or expired.
+        """
+        entry = self._client_refs.get(str(client_id))
+        if not entry:
+            return None
+        if time.time() - float(entry.get("fetched_at", 0)) > CLIENT_REFS_MAX_AGE_HOURS * 3600:
+            return None
+        return {k: v for k, v in entry.items() if k != "fetched_at"}
+
+    def set_client_refs(self, client_id, refs: Dict[str, Optional[int]]):
+        """Record a client's current taxonomy refs (as just read from Summit)."""
+        with self._lock:
+            self._client_refs[str(client_id)] = dict(refs, fetched_at=time.time())
+            self._changed_refs.add(str(client_id))
+
+    def forget_client_refs(self, client_id):
+        """Drop a client's cached refs — the next fetch_client_refs re-reads them."""
+        with self._lock:
+            self._client_refs.pop(str(client_id), None)
+            self._forgotten_refs[str(client_id)] = time.time()
+
+    def clients_missing_refs(self, client_ids: Iterable) -> List[str]:
+        """Client IDs (deduped, in order) with no fresh cached taxonomy refs."""
+        return [cid for cid in dict.fromkeys(str(c) for c in client_ids) if self.get_client_refs(cid) is None]
+
     def save(self):
         """Explicit save (call after batch updates)."""
         self._save()
@@ -140,4 +219,5 @@ class MappingStore:
             "total_mappings": len(self._data["client_to_company"]),
             "with_names": len(self._data["client_names"]),
             "known_absent": len(self._known_absent),
+            "client_refs": len(self._client_refs),
         }
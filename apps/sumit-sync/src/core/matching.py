@@ -0,0 +1,322 @@
+"""
+IDOM→SUMIT match index.
+
+The lookup dict from the parsers is keyed by exact match key (plus a
+zero-stripped variant). When an IDOM key missed it, the engine used to scan
+every lookup key comparing sk.lstrip('0') — O(M) per unmatched row, O(N·M)
+for a run with many new clients.
+
+MatchIndex precomputes each canonical form of every SUMIT key once:
+  exact          — the key as stored in the lookup
+  zero_stripped  — leading zeros removed
+  digits_only    — float formatting undone ("123.0" → "123"), non-digits
+                   dropped, leading zeros removed
+Every form maps to (record, SUMIT key) with first-occurrence-wins in lookup
+insertion order, so results match the old scan. Lookups try the forms in
+that order and report which strategy hit.
+
+MatchResult is the per-run artifact of one matching pass: IDOM key →
+(SUMIT key, SUMIT record ID, strategy), plus the unmatched keys. It is
+computed once during execute, persisted with the run, and replayed by the
+write-plan / dry-run / live-write stages — record IDs are stable across
+Summit fetches, so later stages resolve by ID instead of matching again.
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_EXACT = "exact"
+STRATEGY_ZERO_STRIPPED = "zero_stripped"
+STRATEGY_DIGITS_ONLY = "digits_only"
+STRATEGIES = (STRATEGY_EXACT, STRATEGY_ZERO_STRIPPED, STRATEGY_DIGITS_ONLY)
+
+
+def digits_only(value) -> str:
+    """Canonical digits form: undo float formatting, keep digits, strip leading zeros."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    val_str = str(value)
+    if val_str.isdigit():
+        return val_str.lstrip("0")
+    if "." in val_str:
+        try:
+            val_str = str(int(float(val_str)))
+        except (ValueError, OverflowError):
+            pass
+    return re.sub(r"[^\d]", "", val_str).lstrip("0")
+
+
+@dataclass(frozen=True)
+class Match:
+    """One resolved IDOM key."""
+    position: int      # index into MatchIndex.records
+    sumit_key: str     # lookup key that matched
+    strategy: str      # one of STRATEGIES
+
+
+def record_id(row) -> str:
+    """SUMIT מזהה of a lookup record as a clean string ('' if missing)."""
+    value = row.get("מזהה", "")
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    value = str(value)
+    return value[:-2] if value.endswith(".0") else value
+
+
+@dataclass(frozen=True)
+class MatchedPair:
+    """One matched IDOM key, as persisted in MatchResult."""
+    idom_key: str
+    sumit_key: str
+    sumit_id: str
+    strategy: str
+
+
+@dataclass
+class MatchResult:
+    """Outcome of one matching pass over a run's IDOM keys."""
+    pairs: Dict[str, MatchedPair] = field(default_factory=dict)   # IDOM key → pair
+    unmatched: List[str] = field(default_factory=list)
+    created_at: str = ""
+    _unmatched_set: Optional[set] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def matched_count(self) -> int:
+        return len(self.pairs)
+
+    @property
+    def unmatched_count(self) -> int:
+        return len(self.unmatched)
+
+    @property
+    def unmatched_set(self) -> set:
+        if self._unmatched_set is None:
+            self._unmatched_set = set(self.unmatched)
+        return self._unmatched_set
+
+    def strategy_counts(self) -> Dict[str, int]:
+        return strategy_counts(p.strategy for p in self.pairs.values())
+
+    def covers(self, idom_keys) -> bool:
+        """True if every given IDOM key was part of this pass."""
+        return all(str(k) in self.pairs or str(k) in self.unmatched_set for k in idom_keys)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "created_at": self.created_at,
+            "strategy_counts": self.strategy_counts(),
+            "pairs": [
+                {"idom_key": p.idom_key, "sumit_key": p.sumit_key,
+                 "sumit_id": p.sumit_id, "strategy": p.strategy}
+                for p in self.pairs.values()
+            ],
+            "unmatched": list(self.unmatched),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MatchResult":
+        pairs = {}
+        for p in data.get("pairs", []):
+            pair = MatchedPair(str(p["idom_key"]), str(p["sumit_key"]), str(p["sumit_id"]), p["strategy"])
+            pairs[pair.idom_key] = pair
+        return cls(
+            pairs=pairs,
+            unmatched=[str(k) for k in data.get("unmatched", [])],
+            created_at=data.get("created_at", ""),
+        )
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        logger.info("Saved match result to %s (%d matched, %d unmatched)",
+                    path, self.matched_count, self.unmatched_count)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["MatchResult"]:
+        """Load a persisted MatchResult, or None if missing / unreadable."""
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (json.JSONDecodeError, OSError, KeyError, TypeError) as e:
+            logger.warning("Failed to load match result %s: %s", path, e)
+            return None
+
+
+class MatchIndex:
+    """
+    Constant-time IDOM key → SUMIT record resolution over a lookup dict.
+
+    records holds each distinct lookup record once (a record appears under
+    its exact key and its zero-stripped variant), in first-seen order.
+    """
+
+    def __init__(self, sumit_lookup: Dict[str, pd.Series]):
+        self.records: List[pd.Series] = []
+        self._ids: Optional[Dict[str, int]] = None   # record ID → position, built on first resolve()
+        # strategy → canonical form → (record position, SUMIT key)
+        self._forms: Dict[str, Dict[str, Tuple[int, str]]] = {s: {} for s in STRATEGIES}
+
+        record_pos: Dict[int, int] = {}
+        for key, row in sumit_lookup.items():
+            pos = record_pos.get(id(row))
+            if pos is None:
+                pos = record_pos[id(row)] = len(self.records)
+                self.records.append(row)
+            entry = (pos, key)
+            self._forms[STRATEGY_EXACT].setdefault(key, entry)
+            if isinstance(key, str):
+                self._forms[STRATEGY_ZERO_STRIPPED].setdefault(key.lstrip("0"), entry)
+            digits = digits_only(key)
+            if digits:
+                self._forms[STRATEGY_DIGITS_ONLY].setdefault(digits, entry)
+        logger.debug("Match index: %d records, %d lookup keys", len(self.records), len(sumit_lookup))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def match(self, key) -> Optional[Match]:
+        """Resolve one IDOM key, trying exact → zero_stripped → digits_only."""
+        if key is None or key == "" or (not isinstance(key, str) and pd.isna(key)):
+            return None
+        hit = self._forms[STRATEGY_EXACT].get(key)
+        if hit is not None:
+            return Match(hit[0], hit[1], STRATEGY_EXACT)
+        if isinstance(key, str):
+            hit = self._forms[STRATEGY_ZERO_STRIPPED].get(key.lstrip("0"))
+            if hit is not None:
+                return Match(hit[0], hit[1], STRATEGY_ZERO_STRIPPED)
+        digits = digits_only(key)
+        if digits:
+            hit = self._forms[STRATEGY_DIGITS_ONLY].get(digits)
+            if hit is not None:
+                return Match(hit[0], hit[1], STRATEGY_DIGITS_ONLY)
+        return None
+
+    def match_row(self, key) -> Tuple[Optional[pd.Series], Optional[Match]]:
+        """match() plus the matched SUMIT record."""
+        m = self.match(key)
+        return (self.records[m.position], m) if m is not None else (None, None)
+
+    def match_series(self, keys: pd.Series) -> pd.DataFrame:
+        """
+        Resolve a column of IDOM keys. Returns a frame aligned with `keys`:
+        position (-1 = unmatched), sumit_key, strategy (None when unmatched).
+        """
+        out = pd.DataFrame({
+            "position": -1,
+            "sumit_key": pd.Series([None] * len(keys), index=keys.index, dtype=object),
+            "strategy": pd.Series([None] * len(keys), index=keys.index, dtype=object),
+        }, index=keys.index)
+        valid = keys.notna() & (keys.astype(str) != "")
+        remaining = keys[valid]
+
+        for strategy in STRATEGIES:
+            if remaining.empty:
+                break
+            if strategy == STRATEGY_EXACT:
+                forms = remaining
+            elif strategy == STRATEGY_ZERO_STRIPPED:
+                forms = remaining.map(lambda k: k.lstrip("0") if isinstance(k, str) else None)
+            else:
+                forms = remaining.map(digits_only)
+            hits = forms.map(self._forms[strategy]).dropna()
+            if hits.empty:
+                continue
+            out.loc[hits.index, "position"] = [h[0] for h in hits]
+            out.loc[hits.index, "sumit_key"] = [h[1] for h in hits]
+            out.loc[hits.index, "strategy"] = strategy
+            remaining = remaining.drop(hits.index)
+
+        return out
+
+    def match_all(self, keys: pd.Series) -> MatchResult:
+        """Run one matching pass over a column of IDOM keys."""
+        matches = self.match_series(keys)
+        result = MatchResult(created_at=datetime.now(timezone.utc).isoformat())
+        for key, pos, sk, strategy in zip(keys, matches["position"], matches["sumit_key"], matches["strategy"]):
+            idom_key = str(key)
+            if pos >= 0:
+                result.pairs[idom_key] = MatchedPair(idom_key, sk, record_id(self.records[pos]), strategy)
+            elif idom_key not in result.unmatched_set:
+                result.unmatched.append(idom_key)
+                result.unmatched_set.add(idom_key)
+        return result
+
+    def resolve(self, match_result: MatchResult, keys: pd.Series) -> pd.DataFrame:
+        """
+        Replay a persisted MatchResult against this index's records.
+        Same frame shape as match_series(). Pairs are resolved by SUMIT record
+        ID. Keys the artifact doesn't cover, or whose record is no longer in
+        the data, fall back to match() (logged).
+        """
+        if self._ids is None:
+            self._ids = {}
+            for pos, row in enumerate(self.records):
+                self._ids.setdefault(record_id(row), pos)
+
+        positions, sumit_keys, strategies = [], [], []
+        fallbacks = created = 0
+        for key in keys:
+            idom_key = str(key)
+            pair = match_result.pairs.get(idom_key)
+            pos = self._ids.get(pair.sumit_id) if pair is not None else None
+            if pos is not None:
+                positions.append(pos)
+                sumit_keys.append(pair.sumit_key)
+                strategies.append(pair.strategy)
+                continue
+            # Unmatched keys get an O(1) re-check: a live write may have created
+            # the report since, and planning CREATE_REPORT again would duplicate it
+            m = self.match(key)
+            if pair is None and idom_key in match_result.unmatched_set:
+                created += m is not None
+            else:
+                fallbacks += 1
+            positions.append(m.position if m else -1)
+            sumit_keys.append(m.sumit_key if m else None)
+            strategies.append(m.strategy if m else None)
+
+        if created:
+            logger.info("Match result replay: %d previously unmatched keys now found in Summit", created)
+        if fallbacks:
+            logger.warning("Match result replay: %d keys re-matched (not covered or record gone)", fallbacks)
+        return pd.DataFrame({
+            "position": pd.Series(positions, index=keys.index, dtype="int64"),
+            "sumit_key": pd.Series(sumit_keys, index=keys.index, dtype=object),
+            "strategy": pd.Series(strategies, index=keys.index, dtype=object),
+        }, index=keys.index)
+
+    def frame(self, sumit_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        records as a DataFrame (row i = records[i]).
+        Lookup rows come from sumit_df.iterrows(), so their .name is the
+        sumit_df label — take the rows straight from sumit_df when that holds.
+        """
+        if not self.records:
+            return sumit_df.iloc[0:0].reset_index(drop=True)
+        if sumit_df.index.is_unique:
+            indexer = sumit_df.index.get_indexer([r.name for r in self.records])
+            if (indexer >= 0).all():
+                return sumit_df.iloc[indexer].reset_index(drop=True)
+        return pd.DataFrame(self.records).reset_index(drop=True)
+
+
+def strategy_counts(strategies) -> Dict[str, int]:
+    """Count matches per strategy (unmatched entries — None — are ignored)."""
+    counts = {s: 0 for s in STRATEGIES}
+    for s in strategies:
+        if s in counts:
+            counts[s] += 1
+    return counts
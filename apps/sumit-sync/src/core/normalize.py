@@ -0,0 +1,215 @@
+"""
+Shared normalization kernel: match keys, Israel-midnight dates, "ID: Label".
+
+The IDOM parser, the SUMIT parser, the API source and the match-key
+validation each carried their own copy of the match-key rule (float
+round-trip, then digits only) and applied it one value at a time. They all
+use this module now.
+
+Every rule has a scalar reference (normalize_key, encode_israel_midnight,
+israel_day, split_id_label, extract_year) and a Series version that gives
+the same values, checked by tests/test_normalize.py:
+
+- normalize_keys: integer arithmetic on a numeric column. On text, plain
+  string ops for the usual shapes — digits with separators, and
+  "123456.0" float renderings of up to 15 digits (exact in a float64).
+  Anything else that contains a "." goes through the scalar rule.
+- israel_days: tz ops over the whole column.
+- israel_midnights, split_id_labels, extract_years: computed once per
+  distinct value. These columns repeat a few hundred days, a handful of
+  statuses and tax years.
+"""
+
+import re
+from datetime import date, datetime, time
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+# Israel timezone — handles IST (+02:00, Oct-Mar) and IDT (+03:00, Mar-Oct) automatically.
+# Hardcoding +03:00 caused IST-season dates to land one calendar day early in Summit
+# (Cycle C, 2026-05-12 — March 15 stored as March 14). Use this for all date wire encoding.
+ISRAEL_TZ = ZoneInfo("Asia/Jerusalem")
+
+# "123456.0" / " 0123.00 " — int(float(s)) is the integer part without leading
+# zeros, exactly, up to 15 significant digits
+_FLOAT_INT_RE = r"\s*[+-]?0*([0-9]{1,15})\.0*\s*"
+
+
+# ---------------------------------------------------------------- match keys
+
+def normalize_key(value) -> str:
+    """
+    Normalize match key: extract digits only, preserve leading zeros.
+    Float renderings ("123456.0") lose the fraction first.
+    """
+    if pd.isna(value):
+        return ''
+
+    val_str = str(value)
+
+    # Handle float formatting (e.g., 123456.0)
+    if '.' in val_str:
+        try:
+            val_str = str(int(float(val_str)))
+        except (ValueError, OverflowError):
+            pass
+
+    # Extract digits only
+    return re.sub(r'[^\d]', '', val_str)
+
+
+def normalize_keys(values: pd.Series) -> pd.Series:
+    """normalize_key over a Series (same index), without a Python call per row."""
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        return _normalize_numeric_keys(values)
+    out = np.full(len(values), '', dtype=object)
+    present = values.notna().to_numpy()
+    if present.any():
+        # Positional from here on — frame indexes may repeat labels
+        s = values[present].astype(str).reset_index(drop=True)
+        result = s.str.replace(r'[^\d]', '', regex=True)
+        has_dot = s.str.contains('.', regex=False)
+        if has_dot.any():
+            dotted = s[has_dot]
+            integer_part = dotted.str.fullmatch(_FLOAT_INT_RE)
+            result[integer_part.index[integer_part]] = dotted[integer_part].str.extract(_FLOAT_INT_RE, expand=False)
+            rest = dotted[~integer_part]
+            if len(rest):
+                result[rest.index] = rest.map(normalize_key)
+        out[present] = result.to_numpy(dtype=object)
+    return pd.Series(out, index=values.index, dtype=object)
+
+
+def _normalize_numeric_keys(values: pd.Series) -> pd.Series:
+    """Numeric column: digits of |trunc(v)| wherever str(v) is plain positional notation."""
+    v = values.to_numpy(dtype=float, na_value=np.nan)
+    if pd.api.types.is_integer_dtype(values.dtype):
+        plain = ~np.isnan(v)
+        digits = np.abs(values.to_numpy(dtype=np.int64, na_value=0))
+    else:
+        magnitude = np.abs(v)
+        # repr switches to exponent notation outside [1e-4, 1e16)
+        plain = (magnitude == 0) | ((magnitude >= 1e-4) & (magnitude < 1e16))
+        digits = np.trunc(np.where(plain, magnitude, 0)).astype(np.int64)
+    out = np.full(len(v), '', dtype=object)
+    out[plain] = digits[plain].astype(str).tolist()
+    rest = ~plain & ~np.isnan(v)
+    if rest.any():
+        out[rest] = [normalize_key(x) for x in values.to_numpy()[rest]]
+    return pd.Series(out, index=values.index, dtype=object)
+
+
+# ------------------------------------------------------ Israel-midnight dates
+
+def encode_israel_midnight(d) -> str:
+    """Wire-encode a calendar date as midnight Israel local time (ISO 8601).
+
+    Picks the correct UTC offset for the date (+02:00 IST winter, +03:00 IDT summer)
+    so Summit's Date-typed properties truncate to the intended calendar day.
+    """
+    cal = d.date() if hasattr(d, "date") and callable(d.date) else d
+    return datetime.combine(cal, time.min, tzinfo=ISRAEL_TZ).isoformat()
+
+
+def israel_midnights(values: pd.Series) -> pd.Series:
+    """encode_israel_midnight over a datetime-like Series; '' where empty.
+
+    Encoded once per distinct calendar day — report dates repeat a lot.
+    """
+    ts = pd.to_datetime(values, errors='coerce')
+    if getattr(ts.dt, 'tz', None) is not None:
+        ts = ts.dt.tz_localize(None)
+    days = pd.Series(ts.dt.normalize().to_numpy(), index=values.index)
+    return _per_distinct(days, lambda d: ('' if pd.isna(d) else encode_israel_midnight(d),), ('text',))['text']
+
+
+def israel_day(value) -> Optional[date]:
+    """Calendar day a date value stands for in Israel (None if empty/unparseable).
+
+    Naive midnight (IDOM, XLSX export) is the day itself. Any other naive time
+    is UTC — the API source converts Summit's "+02:00"/"+03:00" values to
+    UTC-naive, so Israel midnight arrives as 22:00/21:00 the day before.
+    Aware values (raw wire strings) are converted to Israel time.
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        ts = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    if pd.isna(ts):
+        return None
+    if ts.tzinfo is None:
+        if ts == ts.normalize():
+            return ts.date()
+        ts = ts.tz_localize("UTC")
+    return ts.tz_convert(ISRAEL_TZ).date()
+
+
+def israel_days(values: pd.Series) -> pd.Series:
+    """israel_day over a naive datetime-like Series; None where empty."""
+    ts = pd.to_datetime(values, errors='coerce')
+    if getattr(ts.dt, 'tz', None) is not None:
+        return ts.dt.tz_convert(ISRAEL_TZ).dt.date.where(ts.notna(), None).astype(object)
+    midnight = ts == ts.dt.normalize()
+    shifted = ts.dt.tz_localize('UTC').dt.tz_convert(ISRAEL_TZ).dt.tz_localize(None)
+    days = ts.where(midnight, shifted).dt.date
+    return days.where(ts.notna(), None).astype(object)
+
+
+# ----------------------------------------------------------------- ID: Label
+
+def split_id_label(value) -> Tuple[str, str]:
+    """
+    "1125886300: 9) תהליך הושלם" → ("1125886300", "9) תהליך הושלם").
+    No colon → ("", value). Empty → ("", "").
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return '', ''
+    text = str(value)
+    if ':' not in text:
+        return '', text
+    ref_id, label = text.split(':', 1)
+    return ref_id.strip(), label.strip()
+
+
+def split_id_labels(values: pd.Series) -> pd.DataFrame:
+    """split_id_label over a Series → DataFrame with 'id' and 'label' columns."""
+    return _per_distinct(values, split_id_label, ('id', 'label'))
+
+
+def extract_year(value) -> Optional[int]:
+    """Tax year of a שנת מס cell — ID:Label ("1125575564: 2024") or a bare year."""
+    if pd.isna(value):
+        return None
+    val_str = str(value)
+
+    # If colon present, take the part after colon
+    if ':' in val_str:
+        year_part = val_str.split(':')[-1].strip()
+        match = re.search(r'(\d{4})', year_part)
+        if match:
+            return int(match.group(1))
+
+    # Fallback: look for 4-digit year between 2000-2099
+    match = re.search(r'\b(20\d{2})\b', val_str)
+    if match:
+        return int(match.group(1))
+
+    return None
+
+
+def extract_years(values: pd.Series) -> pd.Series:
+    """extract_year over a Series; None where no year."""
+    return _per_distinct(values, lambda v: (extract_year(v),), ('year',))['year']
+
+
+def _per_distinct(values: pd.Series, fn, columns) -> pd.DataFrame:
+    """fn evaluated once per distinct value, spread back over the Series."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    table = [fn(u) for u in uniques] + [fn(np.nan)]   # code -1 → last row (NaN)
+    picked = np.asarray(table, dtype=object).reshape(len(table), len(columns))[codes]
+    return pd.DataFrame(picked, index=values.index, columns=list(columns))
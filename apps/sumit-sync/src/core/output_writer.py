@@ -1,18 +1,29 @@
 """
 IDOM→SUMIT Sync Engine - Output Writer
 Generates Excel output files: import, diff report, exceptions.
+
+Workbooks are write-only (openpyxl write_only=True): rows are streamed to
+the file as they are appended, nothing is kept per cell. A frame is
+written column-wise — each column cleaned for export in one pass by dtype
+(_export_column, the vectorized _clean_value), column widths taken from
+the cleaned columns (_column_widths, what the old per-cell _auto_width
+scan gave), then rows zipped from the columns into one reused row of
+styled cells. Styles are the class constants below, created once. Cell
+values, styles and widths are the same as the cell-by-cell workbooks
+this replaced; scripts/bench_output_writer.py compares both.
 """
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence
 from datetime import datetime
 from pathlib import Path
 import logging
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.utils import get_column_letter
 
 from .config import ReportConfig, STATUS_COMPLETED
 from .sync_engine import SyncResult
@@ -37,6 +48,9 @@ class OutputWriter:
         top=Side(style='thin'),
         bottom=Side(style='thin')
     )
+    TITLE_FONT = Font(bold=True, size=14)
+    BOLD_FONT = Font(bold=True)
+    HEADER_ALIGNMENT = Alignment(horizontal='center')
     
     def __init__(self, config: ReportConfig, output_dir: str):
         self.config = config
@@ -76,45 +90,22 @@ class OutputWriter:
         filename = f"sumit_import_{report_type}_{tax_year}_{self.timestamp}.xlsx"
         filepath = self.output_dir / filename
         
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("ייבוא")
+
         if df.empty:
             # Create empty file with headers only
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "ייבוא"
-
-            for col_idx, header in enumerate(self.config.import_schema.columns, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = self.HEADER_FONT
-                cell.fill = self.HEADER_FILL
-
+            ws.append([
+                self._cell(ws, header, font=self.HEADER_FONT, fill=self.HEADER_FILL)
+                for header in self.config.import_schema.columns
+            ])
             wb.save(filepath)
             logger.info(f"Written empty import file: {filepath}")
             return filepath
 
-        # Clean data for export
-        export_df = self._prepare_for_export(df)
+        # Values only - no formulas
+        self._write_frame(ws, df)
 
-        # Write to Excel
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "ייבוא"
-        
-        # Write headers
-        for col_idx, header in enumerate(export_df.columns, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.font = self.HEADER_FONT
-            cell.fill = self.HEADER_FILL
-            cell.alignment = Alignment(horizontal='center')
-        
-        # Write data (values only - no formulas)
-        for row_idx, row in enumerate(export_df.itertuples(index=False), 2):
-            for col_idx, value in enumerate(row, 1):
-                cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                cell.border = self.THIN_BORDER
-        
-        # Auto-width columns
-        self._auto_width(ws)
-        
         wb.save(filepath)
         logger.info(f"Written import file: {filepath} ({len(df)} records)")
         return filepath
@@ -125,11 +116,10 @@ class OutputWriter:
         filename = f"diff_report_{report_type}_{tax_year}_{self.timestamp}.xlsx"
         filepath = self.output_dir / filename
         
-        wb = Workbook()
+        wb = Workbook(write_only=True)
         
         # Sheet 1: Summary
-        ws_summary = wb.active
-        ws_summary.title = "סיכום"
+        ws_summary = wb.create_sheet("סיכום")
         self._write_summary_sheet(ws_summary, result, tax_year)
 
         # Sheet 2: All Changes
@@ -160,11 +150,10 @@ class OutputWriter:
         filename = f"exceptions_{report_type}_{tax_year}_{self.timestamp}.xlsx"
         filepath = self.output_dir / filename
         
-        wb = Workbook()
+        wb = Workbook(write_only=True)
         
         # Sheet 1: Unmatched Records
-        ws_unmatched = wb.active
-        ws_unmatched.title = "ללא התאמה"
+        ws_unmatched = wb.create_sheet("ללא התאמה")
         self._write_dataframe_sheet(ws_unmatched, result.exceptions_df, "רשומות IDOM ללא התאמה")
         
         # Sheet 2: Status Regression Flags
@@ -187,7 +176,7 @@ class OutputWriter:
                 }])
                 self._write_dataframe_sheet(ws_regression, regression_note, "נסיגות סטטוס")
         else:
-            ws_regression.cell(row=1, column=1, value="אין נסיגות סטטוס")
+            ws_regression.append(["אין נסיגות סטטוס"])
         
         # Sheet 3: Summary
         ws_summary = wb.create_sheet("סיכום")
@@ -208,12 +197,13 @@ class OutputWriter:
     def _write_summary_sheet(self, ws, result: SyncResult, tax_year: int) -> None:
         """Write summary sheet."""
         # Title
-        ws.cell(row=1, column=1, value="דו״ח סנכרון IDOM → SUMIT")
-        ws.cell(row=1, column=1).font = Font(bold=True, size=14)
-
-        ws.cell(row=2, column=1, value=f"סוג דו״ח: {self.config.display_name}")
-        ws.cell(row=3, column=1, value=f"שנת מס: {tax_year}")
-        ws.cell(row=4, column=1, value=f"נוצר: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        rows = [
+            [self._cell(ws, "דו״ח סנכרון IDOM → SUMIT", font=self.TITLE_FONT)],
+            [f"סוג דו״ח: {self.config.display_name}"],
+            [f"שנת מס: {tax_year}"],
+            [f"נוצר: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"],
+            [],
+        ]
 
         # Stats table
         stats = [
@@ -221,6 +211,7 @@ class OutputWriter:
             ("סטטיסטיקת עיבוד", ""),
             ("רשומות IDOM", result.total_idom_records),
             ("רשומות SUMIT", result.total_sumit_records),
+            ("הועברו מהרצה קודמת", result.carried_over_count),
             ("", ""),
             ("תוצאות התאמה", ""),
             ("התאמות", result.matched_count),
@@ -235,75 +226,109 @@ class OutputWriter:
             ("נסיגות סטטוס", result.status_regression_flags),
         ]
 
-        for row_idx, (label, value) in enumerate(stats, 6):
-            ws.cell(row=row_idx, column=1, value=label)
-            ws.cell(row=row_idx, column=2, value=value)
-
+        for label, value in stats:
             if label in ["סטטיסטיקת עיבוד", "תוצאות התאמה", "סטטיסטיקת עדכונים"]:
-                ws.cell(row=row_idx, column=1).font = Font(bold=True)
+                label = self._cell(ws, label, font=self.BOLD_FONT)
+            rows.append([label, value])
 
         # Warnings section
         if result.warnings:
-            warning_row = len(stats) + 8
-            ws.cell(row=warning_row, column=1, value="אזהרות")
-            ws.cell(row=warning_row, column=1).font = Font(bold=True)
-            
-            for idx, warning in enumerate(result.warnings, 1):
-                ws.cell(row=warning_row + idx, column=1, value=warning)
-                ws.cell(row=warning_row + idx, column=1).fill = self.CHANGE_FILL
-        
-        self._auto_width(ws)
+            rows += [[], [], [self._cell(ws, "אזהרות", font=self.BOLD_FONT)]]
+            for warning in result.warnings:
+                rows.append([self._cell(ws, warning, fill=self.CHANGE_FILL)])
+
+        ncols = max(len(row) for row in rows)
+        values = pd.DataFrame(
+            [[getattr(v, 'value', v) for v in row] + [None] * (ncols - len(row)) for row in rows], dtype=object,
+        )
+        self._set_widths(ws, self._column_widths([values[col] for col in values.columns]))
+        for row in rows:
+            ws.append(row)
     
     def _write_changes_sheet(self, ws, df: pd.DataFrame) -> None:
         """Write changes DataFrame to sheet."""
         if df.empty:
-            ws.cell(row=1, column=1, value="לא נרשמו שינויים")
+            ws.append(["לא נרשמו שינויים"])
             return
 
         self._write_dataframe_sheet(ws, df, "שינויים")
     
     def _write_warnings_sheet(self, ws, warnings: List[str]) -> None:
         """Write warnings to sheet."""
-        ws.cell(row=1, column=1, value="אזהרות")
-        ws.cell(row=1, column=1).font = Font(bold=True)
+        ws.append([self._cell(ws, "אזהרות", font=self.BOLD_FONT)])
 
         if not warnings:
-            ws.cell(row=2, column=1, value="אין אזהרות")
+            ws.append(["אין אזהרות"])
             return
         
-        for idx, warning in enumerate(warnings, 2):
-            ws.cell(row=idx, column=1, value=warning)
+        for warning in warnings:
+            ws.append([warning])
     
     def _write_dataframe_sheet(self, ws, df: pd.DataFrame, title: str = "") -> None:
         """Write DataFrame to worksheet."""
         if df.empty:
-            ws.cell(row=1, column=1, value=f"אין נתונים ({title})" if title else "אין נתונים")
+            ws.append([f"אין נתונים ({title})" if title else "אין נתונים"])
             return
-        
-        # Headers
-        for col_idx, header in enumerate(df.columns, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.font = self.HEADER_FONT
-            cell.fill = self.HEADER_FILL
-            cell.alignment = Alignment(horizontal='center')
-        
-        # Data
-        for row_idx, row in enumerate(df.itertuples(index=False), 2):
-            for col_idx, value in enumerate(row, 1):
-                cell = ws.cell(row=row_idx, column=col_idx, value=self._clean_value(value))
-                cell.border = self.THIN_BORDER
-        
-        self._auto_width(ws)
-    
-    def _prepare_for_export(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Prepare DataFrame for Excel export (values only)."""
-        export_df = df.copy()
-        
-        for col in export_df.columns:
-            export_df[col] = export_df[col].apply(self._clean_value)
-        
-        return export_df
-    
+
+        self._write_frame(ws, df)
+
+    def _write_frame(self, ws, df: pd.DataFrame) -> None:
+        """Header row, then one bordered row per record; values cleaned for export."""
+        columns = [self._export_column(df.iloc[:, i]) for i in range(df.shape[1])]
+        headers = list(df.columns)
+        self._set_widths(ws, self._column_widths(
+            [pd.Series([header], dtype=object) for header in headers], columns,
+        ))
+
+        ws.append([
+            self._cell(ws, header, font=self.HEADER_FONT, fill=self.HEADER_FILL, alignment=self.HEADER_ALIGNMENT)
+            for header in headers
+        ])
+        # Rows are serialized on append, so one row of styled cells is reused
+        row = [self._cell(ws, None, border=self.THIN_BORDER) for _ in headers]
+        for values in zip(*(column.tolist() for column in columns)):
+            for cell, value in zip(row, values):
+                cell.value = value
+            ws.append(row)
+
+    @staticmethod
+    def _cell(ws, value, font=None, fill=None, alignment=None, border=None) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        if alignment is not None:
+            cell.alignment = alignment
+        if border is not None:
+            cell.border = border
+        return cell
+
+    @classmethod
+    def _export_column(cls, col: pd.Series) -> pd.Series:
+        """_clean_value over a whole column, vectorized for datetime / float / int / bool columns."""
+        if pd.api.types.is_datetime64_any_dtype(col):
+            # SUMIT requires dd/MM/yyyy format
+            return col.dt.strftime('%d/%m/%Y').fillna('')
+
+        numpy_dtype = isinstance(col.dtype, np.dtype)   # not the nullable Int64 / Float64 / boolean
+        if numpy_dtype and col.dtype.kind == 'f':
+            values = col.to_numpy()
+            out = np.full(len(values), '', dtype=object)
+            filled = ~np.isnan(values)
+            out[filled] = values[filled]
+            # Handle float .0 suffix
+            whole = filled & np.isfinite(values) & (values == np.trunc(values))
+            small = whole & (np.abs(values) < 2.0 ** 63)
+            out[small] = values[small].astype(np.int64)
+            out[whole & ~small] = [int(v) for v in values[whole & ~small]]
+            return pd.Series(out, index=col.index)
+
+        if numpy_dtype and col.dtype.kind in 'iub':
+            return col
+
+        return col.astype(object).map(cls._clean_value)
+
     @staticmethod
     def _clean_value(value) -> Any:
         """Clean value for Excel export."""
@@ -321,21 +346,27 @@ class OutputWriter:
         return value
     
     @staticmethod
-    def _auto_width(ws, min_width: int = 10, max_width: int = 50) -> None:
-        """Auto-adjust column widths."""
-        for column in ws.columns:
+    def _column_widths(*parts: Sequence[pd.Series], min_width: int = 10, max_width: int = 50) -> List[int]:
+        """
+        Auto-adjusted column widths: the longest str(value) of a column's
+        non-empty cells + 2, clamped. parts are lists of columns stacked
+        top to bottom (a header row, then the data).
+        """
+        widths = []
+        for stacked in zip(*parts):
             max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    cell_length = len(str(cell.value)) if cell.value else 0
-                    max_length = max(max_length, cell_length)
-                except:
-                    pass
-            
-            adjusted_width = min(max(max_length + 2, min_width), max_width)
-            ws.column_dimensions[column_letter].width = adjusted_width
+            for values in stacked:
+                filled = values[values.astype(bool)]   # None, '' and 0 count as empty, as cell.value did
+                if len(filled):
+                    max_length = max(max_length, int(filled.astype(str).str.len().max()))
+            widths.append(min(max(max_length + 2, min_width), max_width))
+        return widths
+
+    @staticmethod
+    def _set_widths(ws, widths: List[int]) -> None:
+        """Column widths — in a write-only sheet, before its first row is appended."""
+        for col_idx, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
 
 
 def write_outputs(
@@ -0,0 +1,281 @@
+"""
+Sharded multi-process reconciliation for very large IDOM inputs.
+
+SyncEngine.sync and build_write_plan run on one core. For multi-sheet
+workbooks and multi-year backfills the IDOM frame is split into shards by a
+stable hash of מספר_תיק (crc32 — Python's hash() is salted per process) and
+each shard runs on a process pool. Hashing by key keeps every duplicate of a
+key in one shard, so per-key behaviour (first-occurrence matching, one
+client update per key) is the same as the serial path.
+
+The SUMIT frame, lookup and taxonomy tables go to each worker once through
+the pool initializer; only the IDOM shard travels per task. Workers are
+started by a forkserver (spawn where there is none), never forked from the
+API process itself: that process runs the prewarm scheduler, the taxonomy
+refresher and background sync / write-back threads, and a child forked
+while one of them holds a lock (logging, the API rate limiter) inherits
+the lock held, with no thread left to release it.
+
+Results are merged back in IDOM row order: the engine reports which row is
+behind every output row (SyncEngine._sync row_refs), write-plan ops are
+tagged with their row. The merged SyncResult / WritePlan equal the serial
+output exactly — tests/test_parallel.py checks this.
+
+Inputs below SUMIT_PARALLEL_MIN_ROWS, or SUMIT_SYNC_WORKERS <= 1 (the
+default), take the serial path. Size SUMIT_SYNC_WORKERS to the cores the
+container actually gets.
+"""
+
+import logging
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import taxonomy
+from .config import ReportConfig
+from .matching import MatchResult, strategy_counts
+from .sync_engine import SyncEngine, SyncResult, _col, _unmatched_warning
+from .write_plan import CLIENTS_FOLDER_ID, WritePlan
+
+logger = logging.getLogger(__name__)
+
+SYNC_WORKERS = int(os.environ.get("SUMIT_SYNC_WORKERS", "1"))
+PARALLEL_MIN_ROWS = int(os.environ.get("SUMIT_PARALLEL_MIN_ROWS", "20000"))
+
+# Per-worker state, set once by _init_worker
+_WORKER: Dict[str, object] = {}
+
+
+class _ClientIds(dict):
+    """Picklable stand-in for MappingStore — the lookups the planner makes."""
+
+    def __init__(self):
+        super().__init__()
+        self.refs: Dict[str, Optional[dict]] = {}
+
+    def get_client_id(self, company_number: str) -> Optional[str]:
+        return self.get(company_number)
+
+    def get_client_refs(self, client_id) -> Optional[dict]:
+        return self.refs.get(str(client_id))
+
+
+def shard_ids(keys: pd.Series, shards: int) -> np.ndarray:
+    """Stable shard number per IDOM key (same across processes and runs)."""
+    return np.fromiter(
+        (zlib.crc32(str(k).encode("utf-8")) % shards for k in keys),
+        dtype=np.int64, count=len(keys),
+    )
+
+
+def _split(idom_df: pd.DataFrame, shards: int) -> List[np.ndarray]:
+    """Row positions of each non-empty shard, ascending within a shard."""
+    ids = shard_ids(_col(idom_df, "מספר_תיק", ""), shards)
+    parts = [np.flatnonzero(ids == s) for s in range(shards)]
+    return [p for p in parts if len(p)]
+
+
+def _resolve_workers(workers: Optional[int], n_rows: int) -> int:
+    workers = SYNC_WORKERS if workers is None else workers
+    if workers <= 1 or n_rows < PARALLEL_MIN_ROWS:
+        return 1
+    return min(workers, n_rows)
+
+
+def mp_context():
+    """Start method for worker pools: forkserver, else spawn — not fork (see module docstring)."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _pool(workers: int, config: ReportConfig, sumit_df, sumit_lookup) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context(),
+        initializer=_init_worker,
+        initargs=(config, sumit_df, sumit_lookup, taxonomy.registry.export()),
+    )
+
+
+def _init_worker(config, sumit_df, sumit_lookup, taxonomy_tables):
+    taxonomy.registry.adopt(taxonomy_tables)
+    _WORKER.update(engine=SyncEngine(config), sumit_df=sumit_df, sumit_lookup=sumit_lookup)
+
+
+def _sync_shard(idom_shard: pd.DataFrame, tax_year: int, match_result: Optional[MatchResult]):
+    refs: Dict[str, np.ndarray] = {}
+    result = _WORKER["engine"]._sync(
+        idom_shard, _WORKER["sumit_df"], _WORKER["sumit_lookup"], tax_year, match_result, row_refs=refs,
+    )
+    return result, refs
+
+
+def _plan_shard(idom_shard: pd.DataFrame, tax_year: int, client_ids, match_result):
+    plan = _WORKER["engine"].build_write_plan(
+        idom_shard, _WORKER["sumit_df"], _WORKER["sumit_lookup"], tax_year,
+        client_mapping=client_ids, match_result=match_result,
+    )
+    return plan, _plan_rows(plan)
+
+
+def _plan_rows(plan: WritePlan) -> np.ndarray:
+    """
+    Shard row behind each op. build_write_plan emits, per IDOM row in order,
+    one report op optionally followed by that row's client ops (UPDATE_CLIENT
+    or SKIP, then a FLAG for unknown codes — all in the clients folder).
+    """
+    rows = np.empty(len(plan.operations), dtype=np.int64)
+    row = -1
+    for i, op in enumerate(plan.operations):
+        if op.folder_id != CLIENTS_FOLDER_ID:
+            row += 1
+        rows[i] = row
+    return rows
+
+
+def sync(
+    engine: SyncEngine,
+    idom_df: pd.DataFrame,
+    sumit_df: pd.DataFrame,
+    sumit_lookup: Dict[str, pd.Series],
+    tax_year: int,
+    match_result: Optional[MatchResult] = None,
+    workers: Optional[int] = None,
+) -> SyncResult:
+    """engine.sync() over key-hash shards on a process pool; same result."""
+    workers = _resolve_workers(workers, len(idom_df))
+    if workers <= 1:
+        return engine.sync(idom_df, sumit_df, sumit_lookup, tax_year, match_result=match_result)
+
+    idom = idom_df.reset_index(drop=True)
+    shards = _split(idom, workers)
+    logger.info("Parallel sync: %d IDOM rows in %d shards on %d workers", len(idom), len(shards), workers)
+    with _pool(workers, engine.config, sumit_df, sumit_lookup) as pool:
+        futures = [pool.submit(_sync_shard, idom.iloc[pos], tax_year, match_result) for pos in shards]
+        outputs = [f.result() for f in futures]
+    return _merge_sync(engine, idom, sumit_df, shards, outputs, match_result)
+
+
+def _ordered(parts: List[pd.DataFrame], rows: List[np.ndarray]) -> pd.DataFrame:
+    """Concatenate per-shard frames and restore IDOM row order (stable)."""
+    order = np.argsort(np.concatenate(rows), kind="mergesort")
+    return pd.concat(parts, ignore_index=True).iloc[order].reset_index(drop=True)
+
+
+def _merge_sync(engine, idom, sumit_df, shards, outputs, match_result) -> SyncResult:
+    merged = SyncResult()
+    merged.total_idom_records = len(idom)
+    merged.total_sumit_records = len(sumit_df)
+
+    import_parts, import_rows = [], []
+    diff_parts, diff_rows = [], []
+    exc_parts, exc_rows = [], []
+    regressions, secondary = [], []
+    counts: Dict[str, int] = {}
+    for pos, (res, refs) in zip(shards, outputs):
+        matched = pos[refs["matched"]]
+        merged.matched_count += res.matched_count
+        merged.unmatched_count += res.unmatched_count
+        merged.status_completed_count += res.status_completed_count
+        merged.status_preserved_count += res.status_preserved_count
+        merged.status_regression_flags += res.status_regression_flags
+        for strategy, n in res.match_strategy_counts.items():
+            counts[strategy] = counts.get(strategy, 0) + n
+        if res.matched_count:
+            import_parts.append(res.import_df)
+            import_rows.append(matched)
+        if len(refs["diff_rows"]):
+            diff_parts.append(res.diff_df)
+            diff_rows.append(matched[refs["diff_rows"]])
+        if res.unmatched_count:
+            exc_parts.append(res.exceptions_df)
+            exc_rows.append(pos[refs["unmatched"]])
+        regressions.extend(zip(matched[refs["regression"]], res.regression_records))
+        secondary.extend(zip(pos[refs["secondary"]], res.warnings[:len(refs["secondary"])]))
+
+    if import_parts:
+        merged.import_df = _ordered(import_parts, import_rows).infer_objects()
+    merged.diff_df = _ordered(diff_parts, diff_rows) if diff_parts else engine._build_diff_report()
+    if exc_parts:
+        merged.exceptions_df = _ordered(exc_parts, exc_rows)
+    merged.regression_records = [rec for _, rec in sorted(regressions, key=lambda x: x[0])]
+    merged.warnings = [w for _, w in sorted(secondary, key=lambda x: x[0])]
+    if merged.unmatched_count:
+        merged.warnings.append(_unmatched_warning(merged.unmatched_count))
+
+    merged.changed_count = len(merged.diff_df)
+    merged.unchanged_count = merged.matched_count - (
+        merged.diff_df["מזהה"].nunique() if merged.changed_count else 0
+    )
+    merged.match_strategy_counts = counts or strategy_counts([])
+    merged.match_result = match_result or _merge_match_results(
+        _col(idom, "מספר_תיק", ""), [res.match_result for res, _ in outputs],
+    )
+    return merged
+
+
+def _merge_match_results(keys: pd.Series, results: List[MatchResult]) -> MatchResult:
+    """One MatchResult in IDOM first-occurrence order, as a serial pass builds it."""
+    pairs, unmatched = {}, set()
+    for r in results:
+        pairs.update(r.pairs)
+        unmatched.update(r.unmatched)
+    merged = MatchResult(created_at=min(r.created_at for r in results))
+    for key in dict.fromkeys(str(k) for k in keys):
+        if key in pairs:
+            merged.pairs[key] = pairs[key]
+        elif key in unmatched:
+            merged.unmatched.append(key)
+    return merged
+
+
+def build_write_plan(
+    engine: SyncEngine,
+    idom_df: pd.DataFrame,
+    sumit_df: pd.DataFrame,
+    sumit_lookup: Dict[str, pd.Series],
+    tax_year: int,
+    client_mapping=None,
+    match_result: Optional[MatchResult] = None,
+    workers: Optional[int] = None,
+) -> WritePlan:
+    """engine.build_write_plan() over key-hash shards on a process pool; same plan."""
+    workers = _resolve_workers(workers, len(idom_df))
+    if workers <= 1:
+        return engine.build_write_plan(
+            idom_df, sumit_df, sumit_lookup, tax_year,
+            client_mapping=client_mapping, match_result=match_result,
+        )
+
+    idom = idom_df.reset_index(drop=True)
+    shards = _split(idom, workers)
+    client_ids = None
+    if client_mapping:
+        client_ids = _ClientIds()
+        for key in dict.fromkeys(_col(idom, "מספר_תיק", "").astype(str)):
+            cid = client_mapping.get_client_id(key)
+            if cid:
+                client_ids[key] = cid
+                get_refs = getattr(client_mapping, "get_client_refs", None)
+                client_ids.refs[str(cid)] = get_refs(cid) if get_refs else None
+    logger.info("Parallel write plan: %d IDOM rows in %d shards on %d workers", len(idom), len(shards), workers)
+    with _pool(workers, engine.config, sumit_df, sumit_lookup) as pool:
+        futures = [
+            pool.submit(_plan_shard, idom.iloc[pos], tax_year, client_ids, match_result)
+            for pos in shards
+        ]
+        outputs = [f.result() for f in futures]
+
+    merged = WritePlan()
+    tagged = []
+    for pos, (plan, rows) in zip(shards, outputs):
+        tagged.extend(zip(pos[rows], range(len(rows)), plan.operations))
+        merged.writes_avoided += plan.writes_avoided
+    for _, _, op in sorted(tagged, key=lambda x: (x[0], x[1])):
+        merged.add(op)
+    return merged
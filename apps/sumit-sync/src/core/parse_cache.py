@@ -0,0 +1,166 @@
+"""
+Content-addressed cache of parsed inputs (IDOM uploads, SUMIT exports).
+
+One run parses its IDOM upload in execute-api, then again for the write
+plan, the dry-run, the live write-back and the idom_records drill-down.
+Each of them now asks this cache first. Entries are keyed by:
+
+- the upload's SHA-256 — a re-upload of the same file is a hit, an edited
+  file a miss, whatever the run or file name
+- what was parsed from it (IDOM for a report type, SUMIT for a tax year)
+- PARSER_VERSION, a hash of the parsing modules' source, so a deploy that
+  changes parsing never serves frames from the old code
+
+An entry is the parse function's result — frames, conflicts, warnings —
+pickled with protocol 5: pandas keeps each block as one numpy buffer, so
+a load is a few memory copies, not a parse. Parquet / Arrow IPC were the
+other candidates. pyarrow is not a dependency here, and the IDOM frames
+hold mixed-type object columns (פקיד_שומה as int or text) that Arrow
+would coerce, so the loaded frames would differ from a fresh parse.
+
+Entries live in one directory on the data volume, shared across runs. A
+hit refreshes the entry's mtime; after each store the least recently used
+entries are deleted until the total is under SUMIT_PARSE_CACHE_MAX_MB
+(0 disables the cache). The cache only ever holds what this service
+parsed and wrote itself.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+from .plan_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(os.environ.get("DATA_DIR", "/data"))
+PARSE_CACHE_DIR = DATA_DIR / "parse_cache"
+PARSE_CACHE_MAX_MB = float(os.environ.get("SUMIT_PARSE_CACHE_MAX_MB", "512"))
+
+ENTRY_SUFFIX = ".pkl"
+
+# Modules whose output is cached — any change to them is a new parser version
+_PARSER_MODULES = (
+    "config.py", "idom_parser.py", "idom_workbook.py", "normalize.py", "parse_cache.py", "sumit_parser.py",
+)
+
+
+def _parser_version() -> str:
+    h = hashlib.sha256()
+    here = Path(__file__).resolve().parent
+    for name in _PARSER_MODULES:
+        h.update(name.encode())
+        h.update((here / name).read_bytes())
+    return h.hexdigest()[:16]
+
+
+PARSER_VERSION = _parser_version()
+
+
+class ParseCache:
+    """
+    Parsed inputs on disk, one pickle per (file content, kind, params).
+
+    get_or_parse() is the whole interface for callers; load / store / evict
+    are separate for tests and the benchmark. Failures to read or write
+    the cache are logged and fall back to parsing.
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root) if root is not None else PARSE_CACHE_DIR
+        self.max_bytes = int(PARSE_CACHE_MAX_MB * 2**20) if max_bytes is None else max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, path: str, kind: str, params: Sequence[Any] = ()) -> str:
+        """Entry key: file content + what was parsed from it + parser version."""
+        h = hashlib.sha256()
+        for part in (file_sha256(path), kind, *map(str, params), PARSER_VERSION):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.root / (key + ENTRY_SUFFIX)
+
+    def load(self, key: str) -> Optional[Any]:
+        path = self._entry(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as exc:
+            logger.warning("Dropping unreadable parse cache entry %s: %s", path.name, exc)
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)   # LRU order for evict()
+        except OSError:
+            pass
+        return value
+
+    def store(self, key: str, value: Any) -> bool:
+        """Write an entry atomically, then evict down to max_bytes. False if not stored."""
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            data = pickle.dumps(value, protocol=5)
+            if len(data) > self.max_bytes:
+                logger.info("Parse result of %d bytes exceeds the parse cache limit, not cached", len(data))
+                return False
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._entry(key))
+        except (OSError, pickle.PicklingError) as exc:
+            logger.warning("Could not store parse cache entry: %s", exc)
+            return False
+        self.evict(keep=key)
+        return True
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Delete least recently used entries until the total fits max_bytes. Returns entries deleted."""
+        entries = []
+        for path in self.root.glob("*" + ENTRY_SUFFIX):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if path.stem == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            logger.info("Parse cache: evicted %d entries, %.1f MiB left", removed, total / 2**20)
+        return removed
+
+    def get_or_parse(self, path: str, kind: str, params: Sequence[Any], parse: Callable[[], Any]) -> Any:
+        """The cached result of parse() for this file, parsing and storing it on a miss."""
+        if not self.enabled:
+            return parse()
+        try:
+            key = self.key(path, kind, params)
+        except OSError:
+            return parse()   # the caller's parse reports the missing file
+        started = time.perf_counter()
+        value = self.load(key)
+        if value is not None:
+            logger.info("Parse cache hit: %s %s (%.0f ms)", kind, list(params), (time.perf_counter() - started) * 1000)
+            return value
+        value = parse()
+        self.store(key, value)
+        return value
@@ -0,0 +1,327 @@
+"""
+Per-run write plan cache for the preview → dry-run → live sequence.
+
+Each of GET /write-plan, POST /write-back/dry-run and POST /write-back used
+to re-parse the IDOM upload, re-run the targeted Summit fetch (up to 3N
+calls) and rebuild the plan — three full fetches for one write-back. The
+first of them now saves its plan in the run's artifacts together with:
+
+- idom_sha256: hash of the IDOM upload the plan was built from
+- snapshot_at: how old the Summit data behind the plan is — the fetch
+  start, or older when reports were served from the ReportCache mirror
+
+Later stages reuse it while the upload hash matches and the plan is younger
+than SUMIT_WRITE_PLAN_MAX_AGE_MINUTES; `rebuild=true` forces a new build.
+
+A live write from a cached plan re-checks only what changed in Summit since
+snapshot_at through this service (WriteLog successes, any run): those
+reports are dropped from the mirror, their IDOM keys re-fetched and
+re-planned, and their ops replaced in place (splice). Everything else is
+written as previewed.
+
+The cached plan also carries the operator's approval (PlanApproval): which
+writing ops are signed off, by op key, plus a history of every approve /
+exclude / reset. A live write sends only approved ops. Op keys hash the
+op's content, so an op that a rebuild or re-check changed is no longer
+approved and is held back until approved again; unchanged ops keep their
+approval across rebuilds.
+
+write_plan.json is the only copy of the approval, and the approval POST,
+a rebuild and each stage may write it at once: saves are atomic and taken
+under the cache_file lock, an approval change is applied to the plan as it
+is on disk (update), and a rebuild keeps whatever approval is on disk when
+it saves.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache_file import save_merged
+from .report_cache import ReportCache
+from .write_plan import CLIENTS_FOLDER_ID, OpType, WritePlan
+
+logger = logging.getLogger(__name__)
+
+PLAN_FILE = "write_plan.json"
+WRITE_PLAN_MAX_AGE_MINUTES = float(os.environ.get("SUMIT_WRITE_PLAN_MAX_AGE_MINUTES", "30"))
+
+# SKIP reasons the planner counts in writes_avoided (sync_engine._plan_update /
+# _plan_client_update) — both end the same way
+_AVOIDED_SUFFIX = "already up to date"
+
+
+class PlanFileError(RuntimeError):
+    """The saved write plan is missing, unreadable, or not the one expected."""
+
+
+def file_sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def snapshot_time(started: datetime, plan: WritePlan, reports: ReportCache) -> datetime:
+    """
+    Age of the Summit data behind a freshly built plan: the fetch start, or
+    the fetch time of the oldest mirror entry a report op was planned from.
+    """
+    now = datetime.now(timezone.utc)
+    oldest = started
+    for op in plan.operations:
+        if op.entity_id and op.folder_id != CLIENTS_FOLDER_ID:
+            age = reports.entity_age_hours(op.entity_id, op.folder_id)
+            if age is not None:
+                oldest = min(oldest, now - timedelta(hours=age))
+    return oldest
+
+
+APPROVAL_ACTIONS = ("approve", "exclude", "reset")
+
+
+def _writing_keys(plan: WritePlan) -> List[str]:
+    return [op.op_key for op in plan.operations if op.op_type not in (OpType.SKIP, OpType.FLAG)]
+
+
+@dataclass
+class PlanApproval:
+    """
+    Which writing ops of a plan are signed off. approved=None means no
+    selection was made and the whole plan is approved (the pre-approval
+    behaviour); otherwise only the listed op keys are.
+    """
+    approved: Optional[Set[str]] = None
+    history: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def restricted(self) -> bool:
+        return self.approved is not None
+
+    def is_approved(self, op_key: str) -> bool:
+        return self.approved is None or op_key in self.approved
+
+    def apply(
+        self, action: str, plan: WritePlan, op_keys: Iterable[str], selector: Dict[str, Any],
+        note: Optional[str] = None,
+    ) -> int:
+        """
+        approve: the selected ops are approved — the first approve narrows a
+        whole-plan approval down to them. exclude: the selected ops are held
+        back. reset: back to the whole plan. Returns the number of ops
+        selected; every call is appended to history.
+        """
+        if action not in APPROVAL_ACTIONS:
+            raise ValueError("action must be one of %s, got %r" % (APPROVAL_ACTIONS, action))
+        keys = set(op_keys)
+        if action == "approve":
+            self.approved = (self.approved or set()) | keys
+        elif action == "exclude":
+            current = set(_writing_keys(plan)) if self.approved is None else self.approved
+            self.approved = current - keys
+        else:
+            self.approved = None
+        self.history.append({
+            "at": datetime.now(timezone.utc).isoformat(),
+            "action": action,
+            "selector": {k: v for k, v in selector.items() if v not in (None, "", [])},
+            "ops": len(keys) if action != "reset" else 0,
+            "note": note,
+        })
+        return len(keys)
+
+    def summary(self, plan: WritePlan) -> Dict[str, Any]:
+        """Approved / held counts over the plan's writing ops, per op type."""
+        by_type: Dict[str, Dict[str, int]] = {}
+        for op in plan.operations:
+            if op.op_type in (OpType.SKIP, OpType.FLAG):
+                continue
+            counts = by_type.setdefault(op.op_type.value, {"approved": 0, "held": 0})
+            counts["approved" if self.is_approved(op.op_key) else "held"] += 1
+        return {
+            "restricted": self.restricted,
+            "approved": sum(c["approved"] for c in by_type.values()),
+            "held": sum(c["held"] for c in by_type.values()),
+            "by_type": by_type,
+        }
+
+    def approved_keys(self) -> Optional[Set[str]]:
+        """For WriteExecutor(approved_op_keys=...): None = whole plan."""
+        return None if self.approved is None else set(self.approved)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "approved": None if self.approved is None else sorted(self.approved),
+            "history": self.history,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Optional[Dict[str, Any]]) -> "PlanApproval":
+        if not d:
+            return cls()
+        approved = d.get("approved")
+        return cls(approved=None if approved is None else set(approved), history=list(d.get("history") or []))
+
+
+@dataclass
+class CachedWritePlan:
+    """A run's write plan plus what it was built from."""
+    plan: WritePlan
+    idom_sha256: str
+    snapshot_at: str     # ISO 8601, UTC
+    created_at: str
+    approval: PlanApproval = field(default_factory=PlanApproval)
+
+    @classmethod
+    def build(cls, plan: WritePlan, idom_sha256: str, snapshot_at: datetime) -> "CachedWritePlan":
+        return cls(
+            plan=plan,
+            idom_sha256=idom_sha256,
+            snapshot_at=snapshot_at.isoformat(),
+            created_at=datetime.now(timezone.utc).isoformat(),
+        )
+
+    @property
+    def snapshot_datetime(self) -> datetime:
+        return datetime.fromisoformat(self.snapshot_at)
+
+    def age_minutes(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now(timezone.utc)
+        return (now - datetime.fromisoformat(self.created_at)).total_seconds() / 60
+
+    def is_fresh(self, idom_sha256: str, max_age_minutes: Optional[float] = None, now=None) -> bool:
+        max_age = WRITE_PLAN_MAX_AGE_MINUTES if max_age_minutes is None else max_age_minutes
+        return self.idom_sha256 == idom_sha256 and self.age_minutes(now) <= max_age
+
+    def info(self, cached: bool) -> Dict[str, Any]:
+        """Response metadata: was the plan reused, and how old is it."""
+        return {
+            "cached": cached,
+            "created_at": self.created_at,
+            "snapshot_at": self.snapshot_at,
+            "age_minutes": round(self.age_minutes(), 1),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "idom_sha256": self.idom_sha256,
+            "snapshot_at": self.snapshot_at,
+            "created_at": self.created_at,
+            "approval": self.approval.to_dict(),
+            "summary": self.plan.summary(),
+            "operations": [op.to_dict() for op in self.plan.operations],
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "CachedWritePlan":
+        return cls(
+            plan=WritePlan.from_dict(d),
+            idom_sha256=d["idom_sha256"],
+            snapshot_at=d["snapshot_at"],
+            created_at=d["created_at"],
+            approval=PlanApproval.from_dict(d.get("approval")),
+        )
+
+    def save(self, path: Path, keep_saved_approval: bool = False):
+        """
+        Write the plan atomically under the file lock. keep_saved_approval (a
+        rebuild): the approval is the file's as of this save, so one posted
+        while the plan was being built is not lost.
+        """
+        def _merge(on_disk: Dict[str, Any]) -> Dict[str, Any]:
+            if keep_saved_approval and on_disk.get("approval") is not None:
+                self.approval = PlanApproval.from_dict(on_disk["approval"])
+            return self.to_dict()
+
+        save_merged(path, _merge, default=str)
+        logger.info("Saved write plan to %s (%d ops)", path, self.plan.total)
+
+    @classmethod
+    def update(
+        cls, path: Path, change: Callable[["CachedWritePlan"], Any], expect_created_at: Optional[str] = None,
+    ) -> Tuple["CachedWritePlan", Any]:
+        """
+        Read-modify-write of the saved plan under the file lock: change(cached)
+        runs on the plan as it is on disk now, and the result is saved.
+        Returns (cached, change's return value). Raises PlanFileError if there
+        is no readable plan, or it is not the build expect_created_at names.
+        """
+        out: Dict[str, Any] = {}
+
+        def _merge(on_disk: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                cached = cls.from_dict(on_disk)
+            except (KeyError, TypeError, ValueError) as e:
+                raise PlanFileError("write plan %s unreadable: %s" % (path, e)) from e
+            if expect_created_at is not None and cached.created_at != expect_created_at:
+                raise PlanFileError("write plan %s was rebuilt (%s)" % (path, cached.created_at))
+            out["result"] = change(cached)
+            out["cached"] = cached
+            return cached.to_dict()
+
+        save_merged(path, _merge, default=str)
+        return out["cached"], out["result"]
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["CachedWritePlan"]:
+        """Load a cached plan, or None if missing / unreadable."""
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (json.JSONDecodeError, OSError, KeyError, TypeError, ValueError) as e:
+            logger.warning("Failed to load write plan %s: %s", path, e)
+            return None
+
+
+def touched_keys(plan: WritePlan, report_ids: Set[int], client_ids: Set[int]) -> List[str]:
+    """
+    IDOM keys whose ops depend on a report / client written since the plan's
+    snapshot: ops on that report or client, and creates for that client (a
+    report may exist for it now).
+    """
+    keys: Dict[str, None] = {}
+    for op in plan.operations:
+        if op.folder_id == CLIENTS_FOLDER_ID:
+            hit = op.entity_id in client_ids
+        elif op.op_type == OpType.CREATE_REPORT:
+            hit = op.client_entity_id in client_ids
+        else:
+            hit = op.entity_id in report_ids
+        if hit:
+            keys[op.match_key] = None
+    return list(keys)
+
+
+def splice(plan: WritePlan, replacement: WritePlan, keys: Iterable[str]) -> WritePlan:
+    """
+    plan with every op of `keys` replaced by replacement's ops for that key,
+    at the position of the key's first op.
+    """
+    keys = set(keys)
+    new_ops: Dict[str, list] = {}
+    for op in replacement.operations:
+        new_ops.setdefault(op.match_key, []).append(op)
+
+    out = WritePlan()
+    removed_avoided = 0
+    placed: Set[str] = set()
+    for op in plan.operations:
+        if op.match_key not in keys:
+            out.add(op)
+            continue
+        if op.op_type == OpType.SKIP and op.reason.endswith(_AVOIDED_SUFFIX):
+            removed_avoided += 1
+        if op.match_key not in placed:
+            placed.add(op.match_key)
+            for new_op in new_ops.get(op.match_key, []):
+                out.add(new_op)
+    out.writes_avoided = plan.writes_avoided - removed_avoided + replacement.writes_avoided
+    return out
@@ -0,0 +1,217 @@
+"""
+Whole-plan deep validation for Summit write-back.
+
+WriteExecutor's deep dry-run used to check every property of every op from
+scratch: a taxonomy snapshot per property, a set lookup per family, and a
+strptime per accepted date format. Large plans repeat the same few values —
+one extension date, one tax year, a handful of פקיד שומה IDs — thousands of
+times.
+
+PlanValidator compiles the rules once (folder whitelist, the taxonomy ID
+sets of one snapshot, the date formats) and memoizes the verdict per
+distinct (property, value), so validating a plan costs one dict lookup per
+property. validate() returns a ValidationReport with the problems grouped
+by rule; check() gives one op's problems, for the executor's per-op audit.
+
+Rules and messages are the executor's: a plan that passed op-by-op deep
+validation passes here, and vice versa.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import taxonomy
+from .write_plan import OpType, WriteOperation
+
+logger = logging.getLogger(__name__)
+
+# Folders the engine is allowed to write to. Anything else = bug.
+ALLOWED_FOLDERS = {
+    "557688522",   # לקוחות (UPDATE_CLIENT: פקיד שומה / סוג תיק)
+    "1124761700",  # דוחות כספיים (חברות)
+    "1144157121",  # דוחות שנתיים (עצמאים)
+}
+
+# Property names that reference a taxonomy. Values must be known entity IDs.
+# Source of truth: src/core/taxonomy.py
+TAXONOMY_PROPS = {
+    "שנת מס": "TAX_YEARS",
+    "סטטוס דוח": "STATUSES",
+    "פקיד שומה": "PKID_SHOMA",
+    "סוג תיק": "SUG_TIK",
+}
+
+# Date-shaped property names. Engine writes ISO 8601 with time + Israel TZ
+# (see sync_engine._plan_update / _plan_create_or_flag): "%Y-%m-%dT00:00:00+03:00".
+# Summit's Date-typed properties reject bare DD/MM/YYYY and bare ISO YYYY-MM-DD
+# (Cycle A live, 2026-05-11). Validator tracks engine canonical first; bare ISO
+# kept as a defensive fallback so a hand-built operation still passes shallow checks.
+DATE_PROPS = {"תאריך אורכה מ\"ה", "תאריך הגשה"}
+ACCEPTED_DATE_FORMATS = ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d")
+
+# Rule names in ValidationReport.problems
+RULE_FOLDER = "folder_not_allowed"
+RULE_TAXONOMY = "taxonomy"
+RULE_DATE = "date_format"
+
+
+@dataclass
+class Problem:
+    """One rule violation of one op."""
+    rule: str
+    op_index: int
+    op_key: str
+    op_type: str
+    match_key: str
+    entity_id: Optional[int]
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "op_index": self.op_index,
+            "op_key": self.op_key,
+            "op_type": self.op_type,
+            "match_key": self.match_key,
+            "entity_id": self.entity_id,
+            "message": self.message,
+        }
+
+
+@dataclass
+class ValidationReport:
+    """Deep-validation outcome of a plan, problems grouped by rule."""
+    checked: int = 0
+    problems: Dict[str, List[Problem]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    @property
+    def invalid_ops(self) -> Set[int]:
+        return {p.op_index for items in self.problems.values() for p in items}
+
+    def to_dict(self, max_examples: int = 20) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "checked": self.checked,
+            "invalid_ops": len(self.invalid_ops),
+            "rules": {
+                rule: {"count": len(items), "examples": [p.to_dict() for p in items[:max_examples]]}
+                for rule, items in sorted(self.problems.items())
+            },
+        }
+
+
+class PlanValidator:
+    """
+    Deep validation rules compiled against one taxonomy snapshot.
+    Reuse one instance for a whole plan; not meant to outlive a refresh.
+    """
+
+    def __init__(self, snapshot: Optional[taxonomy.TaxonomySnapshot] = None):
+        # One snapshot for the whole plan — a concurrent refresh can't mix versions
+        self.snapshot = snap = snapshot or taxonomy.registry.snapshot()
+        self._allowed_folders = frozenset(ALLOWED_FOLDERS)
+        self._ids = {
+            "TAX_YEARS": frozenset(snap.tax_year_by_id),
+            "STATUSES": frozenset(snap.statuses),
+            "PKID_SHOMA": snap.pkid_shoma_ids,
+            "SUG_TIK": snap.sug_tik_ids,
+        }
+        self._verdicts: Dict[Tuple[str, type, Any], List[Tuple[str, str]]] = {}
+
+    def check(self, op: WriteOperation) -> List[Tuple[str, str]]:
+        """(rule, message) for every problem of one op, in the executor's order."""
+        problems: List[Tuple[str, str]] = []
+        if str(op.folder_id) not in self._allowed_folders:
+            problems.append((
+                RULE_FOLDER,
+                "folder_id %r not in ALLOWED_FOLDERS %s" % (op.folder_id, sorted(ALLOWED_FOLDERS)),
+            ))
+        for prop_name, value in op.properties.items():
+            if prop_name not in TAXONOMY_PROPS and prop_name not in DATE_PROPS:
+                continue
+            try:
+                key = (prop_name, type(value), value)
+                verdict = self._verdicts.get(key)
+            except TypeError:           # unhashable value — not memoized
+                key, verdict = None, None
+            if verdict is None:
+                verdict = self._judge(prop_name, value)
+                if key is not None:
+                    self._verdicts[key] = verdict
+            problems.extend(verdict)
+        return problems
+
+    def validate(self, operations: Iterable[WriteOperation]) -> ValidationReport:
+        """Deep-check every writing op (SKIP / FLAG are never sent)."""
+        report = ValidationReport()
+        for index, op in enumerate(operations):
+            if op.op_type in (OpType.SKIP, OpType.FLAG):
+                continue
+            report.checked += 1
+            for rule, message in self.check(op):
+                report.problems.setdefault(rule, []).append(Problem(
+                    rule=rule,
+                    op_index=index,
+                    op_key=op.op_key,
+                    op_type=op.op_type.value,
+                    match_key=op.match_key,
+                    entity_id=op.entity_id,
+                    message=message,
+                ))
+        if report.problems:
+            logger.info(
+                "Plan validation: %d of %d ops invalid (%s)", len(report.invalid_ops), report.checked,
+                ", ".join("%s=%d" % (r, len(p)) for r, p in sorted(report.problems.items())),
+            )
+        return report
+
+    def _judge(self, prop_name: str, value) -> List[Tuple[str, str]]:
+        if prop_name in TAXONOMY_PROPS:
+            return [(RULE_TAXONOMY, m) for m in self._check_taxonomy(prop_name, value)]
+        return [(RULE_DATE, m) for m in self._check_date(prop_name, value)]
+
+    def _check_taxonomy(self, prop_name: str, value) -> List[str]:
+        """Verify the value is a known taxonomy entity ID."""
+        if value is None or value == "":
+            return ["%s is empty" % prop_name]
+
+        # Engine writes taxonomy refs as ints. Accept str digits for resilience.
+        try:
+            value_id = int(value)
+        except (TypeError, ValueError):
+            return ["%s value %r is not a numeric entity ID" % (prop_name, value)]
+
+        family = TAXONOMY_PROPS[prop_name]
+        ids = self._ids[family]
+        if value_id in ids:
+            return []
+        snap = self.snapshot
+        if family == "TAX_YEARS":
+            return ["%s ID %d not in TAX_YEARS %s" % (prop_name, value_id, sorted(ids))]
+        if family == "STATUSES":
+            return ["%s ID %d not in STATUSES %s" % (prop_name, value_id, sorted(ids))]
+        if not snap.complete:
+            return ["%s ID %d not in partial %s and full taxonomy not loaded "
+                    "(taxonomy v%d from %s)" % (prop_name, value_id, family, snap.version, snap.source)]
+        return ["%s ID %d not in %s (taxonomy v%d)" % (prop_name, value_id, family, snap.version)]
+
+    @staticmethod
+    def _check_date(prop_name: str, value) -> List[str]:
+        """Verify the value parses against one of ACCEPTED_DATE_FORMATS."""
+        if value is None or value == "":
+            return []  # Empty dates are allowed
+        if not isinstance(value, str):
+            return ["%s value %r is not a string" % (prop_name, value)]
+        for fmt in ACCEPTED_DATE_FORMATS:
+            try:
+                datetime.strptime(value, fmt)
+                return []
+            except ValueError:
+                continue
+        return ["%s value %r does not match accepted formats %s"
+                % (prop_name, value, list(ACCEPTED_DATE_FORMATS))]
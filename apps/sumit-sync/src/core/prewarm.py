@@ -0,0 +1,377 @@
+"""
+Off-hours cache prewarm for the Summit-backed sync path.
+
+Operators upload IDOM files during the working day; every cold cache a run
+hits (taxonomies, client mapping, report IDs, report entities) costs
+rate-limited Summit calls while they wait. The scheduler runs warm-up jobs
+once per night inside a quiet-hours window, on the low-priority limiter lane,
+so daytime runs mostly hit cache.
+
+Jobs (in order):
+  taxonomies     — re-list פקיד שומה / סוג תיק folders (new entries only)
+  client_mapping — resolve ח.פ for Summit clients not yet in MappingStore
+  report_ids     — index (client, tax year) → report ID for the current tax years
+  folder_mirror  — refresh stale mirrored report entities for the current tax years
+
+Config (env):
+  SUMIT_PREWARM_ENABLED    "1" to start the scheduler at boot (default: off)
+  SUMIT_PREWARM_WINDOW     quiet hours, Israel local time, "HH:MM-HH:MM" (default 01:00-05:00)
+  SUMIT_PREWARM_TAX_YEARS  comma-separated years (default: the two previous years,
+                           i.e. the ones still in filing season)
+"""
+
+import logging
+import os
+import threading
+import time as _time
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from . import taxonomy
+from .mapping_store import MappingStore
+from .report_cache import ReportCache
+from .sumit_api_client import SummitAPIClient
+from .sumit_api_source import FOLDER_IDS, CLIENTS_FOLDER, _extract_client_id
+
+logger = logging.getLogger(__name__)
+
+ISRAEL_TZ = ZoneInfo("Asia/Jerusalem")
+DEFAULT_WINDOW = "01:00-05:00"
+
+
+@dataclass
+class JobReport:
+    """What one warm-up job warmed and what it cost."""
+    name: str
+    warmed: int = 0
+    skipped: int = 0
+    api_calls: int = 0
+    seconds: float = 0.0
+    completed: bool = True   # False when the window closed mid-job
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "warmed": self.warmed,
+            "skipped": self.skipped,
+            "api_calls": self.api_calls,
+            "seconds": round(self.seconds, 1),
+            "completed": self.completed,
+            "error": self.error,
+        }
+
+
+@dataclass
+class PrewarmReport:
+    """Result of one prewarm pass."""
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    tax_years: List[int] = field(default_factory=list)
+    jobs: List[JobReport] = field(default_factory=list)
+
+    @property
+    def total_api_calls(self) -> int:
+        return sum(j.api_calls for j in self.jobs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "tax_years": self.tax_years,
+            "total_api_calls": self.total_api_calls,
+            "jobs": [j.to_dict() for j in self.jobs],
+        }
+
+
+# ── Window helpers ───────────────────────────────────────────────
+
+def parse_window(spec: str) -> Tuple[time, time]:
+    """Parse "HH:MM-HH:MM" into (start, end) local times. End may wrap past midnight."""
+    try:
+        start_s, end_s = spec.split("-")
+        start = datetime.strptime(start_s.strip(), "%H:%M").time()
+        end = datetime.strptime(end_s.strip(), "%H:%M").time()
+    except ValueError:
+        raise ValueError("Prewarm window must look like 'HH:MM-HH:MM', got %r" % spec)
+    if start == end:
+        raise ValueError("Prewarm window start and end must differ, got %r" % spec)
+    return start, end
+
+
+def in_window(now: datetime, window: Tuple[time, time]) -> bool:
+    """True if the local time of `now` falls inside the window."""
+    start, end = window
+    t = now.timetz().replace(tzinfo=None)
+    if start < end:
+        return start <= t < end
+    return t >= start or t < end
+
+
+def window_bounds(now: datetime, window: Tuple[time, time]) -> Tuple[datetime, datetime]:
+    """
+    Start and end of the window that contains `now`, or of the next window
+    if `now` is outside one. Both are tz-aware in the tz of `now`.
+    """
+    start, end = window
+    tz = now.tzinfo
+    today_start = datetime.combine(now.date(), start, tzinfo=tz)
+    if in_window(now, window):
+        win_start = today_start if now >= today_start else today_start - timedelta(days=1)
+    else:
+        win_start = today_start if now < today_start else today_start + timedelta(days=1)
+    win_end = datetime.combine(win_start.date(), end, tzinfo=tz)
+    if win_end <= win_start:
+        win_end += timedelta(days=1)
+    return win_start, win_end
+
+
+def default_tax_years(today: Optional[datetime] = None) -> List[int]:
+    """Tax years still in filing season: the two years before the current one."""
+    env = os.environ.get("SUMIT_PREWARM_TAX_YEARS", "").strip()
+    if env:
+        return [int(y) for y in env.split(",") if y.strip()]
+    year = (today or datetime.now(ISRAEL_TZ)).year
+    return [year - 2, year - 1]
+
+
+# ── Jobs ─────────────────────────────────────────────────────────
+
+class _WindowClosed(Exception):
+    """Raised inside a job when the prewarm deadline has passed."""
+
+
+def _check_deadline(deadline: Optional[float]):
+    if deadline is not None and _time.monotonic() >= deadline:
+        raise _WindowClosed()
+
+
+def _job_taxonomies(api, job: JobReport, deadline, **_):
+    before = taxonomy.registry.snapshot()
+    after = taxonomy.registry.refresh(api)
+    job.warmed = (len(after.pkid_shoma) + len(after.sug_tik)) - (len(before.pkid_shoma) + len(before.sug_tik))
+
+
+def _job_client_mapping(api, job: JobReport, deadline, mapping: MappingStore, **_):
+    client_ids = api.list_entities(CLIENTS_FOLDER)
+    try:
+        for cid in client_ids:
+            if mapping.has_client(cid):
+                job.skipped += 1
+                continue
+            _check_deadline(deadline)
+            cn = api.get_client_company_number(cid)
+            if cn:
+                mapping.add(cid, cn)
+                job.warmed += 1
+    finally:
+        mapping.save()
+
+
+def _job_report_ids(api, job: JobReport, deadline, reports: ReportCache, tax_years: List[int], **_):
+    try:
+        for year in tax_years:
+            year_entity_id = taxonomy.resolve_tax_year(year)
+            if year_entity_id is None:
+                logger.warning("Prewarm: tax year %d not in taxonomy, skipping", year)
+                continue
+            for folder_id in FOLDER_IDS.values():
+                _check_deadline(deadline)
+                listed = api.list_entities(
+                    folder_id,
+                    filters=[{"Property": "שנת מס", "Value": str(year_entity_id)}],
+                )
+                known = set(reports.report_ids_for(folder_id, year_entity_id))
+                for report_id in listed:
+                    if report_id in known:
+                        job.skipped += 1
+                        continue
+                    _check_deadline(deadline)
+                    entity = api.get_entity(report_id, folder_id)
+                    client_id = _extract_client_id(entity.get("לקוח")) if entity else None
+                    if not client_id:
+                        continue
+                    reports.set_report_id(folder_id, client_id, year_entity_id, report_id)
+                    reports.put_entity(folder_id, entity)
+                    job.warmed += 1
+    finally:
+        reports.save()
+
+
+def _job_folder_mirror(api, job: JobReport, deadline, reports: ReportCache, tax_years: List[int], **_):
+    try:
+        for year in tax_years:
+            year_entity_id = taxonomy.resolve_tax_year(year)
+            if year_entity_id is None:
+                continue
+            for folder_id in FOLDER_IDS.values():
+                for report_id in reports.report_ids_for(folder_id, year_entity_id):
+                    if reports.get_entity(report_id, folder_id) is not None:
+                        job.skipped += 1
+                        continue
+                    _check_deadline(deadline)
+                    entity = api.get_entity(report_id, folder_id)
+                    if entity:
+                        reports.put_entity(folder_id, entity)
+                        job.warmed += 1
+    finally:
+        reports.save()
+
+
+PREWARM_JOBS: List[Tuple[str, Callable]] = [
+    ("taxonomies", _job_taxonomies),
+    ("client_mapping", _job_client_mapping),
+    ("report_ids", _job_report_ids),
+    ("folder_mirror", _job_folder_mirror),
+]
+
+
+def run_prewarm(
+    api: Optional[SummitAPIClient] = None,
+    mapping: Optional[MappingStore] = None,
+    reports: Optional[ReportCache] = None,
+    tax_years: Optional[List[int]] = None,
+    deadline: Optional[float] = None,
+) -> PrewarmReport:
+    """
+    Run every warm-up job once and report what each warmed and what it cost.
+
+    Args:
+        api: Summit client; defaults to a new client on the low-priority lane
+        mapping: client mapping store to fill (default: volume-backed store)
+        reports: report-ID index + folder mirror to fill (default: volume-backed)
+        tax_years: tax years to warm (default: default_tax_years())
+        deadline: time.monotonic() value after which jobs stop early
+
+    A failing job is recorded in the report and does not stop later jobs.
+    """
+    api = api or SummitAPIClient(priority="low")
+    mapping = mapping or MappingStore()
+    reports = reports or ReportCache()
+    report = PrewarmReport(
+        started_at=datetime.now(ISRAEL_TZ),
+        tax_years=list(tax_years) if tax_years is not None else default_tax_years(),
+    )
+
+    for name, fn in PREWARM_JOBS:
+        job = JobReport(name=name)
+        calls_before = api.call_count
+        t0 = _time.monotonic()
+        try:
+            _check_deadline(deadline)
+            fn(api, job, deadline, mapping=mapping, reports=reports, tax_years=report.tax_years)
+        except _WindowClosed:
+            job.completed = False
+        except Exception as exc:
+            logger.error("Prewarm job %s failed: %s", name, exc, exc_info=True)
+            job.error = str(exc)
+        job.api_calls = api.call_count - calls_before
+        job.seconds = _time.monotonic() - t0
+        report.jobs.append(job)
+        logger.info(
+            "Prewarm %s: warmed=%d skipped=%d api_calls=%d %.1fs%s",
+            name, job.warmed, job.skipped, job.api_calls, job.seconds,
+            "" if job.completed else " (window closed)",
+        )
+
+    report.finished_at = datetime.now(ISRAEL_TZ)
+    return report
+
+
+# ── Scheduler ────────────────────────────────────────────────────
+
+class PrewarmScheduler:
+    """
+    Background thread that runs run_prewarm() once per quiet-hours window.
+
+    The pass is cut short (jobs stop between Summit calls) when the window
+    closes, so warm-up never overlaps with the working day.
+    """
+
+    def __init__(self, window: Optional[str] = None, runner: Callable[..., PrewarmReport] = run_prewarm):
+        self.window_spec = window or os.environ.get("SUMIT_PREWARM_WINDOW", DEFAULT_WINDOW)
+        self.window = parse_window(self.window_spec)
+        self._runner = runner
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_window_start: Optional[datetime] = None
+        self.last_report: Optional[PrewarmReport] = None
+
+    @property
+    def running(self) -> bool:
+        return self._run_lock.locked()
+
+    def start(self):
+        """Start the scheduler thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="prewarm-scheduler")
+        self._thread.start()
+        logger.info("Prewarm scheduler started (window %s Israel time)", self.window_spec)
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, deadline: Optional[float] = None) -> Optional[PrewarmReport]:
+        """Run a prewarm pass now. Returns None if a pass is already running."""
+        if not self._run_lock.acquire(blocking=False):
+            return None
+        try:
+            self.last_report = self._runner(deadline=deadline)
+            return self.last_report
+        finally:
+            self._run_lock.release()
+
+    def trigger(self) -> bool:
+        """Start an out-of-schedule pass in a background thread. False if one is running."""
+        if self.running:
+            return False
+        threading.Thread(target=self.run_once, daemon=True, name="prewarm-manual").start()
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        now = datetime.now(ISRAEL_TZ)
+        win_start, win_end = window_bounds(now, self.window)
+        return {
+            "enabled": bool(self._thread and self._thread.is_alive()),
+            "running": self.running,
+            "window": self.window_spec,
+            "next_window_start": (
+                win_start if not in_window(now, self.window) else win_start + timedelta(days=1)
+            ).isoformat(),
+            "last_report": self.last_report.to_dict() if self.last_report else None,
+        }
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now = datetime.now(ISRAEL_TZ)
+            win_start, win_end = window_bounds(now, self.window)
+            if in_window(now, self.window) and self._last_window_start != win_start:
+                self._last_window_start = win_start
+                deadline = _time.monotonic() + (win_end - now).total_seconds()
+                try:
+                    self.run_once(deadline=deadline)
+                except Exception as exc:
+                    logger.error("Prewarm pass failed: %s", exc, exc_info=True)
+                continue
+            # Sleep until the next window opens (re-check at least hourly)
+            if in_window(now, self.window):
+                wait = (win_end - now).total_seconds()
+            else:
+                wait = (win_start - now).total_seconds()
+            self._stop.wait(timeout=max(1.0, min(wait, 3600.0)))
+
+
+_scheduler: Optional[PrewarmScheduler] = None
+
+
+def get_scheduler() -> PrewarmScheduler:
+    """Process-wide scheduler instance."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PrewarmScheduler()
+    return _scheduler
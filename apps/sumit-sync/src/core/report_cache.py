@@ -0,0 +1,215 @@
+"""
+Persistent report cache: report-ID index + report-folder mirror.
+
+Stored as JSON on Railway Volume next to client_mapping.json.
+
+- Report-ID index: (folder, client entity ID, tax-year entity ID) → report entity ID.
+  Reports are uniquely keyed by (client, year) within a folder and their IDs
+  never change, so index entries are kept permanently (like MappingStore).
+- Folder mirror: report entity ID → last fetched entity payload + fetch time.
+  Entries expire after MIRROR_MAX_AGE_HOURS — a mirror hit within the window
+  replaces a getentity call; older entries are re-fetched from Summit.
+
+Filled by the off-hours prewarm jobs (src/core/prewarm.py) and by the
+targeted fetch itself, so daytime runs mostly hit cache. Several instances
+can hold the file at once (prewarm, request threads); save() merges into what
+is on disk (src/core/cache_file.py) rather than overwriting it.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .cache_file import read_json, save_merged
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(os.environ.get("DATA_DIR", "/data"))
+REPORT_CACHE_FILE = DATA_DIR / "report_cache.json"
+
+# Mirror entries older than this are treated as misses. Prewarm runs overnight,
+# so 12h covers a working day of runs on a single warm-up.
+MIRROR_MAX_AGE_HOURS = float(os.environ.get("SUMIT_MIRROR_MAX_AGE_HOURS", "12"))
+
+
+def _index_key(folder_id: str, client_id: int, year_entity_id: int) -> str:
+    return "%s:%s:%s" % (folder_id, client_id, year_entity_id)
+
+
+def _mirror_key(folder_id: str, report_id: int) -> str:
+    return "%s:%s" % (folder_id, report_id)
+
+
+def _updated_at(entry: Dict[str, Any]) -> float:
+    # When the entry was last written: a fetch, or a write-through patch that
+    # kept the fetch's age. Older files only have fetched_at.
+    return float(entry.get("updated_at", entry.get("fetched_at", float("-inf"))))
+
+
+class ReportCache:
+    """
+    Report-ID index and report-folder mirror for Summit report entities.
+
+    Structure:
+    {
+        "report_ids": { "1124761700:1864195687:1125575564": 1896724808, ... },
+        "entities": {
+            "1124761700:1896724808": {"fetched_at": 1760000000.0, "updated_at": 1760003600.0, "entity": {...}},
+            ...
+        }
+    }
+
+    Thread-safe: all mutations are guarded by an internal lock so concurrent
+    fetchers can update the cache without races. Saves merge this instance's
+    changes since its last save into the file: index entries are unioned, an
+    entity put here replaces the file's copy unless that copy was written
+    later (updated_at), and an entity forgotten here is dropped unless the
+    file's copy was written after the forget.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or REPORT_CACHE_FILE
+        self._report_ids: Dict[str, int] = {}
+        self._entities: Dict[str, Dict[str, Any]] = {}
+        self._changed: Set[str] = set()          # mirror keys put since the last save
+        self._forgotten: Dict[str, float] = {}   # mirror key → when forget_entity dropped it
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Load cache from disk if it exists."""
+        if self.path.exists():
+            try:
+                self._report_ids, self._entities = self._parse(read_json(self.path))
+                logger.info(
+                    "Loaded report cache: %d report IDs, %d mirrored entities",
+                    len(self._report_ids), len(self._entities),
+                )
+            except (TypeError, ValueError, AttributeError) as e:
+                logger.warning("Failed to load report cache, starting fresh: %s", e)
+
+    @staticmethod
+    def _parse(loaded: Dict[str, Any]):
+        return (
+            {k: int(v) for k, v in loaded.get("report_ids", {}).items()},
+            dict(loaded.get("entities", {})),
+        )
+
+    def _merge(self, on_disk: Dict[str, Any]) -> Dict[str, Any]:
+        """This instance's changes since its last save, merged into the file's state."""
+        try:
+            disk_ids, disk_entities = self._parse(on_disk)
+        except (TypeError, ValueError, AttributeError):
+            disk_ids, disk_entities = {}, {}
+        entities = {
+            key: entry for key, entry in disk_entities.items()
+            if _updated_at(entry) > self._forgotten.get(key, float("-inf"))
+        }
+        for key in self._changed:
+            entry = self._entities.get(key)
+            if entry is not None and _updated_at(entry) >= _updated_at(entities.get(key, {})):
+                entities[key] = entry
+        return {"report_ids": {**disk_ids, **self._report_ids}, "entities": entities}
+
+    def _save(self):
+        """Merge this instance's changes into the file on disk and adopt the result."""
+        with self._lock:
+            payload = save_merged(self.path, self._merge)
+            self._report_ids, self._entities = self._parse(payload)
+            self._changed.clear()
+            self._forgotten.clear()
+
+    # ── Report-ID index ──────────────────────────────────────────
+
+    def get_report_id(self, folder_id: str, client_id: int, year_entity_id: int) -> Optional[int]:
+        """Look up a report entity ID by (folder, client, tax year)."""
+        return self._report_ids.get(_index_key(folder_id, client_id, year_entity_id))
+
+    def set_report_id(self, folder_id: str, client_id: int, year_entity_id: int, report_id: int):
+        """Record the report entity for (folder, client, tax year)."""
+        with self._lock:
+            self._report_ids[_index_key(folder_id, client_id, year_entity_id)] = int(report_id)
+
+    def report_ids_for(self, folder_id: str, year_entity_id: int) -> List[int]:
+        """All indexed report IDs in a folder for a tax year."""
+        suffix = ":%s" % year_entity_id
+        prefix = "%s:" % folder_id
+        return [
+            rid for key, rid in self._report_ids.items()
+            if key.startswith(prefix) and key.endswith(suffix)
+        ]
+
+    # ── Folder mirror ────────────────────────────────────────────
+
+    def get_entity(
+        self,
+        report_id: int,
+        folder_id: str,
+        max_age_hours: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the mirrored entity if it was fetched within max_age_hours
+        (default MIRROR_MAX_AGE_HOURS), else None.
+        """
+        entry = self._entities.get(_mirror_key(folder_id, report_id))
+        if not entry:
+            return None
+        max_age = MIRROR_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        if time.time() - float(entry.get("fetched_at", 0)) > max_age * 3600:
+            return None
+        return entry.get("entity")
+
+    def entity_age_hours(self, report_id: int, folder_id: str) -> Optional[float]:
+        """Hours since the mirrored entity was fetched, or None if not mirrored."""
+        entry = self._entities.get(_mirror_key(folder_id, report_id))
+        if not entry:
+            return None
+        return (time.time() - float(entry.get("fetched_at", 0))) / 3600
+
+    def put_entity(self, folder_id: str, entity: Dict[str, Any], fetched_at: Optional[float] = None):
+        """Mirror a report entity payload (as returned by getentity)."""
+        if not entity or "ID" not in entity:
+            return
+        key = _mirror_key(folder_id, entity["ID"])
+        now = time.time()
+        with self._lock:
+            self._entities[key] = {
+                "fetched_at": fetched_at if fetched_at is not None else now,
+                "updated_at": now,
+                "entity": entity,
+            }
+            self._changed.add(key)
+
+    def forget_entity(self, report_id: int, folder_id: str):
+        """Drop a mirrored entity — the next lookup re-fetches it from Summit."""
+        key = _mirror_key(folder_id, report_id)
+        with self._lock:
+            self._entities.pop(key, None)
+            self._forgotten[key] = time.time()
+
+    def save(self):
+        """Explicit save (call after batch updates)."""
+        self._save()
+        logger.info(
+            "Saved report cache: %d report IDs, %d mirrored entities",
+            len(self._report_ids), len(self._entities),
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self._report_ids)
+
+    def to_summary(self) -> Dict[str, int]:
+        """Return summary stats."""
+        fresh = sum(
+            1 for e in self._entities.values()
+            if time.time() - float(e.get("fetched_at", 0)) <= MIRROR_MAX_AGE_HOURS * 3600
+        )
+        return {
+            "report_ids": len(self._report_ids),
+            "mirrored_entities": len(self._entities),
+            "fresh_entities": fresh,
+        }
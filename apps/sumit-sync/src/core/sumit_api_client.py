@@ -5,7 +5,9 @@ Bypasses the MCP proxy to access fields like Customers_CompanyNumber
 that are redacted at the Claude↔human interface.
 
 Rate limit handling: Summit returns 403 after ~100-150 rapid calls.
-We batch requests with delays and exponential backoff on 403.
+We batch requests with delays and exponential backoff on 403. Summit's
+limit is per account, so every client in the process draws from one
+RateLimiter; low-priority clients only take slots the normal lane leaves idle.
 """
 
 import json
@@ -18,6 +20,8 @@ from urllib.request import Request, urlopen
 from urllib.error import HTTPError, URLError
 from dataclasses import dataclass
 
+from .write_plan import CLIENTS_FOLDER_ID
+
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://api.sumit.co.il"
@@ -28,6 +32,11 @@ TIMEOUT_SECONDS = 15
 CALLS_PER_BATCH = 60           # Summit threshold ~100-150, pause at 60 (safe margin)
 DELAY_BETWEEN_CALLS = 0.2      # 200ms spacing → 5 QPS ceiling; under burst threshold
 BATCH_COOLDOWN = 35            # 35s pause every batch
+# Low-priority lane (prewarm, taxonomy refresh): at most 1 QPS, and only in
+# slots the normal lane leaves idle — no normal call for LOW_PRIORITY_DELAY —
+# so background work never eats into the budget an operator-triggered run needs.
+LOW_PRIORITY_DELAY = 1.0       # 1 QPS ceiling
+PRIORITIES = ("normal", "low")
 MAX_RETRIES = 4
 INITIAL_BACKOFF = 45           # First retry backoff in seconds
 
@@ -52,6 +61,74 @@ class SummitCredentials:
     api_key: str
 
 
+class RateLimiter:
+    """
+    Process-wide call slots for Summit: DELAY_BETWEEN_CALLS apart, with a
+    BATCH_COOLDOWN pause every CALLS_PER_BATCH calls, whichever lane made
+    them — so the combined traffic stays under the 5 QPS ceiling.
+
+    Slot reservation pattern: a thread briefly takes the lock to reserve its
+    "next allowed call time", then releases it and sleeps until then, so
+    concurrent HTTP round trips overlap with each other's spacing. A normal
+    call reserves the next slot at once. A low-priority call takes a slot
+    only when it is free now, the normal lane has been idle for
+    LOW_PRIORITY_DELAY, and its own lane's 1 QPS spacing allows — otherwise
+    it waits and looks again, so it never delays a normal call by more than
+    the one slot already under way.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self._next_low_slot = self._next_slot
+        self._last_normal = float("-inf")
+        self._count = 0
+
+    def _take(self, slot: float) -> None:
+        # Caller holds the lock. Every CALLS_PER_BATCH calls, schedule a long
+        # cooldown AFTER this slot
+        self._count += 1
+        if self._count % CALLS_PER_BATCH == 0:
+            logger.info("Rate limit cooldown after %d calls (next slot +%ds)", self._count, BATCH_COOLDOWN)
+            self._next_slot = slot + BATCH_COOLDOWN
+        else:
+            self._next_slot = slot + DELAY_BETWEEN_CALLS
+
+    def _reserve(self, priority: str) -> Optional[float]:
+        """The slot reserved for this call, or None if a low-priority call must wait."""
+        with self._lock:
+            now = time.monotonic()
+            if priority != "low":
+                slot = max(now, self._next_slot)
+                self._last_normal = slot
+                self._take(slot)
+                return slot
+            idle_from = self._last_normal + LOW_PRIORITY_DELAY
+            if max(self._next_slot, self._next_low_slot, idle_from) > now:
+                return None
+            self._next_low_slot = now + LOW_PRIORITY_DELAY
+            self._take(now)
+            return now
+
+    def wait(self, priority: str = "normal") -> None:
+        """Block until this call's slot."""
+        while True:
+            slot = self._reserve(priority)
+            if slot is not None:
+                break
+            # Look again once the earliest blocker could have cleared
+            with self._lock:
+                retry_at = max(self._next_slot, self._next_low_slot, self._last_normal + LOW_PRIORITY_DELAY)
+            time.sleep(min(max(retry_at - time.monotonic(), 0.01), LOW_PRIORITY_DELAY))
+        sleep_for = slot - time.monotonic()
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+
+
+# One per process: Summit rate-limits the account, not the client object
+RATE_LIMITER = RateLimiter()
+
+
 class SummitAPIClient:
     """
     Direct HTTP client for Summit CRM API.
@@ -64,16 +141,14 @@ class SummitAPIClient:
         self,
         company_id: Optional[int] = None,
         api_key: Optional[str] = None,
+        priority: str = "normal",
     ):
+        if priority not in PRIORITIES:
+            raise ValueError("priority must be one of %s, got %r" % (PRIORITIES, priority))
         self.credentials = self._resolve_credentials(company_id, api_key)
+        self.priority = priority
         self._call_count = 0
-        self._batch_start = time.monotonic()
-        # Thread-safe rate limiter: slot reservation pattern.
-        # Threads briefly take the lock to reserve their "next allowed call time",
-        # then release the lock and sleep until that time. This lets concurrent
-        # HTTP roundtrips overlap with each other's spacing intervals.
-        self._rate_lock = threading.Lock()
-        self._next_slot = time.monotonic()
+        self._count_lock = threading.Lock()
 
     @staticmethod
     def _resolve_credentials(
@@ -93,30 +168,10 @@ class SummitAPIClient:
         )
 
     def _rate_limit_pause(self):
-        """
-        Reserve a slot in the rate-limited queue and sleep until our turn.
-        Thread-safe: the lock is held only to compute the slot; the sleep
-        happens outside the lock so other threads can be reserving their
-        own slots and/or running concurrent HTTP requests.
-        """
-        with self._rate_lock:
+        """Wait for this call's slot on the process-wide RATE_LIMITER."""
+        with self._count_lock:
             self._call_count += 1
-            count = self._call_count
-            now = time.monotonic()
-            my_slot = max(now, self._next_slot)
-            # Every CALLS_PER_BATCH calls, schedule a long cooldown AFTER our slot
-            if count % CALLS_PER_BATCH == 0:
-                logger.info(
-                    "Rate limit cooldown after %d calls (next slot +%ds)",
-                    count, BATCH_COOLDOWN,
-                )
-                self._next_slot = my_slot + BATCH_COOLDOWN
-            else:
-                self._next_slot = my_slot + DELAY_BETWEEN_CALLS
-
-        sleep_for = my_slot - time.monotonic()
-        if sleep_for > 0:
-            time.sleep(sleep_for)
+        RATE_LIMITER.wait(self.priority)
 
     def _post(self, endpoint: str, body: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -286,7 +341,7 @@ class SummitAPIClient:
         data = self._post(
             "/crm/data/listentities/",
             {
-                "Folder": "557688522",  # לקוחות
+                "Folder": CLIENTS_FOLDER_ID,
                 "Paging": {"StartIndex": 0, "PageSize": 10},
                 "Filters": [
                     {"Property": "Customers_CompanyNumber", "Value": cn},
@@ -343,7 +398,7 @@ class SummitAPIClient:
         Get Customers_CompanyNumber for a client entity.
         Returns the company number string, or empty string if not found.
         """
-        entity = self.get_entity(client_id, "557688522")  # לקוחות folder
+        entity = self.get_entity(client_id, CLIENTS_FOLDER_ID)
         if not entity:
             return ""
 
@@ -352,6 +407,27 @@ class SummitAPIClient:
             return str(cn[0]).strip()
         return str(cn).strip() if cn else ""
 
+    def get_client_refs(self, client_id: int) -> Optional[Dict[str, Optional[int]]]:
+        """
+        Current פקיד שומה / סוג תיק entity-ref IDs of a client (None = unset).
+        Returns None if the client entity is missing/archived.
+        """
+        entity = self.get_entity(client_id, CLIENTS_FOLDER_ID)
+        if not entity:
+            return None
+
+        refs: Dict[str, Optional[int]] = {}
+        for field_name in ("פקיד שומה", "סוג תיק"):
+            value = entity.get(field_name) or []
+            ref = value[0] if isinstance(value, list) and value else value
+            if isinstance(ref, dict):
+                ref = ref.get("ID")
+            try:
+                refs[field_name] = int(ref) if ref not in (None, "") else None
+            except (TypeError, ValueError):
+                refs[field_name] = None
+        return refs
+
     def get_folder_schema(self, folder_id: str) -> Dict[str, Any]:
         """Get schema (field definitions) for a folder."""
         return self._post(
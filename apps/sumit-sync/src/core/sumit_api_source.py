@@ -14,7 +14,7 @@ import re
 import logging
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
 from .config import (
@@ -24,6 +24,8 @@ from .config import (
 )
 from .sumit_api_client import SummitAPIClient
 from .mapping_store import MappingStore
+from .normalize import normalize_key, normalize_keys
+from .report_cache import ReportCache
 from . import taxonomy
 
 logger = logging.getLogger(__name__)
@@ -349,7 +351,7 @@ def fetch_sumit_data(
                 df[col] = ""
 
     # Add match key columns (same as SUMITParser.parse())
-    df["_match_key"] = df[match_key_header].apply(_normalize_key)
+    df["_match_key"] = normalize_keys(df[match_key_header])
     df["_match_key_raw"] = df[match_key_header].apply(
         lambda x: str(x) if pd.notna(x) else ""
     )
@@ -368,20 +370,6 @@ def fetch_sumit_data(
     return df, lookup, warnings
 
 
-def _normalize_key(value) -> str:
-    """Normalize match key: extract digits only. Same as SUMITParser._normalize_key."""
-    if pd.isna(value) or value == "":
-        return ""
-    val_str = str(value)
-    if "." in val_str:
-        try:
-            val_str = str(int(float(val_str)))
-        except (ValueError, OverflowError):
-            pass
-    digits = re.sub(r'[^\d]', '', val_str)
-    return digits
-
-
 def _build_lookup(df: pd.DataFrame) -> Dict[str, pd.Series]:
     """Build lookup dictionary from match key to record. Same as SUMITParser.build_lookup."""
     lookup = {}
@@ -402,6 +390,197 @@ def _build_lookup(df: pd.DataFrame) -> Dict[str, pd.Series]:
 # report lookup + report detail), vs the fetch-all path's ~243 + ~400 calls
 # on cold cache. See `fetch_sumit_data_targeted` for the inverted data flow.
 
+def _lookup_targeted(
+    cn: str,
+    api: SummitAPIClient,
+    store: MappingStore,
+    report_cache: ReportCache,
+    folder_id: str,
+    year_entity_id: int,
+    live: bool = False,
+) -> Dict[str, Any]:
+    """
+    Resolve one IDOM ח.פ to a report entity (or a no-match outcome).
+    Returns dict with: status ∈ {'matched','no_client','no_report'},
+    and entity payload when status='matched'.
+    Negative cache short-circuits known-absent ח.פ values to 0 API calls.
+
+    live: always getentity — the mirror is refreshed but not read. Write
+    planning needs this: a SKIP decided against a mirrored payload hours
+    old would miss edits made in Summit since.
+    """
+    # Negative-cache hit: this ח.פ was previously confirmed absent in Summit.
+    if store.is_known_absent(cn):
+        return {"status": "no_client", "cn": cn}
+
+    # 1. Resolve client_id (positive cache first)
+    client_id_str = store.get_client_id(cn)
+    if client_id_str:
+        client_id = int(client_id_str)
+    else:
+        found = api.find_client_id_by_company_number(cn)
+        if found is None:
+            store.mark_absent(cn)
+            return {"status": "no_client", "cn": cn}
+        client_id = int(found)
+        store.add(client_id, cn)
+
+    # 2. Find the report (folder × client × year) — report-ID index first
+    report_id = report_cache.get_report_id(folder_id, client_id, year_entity_id)
+    if report_id is None:
+        report_id = api.find_report_id(folder_id, client_id, year_entity_id)
+        if report_id is None:
+            return {"status": "no_report", "cn": cn}
+        report_cache.set_report_id(folder_id, client_id, year_entity_id, int(report_id))
+
+    # 3. Fetch report details — folder mirror first, unless live
+    entity = None if live else report_cache.get_entity(int(report_id), folder_id)
+    if entity:
+        return {"status": "matched", "cn": cn, "entity": entity, "cached": True}
+    entity = api.get_entity(int(report_id), folder_id)
+    if not entity:
+        return {"status": "no_report", "cn": cn}
+    report_cache.put_entity(folder_id, entity)
+    return {"status": "matched", "cn": cn, "entity": entity}
+
+
+def iter_targeted_lookups(
+    company_numbers: List[str],
+    api: SummitAPIClient,
+    store: MappingStore,
+    report_cache: ReportCache,
+    folder_id: str,
+    year_entity_id: int,
+    client_refs_for: Optional[set] = None,
+    live: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run _lookup_targeted for each (normalized, deduped) ח.פ and yield the
+    outcomes as they complete, not in input order. A lookup that raises is
+    yielded as status='error' so one bad row doesn't kill the run.
+
+    client_refs_for: ח.פ values whose client פקיד שומה / סוג תיק should also
+    be cached (see fetch_client_refs) before the outcome is yielded.
+    live: read reports and client refs from Summit, not the caches (for
+    write planning — see _lookup_targeted).
+    """
+    refs_for = client_refs_for or set()
+
+    def _task(cn: str) -> Dict[str, Any]:
+        outcome = _lookup_targeted(cn, api, store, report_cache, folder_id, year_entity_id, live=live)
+        if cn in refs_for and outcome["status"] != "no_client":
+            _ensure_client_refs(cn, api, store, live=live)
+        return outcome
+
+    # Shared rate limiter on SummitAPIClient gates global QPS to ~5 calls/sec,
+    # well under Summit's burst ceiling.
+    with ThreadPoolExecutor(max_workers=TARGETED_CONCURRENCY) as pool:
+        futures = {pool.submit(_task, cn): cn for cn in company_numbers}
+        try:
+            for fut in as_completed(futures):
+                try:
+                    outcome = fut.result()
+                except Exception as exc:
+                    logger.error("Targeted lookup raised: %s", exc, exc_info=True)
+                    outcome = {"status": "error", "cn": futures[fut], "error": str(exc)}
+                yield outcome
+        finally:
+            # Consumer stopped early — don't spend API calls on lookups nobody reads
+            for fut in futures:
+                fut.cancel()
+
+
+def _ensure_client_refs(cn: str, api: SummitAPIClient, store: MappingStore, live: bool = False) -> None:
+    client_id = store.get_client_id(cn)
+    if not client_id or not (live or store.clients_missing_refs([client_id])):
+        return
+    try:
+        refs = api.get_client_refs(int(client_id))
+    except Exception as exc:
+        # Unknown refs just mean the planner writes as before
+        logger.warning("Client refs fetch for %s failed: %s", client_id, exc)
+        return
+    if refs is not None:
+        store.set_client_refs(client_id, refs)
+
+
+def unique_company_numbers(idom_company_numbers: List[str]) -> List[str]:
+    """Normalized ח.פ values, deduped, in first-seen order."""
+    seen = set()
+    unique: List[str] = []
+    for raw in idom_company_numbers:
+        cn = normalize_key(raw)
+        if cn and cn not in seen:
+            seen.add(cn)
+            unique.append(cn)
+    return unique
+
+
+def entities_frame(
+    entities: List[Dict],
+    config: ReportConfig,
+    store: MappingStore,
+) -> Tuple[pd.DataFrame, Dict[str, pd.Series]]:
+    """Report entities → (DataFrame, lookup) in the same shape as fetch_sumit_data()."""
+    field_map = FIELD_MAPS[config.report_type]
+    match_key_header = config.export_schema.match_key_header
+
+    rows = []
+    for entity in entities:
+        row: Dict[str, Any] = {}
+        row["מזהה"] = str(entity["ID"])
+
+        client_id = _extract_client_id(entity.get("לקוח"))
+        if client_id:
+            row[match_key_header] = store.get_company_number(client_id) or ""
+            row["מספר לקוח"] = str(client_id)
+        else:
+            row[match_key_header] = ""
+            row["מספר לקוח"] = ""
+
+        for api_field, export_col in field_map.items():
+            raw_value = entity.get(api_field)
+            if api_field in ENTITY_REF_API_FIELDS:
+                row[export_col] = _format_entity_ref(raw_value)
+            elif export_col in DATE_FIELDS:
+                row[export_col] = _extract_date(raw_value)
+            elif api_field in NUMBER_FIELDS:
+                row[export_col] = _extract_number(raw_value)
+            else:
+                row[export_col] = _extract_text(raw_value)
+
+        rows.append(row)
+
+    if not rows:
+        df = pd.DataFrame(columns=config.export_schema.all_columns)
+    else:
+        df = pd.DataFrame(rows)
+        for col in config.export_schema.all_columns:
+            if col not in df.columns:
+                df[col] = ""
+
+    df["_match_key"] = normalize_keys(df[match_key_header])
+    df["_match_key_raw"] = df[match_key_header].apply(
+        lambda x: str(x) if pd.notna(x) else ""
+    )
+
+    lookup = _build_lookup(df)
+    return df, lookup
+
+
+def save_lookup_caches(store: MappingStore, report_cache: ReportCache) -> None:
+    """Persist newly-discovered client mappings and report IDs / mirror entries."""
+    if store.size:
+        try:
+            store.save()
+        except OSError as e:
+            logger.warning("Could not save mapping store: %s", e)
+    try:
+        report_cache.save()
+    except OSError as e:
+        logger.warning("Could not save report cache: %s", e)
+
+
 def fetch_sumit_data_targeted(
     config: ReportConfig,
     tax_year: int,
@@ -409,6 +588,8 @@ def fetch_sumit_data_targeted(
     client: Optional[SummitAPIClient] = None,
     mapping: Optional[MappingStore] = None,
     progress_callback=None,
+    reports: Optional[ReportCache] = None,
+    live: bool = False,
 ) -> Tuple[pd.DataFrame, Dict[str, pd.Series], List[str]]:
     """
     Per-row Summit fetch: looks up only the reports that appear in the IDOM file.
@@ -424,6 +605,10 @@ def fetch_sumit_data_targeted(
         client: Optional pre-configured API client
         mapping: Optional pre-loaded mapping store (used as cache, gets updated)
         progress_callback: Optional (stage, current, total) callback
+        reports: Optional report-ID index + folder mirror (used as cache, gets
+            updated). A fresh mirror entry replaces the getentity call.
+        live: getentity every report even when mirrored — write planning
+            compares against Summit as it is now, not as prewarm last saw it.
 
     Returns:
         Tuple of (parsed_df, lookup_dict, warnings) — same as fetch_sumit_data()
@@ -433,26 +618,17 @@ def fetch_sumit_data_targeted(
     warnings: List[str] = []
     api = client or SummitAPIClient()
     store = mapping or MappingStore()
+    report_cache = reports or ReportCache()
 
     folder_id = FOLDER_IDS[config.report_type]
-    field_map = FIELD_MAPS[config.report_type]
-    match_key_header = config.export_schema.match_key_header
 
     year_entity_id = taxonomy.resolve_tax_year(tax_year)
     if year_entity_id is None:
         warnings.append(f"Tax year {tax_year} not found in taxonomy")
         return _empty_result(config, warnings)
 
-    # Dedup IDOM company numbers, preserving order
-    seen = set()
-    unique_company_numbers: List[str] = []
-    for raw in idom_company_numbers:
-        cn = _normalize_key(raw)
-        if cn and cn not in seen:
-            seen.add(cn)
-            unique_company_numbers.append(cn)
-
-    total_rows = len(unique_company_numbers)
+    company_numbers = unique_company_numbers(idom_company_numbers)
+    total_rows = len(company_numbers)
     print(
         f"[SYNC-TARGETED] {total_rows} unique IDOM ח.פ values, "
         f"folder={folder_id}, year={tax_year} (entity={year_entity_id})",
@@ -465,82 +641,41 @@ def fetch_sumit_data_targeted(
     entities: List[Dict] = []
     no_client = 0
     no_report = 0
+    mirror_hits = 0
     completed = 0
     results_lock = threading.Lock()
 
-    def _lookup_one(cn: str) -> Dict[str, Any]:
-        """
-        Resolve one IDOM ח.פ to a report entity (or a no-match outcome).
-        Returns dict with: status ∈ {'matched','no_client','no_report'},
-        and entity payload when status='matched'.
-        Negative cache short-circuits known-absent ח.פ values to 0 API calls.
-        """
-        # Negative-cache hit: this ח.פ was previously confirmed absent in Summit.
-        if store.is_known_absent(cn):
-            return {"status": "no_client", "cn": cn}
-
-        # 1. Resolve client_id (positive cache first)
-        client_id_str = store.get_client_id(cn)
-        if client_id_str:
-            client_id = int(client_id_str)
-        else:
-            found = api.find_client_id_by_company_number(cn)
-            if found is None:
-                store.mark_absent(cn)
-                return {"status": "no_client", "cn": cn}
-            client_id = int(found)
-            store.add(client_id, cn)
-
-        # 2. Find the report (folder × client × year)
-        report_id = api.find_report_id(folder_id, client_id, year_entity_id)
-        if report_id is None:
-            return {"status": "no_report", "cn": cn}
-
-        # 3. Fetch report details
-        entity = api.get_entity(int(report_id), folder_id)
-        if not entity:
-            return {"status": "no_report", "cn": cn}
-        return {"status": "matched", "cn": cn, "entity": entity}
-
     def _on_complete(result: Dict[str, Any]):
-        nonlocal no_client, no_report, completed
+        nonlocal no_client, no_report, mirror_hits, completed
         with results_lock:
             if result["status"] == "no_client":
                 no_client += 1
             elif result["status"] == "no_report":
                 no_report += 1
+            elif result["status"] == "error":
+                # Surface but don't kill the run — count as no_client for visibility
+                no_client += 1
             elif result["status"] == "matched":
                 entities.append(result["entity"])
+                if result.get("cached"):
+                    mirror_hits += 1
             completed += 1
             if completed % 25 == 0:
                 print(f"[SYNC-TARGETED] {completed}/{total_rows} processed", file=_sys.stderr, flush=True)
             if progress_callback:
                 progress_callback("targeted_lookup", completed, total_rows)
 
-    # Run lookups concurrently. Shared rate limiter on SummitAPIClient gates
-    # global QPS to ~5 calls/sec, well under Summit's burst ceiling.
-    with ThreadPoolExecutor(max_workers=TARGETED_CONCURRENCY) as pool:
-        futures = [pool.submit(_lookup_one, cn) for cn in unique_company_numbers]
-        for fut in as_completed(futures):
-            try:
-                _on_complete(fut.result())
-            except Exception as exc:
-                # Surface but don't kill the run — count as no_client for visibility
-                logger.error("Targeted lookup raised: %s", exc, exc_info=True)
-                with results_lock:
-                    no_client += 1
-                    completed += 1
+    # Outcomes arrive as lookups complete (TARGETED_CONCURRENCY threads)
+    for result in iter_targeted_lookups(
+        company_numbers, api, store, report_cache, folder_id, year_entity_id, live=live,
+    ):
+        _on_complete(result)
 
-    # Persist any newly-discovered client mappings
-    if store.size:
-        try:
-            store.save()
-        except OSError as e:
-            logger.warning("Could not save mapping store: %s", e)
+    save_lookup_caches(store, report_cache)
 
     print(
         f"[SYNC-TARGETED] resolved={len(entities)} no_client={no_client} "
-        f"no_report={no_report} api_calls={api.call_count}",
+        f"no_report={no_report} mirror_hits={mirror_hits} api_calls={api.call_count}",
         file=_sys.stderr, flush=True,
     )
 
@@ -552,49 +687,49 @@ def fetch_sumit_data_targeted(
             f"{config.report_type.value} report for tax year {tax_year}"
         )
 
-    # Build DataFrame rows in the same shape as fetch_sumit_data()
-    rows = []
-    for entity in entities:
-        row: Dict[str, Any] = {}
-        row["מזהה"] = str(entity["ID"])
-
-        client_id = _extract_client_id(entity.get("לקוח"))
-        if client_id:
-            row[match_key_header] = store.get_company_number(client_id) or ""
-            row["מספר לקוח"] = str(client_id)
-        else:
-            row[match_key_header] = ""
-            row["מספר לקוח"] = ""
-
-        for api_field, export_col in field_map.items():
-            raw_value = entity.get(api_field)
-            if api_field in ENTITY_REF_API_FIELDS:
-                row[export_col] = _format_entity_ref(raw_value)
-            elif export_col in DATE_FIELDS:
-                row[export_col] = _extract_date(raw_value)
-            elif api_field in NUMBER_FIELDS:
-                row[export_col] = _extract_number(raw_value)
-            else:
-                row[export_col] = _extract_text(raw_value)
-
-        rows.append(row)
-
-    if not rows:
-        df = pd.DataFrame(columns=config.export_schema.all_columns)
-    else:
-        df = pd.DataFrame(rows)
-        for col in config.export_schema.all_columns:
-            if col not in df.columns:
-                df[col] = ""
+    df, lookup = entities_frame(entities, config, store)
+    return df, lookup, warnings
 
-    df["_match_key"] = df[match_key_header].apply(_normalize_key)
-    df["_match_key_raw"] = df[match_key_header].apply(
-        lambda x: str(x) if pd.notna(x) else ""
-    )
 
-    lookup = _build_lookup(df)
+def fetch_client_refs(
+    company_numbers: List[str],
+    mapping: MappingStore,
+    client: Optional[SummitAPIClient] = None,
+    live: bool = False,
+) -> int:
+    """
+    Make sure the mapping store holds fresh פקיד שומה / סוג תיק refs for the
+    clients behind these ח.פ values, so the write planner can drop client
+    updates that would not change anything. Only mapped clients without a
+    fresh cache entry cost a getentity call — or every mapped client when
+    live, as write planning needs. Returns the number fetched.
+    """
+    client_ids = [mapping.get_client_id(cn) for cn in company_numbers]
+    client_ids = [cid for cid in client_ids if cid]
+    missing = list(dict.fromkeys(str(c) for c in client_ids)) if live else mapping.clients_missing_refs(client_ids)
+    if not missing:
+        return 0
 
-    return df, lookup, warnings
+    api = client or SummitAPIClient()
+    fetched = 0
+    with ThreadPoolExecutor(max_workers=TARGETED_CONCURRENCY) as pool:
+        futures = {pool.submit(api.get_client_refs, int(cid)): cid for cid in missing}
+        for fut in as_completed(futures):
+            try:
+                refs = fut.result()
+            except Exception as exc:
+                # Unknown refs just mean the planner writes as before
+                logger.warning("Client refs fetch for %s failed: %s", futures[fut], exc)
+                continue
+            if refs is not None:
+                mapping.set_client_refs(futures[fut], refs)
+                fetched += 1
+    try:
+        mapping.save()
+    except OSError as e:
+        logger.warning("Could not save mapping store: %s", e)
+    logger.info("Fetched client taxonomy refs for %d/%d clients", fetched, len(missing))
+    return fetched
 
 
 def _empty_result(
@@ -1,19 +1,92 @@
 """
 IDOM→SUMIT Sync Engine - SUMIT Parser
 Parsing of SUMIT export files with ID:Label format handling.
+
+.xlsx exports are streamed (openpyxl read-only, one pass over the rows):
+only the columns in export_schema.all_columns are kept, and rows of other
+tax years are dropped as they stream by, so they are never materialized.
+Cells are converted the way pandas' openpyxl reader converts them and the
+kept rows go through the same TextParser as pd.read_excel — values, NaNs
+and the row index come out as they did from a full read_excel + filter.
+Column dtypes are inferred over the kept rows only (a column empty only in
+other years' rows stays int, not float). Other formats (.xls)
+go through pd.read_excel with the same column projection.
 """
 
 import pandas as pd
 import numpy as np
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import re
 import logging
 
 from .config import ReportConfig, STATUS_COMPLETED, STATUS_COMPLETED_LABEL
+from .normalize import extract_year, extract_years, normalize_keys
 
 logger = logging.getLogger(__name__)
 
+# Exports openpyxl can stream
+STREAMING_SUFFIXES = {".xlsx", ".xlsm"}
+
+YEAR_COLUMN = 'שנת מס'
+
+
+def _excel_value(value):
+    """A streamed cell value as pandas' openpyxl reader passes it on (_convert_cell)."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_export(filepath: str, columns: List[str], tax_year: Optional[int] = None) -> Tuple[pd.DataFrame, int]:
+    """
+    Stream the first sheet of an .xlsx export: only `columns` (those
+    present), only rows whose שנת מס is tax_year (all rows if None or if
+    the sheet has no year column). Returns (DataFrame, rows read); the
+    frame's index is each row's position in the sheet, as read_excel's.
+    """
+    from openpyxl import load_workbook
+    from pandas.io.parsers import TextParser
+
+    wb = load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()  # exporters' <dimension> tags can't be trusted
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+
+        wanted = set(columns)
+        positions: Dict[str, int] = {}
+        for i, name in enumerate(header):
+            if isinstance(name, str) and name in wanted and name not in positions:
+                positions[name] = i
+        names = list(positions)
+        picks = list(positions.values())
+        year_pos = positions.get(YEAR_COLUMN) if tax_year is not None else None
+
+        years: Dict[object, Optional[int]] = {}   # few distinct year cells
+        kept, index, total = [], [], 0
+        for row_number, row in enumerate(rows):
+            total += 1
+            if year_pos is not None:
+                cell = _excel_value(row[year_pos]) if year_pos < len(row) else ""
+                if cell not in years:
+                    years[cell] = extract_year(np.nan if cell == "" else cell)
+                if years[cell] != tax_year:
+                    continue
+            kept.append([_excel_value(row[p]) if p < len(row) else "" for p in picks])
+            index.append(row_number)
+    finally:
+        wb.close()
+
+    if not names:
+        return pd.DataFrame(), total
+    df = TextParser([names] + kept, header=0).read() if kept else pd.DataFrame(columns=names)
+    df.index = pd.Index(index, dtype="int64")
+    return df, total
+
 
 class SUMITParseError(Exception):
     """Error during SUMIT parsing."""
@@ -44,27 +117,36 @@ class SUMITParser:
         """
         logger.info(f"Parsing SUMIT file: {filepath}")
         
-        # Read Excel file
+        # Read Excel file — schema columns only; .xlsx rows of other years never materialized
+        columns = self.config.export_schema.all_columns
+        streamed = Path(filepath).suffix.lower() in STREAMING_SUFFIXES
         try:
-            df = pd.read_excel(filepath, header=0)
+            if streamed:
+                df, total = read_export(filepath, columns, tax_year)
+            else:
+                df = pd.read_excel(filepath, header=0, usecols=lambda c: c in columns)
+                total = len(df)
         except Exception as e:
             raise SUMITParseError(f"Failed to read Excel file: {e}")
         
-        logger.info(f"Read {len(df)} rows, {len(df.columns)} columns")
+        logger.info(f"Read {total} rows, {len(df.columns)} columns")
         logger.debug(f"Columns: {list(df.columns)}")
         
         # Validate expected columns
         self._validate_columns(df)
         
         # Filter by tax year
-        df = self._filter_by_year(df, tax_year)
+        if streamed:
+            self._report_year_filter(total, len(df), tax_year)
+        else:
+            df = self._filter_by_year(df, tax_year)
         
         # Parse key fields
         df = self._parse_data(df)
         
         # Build match key column (normalized)
         match_key_header = self.config.export_schema.match_key_header
-        df['_match_key'] = df[match_key_header].apply(self._normalize_key)
+        df['_match_key'] = normalize_keys(df[match_key_header])
         df['_match_key_raw'] = df[match_key_header].apply(lambda x: str(x) if pd.notna(x) else '')
         
         # Check for duplicates
@@ -96,39 +178,22 @@ class SUMITParser:
         initial_count = len(df)
         
         # Year column is in ID:Label format like "1125575564: 2024"
-        def extract_year(value):
-            if pd.isna(value):
-                return None
-            val_str = str(value)
-            
-            # If colon present, take the part after colon
-            if ':' in val_str:
-                year_part = val_str.split(':')[-1].strip()
-                match = re.search(r'(\d{4})', year_part)
-                if match:
-                    return int(match.group(1))
-            
-            # Fallback: look for 4-digit year between 2000-2099
-            match = re.search(r'\b(20\d{2})\b', val_str)
-            if match:
-                return int(match.group(1))
-            
-            return None
-        
-        df['_extracted_year'] = df[year_col].apply(extract_year)
+        df['_extracted_year'] = extract_years(df[year_col])
         
         # Filter
         filtered = df[df['_extracted_year'] == tax_year].copy()
         filtered = filtered.drop(columns=['_extracted_year'])
         
-        removed = initial_count - len(filtered)
+        self._report_year_filter(initial_count, len(filtered), tax_year)
+        return filtered
+    
+    def _report_year_filter(self, initial_count: int, kept: int, tax_year: int) -> None:
+        removed = initial_count - kept
         if removed > 0:
             logger.info(f"Filtered out {removed} records (not tax year {tax_year})")
         
-        if len(filtered) == 0:
+        if kept == 0:
             self.parse_warnings.append(f"No records found for tax year {tax_year}")
-        
-        return filtered
     
     def _parse_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Parse and clean data values."""
@@ -156,28 +221,6 @@ class SUMITParser:
             val_str = val_str[:-2]
         return val_str
     
-    @staticmethod
-    def _normalize_key(value) -> str:
-        """
-        Normalize match key: extract digits only, preserve leading zeros.
-        """
-        if pd.isna(value):
-            return ''
-        
-        val_str = str(value)
-        
-        # Handle float formatting (e.g., 123456.0)
-        if '.' in val_str:
-            try:
-                val_str = str(int(float(val_str)))
-            except (ValueError, OverflowError):
-                pass
-        
-        # Extract digits only
-        digits = re.sub(r'[^\d]', '', val_str)
-        
-        return digits
-    
     def _check_duplicates(self, df: pd.DataFrame) -> None:
         """Check for and warn about duplicate match keys."""
         if df.empty:
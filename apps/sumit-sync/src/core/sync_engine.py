@@ -6,32 +6,24 @@ Matching, transformation, and output generation.
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime, time
-from zoneinfo import ZoneInfo
+from datetime import datetime
 from dataclasses import dataclass, field
 import logging
 
-# Israel timezone — handles IST (+02:00, Oct-Mar) and IDT (+03:00, Mar-Oct) automatically.
-# Hardcoding +03:00 caused IST-season dates to land one calendar day early in Summit
-# (Cycle C, 2026-05-12 — March 15 stored as March 14). Use this for all date wire encoding.
-ISRAEL_TZ = ZoneInfo("Asia/Jerusalem")
-
-
-def _encode_israel_midnight(d) -> str:
-    """Wire-encode a calendar date as midnight Israel local time (ISO 8601).
-
-    Picks the correct UTC offset for the date (+02:00 IST winter, +03:00 IDT summer)
-    so Summit's Date-typed properties truncate to the intended calendar day.
-    """
-    cal = d.date() if hasattr(d, "date") and callable(d.date) else d
-    return datetime.combine(cal, time.min, tzinfo=ISRAEL_TZ).isoformat()
-
 from .config import (
     ReportConfig, ReportType,
     STATUS_COMPLETED, STATUS_COMPLETED_LABEL,
     IMPORT_MAPPINGS
 )
-from .write_plan import WritePlan, WriteOperation, OpType
+from .normalize import (
+    encode_israel_midnight as _encode_israel_midnight, israel_day as _israel_day,
+    split_id_label, split_id_labels,
+)
+from .write_plan import WritePlan, WriteOperation, OpType, CLIENTS_FOLDER_ID
+from .matching import (
+    MatchIndex, MatchResult, strategy_counts,
+    STRATEGY_ZERO_STRIPPED, STRATEGY_DIGITS_ONLY,
+)
 from .taxonomy import (
     resolve_tax_year, resolve_status, resolve_pkid_shoma, resolve_sug_tik,
     STATUS_COMPLETED_ID,
@@ -39,6 +31,35 @@ from .taxonomy import (
 
 logger = logging.getLogger(__name__)
 
+# Report date properties written by the planner → IDOM source column and the
+# SUMIT frame column holding Summit's current value
+REPORT_DATE_FIELDS = (
+    ('תאריך אורכה מ"ה', "תאריך_ארכה", 'אורכה מ"ה'),
+    ("תאריך הגשה", "תאריך_הגשה", "הגשה"),
+)
+
+# Fallback strategies worth surfacing to the operator as warnings
+SECONDARY_STRATEGIES = (STRATEGY_ZERO_STRIPPED, STRATEGY_DIGITS_ONLY)
+_SECONDARY_REASON = {
+    STRATEGY_ZERO_STRIPPED: 'אפסים מובילים',
+    STRATEGY_DIGITS_ONLY: 'נרמול ספרות',
+}
+
+
+# Diff report columns, one row per changed field
+DIFF_COLUMNS = ['מזהה', 'שם', 'field', 'old_value', 'new_value', 'change_type']
+
+
+def _secondary_match_warning(match_key, sumit_key, strategy) -> str:
+    return f"התאמה משנית עבור {match_key} → {sumit_key} ({_SECONDARY_REASON[strategy]})"
+
+
+def _unmatched_warning(count: int) -> str:
+    return (
+        f"⚠️ {count} רשומות IDOM ללא התאמה ב-SUMIT. "
+        "ייתכן ייצוא SUMIT חלקי/מסונן, או לקוחות חדשים."
+    )
+
 
 @dataclass
 class SyncResult:
@@ -59,6 +80,16 @@ class SyncResult:
     diff_df: pd.DataFrame = field(default_factory=pd.DataFrame)
     exceptions_df: pd.DataFrame = field(default_factory=pd.DataFrame)
     
+    # Matches per strategy: exact / zero_stripped / digits_only
+    match_strategy_counts: Dict[str, int] = field(default_factory=dict)
+
+    # The matching pass behind this result (persisted per run, replayed by the write plan)
+    match_result: Optional[MatchResult] = None
+
+    # IDOM keys reconciled against the previous run's Summit snapshot (incremental re-sync)
+    carried_over_keys: List[str] = field(default_factory=list)
+    carried_over_count: int = 0
+
     # Per-record regression details (populated by engine)
     regression_records: List[Dict[str, str]] = field(default_factory=list)
 
@@ -66,17 +97,6 @@ class SyncResult:
     warnings: List[str] = field(default_factory=list)
 
 
-@dataclass
-class FieldChange:
-    """Record of a field change."""
-    מזהה: str
-    שם: str
-    field_name: str
-    old_value: Any
-    new_value: Any
-    change_type: str  # 'update', 'status_completion', 'extension_update'
-
-
 class SyncEngine:
     """
     Core sync engine for IDOM→SUMIT synchronization.
@@ -86,285 +106,257 @@ class SyncEngine:
         self.config = config
         self.import_mapping = IMPORT_MAPPINGS[config.report_type]
     
+    def match(self, idom_df: pd.DataFrame, sumit_lookup: Dict[str, pd.Series]) -> MatchResult:
+        """Run the matching pass once for a run (persist it, then pass it to sync / build_write_plan)."""
+        index = MatchIndex(sumit_lookup)
+        return index.match_all(_col(idom_df.reset_index(drop=True), 'מספר_תיק', ''))
+
     def sync(
         self,
         idom_df: pd.DataFrame,
         sumit_df: pd.DataFrame,
         sumit_lookup: Dict[str, pd.Series],
-        tax_year: int
+        tax_year: int,
+        match_result: Optional[MatchResult] = None,
     ) -> SyncResult:
         """
         Perform the sync operation.
-        
+
+        Columnar: IDOM keys are resolved in bulk through a MatchIndex (exact,
+        then zero-stripped, then digits-only — constant time per key), then
+        status / extension / submission derivation and diff detection run as
+        whole-column operations. Produces the same SyncResult as the
+        row-by-row reference (tests/sync_reference.py).
+
         Args:
             idom_df: Parsed IDOM DataFrame
             sumit_df: Parsed SUMIT DataFrame
             sumit_lookup: Lookup dict from match key to SUMIT record
             tax_year: Tax year being processed
-            
+            match_result: Matching pass from match(); computed here if omitted
+
         Returns:
-            SyncResult with all output data
+            SyncResult with all output data (including the MatchResult used)
+        """
+        return self._sync(idom_df, sumit_df, sumit_lookup, tax_year, match_result)
+
+    def _sync(
+        self,
+        idom_df: pd.DataFrame,
+        sumit_df: pd.DataFrame,
+        sumit_lookup: Dict[str, pd.Series],
+        tax_year: int,
+        match_result: Optional[MatchResult] = None,
+        row_refs: Optional[Dict[str, np.ndarray]] = None,
+    ) -> SyncResult:
+        """
+        sync(); when row_refs is given it is filled with the idom_df row
+        positions behind each output row, so results over disjoint shards of
+        one file can be merged back in file order (see parallel.py):
+          matched / unmatched — rows behind import_df / exceptions_df
+          secondary           — rows behind the secondary-match warnings
+          diff_rows / regression — matched ordinals behind diff_df rows /
+                                   regression_records
         """
         result = SyncResult()
         result.total_idom_records = len(idom_df)
         result.total_sumit_records = len(sumit_df)
-        
+
         logger.info(f"Starting sync: {len(idom_df)} IDOM records, {len(sumit_df)} SUMIT records")
-        
-        # Match records
-        matched_records = []
-        unmatched_records = []
-        changes: List[FieldChange] = []
-        
-        for _, idom_row in idom_df.iterrows():
-            match_key = idom_row['מספר_תיק']
-            
-            # Try primary match
-            sumit_row = sumit_lookup.get(match_key)
-            
-            # If no match, try secondary normalized match (without leading zeros)
-            if sumit_row is None and match_key:
-                normalized_key = match_key.lstrip('0')
-                if normalized_key != match_key:
-                    for sk, sr in sumit_lookup.items():
-                        if sk.lstrip('0') == normalized_key:
-                            sumit_row = sr
-                            result.warnings.append(
-                                f"התאמה משנית עבור {match_key} → {sk} (אפסים מובילים)"
-                            )
-                            break
-            
-            if sumit_row is None:
-                # Unmatched - add to exceptions
-                exception_row = self._create_exception_row(idom_row, 'no_sumit_match')
-                unmatched_records.append(exception_row)
-                continue
-            
-            # Matched - process update
-            import_row, row_changes, flags = self._process_match(
-                idom_row, sumit_row, tax_year
-            )
-            
-            matched_records.append(import_row)
-            changes.extend(row_changes)
-            
-            if flags.get('status_regression'):
-                result.status_regression_flags += 1
-                if 'regression_detail' in flags:
-                    result.regression_records.append(flags['regression_detail'])
-            if flags.get('status_completed'):
-                result.status_completed_count += 1
-            else:
-                result.status_preserved_count += 1
-        
-        # Build result DataFrames
-        result.matched_count = len(matched_records)
-        result.unmatched_count = len(unmatched_records)
-        
-        if matched_records:
-            result.import_df = pd.DataFrame(matched_records)
-            # Ensure column order matches import schema
-            result.import_df = result.import_df[self.config.import_schema.columns]
-        
-        if unmatched_records:
-            result.exceptions_df = pd.DataFrame(unmatched_records)
-        
-        # Build diff report
-        result.diff_df = self._build_diff_report(changes)
-        result.changed_count = len([c for c in changes if c.change_type != 'no_change'])
-        result.unchanged_count = result.matched_count - len(set(c.מזהה for c in changes if c.change_type != 'no_change'))
-        
-        # Add warning for partial export
+
+        idom = idom_df.reset_index(drop=True)
+        idom_keys = _col(idom, 'מספר_תיק', '')
+        index = MatchIndex(sumit_lookup)
+        sumit_rows = index.frame(sumit_df)
+        if match_result is None:
+            match_result = index.match_all(idom_keys)
+        result.match_result = match_result
+        matches = index.resolve(match_result, idom_keys)
+        positions = matches['position'].to_numpy(dtype=np.int64)
+        result.match_strategy_counts = strategy_counts(matches['strategy'])
+        secondary = matches[matches['strategy'].isin(SECONDARY_STRATEGIES)]
+        for row_idx, sk, strategy in zip(secondary.index, secondary['sumit_key'], secondary['strategy']):
+            result.warnings.append(_secondary_match_warning(idom.at[row_idx, 'מספר_תיק'], sk, strategy))
+
+        matched_mask = positions >= 0
+        if row_refs is not None:
+            row_refs['matched'] = np.flatnonzero(matched_mask)
+            row_refs['unmatched'] = np.flatnonzero(~matched_mask)
+            row_refs['secondary'] = secondary.index.to_numpy(dtype=np.int64)
+            row_refs['diff_rows'] = np.empty(0, dtype=np.int64)
+            row_refs['regression'] = np.empty(0, dtype=np.int64)
+        m_idom = idom[matched_mask].reset_index(drop=True)
+        m_sumit = sumit_rows.iloc[positions[matched_mask]].reset_index(drop=True)
+        unmatched = idom[~matched_mask].reset_index(drop=True)
+
+        result.matched_count = len(m_idom)
+        result.unmatched_count = len(unmatched)
+
+        if result.matched_count:
+            import_df, diff_parts, flags = self._process_matches(m_idom, m_sumit)
+            result.import_df = import_df[self.config.import_schema.columns]
+            result.status_completed_count = int(flags['status_completed'].sum())
+            result.status_preserved_count = result.matched_count - result.status_completed_count
+            result.status_regression_flags = int(flags['status_regression'].sum())
+            result.regression_records = flags['regression_records']
+            result.diff_df = self._build_diff_frame(diff_parts, row_refs)
+            if row_refs is not None:
+                row_refs['regression'] = np.flatnonzero(flags['status_regression'].to_numpy())
+        else:
+            result.diff_df = self._build_diff_report()
+
+        if result.unmatched_count:
+            result.exceptions_df = self._create_exception_frame(unmatched, 'no_sumit_match')
+
+        result.changed_count = len(result.diff_df)
+        result.unchanged_count = result.matched_count - (
+            result.diff_df['מזהה'].nunique() if result.changed_count else 0
+        )
+
         if result.unmatched_count > 0:
-            result.warnings.append(
-                f"⚠️ {result.unmatched_count} רשומות IDOM ללא התאמה ב-SUMIT. "
-                "ייתכן ייצוא SUMIT חלקי/מסונן, או לקוחות חדשים."
-            )
-        
-        logger.info(f"Sync complete: {result.matched_count} matched, {result.unmatched_count} unmatched")
-        
+            result.warnings.append(_unmatched_warning(result.unmatched_count))
+
+        logger.info(
+            f"Sync complete: {result.matched_count} matched, {result.unmatched_count} unmatched "
+            f"(strategies: {result.match_strategy_counts})"
+        )
+
         return result
-    
-    def _process_match(
+
+    def _process_matches(
         self,
-        idom_row: pd.Series,
-        sumit_row: pd.Series,
-        tax_year: int
-    ) -> Tuple[Dict[str, Any], List[FieldChange], Dict[str, bool]]:
+        m_idom: pd.DataFrame,
+        m_sumit: pd.DataFrame,
+    ) -> Tuple[pd.DataFrame, List[pd.DataFrame], Dict[str, Any]]:
         """
-        Process a matched record pair.
-        
+        Status / extension / submission derivation and diffs over all
+        matched pairs (row i ↔ row i).
+
         Returns:
-            Tuple of (import_row_dict, changes_list, flags_dict)
+            Tuple of (import_df, diff_parts, flags) — diff_parts carry _row/_rank
+            so the diff report keeps the per-record field order (record, then field).
         """
-        import_row = {}
-        changes = []
-        flags: Dict[str, Any] = {'status_completed': False, 'status_regression': False}
-
-        sumit_id = str(sumit_row.get('מזהה', ''))
-        if sumit_id.endswith('.0'):
-            sumit_id = sumit_id[:-2]
-
-        idom_ref = str(idom_row.get('מספר_תיק', ''))
-        client_name = self._extract_name(idom_row, sumit_row)
-
-        # Get current SUMIT status
-        current_status = sumit_row.get('סטטוס', '')
-        current_status_str = str(current_status) if pd.notna(current_status) else ''
-        is_currently_completed = STATUS_COMPLETED in current_status_str
-
-        # Check if IDOM has submission date
-        has_submission = pd.notna(idom_row.get('תאריך_הגשה'))
-
-        # Derive new status
-        if has_submission:
-            new_status = STATUS_COMPLETED
-            flags['status_completed'] = True
-        elif is_currently_completed:
-            # Preserve completed status - never downgrade
-            new_status = current_status_str
-            flags['status_regression'] = True  # Flag for review
-            flags['regression_detail'] = {
-                'idom_ref': idom_ref,
-                'sumit_ref': sumit_id,
-                'client_name': client_name,
-                'status': current_status_str,
-            }
-        else:
-            # Preserve existing status
-            new_status = current_status_str
-        
-        # Derive extension date
-        idom_extension = idom_row.get('תאריך_ארכה')
-        sumit_extension = sumit_row.get('אורכה משרד')
-        new_extension = idom_extension if pd.notna(idom_extension) else sumit_extension
-        
-        # Derive submission date
-        idom_submission = idom_row.get('תאריך_הגשה')
-        sumit_submission = sumit_row.get('הגשה')
-        new_submission = idom_submission if pd.notna(idom_submission) else sumit_submission
-        
-        # Build import row using mapping
-        for import_col, source in self.import_mapping.items():
+        n = len(m_idom)
+        sumit_id = _col(m_sumit, 'מזהה', '').astype(str)
+        sumit_id = sumit_id.where(~sumit_id.str.endswith('.0'), sumit_id.str[:-2])
+        client_name = self._extract_names(m_idom, m_sumit)
+
+        # Current SUMIT status
+        current_status = _col(m_sumit, 'סטטוס', '')
+        current_status_str = current_status.astype(str).where(current_status.notna(), '')
+        is_currently_completed = current_status_str.str.contains(STATUS_COMPLETED, regex=False)
+
+        # IDOM submission → completed; otherwise preserve (never downgrade)
+        idom_submission = _col(m_idom, 'תאריך_הגשה', None)
+        has_submission = idom_submission.notna()
+        new_status = current_status_str.where(~has_submission, STATUS_COMPLETED)
+        regression = ~has_submission & is_currently_completed
+
+        # Extension / submission dates: IDOM wins when present
+        sumit_extension = _col(m_sumit, 'אורכה משרד', None)
+        idom_extension = _col(m_idom, 'תאריך_ארכה', None)
+        new_extension = idom_extension.where(idom_extension.notna(), sumit_extension)
+        sumit_submission = _col(m_sumit, 'הגשה', None)
+        new_submission = idom_submission.where(has_submission, sumit_submission)
+
+        import_cols: Dict[str, pd.Series] = {}
+        diff_parts: List[pd.DataFrame] = []
+
+        def _diff_part(rank, mask, field_name, old, new, change_type):
+            if not mask.any():
+                return
+            diff_parts.append(pd.DataFrame({
+                '_row': np.flatnonzero(mask.to_numpy()),
+                '_rank': rank,
+                'מזהה': sumit_id[mask].to_numpy(),
+                'שם': client_name[mask].to_numpy(),
+                'field': field_name,
+                'old_value': _format_series(old[mask]).to_numpy(),
+                'new_value': _format_series(new[mask]).to_numpy(),
+                'change_type': change_type if isinstance(change_type, str) else change_type[mask].to_numpy(),
+            }))
+
+        for rank, (import_col, source) in enumerate(self.import_mapping.items()):
             if source == '_DERIVED_STATUS':
-                import_row[import_col] = new_status
-                # Record change if different
-                if new_status != current_status_str:
-                    changes.append(FieldChange(
-                        מזהה=sumit_id,
-                        שם=client_name,
-                        field_name='סטטוס',
-                        old_value=current_status_str,
-                        new_value=new_status,
-                        change_type='status_completion' if has_submission else 'status_preserved'
-                    ))
+                import_cols[import_col] = new_status
+                _diff_part(
+                    rank, new_status != current_status_str, 'סטטוס',
+                    current_status_str, new_status,
+                    pd.Series(np.where(has_submission, 'status_completion', 'status_preserved')),
+                )
             elif source == '_DERIVED_EXTENSION':
-                import_row[import_col] = new_extension
-                old_ext = sumit_row.get('אורכה משרד')
-                if self._values_differ(new_extension, old_ext):
-                    changes.append(FieldChange(
-                        מזהה=sumit_id,
-                        שם=client_name,
-                        field_name='אורכה משרד',
-                        old_value=old_ext,
-                        new_value=new_extension,
-                        change_type='extension_update'
-                    ))
+                import_cols[import_col] = new_extension
+                _diff_part(
+                    rank, _series_differ(new_extension, sumit_extension), 'אורכה משרד',
+                    sumit_extension, new_extension, 'extension_update',
+                )
             elif source == '_DERIVED_SUBMISSION':
-                import_row[import_col] = new_submission
-                old_sub = sumit_row.get('הגשה')
-                if self._values_differ(new_submission, old_sub):
-                    changes.append(FieldChange(
-                        מזהה=sumit_id,
-                        שם=client_name,
-                        field_name='הגשה',
-                        old_value=old_sub,
-                        new_value=new_submission,
-                        change_type='update'
-                    ))
+                import_cols[import_col] = new_submission
+                _diff_part(
+                    rank, _series_differ(new_submission, sumit_submission), 'הגשה',
+                    sumit_submission, new_submission, 'update',
+                )
             else:
                 # Direct mapping from SUMIT
-                value = sumit_row.get(source, '')
-                import_row[import_col] = value if pd.notna(value) else ''
-        
-        return import_row, changes, flags
-    
-    def _create_exception_row(self, idom_row: pd.Series, reason: str) -> Dict[str, Any]:
-        """Create an exception record for unmatched IDOM row."""
-        return {
-            'exception_type': reason,
-            'מספר_תיק': idom_row.get('מספר_תיק', ''),
-            'שם': idom_row.get('שם', ''),
-            'תאריך_ארכה': idom_row.get('תאריך_ארכה', ''),
-            'תאריך_הגשה': idom_row.get('תאריך_הגשה', ''),
-            'קוד_שידור': idom_row.get('קוד_שידור', ''),
-            'notes': 'רשומת IDOM ללא התאמה בייצוא SUMIT. ייתכן לקוח חדש או סינון ייצוא.'
+                value = _col(m_sumit, source, '')
+                # object first: datetime columns would coerce '' back to NaT
+                import_cols[import_col] = value.astype(object).where(value.notna(), '')
+
+        import_df = pd.DataFrame(import_cols, index=pd.RangeIndex(n)).infer_objects()
+
+        idom_ref = _col(m_idom, 'מספר_תיק', '').astype(str)
+        flags = {
+            'status_completed': has_submission,
+            'status_regression': regression,
+            'regression_records': [
+                {'idom_ref': ref, 'sumit_ref': sid, 'client_name': name, 'status': status}
+                for ref, sid, name, status in zip(
+                    idom_ref[regression], sumit_id[regression],
+                    client_name[regression], current_status_str[regression],
+                )
+            ],
         }
-    
-    def _extract_name(self, idom_row: pd.Series, sumit_row: pd.Series) -> str:
-        """Extract client name from IDOM or SUMIT."""
-        # Try IDOM first
-        name = idom_row.get('שם', '')
-        if pd.notna(name) and str(name).strip():
-            return str(name).strip()
-        
-        # Fall back to SUMIT כרטיס לקוח (ID: Name format)
-        kartis = sumit_row.get('כרטיס לקוח', '')
-        if pd.notna(kartis):
-            kartis_str = str(kartis)
-            if ':' in kartis_str:
-                return kartis_str.split(':', 1)[1].strip()
-            return kartis_str
-        
-        return ''
-    
+        return import_df, diff_parts, flags
+
+    def _extract_names(self, m_idom: pd.DataFrame, m_sumit: pd.DataFrame) -> pd.Series:
+        """IDOM שם, else name part of SUMIT כרטיס לקוח."""
+        name = _col(m_idom, 'שם', '')
+        name_str = name.astype(str).str.strip()
+        has_name = name.notna() & (name_str != '')
+
+        fallback = split_id_labels(_col(m_sumit, 'כרטיס לקוח', ''))['label']
+
+        return name_str.where(has_name, fallback)
+
+    def _build_diff_frame(
+        self, diff_parts: List[pd.DataFrame], row_refs: Optional[Dict[str, np.ndarray]] = None,
+    ) -> pd.DataFrame:
+        """Assemble diff parts in record, then field order."""
+        if not diff_parts:
+            return self._build_diff_report()
+        diff = pd.concat(diff_parts, ignore_index=True)
+        diff = diff.sort_values(['_row', '_rank'], kind='mergesort')
+        if row_refs is not None:
+            row_refs['diff_rows'] = diff['_row'].to_numpy(dtype=np.int64)
+        return diff.drop(columns=['_row', '_rank']).reset_index(drop=True)
+
     @staticmethod
-    def _values_differ(val1: Any, val2: Any) -> bool:
-        """Check if two values are meaningfully different."""
-        # Handle None/NaN
-        if pd.isna(val1) and pd.isna(val2):
-            return False
-        if pd.isna(val1) or pd.isna(val2):
-            return True
-        
-        # Compare as strings for consistency
-        str1 = str(val1).strip()
-        str2 = str(val2).strip()
-        
-        # Handle datetime formatting differences
-        if isinstance(val1, (datetime, pd.Timestamp)):
-            str1 = val1.strftime('%Y-%m-%d') if pd.notna(val1) else ''
-        if isinstance(val2, (datetime, pd.Timestamp)):
-            str2 = val2.strftime('%Y-%m-%d') if pd.notna(val2) else ''
-        
-        return str1 != str2
-    
-    def _build_diff_report(self, changes: List[FieldChange]) -> pd.DataFrame:
-        """Build diff report DataFrame from changes list."""
-        if not changes:
-            return pd.DataFrame(columns=['מזהה', 'שם', 'field', 'old_value', 'new_value', 'change_type'])
-        
-        rows = []
-        for change in changes:
-            rows.append({
-                'מזהה': change.מזהה,
-                'שם': change.שם,
-                'field': change.field_name,
-                'old_value': self._format_value(change.old_value),
-                'new_value': self._format_value(change.new_value),
-                'change_type': change.change_type
-            })
-        
-        return pd.DataFrame(rows)
-    
+    def _create_exception_frame(unmatched: pd.DataFrame, reason: str) -> pd.DataFrame:
+        """One exception row per unmatched IDOM row."""
+        return pd.DataFrame({
+            'exception_type': reason,
+            'מספר_תיק': _col(unmatched, 'מספר_תיק', ''),
+            'שם': _col(unmatched, 'שם', ''),
+            'תאריך_ארכה': _col(unmatched, 'תאריך_ארכה', ''),
+            'תאריך_הגשה': _col(unmatched, 'תאריך_הגשה', ''),
+            'קוד_שידור': _col(unmatched, 'קוד_שידור', ''),
+            'notes': 'רשומת IDOM ללא התאמה בייצוא SUMIT. ייתכן לקוח חדש או סינון ייצוא.',
+        }, index=unmatched.index)
+
     @staticmethod
-    def _format_value(value: Any) -> str:
-        """Format value for display in diff report."""
-        if pd.isna(value):
-            return ''
-        if isinstance(value, (datetime, pd.Timestamp)):
-            return value.strftime('%Y-%m-%d')
-        return str(value)
+    def _build_diff_report() -> pd.DataFrame:
+        """An empty diff report (no changes)."""
+        return pd.DataFrame(columns=DIFF_COLUMNS)
 
     # ── Write Plan Builder ──────────────────────────────────────
 
@@ -375,16 +367,23 @@ class SyncEngine:
         sumit_lookup: Dict[str, pd.Series],
         tax_year: int,
         client_mapping=None,
+        match_result: Optional[MatchResult] = None,
     ) -> WritePlan:
         """
         Build a WritePlan from IDOM data and Summit state.
 
         For each IDOM record:
         - Matched + changes needed → UPDATE_REPORT
-        - Matched + no changes → SKIP
+        - Matched + no changes → SKIP (dates compared as Israel calendar days)
         - Unmatched + client exists → CREATE_REPORT
         - Unmatched + client missing → FLAG
-        Also builds UPDATE_CLIENT ops for פקיד שומה / סוג תיק.
+        Also builds UPDATE_CLIENT ops for פקיד שומה / סוג תיק, compared with
+        the client refs cached in client_mapping when it has them.
+        Updates dropped because Summit already matches are counted in
+        plan.writes_avoided.
+
+        match_result: the run's persisted matching pass — replayed by record ID
+        instead of matching again. Computed here if omitted.
         """
         plan = WritePlan()
         folder_id = {
@@ -393,22 +392,19 @@ class SyncEngine:
         }[self.config.report_type.value]
 
         year_entity_id = resolve_tax_year(tax_year)
+        index = MatchIndex(sumit_lookup)
+        idom_keys = _col(idom_df, "מספר_תיק", "").astype(str)
+        if match_result is None:
+            match_result = index.match_all(idom_keys)
+        positions = index.resolve(match_result, idom_keys)["position"].tolist()
         client_updates_planned = set()  # avoid duplicate client updates
 
-        for _, idom_row in idom_df.iterrows():
+        for (_, idom_row), pos in zip(idom_df.iterrows(), positions):
             match_key = str(idom_row.get("מספר_תיק", ""))
             client_name = str(idom_row.get("שם", ""))
             has_submission = pd.notna(idom_row.get("תאריך_הגשה"))
 
-            # Try match
-            sumit_row = sumit_lookup.get(match_key)
-            if sumit_row is None and match_key:
-                normalized = match_key.lstrip("0")
-                if normalized != match_key:
-                    for sk in sumit_lookup:
-                        if sk.lstrip("0") == normalized:
-                            sumit_row = sumit_lookup[sk]
-                            break
+            sumit_row = index.records[pos] if pos >= 0 else None
 
             if sumit_row is not None:
                 self._plan_update(plan, idom_row, sumit_row, folder_id, match_key, client_name, has_submission)
@@ -443,21 +439,21 @@ class SyncEngine:
             properties["סטטוס"] = STATUS_COMPLETED_ID
             old_values["סטטוס"] = current_status
 
-        # Extension date (אורכה מ"ה)
-        idom_ext = idom_row.get("תאריך_ארכה")
-        if pd.notna(idom_ext):
-            ext_str = _encode_israel_midnight(idom_ext) if hasattr(idom_ext, "strftime") else str(idom_ext)
-            old_ext = sumit_row.get('תאריך אורכה מ"ה', "")
-            properties['תאריך אורכה מ"ה'] = ext_str
-            old_values['תאריך אורכה מ"ה'] = str(old_ext) if pd.notna(old_ext) else ""
-
-        # Submission date
-        idom_sub = idom_row.get("תאריך_הגשה")
-        if pd.notna(idom_sub):
-            sub_str = _encode_israel_midnight(idom_sub) if hasattr(idom_sub, "strftime") else str(idom_sub)
-            old_sub = sumit_row.get("תאריך הגשה", "")
-            properties["תאריך הגשה"] = sub_str
-            old_values["תאריך הגשה"] = str(old_sub) if pd.notna(old_sub) else ""
+        # Dates: skip when Summit already holds the same Israel calendar day
+        unchanged = 0
+        for prop, idom_col, sumit_col in REPORT_DATE_FIELDS:
+            idom_value = idom_row.get(idom_col)
+            if pd.isna(idom_value):
+                continue
+            old = sumit_row.get(sumit_col, sumit_row.get(prop, ""))
+            old_day = _israel_day(old) if old is not None and pd.notna(old) else None
+            if old_day is not None and old_day == _israel_day(idom_value):
+                unchanged += 1
+                continue
+            properties[prop] = (
+                _encode_israel_midnight(idom_value) if hasattr(idom_value, "strftime") else str(idom_value)
+            )
+            old_values[prop] = str(old) if old is not None and pd.notna(old) else ""
 
         if properties:
             plan.add(WriteOperation(
@@ -471,6 +467,8 @@ class SyncEngine:
                 reason="Matched — updating from IDOM",
             ))
         else:
+            if unchanged:
+                plan.writes_avoided += 1
             plan.add(WriteOperation(
                 op_type=OpType.SKIP,
                 entity_id=entity_id_int,
@@ -479,7 +477,7 @@ class SyncEngine:
                 match_key=match_key,
                 properties={},
                 old_values={},
-                reason="Matched — no changes needed",
+                reason="Matched — Summit already up to date" if unchanged else "Matched — no changes needed",
             ))
 
     def _plan_create_or_flag(self, plan, idom_row, folder_id, match_key, client_name, has_submission, tax_year, year_entity_id, client_mapping):
@@ -528,7 +526,11 @@ class SyncEngine:
             ))
 
     def _plan_client_update(self, plan, idom_row, match_key, client_name, client_mapping):
-        """Build UPDATE_CLIENT operation for פקיד שומה / סוג תיק."""
+        """
+        Build UPDATE_CLIENT operation for פקיד שומה / סוג תיק (SKIP if Summit
+        already has them). A code missing from the taxonomy tables can't be
+        written: it becomes a FLAG for manual review, never a silent drop.
+        """
         cid_str = client_mapping.get_client_id(match_key)
         if not cid_str:
             return
@@ -536,32 +538,112 @@ class SyncEngine:
         client_id = int(cid_str)
         client_props = {}
         client_old = {}
-
-        ps_code = str(idom_row.get("פקיד_שומה", "")).strip()
-        if ps_code and ps_code != "nan":
-            ps = resolve_pkid_shoma(ps_code)
-            if ps:
-                client_props["פקיד שומה"] = ps["id"]
-                client_old["פקיד שומה"] = ""
-
-        st_code = str(idom_row.get("סוג_תיק", "")).strip()
-        if st_code and st_code != "nan":
-            st = resolve_sug_tik(st_code)
-            if st:
-                client_props["סוג תיק"] = st["id"]
-                client_old["סוג תיק"] = ""
+        unchanged = 0
+        unresolved = []
+
+        # Current refs from the mapping store cache (None → unknown, write as before)
+        get_refs = getattr(client_mapping, "get_client_refs", None)
+        current = get_refs(client_id) if get_refs else None
+
+        for prop, idom_col, resolve in (
+            ("פקיד שומה", "פקיד_שומה", resolve_pkid_shoma),
+            ("סוג תיק", "סוג_תיק", resolve_sug_tik),
+        ):
+            code = str(idom_row.get(idom_col, "")).strip()
+            if not code or code == "nan":
+                continue
+            entry = resolve(code)
+            if not entry:
+                unresolved.append("%s %s" % (prop, code))
+                continue
+            if current is not None and current.get(prop) == entry["id"]:
+                unchanged += 1
+                continue
+            client_props[prop] = entry["id"]
+            client_old[prop] = (current.get(prop) or "") if current is not None else ""
 
         if client_props:
             plan.add(WriteOperation(
                 op_type=OpType.UPDATE_CLIENT,
                 entity_id=client_id,
-                folder_id="557688522",
+                folder_id=CLIENTS_FOLDER_ID,
                 client_name=client_name,
                 match_key=match_key,
                 properties=client_props,
                 old_values=client_old,
                 reason="Client-level fields from IDOM",
             ))
+        elif unchanged:
+            plan.writes_avoided += 1
+            plan.add(WriteOperation(
+                op_type=OpType.SKIP,
+                entity_id=client_id,
+                folder_id=CLIENTS_FOLDER_ID,
+                client_name=client_name,
+                match_key=match_key,
+                properties={},
+                old_values={},
+                reason="Client fields already up to date",
+            ))
+        if unresolved:
+            plan.add(WriteOperation(
+                op_type=OpType.FLAG,
+                entity_id=client_id,
+                folder_id=CLIENTS_FOLDER_ID,
+                client_name=client_name,
+                match_key=match_key,
+                properties={},
+                old_values={},
+                reason="Unknown taxonomy code (%s) — needs manual review" % ", ".join(unresolved),
+            ))
+
+
+# ── Columnar helpers ───────────────────────────────────────────
+
+def _col(df: pd.DataFrame, name: str, default: Any) -> pd.Series:
+    """df[name], or a column of `default` (a missing column reads as `default` per row)."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def _is_datetime_value(series: pd.Series) -> pd.Series:
+    return series.map(lambda v: isinstance(v, datetime))
+
+
+def _compare_strings(series: pd.Series) -> pd.Series:
+    """String form values are compared in (dates as YYYY-MM-DD, others stripped)."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime('%Y-%m-%d')
+    out = series.astype(str).str.strip()
+    is_dt = _is_datetime_value(series)
+    if is_dt.any():
+        out[is_dt] = series[is_dt].map(lambda v: v.strftime('%Y-%m-%d'))
+    return out
+
+
+def _series_differ(new: pd.Series, old: pd.Series) -> pd.Series:
+    """Per row: do new and old differ (both missing is no change, one missing is)."""
+    new_na = new.isna().to_numpy()
+    old_na = old.isna().to_numpy()
+    differ = new_na != old_na
+    both = ~new_na & ~old_na
+    if both.any():
+        differ[both] = (
+            _compare_strings(new[both]).to_numpy() != _compare_strings(old[both]).to_numpy()
+        )
+    return pd.Series(differ, index=new.index)
+
+
+def _format_series(series: pd.Series) -> pd.Series:
+    """Diff report display form: dates as YYYY-MM-DD, missing as ''."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime('%Y-%m-%d').where(series.notna(), '')
+    out = series.astype(str)
+    is_dt = _is_datetime_value(series)
+    if is_dt.any():
+        out[is_dt] = series[is_dt].map(lambda v: v.strftime('%Y-%m-%d'))
+    return out.where(series.notna(), '')
 
 
 def run_sync(
@@ -569,10 +651,14 @@ def run_sync(
     sumit_df: pd.DataFrame,
     sumit_lookup: Dict[str, pd.Series],
     config: ReportConfig,
-    tax_year: int
+    tax_year: int,
+    match_result: Optional[MatchResult] = None,
 ) -> SyncResult:
     """
-    Convenience function to run sync.
+    Convenience function to run sync. Large inputs are sharded across
+    processes when SUMIT_SYNC_WORKERS > 1 (see parallel.py).
     """
+    from . import parallel
+
     engine = SyncEngine(config)
-    return engine.sync(idom_df, sumit_df, sumit_lookup, tax_year)
+    return parallel.sync(engine, idom_df, sumit_df, sumit_lookup, tax_year, match_result=match_result)
@@ -2,18 +2,30 @@
 Summit CRM taxonomy lookups.
 
 Maps IDOM field values → Summit entity reference IDs.
-Partial data hardcoded from live Summit API (April 13, 2026).
-Missing entries loaded at runtime via load_full_taxonomies().
-
-To refresh all: call load_full_taxonomies(api_client) once.
+Partial data hardcoded from live Summit API (April 13, 2026) seeds the tables;
+the full tables live in a versioned TaxonomyRegistry.
+
+The registry holds an immutable TaxonomySnapshot with O(1) indexes for every
+family (tax years both ways, statuses, פקיד שומה, סוג תיק). Refreshes build a
+new snapshot off to the side and swap the reference atomically, so request
+threads read a consistent version without locking. At startup the registry is
+preloaded in a background thread (disk cache first, then Summit if the cache
+is missing or older than TAXONOMY_TTL_HOURS) and refreshed on the TTL after
+that — no request ever pays the taxonomy fetch cost.
 """
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
 import re
 import json
 import logging
+import threading
+import time
 from pathlib import Path
 import os
 
+from .cache_file import save_merged
+
 logger = logging.getLogger(__name__)
 
 # ── שנת מס (Tax Year) — folder 1125523044 ──
@@ -50,7 +62,7 @@ STATUSES: Dict[int, str] = {
 
 # ── פקיד שומה (Tax Assessor) — folder 1081741878 ──
 # Format: "city - code". IDOM פ.ש field matches trailing code number.
-# Partial list — call load_full_taxonomies() to fill the rest.
+# Seed list only — the registry loads the full table (~33 entries).
 PKID_SHOMA: List[dict] = [
     {"id": 1099384287, "label": "רחובות - 26", "code": "26"},
     {"id": 1099384289, "label": "ירושלים 2 - 45", "code": "45"},
@@ -62,6 +74,7 @@ PKID_SHOMA: List[dict] = [
 
 # ── סוג תיק (File Type) — folder 1081741713 ──
 # Numeric codes. IDOM סוג_תיק field is direct match.
+# Seed list only — the registry loads the full table.
 SUG_TIK: List[dict] = [
     {"id": 1099349748, "label": "7", "code": "7"},
     {"id": 1099349795, "label": "10", "code": "10"},
@@ -71,28 +84,272 @@ SUG_TIK: List[dict] = [
     {"id": 1099350822, "label": "20", "code": "20"},
 ]
 
-# ── Indexes (built once, rebuilt after loading) ──
-_PKID_SHOMA_BY_CODE: Dict[str, dict] = {}
-_SUG_TIK_BY_CODE: Dict[str, dict] = {}
-
 # Persistent cache path (Railway Volume or local)
 DATA_DIR = Path(os.environ.get("DATA_DIR", "/data"))
 TAXONOMY_CACHE = DATA_DIR / "taxonomy_cache.json"
 
+# Refresh the full tables from Summit once they are older than this.
+TAXONOMY_TTL_HOURS = float(os.environ.get("SUMIT_TAXONOMY_TTL_HOURS", "24"))
+
+# How long write planning waits for the full tables before refusing (503).
+TAXONOMY_WAIT_SECONDS = float(os.environ.get("SUMIT_TAXONOMY_WAIT_SECONDS", "30"))
 
-def _build_indexes():
-    """Build lookup indexes from lists."""
-    global _PKID_SHOMA_BY_CODE, _SUG_TIK_BY_CODE
-    _PKID_SHOMA_BY_CODE = {e["code"]: e for e in PKID_SHOMA if e.get("code")}
-    _SUG_TIK_BY_CODE = {e["code"]: e for e in SUG_TIK if e.get("code")}
+# Summit folders for the families loaded at runtime
+PKID_SHOMA_FOLDER = "1081741878"
+SUG_TIK_FOLDER = "1081741713"
 
 
-_build_indexes()
+def _frozen_entries(entries) -> Tuple[Mapping[str, object], ...]:
+    return tuple(MappingProxyType(dict(e)) for e in entries)
+
+
+@dataclass(frozen=True)
+class TaxonomySnapshot:
+    """
+    One immutable version of every taxonomy family, with O(1) indexes.
+    Never mutated after construction — refreshes build a new snapshot.
+    """
+    version: int
+    loaded_at: float                              # time.time() the tables were fetched
+    source: str                                   # 'seed' | 'cache' | 'api'
+    complete: bool                                # full tables loaded (not just the seed)
+    tax_year_to_id: Mapping[int, int]
+    tax_year_by_id: Mapping[int, int]
+    statuses: Mapping[int, str]
+    pkid_shoma: Tuple[Mapping[str, object], ...]
+    pkid_shoma_by_code: Mapping[str, Mapping[str, object]]
+    pkid_shoma_ids: FrozenSet[int]
+    sug_tik: Tuple[Mapping[str, object], ...]
+    sug_tik_by_code: Mapping[str, Mapping[str, object]]
+    sug_tik_ids: FrozenSet[int]
+
+    @classmethod
+    def build(cls, version: int, loaded_at: float, source: str, complete: bool,
+              pkid_shoma, sug_tik) -> "TaxonomySnapshot":
+        ps = _frozen_entries(pkid_shoma)
+        st = _frozen_entries(sug_tik)
+        return cls(
+            version=version,
+            loaded_at=loaded_at,
+            source=source,
+            complete=complete,
+            tax_year_to_id=MappingProxyType(dict(TAX_YEARS)),
+            tax_year_by_id=MappingProxyType({v: k for k, v in TAX_YEARS.items()}),
+            statuses=MappingProxyType(dict(STATUSES)),
+            pkid_shoma=ps,
+            pkid_shoma_by_code=MappingProxyType({e["code"]: e for e in ps if e.get("code")}),
+            pkid_shoma_ids=frozenset(e["id"] for e in ps),
+            sug_tik=st,
+            sug_tik_by_code=MappingProxyType({e["code"]: e for e in st if e.get("code")}),
+            sug_tik_ids=frozenset(e["id"] for e in st),
+        )
+
+    def age_hours(self) -> float:
+        return (time.time() - self.loaded_at) / 3600
+
+    def to_summary(self) -> Dict[str, object]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "complete": self.complete,
+            "age_hours": round(self.age_hours(), 2),
+            "tax_years": len(self.tax_year_to_id),
+            "statuses": len(self.statuses),
+            "pkid_shoma": len(self.pkid_shoma),
+            "sug_tik": len(self.sug_tik),
+        }
+
+
+class TaxonomyRegistry:
+    """
+    Versioned holder of the current TaxonomySnapshot.
+
+    Readers call snapshot() and use the returned object for the whole
+    operation (one consistent version). Writers — cache load and Summit
+    refresh — are serialized by an internal lock and publish by swapping
+    the snapshot reference.
+    """
+
+    def __init__(self, cache_path: Optional[Path] = None, ttl_hours: Optional[float] = None):
+        self.cache_path = cache_path or TAXONOMY_CACHE
+        self.ttl_hours = TAXONOMY_TTL_HOURS if ttl_hours is None else ttl_hours
+        self._snapshot = TaxonomySnapshot.build(
+            version=0, loaded_at=0.0, source="seed", complete=False,
+            pkid_shoma=PKID_SHOMA, sug_tik=SUG_TIK,
+        )
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._complete = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> TaxonomySnapshot:
+        """Current snapshot. Lock-free: the reference swap is atomic."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def is_stale(self) -> bool:
+        snap = self._snapshot
+        return not snap.complete or snap.age_hours() > self.ttl_hours
+
+    def _publish(self, source: str, loaded_at: float, pkid_shoma, sug_tik) -> TaxonomySnapshot:
+        # Anything but the seed came from a full folder listing (Summit or its
+        # persisted copy), so "complete" is a fact about the source, not a size guess.
+        snap = TaxonomySnapshot.build(
+            version=self._snapshot.version + 1,
+            loaded_at=loaded_at,
+            source=source,
+            complete=source != "seed",
+            pkid_shoma=pkid_shoma,
+            sug_tik=sug_tik,
+        )
+        self._snapshot = snap
+        logger.info(
+            "Taxonomy v%d published from %s: %d פקיד שומה, %d סוג תיק",
+            snap.version, source, len(snap.pkid_shoma), len(snap.sug_tik),
+        )
+        return snap
+
+    def load_cache(self) -> bool:
+        """
+        Publish the disk cache if it holds full tables. Returns True if loaded.
+        An expired cache is still published (better than the seed) — is_stale()
+        stays True so the next refresh replaces it.
+        """
+        if not self.cache_path.exists():
+            return False
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Failed to load taxonomy cache: %s", e)
+            return False
+        pkid_shoma = data.get("pkid_shoma") or []
+        sug_tik = data.get("sug_tik") or []
+        if not pkid_shoma or not sug_tik:
+            return False
+        # Caches written before versioning have no fetched_at — treat as expired
+        with self._write_lock:
+            self._publish("cache", float(data.get("fetched_at", 0.0)), pkid_shoma, sug_tik)
+        self._complete.set()
+        return True
+
+    def export(self) -> Dict[str, object]:
+        """The current tables as plain data (picklable — for worker processes)."""
+        snap = self._snapshot
+        return {
+            "source": snap.source,
+            "loaded_at": snap.loaded_at,
+            "pkid_shoma": [dict(e) for e in snap.pkid_shoma],
+            "sug_tik": [dict(e) for e in snap.sug_tik],
+        }
+
+    def adopt(self, data: Dict[str, object]) -> TaxonomySnapshot:
+        """Publish tables exported by another process's registry."""
+        with self._write_lock:
+            return self._publish(data["source"], data["loaded_at"], data["pkid_shoma"], data["sug_tik"])
+
+    def refresh(self, api_client) -> TaxonomySnapshot:
+        """
+        Fetch the full פקיד שומה / סוג תיק tables from Summit, publish them as
+        a new version and persist the cache. Entries already known are not
+        re-fetched — only new folder members cost a getentity call.
+        """
+        with self._write_lock:
+            current = self._snapshot
+            logger.info("Fetching full taxonomies from Summit API (current v%d)...", current.version)
+            pkid_shoma = _fetch_taxonomy(
+                api_client, PKID_SHOMA_FOLDER, "פקיד שומה", current.pkid_shoma,
+                code_extractor=lambda label: _extract_trailing_number(label),
+            )
+            sug_tik = _fetch_taxonomy(
+                api_client, SUG_TIK_FOLDER, "סוג תיק", current.sug_tik,
+                code_extractor=lambda label: label.strip(),
+            )
+            fetched_at = time.time()
+            snap = self._publish("api", fetched_at, pkid_shoma, sug_tik)
+            self._save_cache(snap)
+        # Waiters (ensure_complete) are released once the tables are on disk too
+        self._complete.set()
+        return snap
+
+    def _save_cache(self, snap: TaxonomySnapshot):
+        """Persist the snapshot's runtime-loaded families to disk."""
+        try:
+            save_merged(
+                self.cache_path,
+                lambda _: {
+                    "fetched_at": snap.loaded_at,
+                    "version": snap.version,
+                    "pkid_shoma": [dict(e) for e in snap.pkid_shoma],
+                    "sug_tik": [dict(e) for e in snap.sug_tik],
+                },
+                indent=2,
+            )
+            logger.info("Saved taxonomy cache to %s", self.cache_path)
+        except OSError as e:
+            logger.warning("Failed to save taxonomy cache: %s", e)
+
+    # ── Background preload + TTL refresh ─────────────────────────
+
+    def start(self, api_factory: Callable[[], object]):
+        """
+        Preload asynchronously (cache, then Summit if stale) and keep refreshing
+        on the TTL. api_factory is called per refresh so a client is only built
+        when a fetch is actually needed. Idempotent.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(api_factory,), daemon=True, name="taxonomy-refresh",
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def ensure_complete(self, api_factory: Callable[[], object], timeout: float) -> TaxonomySnapshot:
+        """
+        The current snapshot once it holds the full tables: disk cache first,
+        else start the preload (if startup didn't) and wait for it, at most
+        timeout seconds. May still return the seed — callers check .complete.
+        """
+        if not self._snapshot.complete:
+            self.load_cache()
+        if not self._snapshot.complete:
+            self.start(api_factory)
+            self._complete.wait(timeout)
+        return self._snapshot
+
+    def _loop(self, api_factory):
+        self.load_cache()
+        while not self._stop.is_set():
+            if self.is_stale():
+                try:
+                    self.refresh(api_factory())
+                except Exception as exc:
+                    logger.warning("Taxonomy refresh failed (serving v%d): %s", self.version, exc)
+                    # Retry sooner than the TTL after a failure
+                    self._stop.wait(timeout=15 * 60)
+                    continue
+            wait = max(60.0, self.ttl_hours * 3600 - self._snapshot.age_hours() * 3600)
+            self._stop.wait(timeout=wait)
+
+
+registry = TaxonomyRegistry()
 
 
 def resolve_tax_year(year: int) -> Optional[int]:
     """Resolve tax year to Summit entity ID."""
-    return TAX_YEARS.get(year)
+    return registry.snapshot().tax_year_to_id.get(year)
+
+
+def resolve_tax_year_id(entity_id: int) -> Optional[int]:
+    """Resolve a tax-year entity ID back to the calendar year."""
+    return registry.snapshot().tax_year_by_id.get(entity_id)
 
 
 def resolve_status(has_submission: bool) -> int:
@@ -106,7 +363,8 @@ def resolve_pkid_shoma(code: str) -> Optional[dict]:
     Returns dict with 'id' and 'label', or None if not found.
     """
     code = str(code).strip()
-    return _PKID_SHOMA_BY_CODE.get(code)
+    entry = registry.snapshot().pkid_shoma_by_code.get(code)
+    return dict(entry) if entry is not None else None
 
 
 def resolve_sug_tik(code: str) -> Optional[dict]:
@@ -115,59 +373,40 @@ def resolve_sug_tik(code: str) -> Optional[dict]:
     Returns dict with 'id' and 'label', or None if not found.
     """
     code = str(code).strip()
-    return _SUG_TIK_BY_CODE.get(code)
+    entry = registry.snapshot().sug_tik_by_code.get(code)
+    return dict(entry) if entry is not None else None
 
 
 def get_status_label(entity_id: int) -> str:
     """Get status label by entity ID."""
-    return STATUSES.get(entity_id, "Unknown (%d)" % entity_id)
+    return registry.snapshot().statuses.get(entity_id, "Unknown (%d)" % entity_id)
 
 
 def is_loaded() -> bool:
-    """Check if full taxonomies have been loaded."""
-    return len(PKID_SHOMA) > 10  # we start with 6, full is 33
+    """Check if full taxonomies have been loaded into the registry."""
+    return registry.snapshot().complete
 
 
-def load_full_taxonomies(api_client) -> None:
+def load_full_taxonomies(api_client, force: bool = False) -> None:
     """
-    Fetch all taxonomy entries from Summit API and update local tables.
-    Call once to fill incomplete hardcoded tables.
-    Caches to disk so subsequent runs don't re-fetch.
+    Make sure the registry holds the full tables: disk cache first, Summit if
+    the cache is missing or past its TTL. force=True always re-lists the
+    taxonomy folders (used by the off-hours prewarm to pick up new entries).
     """
-    global PKID_SHOMA, SUG_TIK
-
-    # Try loading from disk cache first
-    if _load_cache():
-        logger.info("Loaded taxonomies from cache")
-        return
-
-    logger.info("Fetching full taxonomies from Summit API...")
-
-    # Load פקיד שומה (folder 1081741878)
-    _fetch_taxonomy(
-        api_client, "1081741878", "פקיד שומה", PKID_SHOMA,
-        code_extractor=lambda label: _extract_trailing_number(label),
-    )
+    if not force:
+        if not registry.snapshot().complete:
+            registry.load_cache()
+        if not registry.is_stale():
+            logger.info("Taxonomies already loaded (v%d)", registry.version)
+            return
+    registry.refresh(api_client)
 
-    # Load סוג תיק (folder 1081741713)
-    _fetch_taxonomy(
-        api_client, "1081741713", "סוג תיק", SUG_TIK,
-        code_extractor=lambda label: label.strip(),
-    )
 
-    _build_indexes()
-    _save_cache()
-
-    logger.info(
-        "Loaded taxonomies: %d פקיד שומה, %d סוג תיק",
-        len(PKID_SHOMA), len(SUG_TIK),
-    )
-
-
-def _fetch_taxonomy(api_client, folder_id, field_name, target_list, code_extractor):
-    """Fetch all entities from a taxonomy folder and append to target_list."""
+def _fetch_taxonomy(api_client, folder_id, field_name, existing, code_extractor) -> List[dict]:
+    """Fetch all entities from a taxonomy folder. Returns existing + new entries."""
     ids = api_client.list_entities(folder_id)
-    existing_ids = {e["id"] for e in target_list}
+    entries = [dict(e) for e in existing]
+    existing_ids = {e["id"] for e in entries}
 
     for eid in ids:
         if eid in existing_ids:
@@ -178,43 +417,11 @@ def _fetch_taxonomy(api_client, folder_id, field_name, target_list, code_extract
         raw = entity.get(field_name, [])
         label = str(raw[0]) if isinstance(raw, list) and raw else ""
         code = code_extractor(label)
-        target_list.append({"id": eid, "label": label, "code": code})
+        entries.append({"id": eid, "label": label, "code": code})
+    return entries
 
 
 def _extract_trailing_number(label: str) -> str:
     """Extract trailing number from labels like 'תל אביב 3 - 38' → '38'."""
     match = re.search(r'(\d+)\s*$', label)
     return match.group(1) if match else ""
-
-
-def _load_cache() -> bool:
-    """Load taxonomy data from disk cache. Returns True if loaded."""
-    global PKID_SHOMA, SUG_TIK
-    if not TAXONOMY_CACHE.exists():
-        return False
-    try:
-        with open(TAXONOMY_CACHE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if data.get("pkid_shoma") and len(data["pkid_shoma"]) > 10:
-            PKID_SHOMA = data["pkid_shoma"]
-        if data.get("sug_tik") and len(data["sug_tik"]) > 10:
-            SUG_TIK = data["sug_tik"]
-        _build_indexes()
-        return len(PKID_SHOMA) > 10
-    except (json.JSONDecodeError, OSError) as e:
-        logger.warning("Failed to load taxonomy cache: %s", e)
-        return False
-
-
-def _save_cache():
-    """Persist taxonomy data to disk."""
-    try:
-        TAXONOMY_CACHE.parent.mkdir(parents=True, exist_ok=True)
-        with open(TAXONOMY_CACHE, "w", encoding="utf-8") as f:
-            json.dump(
-                {"pkid_shoma": PKID_SHOMA, "sug_tik": SUG_TIK},
-                f, ensure_ascii=False, indent=2,
-            )
-        logger.info("Saved taxonomy cache to %s", TAXONOMY_CACHE)
-    except OSError as e:
-        logger.warning("Failed to save taxonomy cache: %s", e)
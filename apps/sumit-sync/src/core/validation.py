@@ -10,6 +10,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 
 from .config import ReportConfig, IDOMSchema
+from .normalize import extract_years, normalize_keys
 
 
 @dataclass
@@ -130,21 +131,7 @@ def validate_sumit_file(df: pd.DataFrame, config: ReportConfig, tax_year: int) -
     # Check for tax year
     year_col = 'שנת מס'
     if year_col in columns:
-        def extract_year(val):
-            if pd.isna(val):
-                return None
-            val_str = str(val)
-            if ':' in val_str:
-                year_part = val_str.split(':')[-1].strip()
-                match = re.search(r'(\d{4})', year_part)
-                if match:
-                    return int(match.group(1))
-            match = re.search(r'\b(20\d{2})\b', val_str)
-            if match:
-                return int(match.group(1))
-            return None
-        
-        years = df[year_col].apply(extract_year)
+        years = extract_years(df[year_col])
         year_counts = years.value_counts()
         
         if tax_year in year_counts.index:
@@ -201,10 +188,7 @@ def validate_match_keys(idom_df: pd.DataFrame, sumit_df: pd.DataFrame,
     idom_keys = set()
     for col in idom_df.columns:
         if 'מספר תיק' in str(col) or 'תיק' in str(col):
-            for val in idom_df[col].dropna():
-                key = str(int(float(val))) if pd.notna(val) else ''
-                if key:
-                    idom_keys.add(key)
+            idom_keys = set(normalize_keys(idom_df[col])) - {''}
             break
     
     # Find SUMIT keys
@@ -212,11 +196,8 @@ def validate_match_keys(idom_df: pd.DataFrame, sumit_df: pd.DataFrame,
     sumit_keys_normalized = set()
     
     if sumit_key_col in sumit_df.columns:
-        for val in sumit_df[sumit_key_col].dropna():
-            key = re.sub(r'[^\d]', '', str(val))
-            if key:
-                sumit_keys.add(key)
-                sumit_keys_normalized.add(key.lstrip('0'))
+        sumit_keys = set(normalize_keys(sumit_df[sumit_key_col])) - {''}
+        sumit_keys_normalized = {key.lstrip('0') for key in sumit_keys}
     
     if not idom_keys:
         result.add_error("לא נמצאו מפתחות בקובץ IDOM")
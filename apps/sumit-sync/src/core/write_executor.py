@@ -7,38 +7,32 @@ and live mode (actually writes to Summit).
 Every operation is logged with before/after values for audit.
 """
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Hashable, Iterable, List, Optional
 
-from . import taxonomy
+from .plan_validator import (  # noqa: F401 — rule constants re-exported
+    ACCEPTED_DATE_FORMATS, ALLOWED_FOLDERS, DATE_PROPS, TAXONOMY_PROPS, PlanValidator,
+)
 from .sumit_api_client import SummitAPIClient, SummitAPIError
 from .write_plan import WritePlan, WriteOperation, WriteResult, OpType
 
 logger = logging.getLogger(__name__)
 
-# Folders the engine is allowed to write to. Anything else = bug.
-ALLOWED_FOLDERS = {
-    "557688522",   # לקוחות (UPDATE_CLIENT: פקיד שומה / סוג תיק)
-    "1124761700",  # דוחות כספיים (חברות)
-    "1144157121",  # דוחות שנתיים (עצמאים)
-}
-
-# Property names that reference a taxonomy. Values must be known entity IDs.
-# Source of truth: src/core/taxonomy.py
-TAXONOMY_PROPS = {
-    "שנת מס": "TAX_YEARS",
-    "סטטוס דוח": "STATUSES",
-    "פקיד שומה": "PKID_SHOMA",
-    "סוג תיק": "SUG_TIK",
-}
-
-# Date-shaped property names. Engine writes ISO 8601 with time + Israel TZ
-# (see sync_engine._plan_update / _plan_create_or_flag): "%Y-%m-%dT00:00:00+03:00".
-# Summit's Date-typed properties reject bare DD/MM/YYYY and bare ISO YYYY-MM-DD
-# (Cycle A live, 2026-05-11). Validator tracks engine canonical first; bare ISO
-# kept as a defensive fallback so a hand-built operation still passes shallow checks.
-DATE_PROPS = {"תאריך אורכה מ\"ה", "תאריך הגשה"}
-ACCEPTED_DATE_FORMATS = ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d")
+# Live writes in flight at once. The client's shared slot limiter still caps
+# QPS; concurrency only overlaps HTTP round trips with each other's slot
+# spacing (same reasoning as sumit_api_source.TARGETED_CONCURRENCY).
+WRITE_CONCURRENCY = int(os.environ.get("SUMIT_WRITE_CONCURRENCY", "4"))
+
+
+class CheckpointError(RuntimeError):
+    """
+    An on_send / on_audit callback could not record its checkpoint. Not an
+    op failure: it stops the execution, because writes that go on without a
+    record would be sent again by the next resume.
+    """
 
 
 class WriteExecutor:
@@ -48,7 +42,24 @@ class WriteExecutor:
     In dry_run mode: validates operations, builds audit log, but makes no API calls.
         validation_mode="shallow" (default): presence check only — fast, no taxonomy lookups.
         validation_mode="deep":              also checks folder whitelist, taxonomy IDs, date formats.
-    In live mode: calls update_entity/create_entity for each operation.
+    In live mode: calls update_entity/create_entity for each operation, up to
+    `concurrency` at a time (default SUMIT_WRITE_CONCURRENCY). Ops on the same
+    report, or on the same client (UPDATE_CLIENT / CREATE_REPORT), still run
+    one after another in plan order — see _ordering_key. The WriteResult and
+    audit log come out in plan order either way.
+
+    skip_op_keys: op keys already written (WriteLog status=success) — those ops
+    are audited as "already_written" and not sent again, so a re-run after a
+    crash resumes instead of duplicating creates.
+    approved_op_keys: op keys signed off for writing (see plan_cache.PlanApproval);
+    other writing ops are audited as "not_approved" and not sent. None = all.
+    on_audit: called with each audit entry as soon as its op is done (from
+    worker threads in concurrent mode), so the caller can checkpoint per op.
+    on_send: live mode only — called with a "pending" audit entry right
+    before each create / update is sent (write-ahead checkpoint). Either
+    callback raising CheckpointError stops the execution.
+    write_through: WriteThrough that folds each successful live write into
+    the local report / client caches; saved when execution ends.
     """
 
     def __init__(
@@ -56,6 +67,12 @@ class WriteExecutor:
         client: Optional[SummitAPIClient] = None,
         dry_run: bool = True,
         validation_mode: str = "shallow",
+        concurrency: Optional[int] = None,
+        skip_op_keys: Optional[Iterable[str]] = None,
+        approved_op_keys: Optional[Iterable[str]] = None,
+        on_audit=None,
+        write_through=None,
+        on_send=None,
     ):
         if validation_mode not in ("shallow", "deep"):
             raise ValueError(
@@ -64,55 +81,46 @@ class WriteExecutor:
         self.client = client or SummitAPIClient()
         self.dry_run = dry_run
         self.validation_mode = validation_mode
+        self.concurrency = max(1, WRITE_CONCURRENCY if concurrency is None else concurrency)
+        self.skip_op_keys = set(skip_op_keys or ())
+        self.approved_op_keys = None if approved_op_keys is None else set(approved_op_keys)
+        self.on_audit = on_audit
+        self.on_send = on_send
+        self.write_through = write_through
+        self._validator: Optional[PlanValidator] = None
 
     def execute(self, plan: WritePlan, progress_callback=None) -> WriteResult:
         """Execute all operations in the plan."""
-        result = WriteResult(dry_run=self.dry_run)
-        total = plan.total
-
-        for i, op in enumerate(plan.operations):
-            if op.op_type in (OpType.SKIP, OpType.FLAG):
-                result.skipped += 1
-                status = "skipped" if op.op_type == OpType.SKIP else "flagged"
-                result.audit_log.append(self._audit_entry(op, status))
-                continue
-
-            result.total_attempted += 1
-
-            try:
-                if self.dry_run:
-                    self._validate_operation(op)
-                    if self.validation_mode == "deep":
-                        self._validate_operation_deep(op)
-                    result.succeeded += 1
-                    status_label = (
-                        "dry_run_ok_deep" if self.validation_mode == "deep" else "dry_run_ok"
-                    )
-                    result.audit_log.append(self._audit_entry(op, status_label))
-                else:
-                    api_result = self._execute_single(op)
-                    created_id = self._extract_created_id(op, api_result)
-                    result.succeeded += 1
-                    result.audit_log.append(
-                        self._audit_entry(op, "success", created_entity_id=created_id)
-                    )
-            except (SummitAPIError, ValueError) as e:
-                result.failed += 1
-                error_info = {
-                    "match_key": op.match_key,
-                    "client_name": op.client_name,
-                    "op_type": op.op_type.value,
-                    "error": str(e),
-                }
-                result.errors.append(error_info)
-                result.audit_log.append(self._audit_entry(op, "failed", str(e)))
-                logger.error(
-                    "Write failed for %s (%s): %s",
-                    op.match_key, op.op_type.value, e,
-                )
+        return self.execute_stream(plan.operations, total=plan.total, progress_callback=progress_callback)
 
-            if progress_callback and (i + 1) % 10 == 0:
-                progress_callback(i + 1, total)
+    def execute_stream(
+        self,
+        operations: Iterable[WriteOperation],
+        total: Optional[int] = None,
+        progress_callback=None,
+    ) -> WriteResult:
+        """
+        Execute operations as the iterable yields them — a list, or a generator
+        fed while the plan is still being built (see write_stream). total is
+        only passed through to progress_callback; None when not known yet.
+        """
+        # Deep rules compiled once per run, not per op
+        self._validator = PlanValidator() if self.dry_run and self.validation_mode == "deep" else None
+        try:
+            if self.dry_run or self.concurrency <= 1:
+                result = WriteResult(dry_run=self.dry_run)
+                done = 0
+                for op in operations:
+                    self._execute_op(op, result)
+                    done += 1
+                    if progress_callback and done % 10 == 0:
+                        progress_callback(done, total)
+            else:
+                result = self._execute_concurrent(operations, total, progress_callback)
+        finally:
+            # Also after a crash: what was written is in Summit either way
+            if self.write_through is not None and not self.dry_run:
+                self.write_through.save()
 
         logger.info(
             "Write execution complete (dry_run=%s): %d attempted, %d succeeded, %d failed, %d skipped",
@@ -120,6 +128,168 @@ class WriteExecutor:
         )
         return result
 
+    @staticmethod
+    def _ordering_key(op: WriteOperation) -> Optional[Hashable]:
+        """
+        Ops with the same key must run in plan order. A report is keyed by its
+        entity ID; UPDATE_CLIENT and CREATE_REPORT by the client they touch
+        (the create links to the client the update is changing). SKIP / FLAG
+        make no API call and need no ordering.
+        """
+        if op.op_type == OpType.UPDATE_REPORT:
+            return ("report", op.entity_id)
+        if op.op_type == OpType.UPDATE_CLIENT:
+            return ("client", op.entity_id)
+        if op.op_type == OpType.CREATE_REPORT:
+            return ("client", op.client_entity_id)
+        return None
+
+    def _execute_concurrent(self, operations: Iterable[WriteOperation], total, progress_callback) -> WriteResult:
+        """
+        Live writes on a thread pool. Each op records into its own WriteResult
+        slot; slots are merged in plan order at the end. An op whose ordering
+        key is busy waits in that key's queue and is submitted when the op
+        ahead of it finishes, so waiting never holds a worker. At most
+        2 × concurrency ops are outstanding — a streamed plan is consumed no
+        faster than it is written.
+        """
+        slots: List[WriteResult] = []
+        waiting: Dict[Hashable, List[tuple]] = {}   # key → ops queued behind the running one
+        lock = threading.Lock()
+        outstanding = threading.BoundedSemaphore(2 * self.concurrency)
+        all_done = threading.Condition(lock)
+        state = {"running": 0, "done": 0, "error": None}
+
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="summit-write")
+
+        def _run(i: int, op: WriteOperation, key) -> None:
+            # After an unexpected error the serial path would have stopped —
+            # ops still queued behind a key are dropped, not written
+            if state["error"] is None:
+                try:
+                    self._execute_op(op, slots[i])
+                except BaseException as exc:   # not a Summit/validation error
+                    with lock:
+                        state["error"] = state["error"] or exc
+            nxt = None
+            with lock:
+                state["done"] += 1
+                done = state["done"]
+                queued = waiting.get(key)
+                if queued:
+                    nxt = queued.pop(0)
+                else:
+                    waiting.pop(key, None)
+                    state["running"] -= 1
+                    all_done.notify_all()
+            outstanding.release()
+            if nxt is not None:
+                pool.submit(_run, nxt[0], nxt[1], key)
+            if progress_callback and done % 10 == 0:
+                progress_callback(done, total)
+
+        try:
+            for op in operations:
+                outstanding.acquire()
+                with lock:
+                    if state["error"] is not None:
+                        outstanding.release()
+                        break
+                    i = len(slots)
+                    slots.append(WriteResult(dry_run=self.dry_run))
+                    key = self._ordering_key(op)
+                    if key is None:
+                        self._execute_op(op, slots[i])
+                        state["done"] += 1
+                        done = state["done"]
+                        outstanding.release()
+                        if progress_callback and done % 10 == 0:
+                            progress_callback(done, total)
+                        continue
+                    if key in waiting:
+                        waiting[key].append((i, op))
+                        continue
+                    waiting[key] = []
+                    state["running"] += 1
+                pool.submit(_run, i, op, key)
+        finally:
+            with lock:
+                while state["running"]:
+                    all_done.wait()
+            pool.shutdown(wait=True)
+
+        if state["error"] is not None:
+            raise state["error"]
+
+        result = WriteResult(dry_run=self.dry_run)
+        for slot in slots:
+            result.total_attempted += slot.total_attempted
+            result.succeeded += slot.succeeded
+            result.failed += slot.failed
+            result.skipped += slot.skipped
+            result.errors.extend(slot.errors)
+            result.audit_log.extend(slot.audit_log)
+        return result
+
+    def _record(self, result: WriteResult, entry: dict) -> None:
+        result.audit_log.append(entry)
+        if self.on_audit:
+            self.on_audit(entry)
+
+    def _execute_op(self, op: WriteOperation, result: WriteResult) -> None:
+        """Run (or validate) one operation and record it in result + audit log."""
+        if op.op_type in (OpType.SKIP, OpType.FLAG):
+            result.skipped += 1
+            status = "skipped" if op.op_type == OpType.SKIP else "flagged"
+            self._record(result, self._audit_entry(op, status))
+            return
+
+        if self.skip_op_keys and op.op_key in self.skip_op_keys:
+            result.skipped += 1
+            self._record(result, self._audit_entry(op, "already_written"))
+            return
+
+        if self.approved_op_keys is not None and op.op_key not in self.approved_op_keys:
+            result.skipped += 1
+            self._record(result, self._audit_entry(op, "not_approved"))
+            return
+
+        result.total_attempted += 1
+
+        try:
+            if self.dry_run:
+                self._validate_operation(op)
+                if self.validation_mode == "deep":
+                    self._validate_operation_deep(op, self._validator)
+                result.succeeded += 1
+                status_label = (
+                    "dry_run_ok_deep" if self.validation_mode == "deep" else "dry_run_ok"
+                )
+                self._record(result, self._audit_entry(op, status_label))
+            else:
+                if self.on_send:
+                    self.on_send(self._audit_entry(op, "pending"))
+                api_result = self._execute_single(op)
+                created_id = self._extract_created_id(op, api_result)
+                result.succeeded += 1
+                if self.write_through is not None:
+                    self.write_through.apply(op, api_result, created_id)
+                self._record(result, self._audit_entry(op, "success", created_entity_id=created_id))
+        except (SummitAPIError, ValueError) as e:
+            result.failed += 1
+            error_info = {
+                "match_key": op.match_key,
+                "client_name": op.client_name,
+                "op_type": op.op_type.value,
+                "error": str(e),
+            }
+            result.errors.append(error_info)
+            self._record(result, self._audit_entry(op, "failed", str(e)))
+            logger.error(
+                "Write failed for %s (%s): %s",
+                op.match_key, op.op_type.value, e,
+            )
+
     def _execute_single(self, op: WriteOperation):
         """Execute a single write operation against Summit API."""
         if op.op_type == OpType.UPDATE_REPORT:
@@ -141,93 +311,24 @@ class WriteExecutor:
         if not op.properties:
             raise ValueError("Empty properties — nothing to write")
 
-    def _validate_operation_deep(self, op: WriteOperation):
+    def _validate_operation_deep(self, op: WriteOperation, validator: Optional[PlanValidator] = None):
         """
         Deep validation — collects ALL problems, then raises a single ValueError
         listing every issue. Catches malformed plans before they hit Summit.
 
-        Checks:
+        Checks (see plan_validator):
           1. folder_id is in ALLOWED_FOLDERS
           2. Each TAXONOMY_PROPS field references a known taxonomy entity ID
-          3. Each DATE_PROPS field parses as ISO YYYY-MM-DD
+          3. Each DATE_PROPS field parses against ACCEPTED_DATE_FORMATS
+        validator: rules compiled once for the whole plan; compiled here if omitted.
         """
-        problems: list = []
-
-        if str(op.folder_id) not in ALLOWED_FOLDERS:
-            problems.append(
-                "folder_id %r not in ALLOWED_FOLDERS %s" % (op.folder_id, sorted(ALLOWED_FOLDERS))
-            )
-
-        for prop_name, value in op.properties.items():
-            if prop_name in TAXONOMY_PROPS:
-                problems.extend(self._check_taxonomy(prop_name, value))
-            elif prop_name in DATE_PROPS:
-                problems.extend(self._check_date(prop_name, value))
-
+        problems = [message for _, message in (validator or PlanValidator()).check(op)]
         if problems:
             raise ValueError(
                 "Deep validation failed for op %s (entity=%s, match_key=%s):\n  - %s"
                 % (op.op_type.value, op.entity_id, op.match_key, "\n  - ".join(problems))
             )
 
-    def _check_taxonomy(self, prop_name: str, value) -> list:
-        """Verify the value is a known taxonomy entity ID. Returns list of problems."""
-        if value is None or value == "":
-            return ["%s is empty" % prop_name]
-
-        # Engine writes taxonomy refs as ints. Accept str digits for resilience.
-        try:
-            value_id = int(value)
-        except (TypeError, ValueError):
-            return ["%s value %r is not a numeric entity ID" % (prop_name, value)]
-
-        family = TAXONOMY_PROPS[prop_name]
-        if family == "TAX_YEARS":
-            if value_id not in taxonomy.TAX_YEARS.values():
-                return ["%s ID %d not in TAX_YEARS %s" %
-                        (prop_name, value_id, sorted(taxonomy.TAX_YEARS.values()))]
-        elif family == "STATUSES":
-            if value_id not in taxonomy.STATUSES:
-                return ["%s ID %d not in STATUSES %s" %
-                        (prop_name, value_id, sorted(taxonomy.STATUSES.keys()))]
-        elif family == "PKID_SHOMA":
-            known = {e["id"] for e in taxonomy.PKID_SHOMA}
-            # Partial taxonomy — only error if NOT in partial list AND full not loaded
-            if value_id not in known and not taxonomy.is_loaded():
-                return ["%s ID %d not in partial PKID_SHOMA and full taxonomy not loaded "
-                        "(run load_full_taxonomies first, or accept partial check)"
-                        % (prop_name, value_id)]
-            if value_id not in known and taxonomy.is_loaded():
-                return ["%s ID %d not in PKID_SHOMA" % (prop_name, value_id)]
-        elif family == "SUG_TIK":
-            known = {e["id"] for e in taxonomy.SUG_TIK}
-            if value_id not in known and not taxonomy.is_loaded():
-                return ["%s ID %d not in partial SUG_TIK and full taxonomy not loaded"
-                        % (prop_name, value_id)]
-            if value_id not in known and taxonomy.is_loaded():
-                return ["%s ID %d not in SUG_TIK" % (prop_name, value_id)]
-        return []
-
-    def _check_date(self, prop_name: str, value) -> list:
-        """
-        Verify the value parses against one of ACCEPTED_DATE_FORMATS.
-        Engine canonical output is DD/MM/YYYY (sync_engine._plan_update).
-        ISO YYYY-MM-DD is accepted as a defensive fallback.
-        Returns list of problems.
-        """
-        if value is None or value == "":
-            return []  # Empty dates are allowed
-        if not isinstance(value, str):
-            return ["%s value %r is not a string" % (prop_name, value)]
-        for fmt in ACCEPTED_DATE_FORMATS:
-            try:
-                datetime.strptime(value, fmt)
-                return []
-            except ValueError:
-                continue
-        return ["%s value %r does not match accepted formats %s"
-                % (prop_name, value, list(ACCEPTED_DATE_FORMATS))]
-
     def _extract_created_id(self, op: WriteOperation, api_result) -> Optional[int]:
         """For CREATE_REPORT, pull the new entity ID out of the Summit response."""
         if op.op_type != OpType.CREATE_REPORT or not isinstance(api_result, dict):
@@ -259,6 +360,7 @@ class WriteExecutor:
 
         return {
             "timestamp": datetime.now(timezone.utc).isoformat(),
+            "op_key": op.op_key,
             "op_type": op.op_type.value,
             "entity_id": op.entity_id,
             "folder_id": op.folder_id,
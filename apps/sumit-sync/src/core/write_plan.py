@@ -7,12 +7,15 @@ The plan can be reviewed before execution (dry-run mode).
 """
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import hashlib
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+CLIENTS_FOLDER_ID = "557688522"  # לקוחות — target of UPDATE_CLIENT ops
+
 
 class OpType(Enum):
     UPDATE_REPORT = "update_report"
@@ -35,8 +38,25 @@ class WriteOperation:
     reason: str
     client_entity_id: Optional[int] = None  # for creates — link to client
 
+    @property
+    def op_key(self) -> str:
+        """
+        Stable identity of this write across plan rebuilds — the WriteLog
+        checkpoint key. A CREATE_REPORT is keyed by what it creates (client ×
+        tax year in a folder): a rebuilt plan that doesn't see the new report
+        yet gets the same key and is not sent twice. Other ops are keyed by
+        target + payload, so a changed value is a new write.
+        """
+        if self.op_type == OpType.CREATE_REPORT:
+            ident = [self.op_type.value, self.folder_id, self.client_entity_id, self.properties.get("שנת מס")]
+        else:
+            ident = [self.op_type.value, self.folder_id, self.entity_id, self.match_key, self.properties]
+        raw = json.dumps(ident, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
     def to_dict(self) -> Dict[str, Any]:
         return {
+            "op_key": self.op_key,
             "op_type": self.op_type.value,
             "entity_id": self.entity_id,
             "folder_id": self.folder_id,
@@ -48,38 +68,113 @@ class WriteOperation:
             "client_entity_id": self.client_entity_id,
         }
 
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "WriteOperation":
+        return cls(
+            op_type=OpType(d["op_type"]),
+            entity_id=d.get("entity_id"),
+            folder_id=d["folder_id"],
+            client_name=d.get("client_name", ""),
+            match_key=d.get("match_key", ""),
+            properties=d.get("properties") or {},
+            old_values=d.get("old_values") or {},
+            reason=d.get("reason", ""),
+            client_entity_id=d.get("client_entity_id"),
+        )
+
 
 @dataclass
 class WritePlan:
-    """Collection of write operations with summary stats."""
+    """
+    Collection of write operations with summary stats.
+
+    Per-OpType counts and positions are kept as ops are added (add() or the
+    constructor), so summary() and filtered views don't rescan the plan.
+    Don't append to `operations` directly.
+    """
     operations: List[WriteOperation] = field(default_factory=list)
+    # Updates turned into SKIPs because Summit already holds the values
+    writes_avoided: int = 0
+    _by_type: Dict[OpType, List[int]] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        ops, self.operations = self.operations, []
+        self._by_type = {t: [] for t in OpType}
+        for op in ops:
+            self.add(op)
 
     def add(self, op: WriteOperation):
+        self._by_type[op.op_type].append(len(self.operations))
         self.operations.append(op)
 
+    def count(self, op_type: OpType) -> int:
+        return len(self._by_type[op_type])
+
     @property
     def total(self) -> int:
         return len(self.operations)
 
     @property
     def updates(self) -> int:
-        return sum(1 for o in self.operations if o.op_type == OpType.UPDATE_REPORT)
+        return self.count(OpType.UPDATE_REPORT)
 
     @property
     def creates(self) -> int:
-        return sum(1 for o in self.operations if o.op_type == OpType.CREATE_REPORT)
+        return self.count(OpType.CREATE_REPORT)
 
     @property
     def client_updates(self) -> int:
-        return sum(1 for o in self.operations if o.op_type == OpType.UPDATE_CLIENT)
+        return self.count(OpType.UPDATE_CLIENT)
 
     @property
     def skips(self) -> int:
-        return sum(1 for o in self.operations if o.op_type == OpType.SKIP)
+        return self.count(OpType.SKIP)
 
     @property
     def flags(self) -> int:
-        return sum(1 for o in self.operations if o.op_type == OpType.FLAG)
+        return self.count(OpType.FLAG)
+
+    @property
+    def unresolved_codes(self) -> int:
+        """FLAGs on clients: IDOM פקיד שומה / סוג תיק codes the taxonomy doesn't know."""
+        return sum(1 for i in self._by_type[OpType.FLAG] if self.operations[i].folder_id == CLIENTS_FOLDER_ID)
+
+    def select(
+        self,
+        op_types: Optional[Iterable[OpType]] = None,
+        match_key: Optional[str] = None,
+        client_name: Optional[str] = None,
+        prop: Optional[str] = None,
+    ) -> List[int]:
+        """
+        Positions of the ops matching every given filter, in plan order.
+        match_key / client_name match as case-insensitive substrings; prop
+        keeps ops that write that property.
+        """
+        if op_types is None:
+            positions: Iterable[int] = range(len(self.operations))
+        else:
+            positions = sorted(i for t in set(op_types) for i in self._by_type[t])
+        key = match_key.strip().lower() if match_key else None
+        name = client_name.strip().lower() if client_name else None
+        if not key and not name and not prop:
+            return list(positions)
+        out = []
+        for i in positions:
+            op = self.operations[i]
+            if key and key not in str(op.match_key).lower():
+                continue
+            if name and name not in str(op.client_name).lower():
+                continue
+            if prop and prop not in op.properties:
+                continue
+            out.append(i)
+        return out
+
+    def iter_ndjson(self, positions: Optional[Iterable[int]] = None) -> Iterator[str]:
+        """One JSON line per op (all, or the given positions) — for streaming export."""
+        for i in (range(len(self.operations)) if positions is None else positions):
+            yield json.dumps(self.operations[i].to_dict(), ensure_ascii=False, default=str) + "\n"
 
     def summary(self) -> Dict[str, int]:
         return {
@@ -89,6 +184,8 @@ class WritePlan:
             "client_updates": self.client_updates,
             "skips": self.skips,
             "flags": self.flags,
+            "unresolved_codes": self.unresolved_codes,
+            "writes_avoided": self.writes_avoided,
         }
 
     def to_json(self) -> str:
@@ -98,6 +195,14 @@ class WritePlan:
             indent=2,
         )
 
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "WritePlan":
+        """Inverse of to_json()'s payload."""
+        return cls(
+            operations=[WriteOperation.from_dict(o) for o in d.get("operations", [])],
+            writes_avoided=int(d.get("summary", {}).get("writes_avoided", 0)),
+        )
+
 
 @dataclass
 class WriteResult:
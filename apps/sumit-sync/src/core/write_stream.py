@@ -0,0 +1,278 @@
+"""
+Streaming live write-back: plan and write while the targeted fetch runs.
+
+The batch path fetches every IDOM ח.פ from Summit, builds the whole
+WritePlan, and only then sends the first update. On a ~700-row run the
+write phase starts minutes after the first report was already resolved.
+
+Here the phases overlap:
+
+    iter_targeted_lookups ──► producer thread ──► bounded queue ──► WriteExecutor
+      (outcome per ח.פ,        (build_write_plan     (backpressure)    (caller's thread,
+       as it completes)         for that ח.פ's rows)                   execute_stream)
+
+Planning is per ח.פ group: the IDOM rows behind one normalized key are
+planned against that key's report alone, which is all the serial plan would
+use for them (the targeted fetch resolves reports per key too). The run's
+persisted MatchResult is replayed per group; a pair whose record isn't in
+the group falls back to matching, as MatchIndex.resolve does everywhere.
+
+Reports and client refs are read live, never from the folder mirror or
+the refs cache: each SKIP is decided against Summit as it is now.
+
+Fetch and writes share one SummitAPIClient, and every client draws on the
+process-wide rate limiter — the 5 calls/sec ceiling still holds for the
+whole run. What overlaps is the writer's per-call latency with the fetch's
+slot waits; the gain is therefore bounded by the limiter
+(scripts/bench_write_stream.py).
+
+The audit log is the executor's, in execution order, one entry per op. The
+returned WritePlan holds the same ops re-ordered by IDOM row — equal to the
+batch plan (tests/test_write_stream.py).
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from . import taxonomy
+from .config import ReportConfig
+from .mapping_store import MappingStore
+from .matching import MatchResult
+from .normalize import normalize_keys
+from .parallel import _plan_rows
+from .report_cache import ReportCache
+from .sumit_api_source import (
+    FOLDER_IDS,
+    entities_frame,
+    iter_targeted_lookups,
+    save_lookup_caches,
+)
+from .sync_engine import SyncEngine, _col
+from .write_executor import WriteExecutor
+from .write_plan import WriteOperation, WritePlan, WriteResult
+
+logger = logging.getLogger(__name__)
+
+# Ops planned but not yet written. Small: the writer is the slow side, and a
+# full queue pauses planning (never the fetch threads' rate-limit slots).
+STREAM_QUEUE_SIZE = int(os.environ.get("SUMIT_WRITE_STREAM_QUEUE", "50"))
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    """The consumer went away; the producer stops planning."""
+
+
+@dataclass
+class StreamedWriteBack:
+    """
+    Outcome of stream_write_back(). error is set when planning stopped
+    partway: only the ops planned until then were written, and the run is
+    failed, not complete, whatever the written ops' own results.
+    """
+    plan: WritePlan
+    result: WriteResult
+    warnings: List[str] = field(default_factory=list)
+    first_write_seconds: Optional[float] = None   # run start → first op executed
+    total_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        return "failed" if self.error is not None else "completed"
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = self.result.to_dict()
+        out["status"] = self.status
+        out["error"] = self.error
+        out["streaming"] = {
+            "plan_summary": self.plan.summary(),
+            "warnings": self.warnings,
+            "first_write_seconds": (
+                round(self.first_write_seconds, 2) if self.first_write_seconds is not None else None
+            ),
+            "total_seconds": round(self.total_seconds, 2),
+        }
+        return out
+
+
+def _client_ref_keys(idom_df: pd.DataFrame) -> set:
+    """Normalized ח.פ of rows carrying פקיד_שומה / סוג_תיק codes."""
+    has_ref = pd.Series(False, index=idom_df.index)
+    for col in ("פקיד_שומה", "סוג_תיק"):
+        has_ref |= ~_col(idom_df, col, "").astype(str).str.strip().isin(("", "nan", "None"))
+    keys = set(normalize_keys(_col(idom_df, "מספר_תיק", None)[has_ref]))
+    keys.discard("")
+    return keys
+
+
+def stream_write_back(
+    config: ReportConfig,
+    tax_year: int,
+    idom_df: pd.DataFrame,
+    executor: WriteExecutor,
+    mapping: Optional[MappingStore] = None,
+    reports: Optional[ReportCache] = None,
+    match_result: Optional[MatchResult] = None,
+    queue_size: Optional[int] = None,
+    progress_callback=None,
+    on_planned=None,
+) -> StreamedWriteBack:
+    """
+    Targeted fetch → per-key write plan → executor, overlapped.
+
+    executor.client is used for the fetch as well; both phases draw from the
+    process-wide rate limiter. progress_callback(done, total) as in
+    WriteExecutor.execute_stream; total is None while planning is running.
+    on_planned(total) is called from the planner thread once planning ends
+    (also when it stopped early) with the number of ops that will be run.
+    """
+    started = time.monotonic()
+    engine = SyncEngine(config)
+    api = executor.client
+    store = mapping or MappingStore()
+    report_cache = reports or ReportCache()
+    folder_id = FOLDER_IDS[config.report_type]
+    warnings: List[str] = []
+
+    idom = idom_df.reset_index(drop=True)
+    norm = normalize_keys(_col(idom, "מספר_תיק", ""))
+    groups: Dict[str, List[int]] = {}
+    for pos, key in enumerate(norm):
+        groups.setdefault(key, []).append(pos)
+    keyless = groups.pop("", [])
+
+    year_entity_id = taxonomy.resolve_tax_year(tax_year)
+    if year_entity_id is None:
+        # Same as the batch path: an empty Summit side, nothing fetched
+        warnings.append(f"Tax year {tax_year} not found in taxonomy")
+        keyless = sorted(keyless + [p for positions in groups.values() for p in positions])
+        groups = {}
+
+    ops_queue: "queue.Queue" = queue.Queue(maxsize=queue_size or STREAM_QUEUE_SIZE)
+    stop = threading.Event()
+    planned: List[WritePlan] = []
+    tagged: List[tuple] = []        # (IDOM row, seq, op) — to restore batch order
+    counts = {"no_client": 0, "no_report": 0, "error": 0}
+    producer_error: List[BaseException] = []
+
+    def _put(item) -> None:
+        while True:
+            try:
+                ops_queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                if stop.is_set():
+                    raise _Stopped()
+
+    def _plan(positions: List[int], entities: List[Dict]) -> None:
+        sumit_df, lookup = entities_frame(entities, config, store)
+        plan = engine.build_write_plan(
+            idom.iloc[positions], sumit_df, lookup, tax_year,
+            client_mapping=store, match_result=match_result,
+        )
+        rows = _plan_rows(plan)
+        planned.append(plan)
+        tagged.extend((positions[r], i, op) for i, (r, op) in enumerate(zip(rows, plan.operations)))
+        for op in plan.operations:
+            _put(op)
+
+    def _produce() -> None:
+        try:
+            # No usable ח.פ (or no tax year) → nothing to look up
+            if keyless:
+                _plan(keyless, [])
+            if groups:
+                outcomes = iter_targeted_lookups(
+                    list(groups), api, store, report_cache, folder_id, year_entity_id,
+                    client_refs_for=_client_ref_keys(idom), live=True,
+                )
+                for outcome in outcomes:
+                    if stop.is_set():
+                        raise _Stopped()
+                    status = outcome["status"]
+                    if status in counts:
+                        counts[status] += 1
+                    entities = [outcome["entity"]] if status == "matched" else []
+                    _plan(groups[outcome["cn"]], entities)
+        except _Stopped:
+            logger.warning("Streaming write-back: writer stopped, planning abandoned")
+        except BaseException as exc:
+            producer_error.append(exc)
+            logger.error("Streaming write-back: planning failed: %s", exc, exc_info=True)
+        finally:
+            planned_total.append(len(tagged))
+            if on_planned is not None:
+                try:
+                    on_planned(len(tagged))
+                except Exception as exc:
+                    logger.warning("Streaming write-back: on_planned failed: %s", exc)
+            try:
+                _put(_DONE)
+            except _Stopped:
+                pass
+
+    first_write: List[float] = []
+    planned_total: List[int] = []
+
+    def _progress(done: int, _total: Optional[int]) -> None:
+        progress_callback(done, planned_total[0] if planned_total else None)
+
+    def _drain() -> Iterator[WriteOperation]:
+        while True:
+            item = ops_queue.get()
+            if item is _DONE:
+                return
+            if not first_write:
+                first_write.append(time.monotonic() - started)
+            yield item
+
+    producer = threading.Thread(target=_produce, name="write-stream-planner", daemon=True)
+    producer.start()
+    try:
+        result = executor.execute_stream(_drain(), progress_callback=_progress if progress_callback else None)
+    finally:
+        stop.set()
+        producer.join()
+        save_lookup_caches(store, report_cache)
+
+    plan = WritePlan()
+    for _, _, op in sorted(tagged, key=lambda x: (x[0], x[1])):
+        plan.add(op)
+    plan.writes_avoided = sum(p.writes_avoided for p in planned)
+
+    if counts["no_client"] + counts["error"]:
+        warnings.append(f"{counts['no_client'] + counts['error']} IDOM rows had no matching Summit client")
+    if counts["no_report"]:
+        warnings.append(
+            f"{counts['no_report']} IDOM rows have a known Summit client but no "
+            f"{config.report_type.value} report for tax year {tax_year}"
+        )
+    if producer_error:
+        warnings.append(
+            "Planning stopped early (%s) — %d ops were written; re-run to finish"
+            % (producer_error[0], len(result.audit_log))
+        )
+
+    total = time.monotonic() - started
+    logger.info(
+        "Streaming write-back: %d ops (%d groups) in %.1fs, first write after %s",
+        len(result.audit_log), len(planned), total,
+        "%.1fs" % first_write[0] if first_write else "—",
+    )
+    return StreamedWriteBack(
+        plan=plan,
+        result=result,
+        warnings=warnings,
+        first_write_seconds=first_write[0] if first_write else None,
+        total_seconds=total,
+        error=f"Planning stopped early: {producer_error[0]}" if producer_error else None,
+    )
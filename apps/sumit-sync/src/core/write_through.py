@@ -0,0 +1,151 @@
+"""
+Write-through of successful live writes into the local Summit caches.
+
+A live write-back knows exactly what it just changed — the reports' סטטוס /
+תאריך הגשה / תאריך אורכה מ"ה, the IDs of newly created reports, the clients'
+פקיד שומה / סוג תיק — yet the next sync re-read all of it from Summit, since
+the folder mirror and client-ref cache still held the old values. WriteThrough
+folds each successful op into:
+
+- ReportCache report-ID index: new report IDs (client × tax year)
+- ReportCache folder mirror: the written entity, in getentity shape
+- MappingStore client refs: the written פקיד שומה / סוג תיק
+
+so the next targeted fetch and write plan read them from cache.
+
+A written report is mirrored fresh only when Summit returned the whole
+entity, or when it was created by the write (nothing else on it to be
+stale). Otherwise the written fields are patched into the mirrored copy,
+which keeps its original fetch time, and an unknown entity is dropped rather
+than guessed. Cache errors are logged, never raised — the write itself
+already succeeded.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from . import taxonomy
+from .mapping_store import MappingStore
+from .report_cache import ReportCache
+from .write_plan import OpType, WriteOperation
+
+logger = logging.getLogger(__name__)
+
+# Report fields that are entity references in getentity responses
+_REF_PROPS = {"לקוח", "סטטוס", "שנת מס"}
+
+# A returned entity carrying these is a full report, not an acknowledgement
+_FULL_ENTITY_PROPS = ("לקוח", "שנת מס")
+
+CLIENT_REF_PROPS = ("פקיד שומה", "סוג תיק")
+
+
+def _ref_name(prop: str, value: int, client_name: str) -> str:
+    if prop == "סטטוס":
+        return taxonomy.get_status_label(value)
+    if prop == "שנת מס":
+        year = taxonomy.resolve_tax_year_id(value)
+        return str(year) if year is not None else ""
+    return client_name
+
+
+def as_entity_fields(op: WriteOperation) -> Dict[str, Any]:
+    """op.properties in getentity shape: [value] / [{"ID", "Name"}] / None."""
+    fields: Dict[str, Any] = {}
+    for prop, value in op.properties.items():
+        if value is None or value == "":
+            fields[prop] = None
+        elif prop in _REF_PROPS:
+            fields[prop] = [{"ID": int(value), "Name": _ref_name(prop, int(value), op.client_name)}]
+        else:
+            fields[prop] = [value]
+    return fields
+
+
+def _returned_entity(api_result) -> Optional[Dict[str, Any]]:
+    """
+    The full entity Summit returned, flattened to getentity shape, or None
+    if the response is only an acknowledgement.
+    """
+    if not isinstance(api_result, dict) or not api_result.get("ID"):
+        return None
+    entity = dict(api_result)
+    if isinstance(entity.get("Properties"), dict):
+        entity = {"ID": entity["ID"], **entity.pop("Properties")}
+    if not all(entity.get(p) for p in _FULL_ENTITY_PROPS):
+        return None
+    return entity
+
+
+class WriteThrough:
+    """Applies successful WriteExecutor ops to ReportCache / MappingStore."""
+
+    def __init__(self, reports: Optional[ReportCache] = None, mapping: Optional[MappingStore] = None):
+        self.reports = reports or ReportCache()
+        self.mapping = mapping or MappingStore()
+        self.applied = 0
+        self._lock = threading.Lock()
+
+    def apply(self, op: WriteOperation, api_result, created_id: Optional[int] = None) -> None:
+        """Record one successful live write. Called from executor worker threads."""
+        try:
+            if op.op_type == OpType.UPDATE_REPORT:
+                self._apply_report_update(op, api_result)
+            elif op.op_type == OpType.CREATE_REPORT:
+                self._apply_report_create(op, api_result, created_id)
+            elif op.op_type == OpType.UPDATE_CLIENT:
+                self._apply_client_update(op)
+            else:
+                return
+            with self._lock:
+                self.applied += 1
+        except Exception as exc:
+            logger.warning("Write-through for %s %s failed: %s", op.op_type.value, op.match_key, exc)
+
+    def _apply_report_update(self, op: WriteOperation, api_result) -> None:
+        returned = _returned_entity(api_result)
+        if returned is not None and int(returned["ID"]) == int(op.entity_id):
+            self.reports.put_entity(op.folder_id, returned)
+            return
+        # Patch the mirrored copy; its other fields are as old as they were
+        entity = self.reports.get_entity(op.entity_id, op.folder_id)
+        if entity is None:
+            self.reports.forget_entity(op.entity_id, op.folder_id)
+            return
+        age = self.reports.entity_age_hours(op.entity_id, op.folder_id) or 0.0
+        fetched_at = time.time() - age * 3600
+        self.reports.put_entity(op.folder_id, {**entity, **as_entity_fields(op)}, fetched_at=fetched_at)
+
+    def _apply_report_create(self, op: WriteOperation, api_result, created_id: Optional[int]) -> None:
+        if not created_id:
+            return
+        year_entity_id = op.properties.get("שנת מס")
+        if op.client_entity_id and year_entity_id:
+            self.reports.set_report_id(op.folder_id, int(op.client_entity_id), int(year_entity_id), int(created_id))
+        returned = _returned_entity(api_result)
+        entity = returned if returned is not None else {"ID": int(created_id), **as_entity_fields(op)}
+        self.reports.put_entity(op.folder_id, entity)
+
+    def _apply_client_update(self, op: WriteOperation) -> None:
+        written = {p: op.properties[p] for p in CLIENT_REF_PROPS if p in op.properties}
+        current = self.mapping.get_client_refs(op.entity_id)
+        if current is None and len(written) < len(CLIENT_REF_PROPS):
+            # The other ref is unknown — let the next fetch read both
+            self.mapping.forget_client_refs(op.entity_id)
+            return
+        refs = dict(current or {})
+        refs.update({p: int(v) if v not in (None, "") else None for p, v in written.items()})
+        self.mapping.set_client_refs(op.entity_id, refs)
+
+    def save(self) -> None:
+        """Persist both caches (after the write-back)."""
+        if not self.applied:
+            return
+        for cache in (self.reports, self.mapping):
+            try:
+                cache.save()
+            except OSError as exc:
+                logger.warning("Could not persist write-through cache %s: %s", type(cache).__name__, exc)
+        logger.info("Write-through: %d successful writes folded into local caches", self.applied)
@@ -9,8 +9,8 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import (
-    Column, String, SmallInteger, Integer, Float, Text, DateTime,
-    ForeignKey, UniqueConstraint, CheckConstraint, JSON, Uuid,
+    Column, String, SmallInteger, Integer, Float, Text, DateTime, Boolean,
+    ForeignKey, UniqueConstraint, CheckConstraint, Index, JSON, Uuid, text,
 )
 from sqlalchemy.orm import DeclarativeBase, relationship
 
@@ -99,6 +99,9 @@ class RunMetrics(Base):
     status_preserved_count = Column(Integer, nullable=False, default=0)
     status_regression_flags = Column(Integer, nullable=False, default=0)
 
+    # IDOM rows reconciled against the previous run's Summit snapshot (not re-fetched)
+    carried_over_count = Column(Integer, nullable=False, default=0)
+
     processing_seconds = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
 
@@ -153,12 +156,15 @@ class Exception(Base):
 class WriteLog(Base):
     """
     Audit trail for Summit API write operations.
-    Every update/create is logged with before/after values.
+    Every update/create is logged with before/after values. Dry-run audits
+    are kept too (dry_run=True) — they never count as written or failed.
     """
     __tablename__ = "write_logs"
 
     id = Column(Uuid, primary_key=True, default=uuid.uuid4)
     run_id = Column(Uuid, ForeignKey("runs.id", ondelete="CASCADE"), nullable=False)
+    op_key = Column(String(32), nullable=True)  # WriteOperation.op_key — resume checkpoint
+    dry_run = Column(Boolean, nullable=False, default=False, server_default=text("false"))
     op_type = Column(String(20), nullable=False)
     entity_id = Column(Integer, nullable=True)
     folder_id = Column(String(20), nullable=False)
@@ -171,3 +177,49 @@ class WriteLog(Base):
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
 
     run = relationship("Run", backref="write_logs")
+
+    __table_args__ = (
+        Index("idx_write_logs_run_op_key", "run_id", "op_key"),
+    )
+
+
+class WriteJob(Base):
+    """
+    A live write-back — synchronous, background or retry-failed. Counters
+    advance with every audited op (committed together with its WriteLog
+    row), so a poll sees exactly what has been written so far.
+
+    At most one job per run is 'running': the partial unique index is the
+    guard, so two requests racing to start one cannot both get in. Jobs
+    still 'running' at startup were cut off by a restart and are failed.
+    """
+    __tablename__ = "write_jobs"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    run_id = Column(Uuid, ForeignKey("runs.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(20), nullable=False, default="running")
+    streaming = Column(Boolean, nullable=False, default=False)
+    total_ops = Column(Integer, nullable=True)  # None until the plan is known
+    done_ops = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    error_message = Column(Text, nullable=True)
+    warnings = Column(JSON, nullable=True)  # streamed planning warnings
+    started_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    run = relationship("Run", backref="write_jobs")
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('running', 'completed', 'failed')",
+            name="valid_write_job_status",
+        ),
+        Index("idx_write_jobs_run", "run_id"),
+        Index(
+            "uq_write_jobs_running_run", "run_id", unique=True,
+            sqlite_where=text("status = 'running'"), postgresql_where=text("status = 'running'"),
+        ),
+    )
@@ -42,10 +42,54 @@ def _startup_diagnostics():
             logger.info("DB tables verified/created")
         except Exception as exc:
             logger.error("Failed to create tables: %s", exc)
+        try:
+            interrupted = _fail_interrupted_write_jobs(engine)
+            if interrupted:
+                logger.warning("Write-back: %d jobs cut off by the last shutdown marked failed", interrupted)
+        except Exception as exc:
+            logger.error("Could not check for interrupted write jobs: %s", exc)
+
+    # Taxonomy preload + TTL refresh — off the request path, low-priority lane
+    if os.environ.get("SUMMIT_API_KEY"):
+        from .core import taxonomy
+        from .core.sumit_api_client import SummitAPIClient
+        taxonomy.registry.start(api_factory=lambda: SummitAPIClient(priority="low"))
+        logger.info("Taxonomy registry: background preload started (TTL %sh)", taxonomy.registry.ttl_hours)
+    else:
+        logger.info("Taxonomy registry: no Summit credentials, serving seed tables")
+
+    # Off-hours cache prewarm (needs Summit credentials — opt-in)
+    if os.environ.get("SUMIT_PREWARM_ENABLED") == "1":
+        from .core.prewarm import get_scheduler
+        try:
+            get_scheduler().start()
+        except ValueError as exc:
+            logger.error("Prewarm scheduler not started: %s", exc)
+    logger.info("Prewarm scheduler: %s", "enabled" if os.environ.get("SUMIT_PREWARM_ENABLED") == "1" else "disabled")
 
     logger.info("==========================")
 
 
+def _fail_interrupted_write_jobs(bind) -> int:
+    """
+    Write jobs run in threads of this process, so any still 'running' at
+    startup died with the previous one. Fail them — a running job blocks
+    every other write-back of its run.
+    """
+    from datetime import datetime, timezone
+
+    from sqlalchemy import update
+
+    from .db.models import WriteJob
+
+    with bind.begin() as conn:
+        return conn.execute(
+            update(WriteJob)
+            .where(WriteJob.status == "running")
+            .values(status="failed", error_message="interrupted", completed_at=datetime.now(timezone.utc))
+        ).rowcount
+
+
 @app.get("/health")
 def health():
     """
@@ -29,6 +29,16 @@ def outputs_dir(run_id: str) -> Path:
     return _ensure_dir(DATA_DIR / "outputs" / run_id)
 
 
+def artifacts_dir(run_id: str) -> Path:
+    """Directory for a run's intermediate artifacts (e.g. match result)."""
+    return _ensure_dir(DATA_DIR / "artifacts" / run_id)
+
+
+def parse_cache_dir() -> Path:
+    """Directory for parsed uploads, shared by all runs (see core/parse_cache.py)."""
+    return DATA_DIR / "parse_cache"
+
+
 def store_upload(run_id: str, filename: str, content: bytes) -> Path:
     """Persist an uploaded file and return the stored path."""
     dest = uploads_dir(run_id) / filename
@@ -45,9 +55,9 @@ def read_file(path: str) -> Optional[bytes]:
 
 
 def cleanup_run_files(run_id: str) -> int:
-    """Delete all stored files for a run (uploads + outputs). Returns bytes freed."""
+    """Delete all stored files for a run (uploads + outputs + artifacts). Returns bytes freed."""
     freed = 0
-    for subdir in ("uploads", "outputs"):
+    for subdir in ("uploads", "outputs", "artifacts"):
         d = DATA_DIR / subdir / run_id
         if d.exists():
             for f in d.rglob("*"):
@@ -0,0 +1,234 @@
+"""
+Row-by-row reference implementation of SyncEngine.sync.
+
+The engine is columnar; this is the original one-record-at-a-time loop it
+replaced, kept only to check the engine against (tests/test_sync_engine.py,
+tests/test_matching.py) and to time it (scripts/bench_sync_engine.py).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from src.core.config import STATUS_COMPLETED
+from src.core.matching import MatchIndex, strategy_counts
+from src.core.normalize import split_id_label
+from src.core.sync_engine import (
+    DIFF_COLUMNS, SECONDARY_STRATEGIES, SyncEngine, SyncResult, _secondary_match_warning,
+)
+
+
+@dataclass
+class FieldChange:
+    """Record of a field change."""
+    מזהה: str
+    שם: str
+    field_name: str
+    old_value: Any
+    new_value: Any
+    change_type: str  # 'update', 'status_completion', 'extension_update'
+
+
+def sync_rowwise(
+    engine: SyncEngine,
+    idom_df: pd.DataFrame,
+    sumit_df: pd.DataFrame,
+    sumit_lookup: Dict[str, pd.Series],
+    tax_year: int,
+) -> SyncResult:
+    """Row-by-row SyncEngine.sync: the same SyncResult, one IDOM record at a time."""
+    result = SyncResult()
+    result.total_idom_records = len(idom_df)
+    result.total_sumit_records = len(sumit_df)
+
+    matched_records = []
+    unmatched_records = []
+    changes: List[FieldChange] = []
+
+    index = MatchIndex(sumit_lookup)
+    strategies = []
+
+    for _, idom_row in idom_df.iterrows():
+        match_key = idom_row['מספר_תיק']
+
+        # Exact, then zero-stripped / digits-only fallback — O(1) each
+        sumit_row, match = index.match_row(match_key)
+        if match is not None:
+            strategies.append(match.strategy)
+            if match.strategy in SECONDARY_STRATEGIES:
+                result.warnings.append(
+                    _secondary_match_warning(match_key, match.sumit_key, match.strategy)
+                )
+
+        if sumit_row is None:
+            unmatched_records.append(_create_exception_row(idom_row, 'no_sumit_match'))
+            continue
+
+        import_row, row_changes, flags = _process_match(engine, idom_row, sumit_row)
+
+        matched_records.append(import_row)
+        changes.extend(row_changes)
+
+        if flags.get('status_regression'):
+            result.status_regression_flags += 1
+            if 'regression_detail' in flags:
+                result.regression_records.append(flags['regression_detail'])
+        if flags.get('status_completed'):
+            result.status_completed_count += 1
+        else:
+            result.status_preserved_count += 1
+
+    result.match_strategy_counts = strategy_counts(strategies)
+    result.matched_count = len(matched_records)
+    result.unmatched_count = len(unmatched_records)
+
+    if matched_records:
+        result.import_df = pd.DataFrame(matched_records)[engine.config.import_schema.columns]
+
+    if unmatched_records:
+        result.exceptions_df = pd.DataFrame(unmatched_records)
+
+    result.diff_df = _build_diff_report(changes)
+    result.changed_count = len([c for c in changes if c.change_type != 'no_change'])
+    result.unchanged_count = result.matched_count - len(set(c.מזהה for c in changes if c.change_type != 'no_change'))
+
+    if result.unmatched_count > 0:
+        result.warnings.append(
+            f"⚠️ {result.unmatched_count} רשומות IDOM ללא התאמה ב-SUMIT. "
+            "ייתכן ייצוא SUMIT חלקי/מסונן, או לקוחות חדשים."
+        )
+
+    return result
+
+
+def _process_match(
+    engine: SyncEngine, idom_row: pd.Series, sumit_row: pd.Series,
+) -> Tuple[Dict[str, Any], List[FieldChange], Dict[str, Any]]:
+    """One matched record pair → (import_row_dict, changes_list, flags_dict)."""
+    import_row = {}
+    changes = []
+    flags: Dict[str, Any] = {'status_completed': False, 'status_regression': False}
+
+    sumit_id = str(sumit_row.get('מזהה', ''))
+    if sumit_id.endswith('.0'):
+        sumit_id = sumit_id[:-2]
+
+    idom_ref = str(idom_row.get('מספר_תיק', ''))
+    client_name = _extract_name(idom_row, sumit_row)
+
+    current_status = sumit_row.get('סטטוס', '')
+    current_status_str = str(current_status) if pd.notna(current_status) else ''
+    is_currently_completed = STATUS_COMPLETED in current_status_str
+
+    has_submission = pd.notna(idom_row.get('תאריך_הגשה'))
+
+    if has_submission:
+        new_status = STATUS_COMPLETED
+        flags['status_completed'] = True
+    elif is_currently_completed:
+        # Preserve completed status - never downgrade
+        new_status = current_status_str
+        flags['status_regression'] = True
+        flags['regression_detail'] = {
+            'idom_ref': idom_ref,
+            'sumit_ref': sumit_id,
+            'client_name': client_name,
+            'status': current_status_str,
+        }
+    else:
+        new_status = current_status_str
+
+    idom_extension = idom_row.get('תאריך_ארכה')
+    sumit_extension = sumit_row.get('אורכה משרד')
+    new_extension = idom_extension if pd.notna(idom_extension) else sumit_extension
+
+    idom_submission = idom_row.get('תאריך_הגשה')
+    sumit_submission = sumit_row.get('הגשה')
+    new_submission = idom_submission if pd.notna(idom_submission) else sumit_submission
+
+    for import_col, source in engine.import_mapping.items():
+        if source == '_DERIVED_STATUS':
+            import_row[import_col] = new_status
+            if new_status != current_status_str:
+                changes.append(FieldChange(
+                    sumit_id, client_name, 'סטטוס', current_status_str, new_status,
+                    'status_completion' if has_submission else 'status_preserved',
+                ))
+        elif source == '_DERIVED_EXTENSION':
+            import_row[import_col] = new_extension
+            old_ext = sumit_row.get('אורכה משרד')
+            if _values_differ(new_extension, old_ext):
+                changes.append(FieldChange(
+                    sumit_id, client_name, 'אורכה משרד', old_ext, new_extension, 'extension_update',
+                ))
+        elif source == '_DERIVED_SUBMISSION':
+            import_row[import_col] = new_submission
+            old_sub = sumit_row.get('הגשה')
+            if _values_differ(new_submission, old_sub):
+                changes.append(FieldChange(
+                    sumit_id, client_name, 'הגשה', old_sub, new_submission, 'update',
+                ))
+        else:
+            value = sumit_row.get(source, '')
+            import_row[import_col] = value if pd.notna(value) else ''
+
+    return import_row, changes, flags
+
+
+def _create_exception_row(idom_row: pd.Series, reason: str) -> Dict[str, Any]:
+    return {
+        'exception_type': reason,
+        'מספר_תיק': idom_row.get('מספר_תיק', ''),
+        'שם': idom_row.get('שם', ''),
+        'תאריך_ארכה': idom_row.get('תאריך_ארכה', ''),
+        'תאריך_הגשה': idom_row.get('תאריך_הגשה', ''),
+        'קוד_שידור': idom_row.get('קוד_שידור', ''),
+        'notes': 'רשומת IDOM ללא התאמה בייצוא SUMIT. ייתכן לקוח חדש או סינון ייצוא.'
+    }
+
+
+def _extract_name(idom_row: pd.Series, sumit_row: pd.Series) -> str:
+    name = idom_row.get('שם', '')
+    if pd.notna(name) and str(name).strip():
+        return str(name).strip()
+    return split_id_label(sumit_row.get('כרטיס לקוח', ''))[1]
+
+
+def _values_differ(val1: Any, val2: Any) -> bool:
+    if pd.isna(val1) and pd.isna(val2):
+        return False
+    if pd.isna(val1) or pd.isna(val2):
+        return True
+    str1 = str(val1).strip()
+    str2 = str(val2).strip()
+    if isinstance(val1, (datetime, pd.Timestamp)):
+        str1 = val1.strftime('%Y-%m-%d')
+    if isinstance(val2, (datetime, pd.Timestamp)):
+        str2 = val2.strftime('%Y-%m-%d')
+    return str1 != str2
+
+
+def _build_diff_report(changes: List[FieldChange]) -> pd.DataFrame:
+    if not changes:
+        return pd.DataFrame(columns=DIFF_COLUMNS)
+    return pd.DataFrame([
+        {
+            'מזהה': c.מזהה,
+            'שם': c.שם,
+            'field': c.field_name,
+            'old_value': _format_value(c.old_value),
+            'new_value': _format_value(c.new_value),
+            'change_type': c.change_type,
+        }
+        for c in changes
+    ])
+
+
+def _format_value(value: Any) -> str:
+    if pd.isna(value):
+        return ''
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)
@@ -186,6 +186,13 @@ def test_full_pipeline(client, golden_idom_file, golden_sumit_file):
     assert len(detail["files"]) == 5  # 2 uploads + 3 outputs
     assert len(detail["exceptions"]) >= 2  # unmatched + regression
 
+    # Matching pass persisted for the write-back stages
+    from src.core.matching import MatchResult
+    import src.storage.file_store as fs
+    match_result = MatchResult.load(fs.DATA_DIR / "artifacts" / run_id / "match_result.json")
+    assert match_result.matched_count == 3
+    assert match_result.unmatched == ["555555555"]
+
 
 def test_list_runs(client):
     client.post("/runs", json={"year": 2024, "report_type": "financial"})
@@ -0,0 +1,41 @@
+"""IDOM deduplication: latest submission, else latest extension; every duplicate reported."""
+import pandas as pd
+
+from src.core.idom_parser import IDOMParser
+
+
+def _frame(rows, index=None):
+    df = pd.DataFrame(rows, columns=["מספר_תיק", "שם", "תאריך_ארכה", "תאריך_הגשה"], index=index)
+    for col in ("תאריך_ארכה", "תאריך_הגשה"):
+        df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def test_winner_rules_and_conflicts():
+    df = _frame([
+        ("300", "a", "2025-06-30", None),
+        ("100", "b", "2025-09-30", None),
+        ("300", "c", "2025-01-31", "2025-04-01"),   # submission beats a later extension
+        ("200", "d", None, None),
+        ("100", "e", "2025-12-31", None),           # latest extension
+        ("300", "f", "2025-12-31", "2025-04-01"),   # same submission, later row: loses the tie
+        ("200", "g", None, None),
+        ("400", "h", "2025-06-30", None),
+    ], index=[10, 11, 12, 13, 14, 15, 16, 17])
+    dedup, conflicts = IDOMParser().deduplicate(df)
+
+    # Key order, original index labels, file order breaks ties
+    assert dedup["מספר_תיק"].tolist() == ["100", "200", "300", "400"]
+    assert dedup["שם"].tolist() == ["e", "d", "c", "h"]
+    assert dedup.index.tolist() == [14, 13, 12, 17]
+    assert list(dedup.columns) == list(df.columns)
+
+    assert conflicts["שם"].tolist() == ["b", "e", "d", "g", "a", "c", "f"]
+    assert set(conflicts["_conflict_reason"]) == {"duplicate_מספר_תיק"}
+
+
+def test_no_duplicates_gives_empty_conflicts():
+    df = _frame([("2", "a", "2025-06-30", None), ("1", "b", None, "2025-05-01")])
+    dedup, conflicts = IDOMParser().deduplicate(df)
+    assert dedup["שם"].tolist() == ["b", "a"]
+    assert conflicts.empty
@@ -0,0 +1,103 @@
+"""SHAAM paste text: parsed directly, same records as the XLSX it would have been pasted into."""
+import pandas as pd
+from openpyxl import Workbook
+
+from src.core.idom_parser import parse_idom_file
+from src.core.idom_workbook import decode_paste, parse_idom_paste, parse_idom_workbook, read_paste
+from tests.conftest import IDOM_ROWS
+from tests.test_api import client, test_db  # noqa: F401  (fixtures)
+
+GOLDEN_HEADERS = ["מספר תיק", "שם משפחה ופרטי", "תאריך ארכה", "תאריך הגשה", "קוד שידור", "ס'ש", "מח"]
+
+
+def _day_first(iso):
+    return "" if not iso else "/".join(reversed(iso.split("-")))
+
+
+def _golden_paste():
+    lines = ["\t".join(GOLDEN_HEADERS)]
+    for tik, name, ext, sub, code, year, mch in IDOM_ROWS:
+        lines.append("\t".join([tik, name, _day_first(ext), _day_first(sub), code, year, mch]))
+    return "\r\n".join(lines) + "\r\n"
+
+
+def test_header_paste_matches_the_xlsx_parse(golden_idom_file):
+    sheet = parse_idom_paste(_golden_paste(), "financial")
+    expected, expected_conflicts, _ = parse_idom_file(str(golden_idom_file))
+    assert sheet.error is None
+    pd.testing.assert_frame_equal(sheet.records, expected)
+    pd.testing.assert_frame_equal(sheet.conflicts, expected_conflicts)
+
+
+def test_freeform_paste_matches_the_sheet_it_would_be_pasted_into(tmp_path):
+    rows = [
+        ["", "30/06/2025", "1", "7", "25", "כהן יעקב", "051234567"],
+        ["", "15/06/2025", "1", "", "38", "לוי שרה", "987654321"],
+        ["", "31/12/2025", "2", "7", "", "כהן יעקב", "051234567"],
+    ]
+    wb = Workbook()
+    wb.active.title = "חברות"
+    for row in rows:
+        wb.active.append([v or None for v in row])
+    path = tmp_path / "paste.xlsx"
+    wb.save(path)
+    expected = parse_idom_workbook(str(path)).sheets[0]
+
+    # Clipboard text: blank lines, a row of empty cells, trailing tabs
+    text = "\n" + "\n".join("\t".join(r) for r in rows[:2]) + "\n\t\t\t\t\t\t\n" + "\t".join(rows[2]) + "\t\t\n"
+    sheet = parse_idom_paste(text, "financial")
+    assert sheet.error is None
+    # Numbers are typed as Excel types them: the key loses its leading zero either way
+    assert sheet.records["מספר_תיק"].tolist() == ["51234567", "987654321"]
+    assert sheet.records["תאריך_ארכה"].tolist() == [pd.Timestamp("2025-12-31"), pd.Timestamp("2025-06-15")]
+    for col in ("מספר_תיק", "שם", "תאריך_ארכה", "קוד_שידור"):
+        assert sheet.records[col].tolist() == expected.records[col].tolist()
+    assert len(sheet.conflicts) == len(expected.conflicts) == 2
+
+
+def test_ambiguous_dates_are_day_first():
+    sheet = parse_idom_paste("\t01/06/2025\t1\t7\t25\tלוי שרה\t987654321\n\t05.07.2025\t1\t7\t25\tכהן\t123456789\n")
+    assert sorted(sheet.records["תאריך_ארכה"].tolist()) == [pd.Timestamp("2025-06-01"), pd.Timestamp("2025-07-05")]
+
+
+def test_quote_marks_are_kept():
+    sheet = parse_idom_paste('\t30/06/2025\t1\t7\t25\t"גל" בע"מ\t987654321\n\t30/06/2025\t1\t7\t25\tכהן "הבן"\t123456789\n')
+    assert sorted(sheet.records["שם"].tolist()) == ['"גל" בע"מ', 'כהן "הבן"']
+
+
+def test_clipboard_encodings():
+    text = "מספר תיק\tשם\n051234567\tכהן\n"
+    for encoded in (text.encode("utf-16"), text.encode("utf-8-sig"), text.encode("cp1255")):
+        assert decode_paste(encoded) == text
+    raw = read_paste(text)
+    assert list(raw.columns) == [0, 1] and raw.iloc[1].tolist() == [51234567, "כהן"]
+
+
+def test_posted_paste_runs_like_an_xlsx_upload(client, golden_idom_file, golden_sumit_file):  # noqa: F811
+    def _run(upload_idom):
+        run_id = client.post("/runs", json={"year": 2024, "report_type": "financial"}).json()["id"]
+        upload_idom(run_id)
+        with open(golden_sumit_file, "rb") as f:
+            client.post(f"/runs/{run_id}/upload", data={"file_role": "sumit_upload"},
+                        files={"file": ("sumit.xlsx", f, "application/octet-stream")})
+        assert client.post(f"/runs/{run_id}/execute").status_code == 200
+        return client.get(f"/runs/{run_id}").json()
+
+    def _paste(run_id):
+        resp = client.post(f"/runs/{run_id}/idom-paste", json={"text": _golden_paste()})
+        assert resp.status_code == 200
+        assert resp.json()["original_name"] == "idom_paste.tsv"
+        assert client.post(f"/runs/{run_id}/idom-paste", json={"text": "x"}).status_code == 409
+
+    def _xlsx(run_id):
+        with open(golden_idom_file, "rb") as f:
+            client.post(f"/runs/{run_id}/upload", data={"file_role": "idom_upload"},
+                        files={"file": ("idom.xlsx", f, "application/octet-stream")})
+
+    pasted, uploaded = _run(_paste), _run(_xlsx)
+    rows = client.get(f"/runs/{pasted['id']}/drill-down/idom_records").json()
+    assert rows["total_rows"] == len(IDOM_ROWS) and rows["columns"] == GOLDEN_HEADERS
+    assert pasted["status"] == uploaded["status"]
+    for metrics in (pasted["metrics"], uploaded["metrics"]):
+        metrics.pop("processing_seconds")
+    assert pasted["metrics"] == uploaded["metrics"]
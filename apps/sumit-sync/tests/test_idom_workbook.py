@@ -0,0 +1,70 @@
+"""IDOM workbook: one open, one read per sheet, only the sheets that are asked for."""
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from src.api import routes
+from src.core import idom_workbook
+from src.core.idom_workbook import IDOMWorkbook, parse_idom_workbook
+
+HEADERS = ["מספר תיק", "שם משפחה ופרטי", "תאריך ארכה", "תאריך הגשה", "פקיד שומה", "קוד שידור"]
+
+
+@pytest.fixture()
+def workbook_path(tmp_path):
+    wb = Workbook()
+    wb.active.title = "הוראות"
+    wb.active.append(["הוראות"])
+    for sheet, keys in (("עצמאים", ["100000001", "100000002"]), ("חברות", ["510000001", "510000002", "510000003"])):
+        ws = wb.create_sheet(sheet)
+        ws.append(["תבנית אידום"])
+        ws.append(["הוראות מילוי"])
+        ws.append(HEADERS)
+        ws.append(["9 ספרות", "", "DD/MM/YYYY", "", "", ""])
+        for key in keys:
+            ws.append([key, f"לקוח {key}", "30/06/2025", "", 25, 1])
+    ws = wb.create_sheet("מנהלים")
+    ws.append([None, "30/06/2025", 1, "", 25, "מנהל", "200000001"])
+    path = tmp_path / "idom.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+def test_sheets_are_parsed_on_demand_from_one_open(workbook_path, monkeypatch):
+    def _no_reopen(*args, **kwargs):
+        raise AssertionError("workbook re-opened through read_excel")
+
+    monkeypatch.setattr(pd, "read_excel", _no_reopen)
+    with IDOMWorkbook(workbook_path) as wb:
+        assert wb.data_sheets == ["עצמאים", "חברות", "מנהלים"]
+        assert wb.sheets_for("financial") == ["חברות"]
+        sheet = wb.sheet("חברות")
+        assert list(wb._parsed) == ["חברות"]
+        assert sheet.report_type == "financial" and sheet.error is None
+        assert sorted(sheet.records["מספר_תיק"].astype(str)) == ["510000001", "510000002", "510000003"]
+        assert wb.sheet("חברות") is sheet
+
+
+def test_full_and_selective_results_agree(workbook_path):
+    full = parse_idom_workbook(workbook_path)
+    assert [s.sheet_name for s in full.sheets] == ["עצמאים", "חברות", "מנהלים"]
+    assert full.unmapped_sheets == ["מנהלים"]
+
+    only = parse_idom_workbook(workbook_path, sheet_names=["חברות"])
+    assert [s.sheet_name for s in only.sheets] == ["חברות"]
+    assert only.sheets[0].records.equals(full.sheets[1].records)
+    assert only.total_records == 3
+
+
+def test_load_idom_dataframe_parses_only_the_report_type_sheet(workbook_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(routes.file_store, "DATA_DIR", tmp_path / "data")
+    parsed = []
+    real = idom_workbook._parse_sheet
+
+    def _counting(xl, sheet_name):
+        parsed.append(sheet_name)
+        return real(xl, sheet_name)
+
+    monkeypatch.setattr(idom_workbook, "_parse_sheet", _counting)
+    df, _, _ = routes._load_idom_dataframe(workbook_path, "annual")
+    assert parsed == ["עצמאים"] and len(df) == 2
@@ -0,0 +1,177 @@
+"""Tests for incremental re-sync (IDOM row hashes + previous-run Summit snapshot)."""
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from src.core.config import get_config
+from src.core.incremental import (
+    REASON_CHANGED,
+    REASON_NEW,
+    REASON_STALE,
+    REASON_UNMATCHED,
+    REASON_WRITTEN,
+    SummitSnapshot,
+    fetch_incremental,
+    mark_carried_over,
+    row_hashes,
+)
+from src.core.sumit_parser import SUMITParser
+from src.core.sync_engine import run_sync
+
+IN_PROGRESS = "1125886200: 3) בעבודה"
+
+
+def _idom(**overrides):
+    df = pd.DataFrame({
+        "מספר_תיק": ["111", "222", "333", "444"],
+        "שם": ["א", "ב", "ג", "ד"],
+        "תאריך_ארכה": pd.to_datetime(["2024-06-30", None, "2024-09-30", None]),
+        "תאריך_הגשה": pd.to_datetime([None, None, "2024-05-01", None]),
+        "קוד_שידור": ["1", "2", "3", "4"],
+    })
+    for col, values in overrides.items():
+        df[col] = values
+    return df
+
+
+def _sumit(keys, first_id=1000):
+    return pd.DataFrame({
+        "מזהה": [str(first_id + i) for i in range(len(keys))],
+        "שנת מס": "1125575564: 2024",
+        "כרטיס לקוח": ["%d: לקוח" % i for i in range(len(keys))],
+        "עובד ע. מקדימה": "a",
+        "עובד מטפל": "b",
+        "סטטוס": IN_PROGRESS,
+        "הערות": "",
+        "חבות מס": 0,
+        "תחילת עבודה": pd.NaT,
+        'אורכה מ"ה': pd.to_datetime(["2024-06-30"] * len(keys)),
+        "אורכה משרד": pd.NaT,
+        "סיום עבודה מקדימה": pd.NaT,
+        "הגשה": pd.NaT,
+        "_match_key": list(keys),
+    })
+
+
+class FakeFetch:
+    """fetch_sumit_data_targeted stand-in serving rows from a fixed SUMIT frame."""
+
+    def __init__(self, sumit_df):
+        self.sumit_df = sumit_df
+        self.calls = []
+
+    def __call__(self, config, tax_year, idom_company_numbers):
+        self.calls.append(list(idom_company_numbers))
+        df = self.sumit_df[self.sumit_df["_match_key"].isin(idom_company_numbers)].reset_index(drop=True)
+        return df, SUMITParser(config).build_lookup(df), []
+
+
+def _first_run(config, idom_df, sumit_df, fetched_now):
+    fetch = FakeFetch(sumit_df)
+    first = fetch_incremental(config, 2024, idom_df, fetch)
+    result = run_sync(idom_df, first.sumit_df, first.sumit_lookup, config, 2024)
+    snapshot = SummitSnapshot.build("run-1", 2024, "financial", idom_df, first.sumit_df, {}, now=fetched_now)
+    return snapshot, result.match_result
+
+
+def test_row_hashes_stable_and_column_order_independent():
+    df = _idom()
+    hashes = row_hashes(df)
+    assert set(hashes) == {"111", "222", "333", "444"}
+    assert row_hashes(df[list(reversed(df.columns))]) == hashes
+
+    edited = _idom(שם=["א", "ב", "שונה", "ד"])
+    changed = row_hashes(edited)
+    assert changed["333"] != hashes["333"]
+    assert changed["111"] == hashes["111"]
+
+
+def test_row_hashes_blank_for_duplicate_keys():
+    df = _idom(**{"מספר_תיק": ["111", "111", "333", "444"]})
+    assert row_hashes(df)["111"] == ""
+
+
+def test_first_run_fetches_everything():
+    config = get_config("financial")
+    fetch = FakeFetch(_sumit(["111", "222", "333"]))
+    out = fetch_incremental(config, 2024, _idom(), fetch)
+    assert fetch.calls == [["111", "222", "333", "444"]]
+    assert out.plan.carried == {}
+    assert out.plan.reasons == {REASON_NEW: 4}
+
+
+def test_unchanged_rows_carried_changed_and_unmatched_fetched(tmp_path):
+    config = get_config("financial")
+    sumit_df = _sumit(["111", "222", "333"])
+    now = datetime.now(timezone.utc)
+    snapshot, prev_match = _first_run(config, _idom(), sumit_df, now - timedelta(hours=1))
+
+    # Round-trip through disk, as the routes do
+    snapshot.save(tmp_path / "snap.json")
+    snapshot = SummitSnapshot.load(tmp_path / "snap.json")
+
+    idom_df = _idom(שם=["א", "ב", "שונה", "ד"])
+    fetch = FakeFetch(sumit_df)
+    out = fetch_incremental(config, 2024, idom_df, fetch, previous=snapshot, previous_match=prev_match)
+
+    assert fetch.calls == [["333", "444"]]
+    assert out.plan.carried == {"111": "1000", "222": "1001"}
+    assert out.plan.reasons == {REASON_CHANGED: 1, REASON_UNMATCHED: 1}
+    assert sorted(out.sumit_df["מזהה"]) == ["1000", "1001", "1002"]
+    assert out.sumit_df['אורכה מ"ה'].dtype.kind == "M"
+
+    # Reconciling against the merged frame gives the same result as a full fetch
+    merged = run_sync(idom_df, out.sumit_df, out.sumit_lookup, config, 2024)
+    full = run_sync(idom_df, sumit_df, SUMITParser(config).build_lookup(sumit_df), config, 2024)
+    assert merged.matched_count == full.matched_count == 3
+    assert merged.changed_count == full.changed_count
+    pd.testing.assert_frame_equal(
+        merged.import_df.sort_values("מזהה").reset_index(drop=True),
+        full.import_df.sort_values("מזהה").reset_index(drop=True),
+        check_dtype=False,
+    )
+
+    mark_carried_over(merged, out.plan)
+    assert merged.carried_over_keys == ["111", "222"]
+    assert merged.carried_over_count == 2
+    assert any("run-1" in w for w in merged.warnings)
+
+
+def test_stale_and_written_records_are_refetched():
+    config = get_config("financial")
+    sumit_df = _sumit(["111", "222", "333"])
+    now = datetime.now(timezone.utc)
+    snapshot, prev_match = _first_run(config, _idom(), sumit_df, now - timedelta(hours=10))
+    snapshot.records["1001"]["fetched_at"] = (now - timedelta(hours=100)).isoformat()
+
+    fetch = FakeFetch(sumit_df)
+    out = fetch_incremental(
+        config, 2024, _idom(), fetch,
+        previous=snapshot, previous_match=prev_match,
+        last_writes={"1002": now - timedelta(hours=1), "1000": now - timedelta(hours=20)},
+        max_age_hours=72,
+    )
+    # 1000 was written before it was fetched → still carried
+    assert out.plan.carried == {"111": "1000"}
+    assert out.plan.reasons == {REASON_STALE: 1, REASON_WRITTEN: 1, REASON_UNMATCHED: 1}
+    assert fetch.calls == [["222", "333", "444"]]
+    # The carried record keeps its original fetch time in the next snapshot
+    assert out.fetched_at == {"1000": snapshot.records["1000"]["fetched_at"]}
+
+
+def test_everything_carried_skips_fetch():
+    config = get_config("financial")
+    sumit_df = _sumit(["111", "222", "333", "444"])
+    snapshot, prev_match = _first_run(config, _idom(), sumit_df, datetime.now(timezone.utc))
+
+    fetch = FakeFetch(sumit_df)
+    out = fetch_incremental(config, 2024, _idom(), fetch, previous=snapshot, previous_match=prev_match)
+    assert fetch.calls == []
+    assert len(out.plan.carried) == 4
+    assert len(out.sumit_lookup) == 4
+
+
+def test_snapshot_load_missing_or_corrupt(tmp_path):
+    assert SummitSnapshot.load(tmp_path / "missing.json") is None
+    (tmp_path / "bad.json").write_text("{", encoding="utf-8")
+    assert SummitSnapshot.load(tmp_path / "bad.json") is None
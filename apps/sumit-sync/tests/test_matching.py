@@ -0,0 +1,170 @@
+"""Tests for the IDOM→SUMIT match index."""
+import pandas as pd
+
+from src.core.config import get_config
+from src.core.matching import (
+    MatchIndex,
+    MatchResult,
+    MatchedPair,
+    digits_only,
+    strategy_counts,
+    STRATEGY_EXACT,
+    STRATEGY_ZERO_STRIPPED,
+    STRATEGY_DIGITS_ONLY,
+)
+from src.core.sumit_parser import SUMITParser
+from src.core.sync_engine import SyncEngine
+from tests.sync_reference import sync_rowwise
+
+
+def _lookup(*keys):
+    return {k: pd.Series({"מזהה": str(i), "_match_key": k}, name=i) for i, k in enumerate(keys)}
+
+
+def test_digits_only_undoes_float_formatting():
+    assert digits_only("0123456.0") == "123456"
+    assert digits_only(123456.0) == "123456"
+    assert digits_only("51-234567-8") == "512345678"
+    assert digits_only(None) == ""
+    assert digits_only(float("nan")) == ""
+
+
+def test_exact_match():
+    index = MatchIndex(_lookup("123", "0456"))
+    m = index.match("0456")
+    assert m.strategy == STRATEGY_EXACT
+    assert m.sumit_key == "0456"
+
+
+def test_zero_stripped_first_key_in_insertion_order_wins():
+    index = MatchIndex(_lookup("0999", "999", "00999x"))
+    m = index.match("000999")
+    assert m.strategy == STRATEGY_ZERO_STRIPPED
+    assert m.sumit_key == "0999"
+
+
+def test_digits_only_match_from_float_formatted_key():
+    index = MatchIndex(_lookup("123456789"))
+    row, m = index.match_row("123456789.0")
+    assert m.strategy == STRATEGY_DIGITS_ONLY
+    assert row["מזהה"] == "0"
+
+
+def test_empty_and_missing_keys_never_match():
+    index = MatchIndex(_lookup("0", "123"))
+    assert index.match("") is None
+    assert index.match(None) is None
+    assert index.match(float("nan")) is None
+    assert index.match("555") is None
+
+
+def test_records_are_deduplicated_across_variants():
+    config = get_config("financial")
+    df = pd.DataFrame({"מזהה": ["1", "2"], "_match_key": ["0123", "456"]})
+    lookup = SUMITParser(config).build_lookup(df)
+    assert len(lookup) == 3          # "0123", "123", "456"
+    index = MatchIndex(lookup)
+    assert len(index) == 2
+    assert index.frame(df)["מזהה"].tolist() == ["1", "2"]
+
+
+def test_match_series_agrees_with_scalar_match():
+    index = MatchIndex(_lookup("0999", "123", "456"))
+    keys = pd.Series(["0999", "00123", "456.0", "777", "", None])
+    out = index.match_series(keys)
+    for key, (_, row) in zip(keys, out.iterrows()):
+        m = index.match(key)
+        if m is None:
+            assert row["position"] == -1 and row["strategy"] is None
+        else:
+            assert (row["position"], row["sumit_key"], row["strategy"]) == (m.position, m.sumit_key, m.strategy)
+    assert strategy_counts(out["strategy"]) == {
+        STRATEGY_EXACT: 1, STRATEGY_ZERO_STRIPPED: 1, STRATEGY_DIGITS_ONLY: 1,
+    }
+
+
+def test_sync_reports_strategy_counts():
+    config = get_config("financial")
+    sumit_df = pd.DataFrame({
+        "מזהה": ["1", "2", "3"],
+        "כרטיס לקוח": ["1: a", "2: b", "3: c"],
+        "סטטוס": ["", "", ""],
+        "_match_key": ["111", "0222", "333"],
+    })
+    idom_df = pd.DataFrame({
+        "מספר_תיק": ["111", "00222", "333.0", "444"],
+        "שם": ["a", "b", "c", "d"],
+        "תאריך_ארכה": pd.NaT,
+        "תאריך_הגשה": pd.NaT,
+    })
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    engine = SyncEngine(config)
+
+    columnar = engine.sync(idom_df, sumit_df, lookup, 2024)
+    rowwise = sync_rowwise(engine, idom_df, sumit_df, lookup, 2024)
+    expected = {STRATEGY_EXACT: 1, STRATEGY_ZERO_STRIPPED: 1, STRATEGY_DIGITS_ONLY: 1}
+    assert columnar.match_strategy_counts == expected
+    assert rowwise.match_strategy_counts == expected
+    assert columnar.warnings == rowwise.warnings
+    assert columnar.unmatched_count == 1
+
+
+# ── MatchResult artifact ─────────────────────────────────────────
+
+def test_match_result_round_trip(tmp_path):
+    index = MatchIndex(_lookup("111", "0222"))
+    result = index.match_all(pd.Series(["111", "00222", "999"]))
+    path = tmp_path / "match_result.json"
+    result.save(path)
+
+    loaded = MatchResult.load(path)
+    assert loaded.pairs == result.pairs
+    assert loaded.unmatched == ["999"]
+    assert loaded.strategy_counts() == {
+        STRATEGY_EXACT: 1, STRATEGY_ZERO_STRIPPED: 1, STRATEGY_DIGITS_ONLY: 0,
+    }
+    assert loaded.covers(["111", "999"])
+    assert not loaded.covers(["333"])
+
+
+def test_match_result_load_missing_or_corrupt(tmp_path):
+    assert MatchResult.load(tmp_path / "nope.json") is None
+    bad = tmp_path / "bad.json"
+    bad.write_text("{not json", encoding="utf-8")
+    assert MatchResult.load(bad) is None
+
+
+def test_resolve_replays_pairs_by_record_id_without_matching():
+    index = MatchIndex(_lookup("111", "222"))
+    # Artifact pairs IDOM "111" with record ID "1" (key "222") — replay must honor it
+    artifact = MatchResult(pairs={"111": MatchedPair("111", "222", "1", STRATEGY_EXACT)})
+    out = index.resolve(artifact, pd.Series(["111"]))
+    assert out.loc[0, "position"] == 1
+    assert out.loc[0, "sumit_key"] == "222"
+
+
+def test_resolve_rechecks_previously_unmatched_keys():
+    """A report created after the pass must not be planned for creation again."""
+    artifact = MatchResult(unmatched=["333"])
+    index = MatchIndex(_lookup("333"))
+    out = index.resolve(artifact, pd.Series(["333"]))
+    assert out.loc[0, "position"] == 0
+
+
+def test_build_write_plan_consumes_match_result(monkeypatch):
+    config = get_config("financial")
+    sumit_df = pd.DataFrame({"מזהה": ["1001"], "סטטוס": [""], "_match_key": ["111"]})
+    idom_df = pd.DataFrame({
+        "מספר_תיק": ["111"], "שם": ["a"],
+        "תאריך_ארכה": pd.NaT, "תאריך_הגשה": pd.NaT,
+    })
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    engine = SyncEngine(config)
+    match_result = engine.match(idom_df, lookup)
+
+    def _no_matching(self, keys):
+        raise AssertionError("build_write_plan re-matched")
+    monkeypatch.setattr(MatchIndex, "match_series", _no_matching)
+
+    plan = engine.build_write_plan(idom_df, sumit_df, lookup, 2024, match_result=match_result)
+    assert plan.operations[0].entity_id == 1001
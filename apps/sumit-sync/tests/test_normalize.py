@@ -0,0 +1,72 @@
+"""Normalization kernel: every Series version equals its scalar reference, value by value."""
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.normalize import (
+    encode_israel_midnight, extract_year, extract_years, israel_day, israel_days,
+    israel_midnights, normalize_key, normalize_keys, split_id_label, split_id_labels,
+)
+
+KEYS = [
+    None, np.nan, "", "nan", "051234567", "051-234-567", " 51 234 567 ", 514000001, 514000001.0,
+    "514000001.0", " 0123.00 ", "0.0", "-0.00", "-7.0", "1.", ".5", "1.5", "12345678.9", "abc.def",
+    "inf.0", "1e+20", 1e20, 1234567890123456.0, "0000000000000000001.0", "١٢٣.0", "١٢٣", "12_3.5",
+    "ח.פ 510000000", True, 0,
+]
+
+
+def test_normalize_keys_matches_scalar_rule():
+    # Repeated index labels, as a concatenated frame has
+    values = pd.Series(KEYS, index=[7] * len(KEYS), dtype=object)
+    out = normalize_keys(values)
+    assert list(out.index) == list(values.index)
+    assert list(out) == [normalize_key(v) for v in KEYS]
+    assert out.iloc[4] == "051234567" and out.iloc[10] == "123"
+
+
+@pytest.mark.parametrize("series", [
+    pd.Series([514000001.0, np.nan, 51.0]),
+    pd.Series([510000000, 1, 0]),
+    pd.Series([510000000, None, -3], dtype="Int64"),
+    pd.Series([0.5, -0.0, 1e-5, 9.9e-5, 1e16, 9999999999999998.0, np.inf, -np.inf]),
+    pd.Series([], dtype=object),
+    pd.Series([None, None], dtype=object),
+])
+def test_normalize_keys_typed_columns(series):
+    assert list(normalize_keys(series)) == [normalize_key(v) for v in series]
+
+
+def test_israel_midnights_match_scalar_encoding():
+    days = pd.Series([
+        pd.Timestamp("2025-03-15"), pd.NaT, pd.Timestamp("2025-06-30 13:00"),
+        pd.Timestamp("2025-03-28"), pd.Timestamp("2025-10-26"), pd.Timestamp("2025-12-31"),
+    ])
+    expected = [encode_israel_midnight(d) if pd.notna(d) else "" for d in days]
+    assert list(israel_midnights(days)) == expected
+    assert expected[0] == "2025-03-15T00:00:00+02:00" and expected[2] == "2025-06-30T00:00:00+03:00"
+
+
+def test_israel_days_match_scalar_day():
+    naive = pd.Series([
+        pd.Timestamp("2025-03-15"), pd.Timestamp("2025-03-14 22:00"), pd.Timestamp("2025-06-29 21:00"), pd.NaT,
+    ])
+    assert list(israel_days(naive)) == [israel_day(v) for v in naive]
+    aware = pd.Series(pd.to_datetime(["2025-12-31T00:00:00+02:00", "2025-06-30T00:00:00+03:00"], utc=True))
+    assert list(israel_days(aware)) == [date(2025, 12, 31), date(2025, 6, 30)]
+    assert list(israel_days(aware)) == [israel_day(v) for v in aware]
+
+
+def test_split_id_labels_and_years_per_distinct_value():
+    labels = pd.Series(["1125886300: 9) תהליך הושלם", "בלי מזהה", None, np.nan, 5, "1: a: b", "1125886300: 9) תהליך הושלם"],
+                       index=[3, 3, 1, 0, 2, 9, 4])
+    out = split_id_labels(labels)
+    assert list(out.index) == list(labels.index)
+    assert [tuple(r) for r in out.itertuples(index=False)] == [split_id_label(v) for v in labels]
+    assert split_id_label("1: a: b") == ("1", "a: b")
+
+    years = pd.Series(["1125575564: 2024", 2023, None, "x", "2025", datetime(2024, 1, 1), "1125575564: 2024"])
+    assert list(extract_years(years)) == [extract_year(v) for v in years]
+    assert list(extract_years(years))[:3] == [2024, 2023, None]
@@ -0,0 +1,63 @@
+"""Write-only OutputWriter: values, styles and widths as the cell-by-cell workbooks had them."""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from src.core.config import get_config
+from src.core.output_writer import OutputWriter
+from src.core.sync_engine import SyncResult
+
+
+def test_export_column_matches_clean_value():
+    frame = pd.DataFrame({
+        "dates": pd.Series([pd.Timestamp("2025-06-30"), pd.NaT, pd.Timestamp("2024-01-02")]),
+        "floats": [1.0, np.nan, 2.5],
+        "big": [2.0 ** 70, -3.0, np.inf],
+        "ints": [0, 7, 123456789],
+        "flags": [True, False, True],
+        "mixed": ["a", None, datetime(2025, 1, 5)],
+        "nullable": pd.array([1, None, 3], dtype="Int64"),
+    })
+    for col in frame.columns:
+        expected = [OutputWriter._clean_value(v) if not (isinstance(v, float) and np.isinf(v)) else v
+                    for v in frame[col].tolist()]
+        got = OutputWriter._export_column(frame[col]).tolist()
+        assert got == expected, col
+        assert [type(v) for v in got] == [type(v) for v in expected], col
+
+
+def test_column_widths_count_non_empty_cells():
+    headers = [pd.Series([h], dtype=object) for h in ("מזהה", "x")]
+    columns = [pd.Series(["", "a" * 30, 0], dtype=object), pd.Series(["a" * 80, "b"], dtype=object)]
+    assert OutputWriter._column_widths(headers, columns) == [32, 50]
+    assert OutputWriter._column_widths([pd.Series([None, "", 0], dtype=object)]) == [10]
+
+
+def test_written_import_file_keeps_the_styles_and_widths(tmp_path):
+    config = get_config("financial")
+    columns = config.import_schema.columns
+    import_df = pd.DataFrame({col: [f"{col} ערך ארוך מאוד", ""] for col in columns})
+    import_df[columns[0]] = [12345.0, np.nan]
+    import_df[columns[1]] = [pd.Timestamp("2025-06-30"), pd.NaT]
+    result = SyncResult(import_df=import_df, warnings=["אזהרה"])
+
+    paths = OutputWriter(config, str(tmp_path)).write_all(result, 2024)
+
+    ws = load_workbook(paths["import"])["ייבוא"]
+    header, first, second = ws[1], ws[2], ws[3]
+    assert [c.value for c in header] == columns
+    assert all(c.font.b and c.fill.fgColor.rgb.endswith("4472C4") and c.alignment.horizontal == "center"
+               for c in header)
+    assert first[0].value == 12345 and first[1].value == "30/06/2025"
+    assert second[0].value in ("", None) and all(c.border.left.style == "thin" for c in first + second)
+    widths = {k: d.width for k, d in ws.column_dimensions.items() if d.customWidth}
+    assert widths["A"] == max(max(len(columns[0]), len("12345")) + 2, 10)
+    assert widths["C"] == min(len(f"{columns[2]} ערך ארוך מאוד") + 2, 50)
+
+    summary = load_workbook(paths["diff"])["סיכום"]
+    assert summary["A1"].font.sz == 14
+    assert summary["A25"].value == "אזהרות" and summary["A26"].fill.fgColor.rgb.endswith("FFF2CC")
+    exceptions = load_workbook(paths["exceptions"])
+    assert exceptions["ללא התאמה"]["A1"].value.startswith("אין נתונים")
@@ -0,0 +1,160 @@
+"""Sharded parallel sync / write plan must equal the serial path exactly."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core import parallel
+from src.core.config import get_config
+from src.core.idom_parser import parse_idom_file
+from src.core.sumit_parser import parse_sumit_file, SUMITParser
+from src.core.sync_engine import SyncEngine
+from src.core.taxonomy import resolve_pkid_shoma
+
+IN_PROGRESS = "1125886200: 3) בעבודה"
+COMPLETED = "1125886300: 9) תהליך הושלם"
+
+
+@pytest.fixture(autouse=True)
+def _no_min_rows(monkeypatch):
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_ROWS", 0)
+
+
+def _assert_same_result(a, b):
+    for attr in (
+        "total_idom_records", "total_sumit_records", "matched_count", "unmatched_count",
+        "changed_count", "unchanged_count", "status_completed_count",
+        "status_preserved_count", "status_regression_flags", "match_strategy_counts",
+        "regression_records", "warnings",
+    ):
+        assert getattr(a, attr) == getattr(b, attr), attr
+    pd.testing.assert_frame_equal(a.import_df, b.import_df)
+    pd.testing.assert_frame_equal(a.diff_df, b.diff_df)
+    pd.testing.assert_frame_equal(a.exceptions_df, b.exceptions_df)
+    assert a.match_result.pairs == b.match_result.pairs
+    assert list(a.match_result.pairs) == list(b.match_result.pairs)
+    assert a.match_result.unmatched == b.match_result.unmatched
+
+
+def _frames(seed, n=400):
+    rng = np.random.default_rng(seed)
+    keys = ["%09d" % k for k in rng.integers(1, 5_000, size=n)]
+    dates = pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, size=n), unit="D")
+    idom_df = pd.DataFrame({
+        # duplicates kept on purpose; every 7th key loses its leading zeros
+        "מספר_תיק": [k.lstrip("0") if i % 7 == 0 else k for i, k in enumerate(keys)],
+        "שם": np.where(rng.random(n) < 0.2, None, "לקוח"),
+        "תאריך_ארכה": pd.Series(dates).where(rng.random(n) < 0.6),
+        "תאריך_הגשה": pd.Series(dates).where(rng.random(n) < 0.3),
+        "קוד_שידור": "1",
+        "פקיד_שומה": np.where(rng.random(n) < 0.5, "38", ""),
+        "סוג_תיק": np.where(rng.random(n) < 0.5, "7", ""),
+    })
+    sumit_keys = keys[: n // 2]
+    m = len(sumit_keys)
+    sumit_df = pd.DataFrame({
+        "מזהה": np.arange(5000, 5000 + m).astype(float),
+        "שנת מס": "1125575564: 2024",
+        "כרטיס לקוח": ["%d: שם" % i for i in range(m)],
+        "עובד ע. מקדימה": "a",
+        "עובד מטפל": "b",
+        "סטטוס": np.where(rng.random(m) < 0.3, COMPLETED, IN_PROGRESS),
+        "הערות": "",
+        "חבות מס": 0,
+        "תחילת עבודה": pd.NaT,
+        'אורכה מ"ה': pd.NaT,
+        "אורכה משרד": pd.Series(dates[:m]).where(rng.random(m) < 0.5),
+        "סיום עבודה מקדימה": pd.NaT,
+        "הגשה": pd.Series(dates[:m]).where(rng.random(m) < 0.2),
+        "_match_key": sumit_keys,
+    })
+    return idom_df, sumit_df
+
+
+def test_shard_ids_stable_and_key_grouped():
+    keys = pd.Series(["1", "2", "1", "333"])
+    ids = parallel.shard_ids(keys, 4)
+    assert ids[0] == ids[2]
+    assert (ids == parallel.shard_ids(keys, 4)).all()
+    assert ((ids >= 0) & (ids < 4)).all()
+
+
+@pytest.mark.parametrize("seed,workers", [(0, 2), (1, 3), (2, 4)])
+def test_parallel_sync_equals_serial(seed, workers):
+    config = get_config("financial")
+    idom_df, sumit_df = _frames(seed)
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    engine = SyncEngine(config)
+
+    serial = engine.sync(idom_df, sumit_df, lookup, 2024)
+    sharded = parallel.sync(engine, idom_df, sumit_df, lookup, 2024, workers=workers)
+    _assert_same_result(sharded, serial)
+
+
+def test_parallel_sync_equals_serial_on_golden(golden_idom_file, golden_sumit_file):
+    config = get_config("financial")
+    idom_df, _, _ = parse_idom_file(str(golden_idom_file))
+    sumit_df, lookup, _ = parse_sumit_file(str(golden_sumit_file), config, 2024)
+    engine = SyncEngine(config)
+
+    _assert_same_result(
+        parallel.sync(engine, idom_df, sumit_df, lookup, 2024, workers=2),
+        engine.sync(idom_df, sumit_df, lookup, 2024),
+    )
+
+
+def test_parallel_sync_replays_given_match_result():
+    config = get_config("financial")
+    idom_df, sumit_df = _frames(3)
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    engine = SyncEngine(config)
+    match_result = engine.match(idom_df, lookup)
+
+    sharded = parallel.sync(engine, idom_df, sumit_df, lookup, 2024, match_result=match_result, workers=2)
+    _assert_same_result(sharded, engine.sync(idom_df, sumit_df, lookup, 2024, match_result=match_result))
+    assert sharded.match_result is match_result
+
+
+class _Mapping:
+    def __init__(self, ids, refs=None):
+        self.ids = ids
+        self.refs = refs or {}
+
+    def get_client_id(self, key):
+        return self.ids.get(key)
+
+    def get_client_refs(self, client_id):
+        return self.refs.get(str(client_id))
+
+
+def test_parallel_write_plan_equals_serial():
+    config = get_config("financial")
+    idom_df, sumit_df = _frames(4)
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    engine = SyncEngine(config)
+    keys = idom_df["מספר_תיק"].astype(str).unique()
+    ids = {k: str(9000 + i) for i, k in enumerate(keys) if i % 2 == 0}
+    ps_id = resolve_pkid_shoma("38")["id"]
+    # Every other mapped client already has פקיד שומה 38 → client SKIPs in the mix
+    mapping = _Mapping(ids, {cid: {"פקיד שומה": ps_id, "סוג תיק": None} for cid in list(ids.values())[::2]})
+
+    serial = engine.build_write_plan(idom_df, sumit_df, lookup, 2024, client_mapping=mapping)
+    sharded = parallel.build_write_plan(
+        engine, idom_df, sumit_df, lookup, 2024, client_mapping=mapping, workers=3,
+    )
+    assert [op.to_dict() for op in sharded.operations] == [op.to_dict() for op in serial.operations]
+    assert serial.client_updates > 0 and serial.creates > 0 and serial.writes_avoided > 0
+    assert sharded.writes_avoided == serial.writes_avoided
+
+
+def test_small_inputs_stay_serial(monkeypatch):
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_ROWS", 10_000)
+    monkeypatch.setattr(parallel, "_pool", lambda *a: pytest.fail("pool started"))
+    config = get_config("financial")
+    idom_df, sumit_df = _frames(5, n=50)
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    parallel.sync(SyncEngine(config), idom_df, sumit_df, lookup, 2024, workers=4)
+
+
+def test_workers_are_not_forked_from_the_api_process():
+    # The API process runs background threads; a forked child could inherit a held lock
+    assert parallel.mp_context().get_start_method() in ("forkserver", "spawn")
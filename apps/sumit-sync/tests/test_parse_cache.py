@@ -0,0 +1,93 @@
+"""Parse cache: keyed by file content + parser version, every stage after the first loads instead of parsing."""
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from src.api import routes
+from src.core import parse_cache
+from src.core.parse_cache import ParseCache
+
+
+@pytest.fixture()
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(routes.file_store, "DATA_DIR", tmp_path / "data")
+    return tmp_path / "data"
+
+
+def test_idom_upload_is_parsed_once_per_content(golden_idom_file, data_dir, tmp_path, monkeypatch):
+    calls = []
+    real = routes._parse_idom_upload
+
+    def _counting(path, report_type):
+        calls.append(report_type)
+        return real(path, report_type)
+
+    monkeypatch.setattr(routes, "_parse_idom_upload", _counting)
+    df, conflicts, warnings = routes._load_idom_dataframe(str(golden_idom_file), "financial")
+
+    # Same content under another name (another run's upload) is a hit
+    copy = tmp_path / "other_run.xlsx"
+    shutil.copy(golden_idom_file, copy)
+    again, again_conflicts, again_warnings = routes._load_idom_dataframe(str(copy), "financial")
+    assert calls == ["financial"]
+    pd.testing.assert_frame_equal(again, df)
+    pd.testing.assert_frame_equal(again_conflicts, conflicts)
+    assert again_warnings == warnings
+
+    # Another report type is another entry
+    routes._load_idom_dataframe(str(golden_idom_file), "annual")
+    assert calls == ["financial", "annual"]
+    assert len(list((data_dir / "parse_cache").glob("*.pkl"))) == 2
+
+
+def test_content_and_parser_version_are_part_of_the_key(tmp_path, monkeypatch):
+    path = tmp_path / "in.txt"
+    path.write_text("a")
+    cache = ParseCache(tmp_path / "cache")
+    key = cache.key(str(path), "idom", ["financial"])
+    assert cache.key(str(path), "idom", ["annual"]) != key
+
+    path.write_text("b")
+    edited = cache.key(str(path), "idom", ["financial"])
+    assert edited != key
+
+    monkeypatch.setattr(parse_cache, "PARSER_VERSION", "next")
+    assert cache.key(str(path), "idom", ["financial"]) != edited
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ParseCache(tmp_path / "cache", max_bytes=2500)
+    payload = b"x" * 1000
+    for name in ("a", "b"):
+        assert cache.store(name, payload)
+    (tmp_path / "cache" / "a.pkl").touch()      # as a load() hit does
+    os.utime(tmp_path / "cache" / "b.pkl", (0, 0))
+
+    assert cache.store("c", payload)
+    assert sorted(p.stem for p in (tmp_path / "cache").glob("*.pkl")) == ["a", "c"]
+    assert cache.load("b") is None and cache.load("a") == payload
+
+    assert not cache.store("huge", b"x" * 5000)
+
+
+def test_unreadable_entry_is_reparsed(tmp_path):
+    src = tmp_path / "in.txt"
+    src.write_text("a")
+    cache = ParseCache(tmp_path / "cache")
+    key = cache.key(str(src), "k")
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache" / (key + ".pkl")).write_bytes(b"not a pickle")
+    assert cache.get_or_parse(str(src), "k", [], lambda: ("parsed",)) == ("parsed",)
+    assert cache.load(key) == ("parsed",)
+
+
+def test_disabled_cache_always_parses(tmp_path):
+    src = tmp_path / "in.txt"
+    src.write_text("a")
+    cache = ParseCache(tmp_path / "cache", max_bytes=0)
+    calls = []
+    for _ in range(2):
+        cache.get_or_parse(str(src), "k", [], lambda: calls.append(1) or 1)
+    assert len(calls) == 2 and not (tmp_path / "cache").exists()
@@ -0,0 +1,300 @@
+"""Per-run write plan cache: persistence, freshness, and re-planning only touched entities."""
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.api import routes
+from src.core import mapping_store, plan_cache, report_cache, write_executor
+from src.core.plan_cache import CachedWritePlan, PlanApproval, splice, touched_keys
+from src.core.report_cache import ReportCache
+from src.core.write_plan import CLIENTS_FOLDER_ID, OpType, WriteOperation, WritePlan
+from src.db import models
+from tests.test_api import client, test_db  # noqa: F401 — fixtures
+from tests.test_write_back_resume import FlakySummitAPI
+
+FOLDER = "1124761700"
+
+
+def _plan(status=1):
+    plan = WritePlan(writes_avoided=2)
+    plan.add(WriteOperation(OpType.UPDATE_REPORT, 1001, FOLDER, "א", "111", {"סטטוס": status}, {}, "dates"))
+    plan.add(WriteOperation(OpType.UPDATE_CLIENT, 501, CLIENTS_FOLDER_ID, "א", "111", {"פקיד שומה": 9}, {}, "refs"))
+    plan.add(WriteOperation(OpType.CREATE_REPORT, None, FOLDER, "ב", "222",
+                            {"לקוח": 77, "שנת מס": 1125575564}, {}, "new", client_entity_id=77))
+    plan.add(WriteOperation(OpType.SKIP, 1003, FOLDER, "ג", "333", {}, {}, "Matched — Summit already up to date"))
+    plan.add(WriteOperation(OpType.SKIP, 1004, FOLDER, "ד", "444", {}, {}, "Matched — Summit already up to date"))
+    return plan
+
+
+def test_round_trip_and_freshness(tmp_path):
+    snap = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+    cached = CachedWritePlan.build(_plan(), "abc", snap)
+    cached.save(tmp_path / plan_cache.PLAN_FILE)
+    loaded = CachedWritePlan.load(tmp_path / plan_cache.PLAN_FILE)
+
+    assert [op.to_dict() for op in loaded.plan.operations] == [op.to_dict() for op in cached.plan.operations]
+    assert loaded.plan.writes_avoided == 2
+    assert loaded.snapshot_datetime == snap
+    assert loaded.is_fresh("abc", max_age_minutes=5)
+    assert not loaded.is_fresh("other", max_age_minutes=5)
+    assert not loaded.is_fresh("abc", max_age_minutes=5, now=datetime.now(timezone.utc) + timedelta(minutes=6))
+
+    cached.approval.apply("approve", cached.plan, [cached.plan.operations[0].op_key], {"op_types": ["update_report"]})
+    cached.save(tmp_path / plan_cache.PLAN_FILE)
+    loaded = CachedWritePlan.load(tmp_path / plan_cache.PLAN_FILE)
+    assert loaded.approval.approved == {cached.plan.operations[0].op_key}
+    assert loaded.approval.history[0]["selector"] == {"op_types": ["update_report"]}
+
+    (tmp_path / "bad.json").write_text("{", encoding="utf-8")
+    assert CachedWritePlan.load(tmp_path / "bad.json") is None
+    assert CachedWritePlan.load(tmp_path / "missing.json") is None
+
+
+def test_overlapping_approvals_and_rebuild_keep_every_change(tmp_path):
+    path = tmp_path / plan_cache.PLAN_FILE
+    first = CachedWritePlan.build(_plan(), "abc", datetime.now(timezone.utc))
+    first.save(path)
+    update, client_op = (op.op_key for op in first.plan.operations[:2])
+
+    # A rebuild starts from the approval as loaded; two approvals land meanwhile
+    rebuilt = CachedWritePlan.build(_plan(), "abc", datetime.now(timezone.utc))
+    rebuilt.approval = CachedWritePlan.load(path).approval
+    for key in (update, client_op):
+        CachedWritePlan.update(
+            path, lambda saved, key=key: saved.approval.apply("approve", saved.plan, [key], {}),
+            expect_created_at=first.created_at,
+        )
+    rebuilt.save(path, keep_saved_approval=True)
+    assert CachedWritePlan.load(path).approval.approved == {update, client_op}
+
+    with pytest.raises(plan_cache.PlanFileError):   # the plan the keys were picked from is gone
+        CachedWritePlan.update(path, lambda saved: None, expect_created_at=first.created_at)
+    path.write_text('{"operations": [', encoding="utf-8")
+    with pytest.raises(plan_cache.PlanFileError):
+        CachedWritePlan.update(path, lambda saved: None)
+    assert path.read_text(encoding="utf-8") == '{"operations": ['
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_snapshot_time_is_oldest_mirror_entry(tmp_path):
+    reports = ReportCache(path=tmp_path / "reports.json")
+    now = datetime.now(timezone.utc)
+    reports.put_entity(FOLDER, {"ID": 1003}, fetched_at=(now - timedelta(hours=2)).timestamp())
+    snap = plan_cache.snapshot_time(now, _plan(), reports)
+    assert timedelta(hours=1.99) < now - snap < timedelta(hours=2.01)
+    assert plan_cache.snapshot_time(now, WritePlan(), reports) == now
+
+
+def test_touched_keys_and_splice():
+    plan = _plan()
+    assert touched_keys(plan, report_ids={1003}, client_ids=set()) == ["333"]
+    assert touched_keys(plan, report_ids=set(), client_ids={77, 501}) == ["111", "222"]
+
+    replacement = WritePlan()
+    replacement.add(WriteOperation(OpType.UPDATE_REPORT, 1003, FOLDER, "ג", "333", {"סטטוס": 2}, {}, "dates"))
+    replacement.add(WriteOperation(OpType.SKIP, 9002, FOLDER, "ב", "222", {}, {}, "Matched — no changes needed"))
+    out = splice(plan, replacement, ["222", "333"])
+
+    assert [(op.match_key, op.op_type) for op in out.operations] == [
+        ("111", OpType.UPDATE_REPORT), ("111", OpType.UPDATE_CLIENT),
+        ("222", OpType.SKIP), ("333", OpType.UPDATE_REPORT), ("444", OpType.SKIP),
+    ]
+    assert out.writes_avoided == 1
+
+
+@pytest.fixture()
+def review_run(client, test_db, tmp_path, monkeypatch):  # noqa: F811
+    monkeypatch.setattr(write_executor, "SummitAPIClient", FlakySummitAPI)
+    monkeypatch.setattr(write_executor, "WRITE_CONCURRENCY", 1)
+    monkeypatch.setattr(report_cache, "REPORT_CACHE_FILE", tmp_path / "reports.json")
+    monkeypatch.setattr(mapping_store, "MAPPING_FILE", tmp_path / "mapping.json")
+    monkeypatch.setattr(routes, "_idom_sha256", lambda run: "idom")
+    FlakySummitAPI.sent, FlakySummitAPI.reject, FlakySummitAPI.crash = [], set(), set()
+
+    builds = []
+
+    def _build(run, only_keys=None):
+        builds.append(only_keys)
+        plan = _plan(status=2 if only_keys else 1)
+        if only_keys is not None:
+            plan = WritePlan(operations=[op for op in plan.operations if op.match_key in only_keys])
+        return plan, datetime.now(timezone.utc), ReportCache()
+
+    monkeypatch.setattr(routes, "_build_write_plan_for_run", _build)
+
+    run_id = client.post("/runs", json={"year": 2024, "report_type": "financial"}).json()["id"]
+    run = test_db.query(models.Run).filter(models.Run.id == routes.uuid_mod.UUID(run_id)).one()
+    run.status = "review"
+    test_db.commit()
+    return run_id, builds
+
+
+def test_preview_dry_run_live_share_one_build(client, review_run):  # noqa: F811
+    run_id, builds = review_run
+    first = client.get(f"/runs/{run_id}/write-plan").json()
+    assert first["plan_cache"]["cached"] is False
+
+    dry = client.post(f"/runs/{run_id}/write-back/dry-run").json()
+    live = client.post(f"/runs/{run_id}/write-back").json()
+    assert dry["plan_cache"]["cached"] and live["plan_cache"]["cached"]
+    assert live["plan_cache"]["rechecked_keys"] == 0
+    assert builds == [None]
+    assert FlakySummitAPI.sent == [1001, 501, ("create", 77)]
+
+    client.get(f"/runs/{run_id}/write-plan?rebuild=true")
+    assert builds == [None, None]
+
+
+def test_live_rechecks_only_entities_written_since_snapshot(client, test_db, review_run):  # noqa: F811
+    run_id, builds = review_run
+    client.get(f"/runs/{run_id}/write-plan")
+
+    # Another run wrote report 1001 after this plan's snapshot
+    test_db.add(models.WriteLog(
+        run_id=routes.uuid_mod.UUID(run_id), op_type="update_report", entity_id=1001, folder_id=FOLDER,
+        match_key="111", status="success",
+    ))
+    test_db.commit()
+
+    body = client.post(f"/runs/{run_id}/write-back").json()
+    assert builds == [None, ["111"]]
+    assert body["plan_cache"]["rechecked_keys"] == 1
+    # Key 111 was re-planned (status 2 → new op key → written), the rest as previewed
+    assert FlakySummitAPI.sent == [1001, 501, ("create", 77)]
+    written = [e for e in body["audit_log"] if e["status"] == "success"]
+    assert written[0]["properties_written"] == {"סטטוס": 2}
+
+
+def test_write_plan_pages_filters_and_exports(client, review_run):  # noqa: F811
+    run_id, builds = review_run
+    body = client.get(f"/runs/{run_id}/write-plan?limit=2&offset=1").json()
+    assert body["summary"]["total"] == 5
+    assert body["page"] == {"offset": 1, "limit": 2, "matched": 5, "returned": 2}
+    assert [op["index"] for op in body["operations"]] == [1, 2]
+
+    body = client.get(f"/runs/{run_id}/write-plan?op_type=skip,create_report").json()
+    assert [op["match_key"] for op in body["operations"]] == ["222", "333", "444"]
+    assert client.get(f"/runs/{run_id}/write-plan?op_type=bogus").status_code == 400
+
+    res = client.get(f"/runs/{run_id}/write-plan/export.ndjson?match_key=11")
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["op_type"] for line in res.text.splitlines()] == ["update_report", "update_client"]
+    assert builds == [None]
+
+
+def test_approval_narrows_excludes_and_resets():
+    plan = _plan()
+    update, client_op, create = (op.op_key for op in plan.operations[:3])
+    approval = PlanApproval()
+    assert approval.summary(plan)["approved"] == 3 and approval.approved_keys() is None
+
+    approval.apply("exclude", plan, [create], {})
+    assert approval.approved_keys() == {update, client_op}
+    approval.apply("reset", plan, [], {})
+    approval.apply("approve", plan, [update], {"prop": "סטטוס"})
+    summary = approval.summary(plan)
+    assert (summary["approved"], summary["held"]) == (1, 2)
+    assert summary["by_type"]["update_client"] == {"approved": 0, "held": 1}
+    assert [h["action"] for h in approval.history] == ["exclude", "reset", "approve"]
+
+
+def test_live_writes_only_the_approved_subset(client, test_db, review_run):  # noqa: F811
+    run_id, builds = review_run
+    client.get(f"/runs/{run_id}/write-plan")
+    body = client.post(f"/runs/{run_id}/write-plan/approval",
+                       json={"action": "approve", "op_types": ["update_report"], "prop": "סטטוס"}).json()
+    assert body["selected"] == 1
+    assert (body["approval"]["approved"], body["approval"]["held"]) == (1, 2)
+
+    bad = client.post(f"/runs/{run_id}/write-plan/approval", json={"action": "approve", "op_keys": ["nope"]})
+    assert bad.status_code == 400
+
+    live = client.post(f"/runs/{run_id}/write-back").json()
+    assert FlakySummitAPI.sent == [1001]
+    assert live["approval"]["held"] == 2
+    statuses = {row.match_key + "/" + row.op_type: row.status for row in test_db.query(models.WriteLog).all()}
+    assert statuses["111/update_report"] == "success"
+    assert statuses["111/update_client"] == "not_approved"
+    assert statuses["222/create_report"] == "not_approved"
+
+    # Tomorrow: approve the rest; the resumed live run sends only those
+    client.post(f"/runs/{run_id}/write-plan/approval", json={"action": "reset", "note": "rest signed off"})
+    client.post(f"/runs/{run_id}/write-back")
+    # 1001 was written since the snapshot → key 111 re-checked (status 2 here) and written again
+    assert FlakySummitAPI.sent == [1001, 1001, 501, ("create", 77)]
+    history = client.get(f"/runs/{run_id}/write-plan/approval").json()["history"]
+    assert [h["action"] for h in history] == ["approve", "reset"] and history[1]["note"] == "rest signed off"
+    assert builds == [None, ["111"]]
+
+
+def test_approval_reads_the_saved_plan_never_builds(client, review_run, monkeypatch):  # noqa: F811
+    run_id, builds = review_run
+    approve = {"action": "approve", "op_types": ["update_report"]}
+    # Nothing previewed yet
+    assert client.get(f"/runs/{run_id}/write-plan/approval").status_code == 409
+    assert client.post(f"/runs/{run_id}/write-plan/approval", json=approve).status_code == 409
+
+    client.get(f"/runs/{run_id}/write-plan")
+    assert client.post(f"/runs/{run_id}/write-plan/approval", json=approve).json()["selected"] == 1
+    monkeypatch.setattr(plan_cache, "WRITE_PLAN_MAX_AGE_MINUTES", -1)
+    assert client.get(f"/runs/{run_id}/write-plan/approval").status_code == 409
+    assert client.post(f"/runs/{run_id}/write-plan/approval", json=approve).status_code == 409
+    assert builds == [None]
+
+
+def test_approval_fails_closed(client, test_db, review_run, monkeypatch):  # noqa: F811
+    run_id, builds = review_run
+    client.get(f"/runs/{run_id}/write-plan")
+    client.post(f"/runs/{run_id}/write-plan/approval", json={"action": "approve", "op_types": ["update_report"]})
+    run = test_db.query(models.Run).filter(models.Run.id == routes.uuid_mod.UUID(run_id)).one()
+    approved = routes._plan_approval(run).approved_keys()
+    assert len(approved) == 1
+
+    # A changed upload keeps the op-key approval (streaming / retry-failed read it unbuilt)
+    monkeypatch.setattr(routes, "_idom_sha256", lambda run: "re-uploaded")
+    assert routes._plan_approval(run).approved_keys() == approved
+
+    # An unreadable plan file: refused, until a rebuild that approves nothing
+    path, _ = routes._saved_write_plan(run)
+    path.write_text('{"approval": {"approved": [', encoding="utf-8")
+    for resp in (client.post(f"/runs/{run_id}/write-back"), client.get(f"/runs/{run_id}/write-plan/approval")):
+        assert resp.status_code == 409
+    assert FlakySummitAPI.sent == []
+
+    rebuilt = client.get(f"/runs/{run_id}/write-plan", params={"rebuild": True})
+    assert rebuilt.status_code == 200
+    live = client.post(f"/runs/{run_id}/write-back").json()
+    assert FlakySummitAPI.sent == [] and live["approval"]["approved"] == 0 and live["approval"]["held"] == 3
+
+
+def test_write_plan_refuses_to_build_on_partial_taxonomy(client, test_db, golden_idom_file, tmp_path, monkeypatch):  # noqa: F811
+    from src.core import sumit_api_client, taxonomy
+
+    def _unreachable(*args, **kwargs):
+        raise ConnectionError("Summit unreachable")
+
+    registry = taxonomy.TaxonomyRegistry(cache_path=tmp_path / "tax.json")
+    monkeypatch.setattr(taxonomy, "registry", registry)
+    monkeypatch.setattr(taxonomy, "TAXONOMY_WAIT_SECONDS", 0.2)
+    monkeypatch.setattr(sumit_api_client, "SummitAPIClient", _unreachable)
+
+    run_id = client.post("/runs", json={"year": 2024, "report_type": "financial"}).json()["id"]
+    with open(golden_idom_file, "rb") as f:
+        client.post(f"/runs/{run_id}/upload", data={"file_role": "idom_upload"},
+                    files={"file": ("idom.xlsx", f, "application/octet-stream")})
+    run = test_db.query(models.Run).filter(models.Run.id == routes.uuid_mod.UUID(run_id)).one()
+    try:
+        # Seed tables only: unknown codes would be dropped, so no plan at all
+        with pytest.raises(routes.HTTPException) as refused:
+            routes._write_back_inputs(run)
+        assert refused.value.status_code == 503
+    finally:
+        registry.stop()
+
+    # Once the full tables are on disk the plan is built on them
+    from tests.test_taxonomy import FakeTaxonomyAPI
+
+    taxonomy.TaxonomyRegistry(cache_path=tmp_path / "tax.json").refresh(FakeTaxonomyAPI())
+    routes._write_back_inputs(run)
+    assert registry.snapshot().complete
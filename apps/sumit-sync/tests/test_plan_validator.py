@@ -0,0 +1,61 @@
+"""Whole-plan deep validation: grouped report, same verdicts as the executor's deep dry-run."""
+from src.core.plan_validator import RULE_DATE, RULE_FOLDER, RULE_TAXONOMY, PlanValidator
+from src.core.taxonomy import resolve_tax_year
+from src.core.write_executor import WriteExecutor
+from src.core.write_plan import CLIENTS_FOLDER_ID, OpType, WriteOperation, WritePlan
+
+FOLDER = "1124761700"
+GOOD_DATE = "2024-06-30T00:00:00+03:00"
+
+
+def _plan():
+    year = resolve_tax_year(2024)
+    plan = WritePlan()
+    for i in range(40):
+        plan.add(WriteOperation(OpType.UPDATE_REPORT, 100 + i, FOLDER, "x", str(i),
+                                {'תאריך אורכה מ"ה': GOOD_DATE, "תאריך הגשה": "2024-05-01"}, {}, "dates"))
+    plan.add(WriteOperation(OpType.UPDATE_REPORT, 1, FOLDER, "x", "bad-date", {"תאריך הגשה": "31/12/2024"}, {}, ""))
+    plan.add(WriteOperation(OpType.UPDATE_REPORT, 2, "999", "x", "bad-folder", {"תאריך הגשה": GOOD_DATE}, {}, ""))
+    plan.add(WriteOperation(OpType.CREATE_REPORT, None, FOLDER, "x", "bad-year",
+                            {"לקוח": 5, "שנת מס": 123}, {}, "", client_entity_id=5))
+    plan.add(WriteOperation(OpType.CREATE_REPORT, None, FOLDER, "x", "good-create",
+                            {"לקוח": 6, "שנת מס": year}, {}, "", client_entity_id=6))
+    plan.add(WriteOperation(OpType.UPDATE_CLIENT, 7, CLIENTS_FOLDER_ID, "x", "bad-ref",
+                            {"פקיד שומה": "abc", "סוג תיק": ""}, {}, ""))
+    # Never sent → never validated
+    plan.add(WriteOperation(OpType.FLAG, None, "999", "x", "flag", {"תאריך הגשה": "nope"}, {}, ""))
+    return plan
+
+
+def test_report_groups_problems_by_rule():
+    report = PlanValidator().validate(_plan().operations)
+    assert report.checked == 45 and not report.ok
+    by_rule = {rule: sorted(p.match_key for p in items) for rule, items in report.problems.items()}
+    assert by_rule == {
+        RULE_DATE: ["bad-date"],
+        RULE_FOLDER: ["bad-folder"],
+        RULE_TAXONOMY: ["bad-ref", "bad-ref", "bad-year"],
+    }
+    out = report.to_dict(max_examples=1)
+    assert out["invalid_ops"] == 4
+    assert out["rules"][RULE_TAXONOMY]["count"] == 3 and len(out["rules"][RULE_TAXONOMY]["examples"]) == 1
+
+
+def test_executor_deep_dry_run_matches_report():
+    plan = _plan()
+    result = WriteExecutor(client=object(), dry_run=True, validation_mode="deep").execute(plan)
+    report = PlanValidator().validate(plan.operations)
+
+    failed = {e["match_key"]: e["error"] for e in result.audit_log if e["status"] == "failed"}
+    assert set(failed) == {plan.operations[i].match_key for i in report.invalid_ops}
+    for items in report.problems.values():
+        for p in items:
+            assert p.message in failed[p.match_key]
+    assert result.succeeded == 41
+
+
+def test_verdicts_are_memoized_per_distinct_value():
+    validator = PlanValidator()
+    validator.validate(_plan().operations)
+    # 40 ops × 2 dates collapse to a handful of distinct (property, value) pairs
+    assert len(validator._verdicts) <= 10
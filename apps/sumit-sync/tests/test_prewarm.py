@@ -0,0 +1,142 @@
+"""Tests for the off-hours cache prewarm jobs and scheduler window logic."""
+from datetime import datetime
+
+import pytest
+
+from src.core import prewarm
+from src.core.mapping_store import MappingStore
+from src.core.report_cache import ReportCache
+from src.core.prewarm import (
+    ISRAEL_TZ, parse_window, in_window, window_bounds, run_prewarm, PrewarmScheduler,
+)
+
+
+class FakeSummitAPI:
+    """Minimal stand-in for SummitAPIClient: counts calls, serves canned entities."""
+
+    def __init__(self, clients, reports):
+        self.clients = clients      # client_id → company number
+        self.reports = reports      # (folder_id, report_id) → entity
+        self.call_count = 0
+
+    def list_entities(self, folder_id, page_size=500, filters=None):
+        self.call_count += 1
+        if folder_id == "557688522":
+            return list(self.clients)
+        return [rid for (fid, rid) in self.reports if fid == folder_id]
+
+    def get_entity(self, entity_id, folder_id):
+        self.call_count += 1
+        return self.reports.get((folder_id, entity_id), {})
+
+    def get_client_company_number(self, client_id):
+        self.call_count += 1
+        return self.clients.get(client_id, "")
+
+
+@pytest.fixture()
+def fake_api():
+    return FakeSummitAPI(
+        clients={101: "123456789", 102: "987654321"},
+        reports={
+            ("1124761700", 5001): {"ID": 5001, "לקוח": [{"ID": 101, "Name": "כהן"}]},
+            ("1144157121", 6001): {"ID": 6001, "לקוח": [{"ID": 102, "Name": "לוי"}]},
+        },
+    )
+
+
+@pytest.fixture()
+def no_taxonomy_fetch(monkeypatch):
+    monkeypatch.setattr(prewarm.taxonomy.registry, "refresh", lambda api: prewarm.taxonomy.registry.snapshot())
+
+
+def test_parse_window_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_window("late night")
+
+
+def test_in_window_wraps_midnight():
+    window = parse_window("23:00-04:00")
+    assert in_window(datetime(2026, 1, 1, 23, 30, tzinfo=ISRAEL_TZ), window)
+    assert in_window(datetime(2026, 1, 2, 3, 59, tzinfo=ISRAEL_TZ), window)
+    assert not in_window(datetime(2026, 1, 2, 12, 0, tzinfo=ISRAEL_TZ), window)
+
+
+def test_window_bounds_outside_points_to_next_window():
+    window = parse_window("01:00-05:00")
+    start, end = window_bounds(datetime(2026, 3, 10, 14, 0, tzinfo=ISRAEL_TZ), window)
+    assert start == datetime(2026, 3, 11, 1, 0, tzinfo=ISRAEL_TZ)
+    assert end == datetime(2026, 3, 11, 5, 0, tzinfo=ISRAEL_TZ)
+
+
+def test_run_prewarm_fills_caches_and_reports_cost(fake_api, tmp_path, no_taxonomy_fetch):
+    mapping = MappingStore(path=tmp_path / "mapping.json")
+    reports = ReportCache(path=tmp_path / "reports.json")
+
+    report = run_prewarm(api=fake_api, mapping=mapping, reports=reports, tax_years=[2024])
+
+    jobs = {j.name: j for j in report.jobs}
+    assert jobs["client_mapping"].warmed == 2
+    assert jobs["report_ids"].warmed == 2
+    # Entities fetched by report_ids are fresh — mirror job has nothing to do
+    assert jobs["folder_mirror"].warmed == 0
+    assert jobs["folder_mirror"].skipped == 2
+    assert report.total_api_calls == fake_api.call_count
+
+    assert mapping.get_client_id("123456789") == "101"
+    assert reports.get_report_id("1124761700", 101, 1125575564) == 5001
+    assert reports.get_entity(6001, "1144157121")["ID"] == 6001
+
+
+def test_second_pass_is_mostly_cache_hits(fake_api, tmp_path, no_taxonomy_fetch):
+    mapping = MappingStore(path=tmp_path / "mapping.json")
+    reports = ReportCache(path=tmp_path / "reports.json")
+    run_prewarm(api=fake_api, mapping=mapping, reports=reports, tax_years=[2024])
+
+    calls_before = fake_api.call_count
+    report = run_prewarm(api=fake_api, mapping=mapping, reports=reports, tax_years=[2024])
+
+    # Only the listings are re-issued: 1 client listing + 2 report folders
+    assert fake_api.call_count - calls_before == 3
+    assert all(j.warmed == 0 for j in report.jobs)
+
+
+def test_failing_job_does_not_stop_later_jobs(fake_api, tmp_path, monkeypatch):
+    def _boom(api):
+        raise RuntimeError("taxonomy folder unavailable")
+    monkeypatch.setattr(prewarm.taxonomy.registry, "refresh", _boom)
+
+    report = run_prewarm(
+        api=fake_api,
+        mapping=MappingStore(path=tmp_path / "mapping.json"),
+        reports=ReportCache(path=tmp_path / "reports.json"),
+        tax_years=[2024],
+    )
+    jobs = {j.name: j for j in report.jobs}
+    assert "unavailable" in jobs["taxonomies"].error
+    assert jobs["report_ids"].warmed == 2
+
+
+def test_expired_deadline_stops_jobs(fake_api, tmp_path, no_taxonomy_fetch):
+    report = run_prewarm(
+        api=fake_api,
+        mapping=MappingStore(path=tmp_path / "mapping.json"),
+        reports=ReportCache(path=tmp_path / "reports.json"),
+        tax_years=[2024],
+        deadline=0.0,
+    )
+    assert all(not j.completed for j in report.jobs)
+    assert fake_api.call_count == 0
+
+
+def test_scheduler_run_once_records_last_report():
+    calls = []
+
+    def _runner(deadline=None):
+        calls.append(deadline)
+        return prewarm.PrewarmReport(started_at=datetime.now(ISRAEL_TZ))
+
+    scheduler = PrewarmScheduler(window="01:00-05:00", runner=_runner)
+    assert scheduler.run_once() is not None
+    assert scheduler.status()["last_report"] is not None
+    assert len(calls) == 1
@@ -0,0 +1,78 @@
+"""One process-wide rate limiter: both priority lanes share the 5 QPS slots."""
+import threading
+import time
+
+from src.core import sumit_api_client
+from src.core.sumit_api_client import RATE_LIMITER, RateLimiter, SummitAPIClient
+
+
+def _fast(monkeypatch, delay=0.02, low=0.1):
+    monkeypatch.setattr(sumit_api_client, "DELAY_BETWEEN_CALLS", delay)
+    monkeypatch.setattr(sumit_api_client, "LOW_PRIORITY_DELAY", low)
+    monkeypatch.setattr(sumit_api_client, "CALLS_PER_BATCH", 10_000)
+
+
+class _Recording(RateLimiter):
+    def __init__(self):
+        super().__init__()
+        self.slots = []
+
+    def _reserve(self, priority):
+        slot = super()._reserve(priority)
+        if slot is not None:
+            self.slots.append((slot, priority))
+        return slot
+
+
+def _run(lanes):
+    """Start one thread per (priority, calls) lane; return the reserved [(slot, priority)] in order."""
+    limiter = _Recording()
+
+    def lane(priority, calls):
+        for _ in range(calls):
+            limiter.wait(priority)
+
+    threads = [threading.Thread(target=lane, args=spec) for spec in lanes]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sorted(limiter.slots)
+
+
+def test_combined_lanes_never_beat_the_normal_spacing(monkeypatch):
+    _fast(monkeypatch)
+    taken = _run([("normal", 15), ("normal", 15), ("low", 3)])
+    gaps = [b[0] - a[0] for a, b in zip(taken, taken[1:])]
+    assert len(taken) == 33 and min(gaps) >= 0.02 - 1e-9
+
+
+def test_low_priority_takes_only_idle_slots(monkeypatch):
+    _fast(monkeypatch)
+    taken = _run([("normal", 20), ("low", 2)])
+    last_normal = max(t for t, p in taken if p == "normal")
+    lows = [t for t, p in taken if p == "low"]
+    assert all(t >= last_normal + 0.1 for t in lows)
+    assert lows[1] - lows[0] >= 0.1
+
+
+def test_batch_cooldown_counts_both_lanes(monkeypatch):
+    _fast(monkeypatch, low=0.01)
+    monkeypatch.setattr(sumit_api_client, "CALLS_PER_BATCH", 3)
+    monkeypatch.setattr(sumit_api_client, "BATCH_COOLDOWN", 0.3)
+    limiter = RateLimiter()
+    limiter.wait("normal")
+    limiter.wait("normal")
+    time.sleep(0.05)
+    limiter.wait("low")   # third call of the batch
+    start = time.monotonic()
+    limiter.wait("normal")
+    assert time.monotonic() - start >= 0.25
+
+
+def test_clients_share_the_process_limiter(monkeypatch):
+    calls = []
+    monkeypatch.setattr(RATE_LIMITER, "wait", lambda priority="normal": calls.append(priority))
+    for priority in ("normal", "low"):
+        SummitAPIClient(company_id=1, api_key="k", priority=priority)._rate_limit_pause()
+    assert calls == ["normal", "low"]
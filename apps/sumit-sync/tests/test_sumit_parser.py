@@ -0,0 +1,74 @@
+"""Streamed, column-projected SUMIT export reader: same frame as read_excel + year filter."""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from src.core import sumit_parser
+from src.core.config import get_config
+from src.core.sumit_parser import SUMITParser, read_export
+
+
+def _parse_both(path, monkeypatch, tax_year=2024):
+    config = get_config("financial")
+    streamed = SUMITParser(config)
+    df = streamed.parse(str(path), tax_year)
+    monkeypatch.setattr(sumit_parser, "STREAMING_SUFFIXES", set())
+    full = SUMITParser(config)
+    return df, full.parse(str(path), tax_year), streamed, full
+
+
+def test_golden_export_matches_read_excel(golden_sumit_file, monkeypatch):
+    df, expected, streamed, full = _parse_both(golden_sumit_file, monkeypatch)
+    pd.testing.assert_frame_equal(df, expected)
+    assert streamed.parse_warnings == full.parse_warnings
+
+
+@pytest.fixture()
+def wide_export(tmp_path):
+    config = get_config("financial")
+    headers = config.export_schema.all_columns + ["עמודה מיותרת", "עוד אחת"]
+    wb = Workbook()
+    ws = wb.active
+    ws.append(headers)
+    for i in range(30):
+        year = ("1125575564: 2024", "1125575563: 2023", 2025)[i % 3]
+        row = {h: None for h in headers}
+        row.update({
+            "מזהה": float(9000 + i), "שנת מס": year, "כרטיס לקוח": f"לקוח {i}", "ח.פ": f"51{i:07d}",
+            "סטטוס": "1125886200: בתהליך", "הגשה": datetime(2024, 5, 1) if i % 2 else None,
+            "חבות מס": 1.5 * i, "עמודה מיותרת": "x" * 50,
+        })
+        ws.append([row[h] for h in headers])
+        if i == 10:
+            ws.append([None] * len(headers))
+    path = tmp_path / "wide.xlsx"
+    wb.save(path)
+    return path
+
+
+def test_projects_columns_and_filters_rows_while_streaming(wide_export, monkeypatch):
+    raw, total = read_export(str(wide_export), get_config("financial").export_schema.all_columns, 2024)
+    assert total == 31 and len(raw) == 10
+    assert "עמודה מיותרת" not in raw.columns
+    # Index = row position in the sheet, as read_excel's (the blank row counts)
+    assert list(raw.index[:5]) == [0, 3, 6, 9, 13]
+
+    df, expected, _, _ = _parse_both(wide_export, monkeypatch)
+    # Dtypes come from the kept rows: the blank row's NaN no longer turns ח.פ into floats
+    pd.testing.assert_frame_equal(df.drop(columns="_match_key_raw"), expected.drop(columns="_match_key_raw"),
+                                  check_dtype=False)
+    assert df["ח.פ"].dtype == "int64" and expected["ח.פ"].dtype == "float64"
+    assert df["_match_key_raw"].iloc[0] == "510000000"
+    assert df["מזהה"].iloc[0] == "9000"
+
+
+def test_missing_required_column_still_raises(tmp_path):
+    wb = Workbook()
+    wb.active.append(["מזהה", "כרטיס לקוח"])
+    wb.active.append([1, "x"])
+    path = tmp_path / "bad.xlsx"
+    wb.save(path)
+    with pytest.raises(sumit_parser.SUMITParseError, match="Missing required columns"):
+        SUMITParser(get_config("financial")).parse(str(path), 2024)
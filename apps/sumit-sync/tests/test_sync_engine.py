@@ -0,0 +1,173 @@
+"""
+Equivalence tests: columnar SyncEngine.sync vs the row-by-row reference.
+
+Both paths must produce the same SyncResult — counts, import rows, diff
+report (including row/field order), exceptions, regression details and
+warnings.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.config import get_config, STATUS_COMPLETED
+from src.core.idom_parser import parse_idom_file
+from src.core.sumit_parser import parse_sumit_file, SUMITParser
+from src.core.sync_engine import SyncEngine
+from tests.sync_reference import sync_rowwise
+
+IN_PROGRESS = "1125886200: 3) בעבודה"
+COMPLETED = "1125886300: 9) תהליך הושלם"
+
+
+def _assert_same_result(a, b):
+    for attr in (
+        "total_idom_records", "total_sumit_records", "matched_count", "unmatched_count",
+        "changed_count", "unchanged_count", "status_completed_count",
+        "status_preserved_count", "status_regression_flags",
+    ):
+        assert getattr(a, attr) == getattr(b, attr), attr
+    assert a.regression_records == b.regression_records
+    assert a.warnings == b.warnings
+    pd.testing.assert_frame_equal(a.import_df, b.import_df, check_dtype=False)
+    pd.testing.assert_frame_equal(a.diff_df, b.diff_df, check_dtype=False)
+    pd.testing.assert_frame_equal(
+        a.exceptions_df.reset_index(drop=True), b.exceptions_df.reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def _edge_case_frames():
+    """IDOM/SUMIT frames covering the matching and diff edge cases."""
+    idom_df = pd.DataFrame({
+        "מספר_תיק": ["123456789", "0987654", "555", "0000111", "222", "333", "00999"],
+        "שם": ["כהן", None, "  ", "לוי", "גולן", "אבי", "דנה"],
+        "תאריך_ארכה": pd.to_datetime(
+            ["2024-06-30", None, "2024-06-30", "2024-09-30", None, "2024-03-31", None]),
+        "תאריך_הגשה": pd.to_datetime(
+            ["2024-05-15", None, None, None, None, "2024-04-01", None]),
+        "קוד_שידור": ["1", "2", "3", "4", "5", "6", "7"],
+    })
+    sumit_df = pd.DataFrame({
+        "מזהה": [1001.0, 1002.0, 1003.0, 1004.0, 1005.0, 1006.0],
+        "שנת מס": ["1125575564: 2024"] * 6,
+        "כרטיס לקוח": ["100: כהן", "200: פלוני", "אלמוני", None, "500: גולן", "600: אבי"],
+        "עובד ע. מקדימה": ["a", "b", None, "d", "e", "f"],
+        "עובד מטפל": ["x"] * 6,
+        "סטטוס": [IN_PROGRESS, IN_PROGRESS, COMPLETED, IN_PROGRESS, COMPLETED, None],
+        "הערות": ["", None, "n", "", "", ""],
+        "חבות מס": [0, 1, 2, 3, 4, 5],
+        "תחילת עבודה": pd.to_datetime([None] * 6),
+        'אורכה מ"ה': pd.to_datetime(["2024-06-30"] * 6),
+        "אורכה משרד": pd.to_datetime(
+            ["2024-03-31", "2024-01-31", "2024-06-30", None, "2024-06-30", "2024-03-31"]),
+        "סיום עבודה מקדימה": pd.to_datetime([None] * 6),
+        "הגשה": pd.to_datetime([None, None, "2024-04-01", None, None, "2024-04-01"]),
+        "_match_key": ["123456789", "987654", "555", "111", "222", "0999"],
+    })
+    return idom_df, sumit_df
+
+
+def test_columnar_matches_rowwise_on_golden(golden_idom_file, golden_sumit_file):
+    config = get_config("financial")
+    idom_df, _, _ = parse_idom_file(str(golden_idom_file))
+    sumit_df, lookup, _ = parse_sumit_file(str(golden_sumit_file), config, 2024)
+    engine = SyncEngine(config)
+
+    _assert_same_result(
+        engine.sync(idom_df, sumit_df, lookup, 2024),
+        sync_rowwise(engine, idom_df, sumit_df, lookup, 2024),
+    )
+
+
+def test_columnar_matches_rowwise_on_edge_cases():
+    config = get_config("financial")
+    idom_df, sumit_df = _edge_case_frames()
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    engine = SyncEngine(config)
+
+    columnar = engine.sync(idom_df, sumit_df, lookup, 2024)
+    _assert_same_result(columnar, sync_rowwise(engine, idom_df, sumit_df, lookup, 2024))
+
+    # "0000111" only matches through the zero-stripped fallback
+    assert any("0000111" in w for w in columnar.warnings)
+    # First lookup key in insertion order wins: "0999" before its variant "999"
+    assert "התאמה משנית עבור 00999 → 0999 (אפסים מובילים)" in columnar.warnings
+    assert columnar.matched_count == 6
+    assert columnar.exceptions_df["מספר_תיק"].tolist() == ["333"]
+
+
+def test_columnar_handles_lookup_not_backed_by_sumit_df():
+    """Hand-built lookups (rows not taken from sumit_df) still resolve."""
+    config = get_config("financial")
+    idom_df, sumit_df = _edge_case_frames()
+    lookup = {
+        "123456789": pd.Series({"מזהה": "7", "סטטוס": COMPLETED, "כרטיס לקוח": "7: x"}),
+    }
+    engine = SyncEngine(config)
+
+    columnar = engine.sync(idom_df, sumit_df.iloc[0:0], lookup, 2024)
+    _assert_same_result(columnar, sync_rowwise(engine, idom_df, sumit_df.iloc[0:0], lookup, 2024))
+    assert columnar.matched_count == 1
+    assert columnar.import_df.iloc[0]["סטטוס"] == STATUS_COMPLETED
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_columnar_matches_rowwise_randomized(seed):
+    rng = np.random.default_rng(seed)
+    n = 300
+    config = get_config("annual")
+    keys = ["%09d" % k for k in rng.integers(1, 10_000, size=n)]
+    dates = pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, size=n), unit="D")
+
+    idom_df = pd.DataFrame({
+        "מספר_תיק": [k.lstrip("0") if i % 7 == 0 else k for i, k in enumerate(keys)],
+        "שם": np.where(rng.random(n) < 0.2, None, "לקוח"),
+        "תאריך_ארכה": pd.Series(dates).where(rng.random(n) < 0.6),
+        "תאריך_הגשה": pd.Series(dates).where(rng.random(n) < 0.3),
+        "קוד_שידור": "1",
+    }).drop_duplicates("מספר_תיק")
+    sumit_keys = keys[: n // 2]
+    m = len(sumit_keys)
+    sumit_df = pd.DataFrame({
+        "מזהה": np.arange(5000, 5000 + m).astype(float),
+        "שנת מס": "1125575564: 2024",
+        "כרטיס לקוח": ["%d: שם" % i for i in range(m)],
+        "עובד ע.מקדימה": "a",
+        "עובד מטפל": "b",
+        "סטטוס": np.where(rng.random(m) < 0.3, COMPLETED, IN_PROGRESS),
+        "הערות": "",
+        "חבות מס": 0,
+        "חבות ביטוח לאומי": 0,
+        "תחילת עבודה": pd.NaT,
+        'אורכה מ"ה': pd.NaT,
+        "אורכה משרד": pd.Series(dates[:m]).where(rng.random(m) < 0.5),
+        "סיום עבודה מקדימה": pd.NaT,
+        "הגשה": pd.Series(dates[:m]).where(rng.random(m) < 0.2),
+        "_match_key": sumit_keys,
+    })
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    engine = SyncEngine(config)
+
+    _assert_same_result(
+        engine.sync(idom_df, sumit_df, lookup, 2024),
+        sync_rowwise(engine, idom_df, sumit_df, lookup, 2024),
+    )
+
+
+def test_columnar_object_dates_compare_like_rowwise():
+    """API-sourced frames can carry datetimes in object columns."""
+    config = get_config("financial")
+    idom_df, sumit_df = _edge_case_frames()
+    sumit_df["אורכה משרד"] = [
+        datetime(2024, 3, 31), "2024-01-31", None, "x", datetime(2024, 6, 30), "2024-03-31 ",
+    ]
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    engine = SyncEngine(config)
+
+    _assert_same_result(
+        engine.sync(idom_df, sumit_df, lookup, 2024),
+        sync_rowwise(engine, idom_df, sumit_df, lookup, 2024),
+    )
@@ -1,13 +1,22 @@
 """Tests for Summit taxonomy lookups."""
+import json
+import time
+
 import pytest
 from src.core.taxonomy import (
+    TaxonomyRegistry,
     resolve_tax_year,
+    resolve_tax_year_id,
     resolve_status,
     resolve_pkid_shoma,
     resolve_sug_tik,
     get_status_label,
     STATUS_COMPLETED_ID,
     STATUS_PRE_WORK_ID,
+    PKID_SHOMA,
+    SUG_TIK,
+    PKID_SHOMA_FOLDER,
+    SUG_TIK_FOLDER,
 )
 
 
@@ -75,3 +84,124 @@ def test_resolve_sug_tik_unknown():
 def test_get_status_label():
     assert "הושלם" in get_status_label(STATUS_COMPLETED_ID)
     assert "טרום" in get_status_label(STATUS_PRE_WORK_ID)
+
+
+# ── Versioned registry ───────────────────────────────────────────
+
+class FakeTaxonomyAPI:
+    """Two folders: the seed entries plus one new entity each."""
+
+    def __init__(self):
+        self.folders = {
+            PKID_SHOMA_FOLDER: [e["id"] for e in PKID_SHOMA] + [5001],
+            SUG_TIK_FOLDER: [e["id"] for e in SUG_TIK] + [6001],
+        }
+        self.entities = {
+            5001: {"פקיד שומה": ["חיפה - 77"]},
+            6001: {"סוג תיק": ["42"]},
+        }
+        self.get_calls = 0
+
+    def list_entities(self, folder_id):
+        return list(self.folders[folder_id])
+
+    def get_entity(self, entity_id, folder_id):
+        self.get_calls += 1
+        return self.entities.get(entity_id)
+
+
+def test_resolve_tax_year_id_round_trip():
+    assert resolve_tax_year_id(resolve_tax_year(2025)) == 2025
+    assert resolve_tax_year_id(123) is None
+
+
+def test_seed_snapshot_is_partial_and_stale(tmp_path):
+    reg = TaxonomyRegistry(cache_path=tmp_path / "tax.json")
+    snap = reg.snapshot()
+    assert snap.version == 0
+    assert snap.source == "seed"
+    assert not snap.complete
+    assert reg.is_stale()
+
+
+def test_refresh_publishes_new_version_and_fetches_only_new_ids(tmp_path):
+    reg = TaxonomyRegistry(cache_path=tmp_path / "tax.json")
+    api = FakeTaxonomyAPI()
+    old = reg.snapshot()
+    new = reg.refresh(api)
+
+    assert new.version == old.version + 1
+    assert new.complete and new.source == "api"
+    assert api.get_calls == 2
+    assert new.pkid_shoma_by_code["77"]["id"] == 5001
+    assert 6001 in new.sug_tik_ids
+    # The old snapshot is untouched — readers holding it see one consistent version
+    assert "77" not in old.pkid_shoma_by_code
+    assert not reg.is_stale()
+
+
+def test_snapshot_is_immutable(tmp_path):
+    snap = TaxonomyRegistry(cache_path=tmp_path / "tax.json").snapshot()
+    with pytest.raises(TypeError):
+        snap.pkid_shoma_by_code["1"] = {}
+    with pytest.raises(AttributeError):
+        snap.version = 99
+
+
+def test_cache_round_trip_and_ttl(tmp_path):
+    path = tmp_path / "tax.json"
+    TaxonomyRegistry(cache_path=path).refresh(FakeTaxonomyAPI())
+
+    fresh = TaxonomyRegistry(cache_path=path, ttl_hours=24)
+    assert fresh.load_cache()
+    assert fresh.snapshot().source == "cache"
+    assert fresh.snapshot().complete
+    assert not fresh.is_stale()
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["fetched_at"] = time.time() - 48 * 3600
+    path.write_text(json.dumps(data), encoding="utf-8")
+    expired = TaxonomyRegistry(cache_path=path, ttl_hours=24)
+    assert expired.load_cache()
+    assert expired.snapshot().complete
+    assert expired.is_stale()
+
+
+def test_legacy_cache_without_timestamp_is_stale(tmp_path):
+    path = tmp_path / "tax.json"
+    path.write_text(json.dumps({
+        "pkid_shoma": [{"id": 1, "label": "x - 1", "code": "1"}],
+        "sug_tik": [{"id": 2, "label": "2", "code": "2"}],
+    }), encoding="utf-8")
+    reg = TaxonomyRegistry(cache_path=path)
+    assert reg.load_cache()
+    assert reg.is_stale()
+
+
+def test_ensure_complete_waits_for_the_preload(tmp_path):
+    reg = TaxonomyRegistry(cache_path=tmp_path / "tax.json")
+    try:
+        snap = reg.ensure_complete(FakeTaxonomyAPI, timeout=5)
+        assert snap.complete and snap.pkid_shoma_by_code["77"]["id"] == 5001
+    finally:
+        reg.stop()
+
+    # Full tables on disk: no Summit call at all
+    def _no_api():
+        raise AssertionError("cache should have been enough")
+
+    cached = TaxonomyRegistry(cache_path=tmp_path / "tax.json")
+    assert cached.ensure_complete(_no_api, timeout=0).source == "cache"
+
+
+def test_ensure_complete_gives_up_after_timeout(tmp_path):
+    def _unreachable():
+        raise ConnectionError("Summit unreachable")
+
+    reg = TaxonomyRegistry(cache_path=tmp_path / "tax.json")
+    try:
+        started = time.monotonic()
+        assert not reg.ensure_complete(_unreachable, timeout=0.2).complete
+        assert time.monotonic() - started < 5
+    finally:
+        reg.stop()
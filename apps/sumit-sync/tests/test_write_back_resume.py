@@ -0,0 +1,192 @@
+"""Live write-back checkpoints every op in write_logs and resumes / retries from them."""
+from datetime import datetime, timezone
+
+import pytest
+
+from src.api import routes
+from src.core import mapping_store, report_cache, write_executor
+from src.core.plan_cache import CachedWritePlan, PlanApproval
+from src.core.sumit_api_client import SummitAPIError
+from src.core.write_plan import OpType, WriteOperation, WritePlan
+from src.db import models
+from tests.test_api import client, test_db  # noqa: F401 — fixtures
+
+FOLDER = "1124761700"
+
+
+def _plan():
+    plan = WritePlan()
+    plan.add(WriteOperation(OpType.UPDATE_REPORT, 1001, FOLDER, "א", "111", {"סטטוס": 1}, {}, "dates"))
+    plan.add(WriteOperation(OpType.CREATE_REPORT, None, FOLDER, "ב", "222",
+                            {"לקוח": 77, "שנת מס": 1125575564}, {}, "new", client_entity_id=77))
+    plan.add(WriteOperation(OpType.UPDATE_REPORT, 1003, FOLDER, "ג", "333", {"סטטוס": 1}, {}, "dates"))
+    plan.add(WriteOperation(OpType.UPDATE_REPORT, 1004, FOLDER, "ד", "444", {"סטטוס": 1}, {}, "dates"))
+    plan.add(WriteOperation(OpType.SKIP, 1005, FOLDER, "ה", "555", {}, {}, "up to date"))
+    return plan
+
+
+class FlakySummitAPI:
+    """Rejects some entities, crashes the request on one, records what was sent."""
+
+    sent = []
+    reject = set()
+    crash = set()
+    created = {}        # client ID → report created in Summit
+    lost_reply = False  # create goes through, the reply never arrives
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update_entity(self, entity_id, folder_id, properties):
+        if entity_id in self.crash:
+            raise RuntimeError("worker killed")
+        type(self).sent.append(entity_id)
+        if entity_id in self.reject:
+            raise SummitAPIError(status=1, user_message="rejected")
+        return {"ID": entity_id}
+
+    def create_entity(self, folder_id, properties):
+        type(self).sent.append(("create", properties["לקוח"]))
+        type(self).created[properties["לקוח"]] = 9001
+        if self.lost_reply:
+            raise RuntimeError("connection reset")
+        return {"ID": 9001}
+
+    def find_report_id(self, folder_id, client_id, year_entity_id):
+        return self.created.get(client_id)
+
+
+@pytest.fixture()
+def review_run(client, test_db, tmp_path, monkeypatch):  # noqa: F811
+    monkeypatch.setattr(write_executor, "SummitAPIClient", FlakySummitAPI)
+    # Write-through caches
+    monkeypatch.setattr(report_cache, "REPORT_CACHE_FILE", tmp_path / "reports.json")
+    monkeypatch.setattr(mapping_store, "MAPPING_FILE", tmp_path / "mapping.json")
+    monkeypatch.setattr(write_executor, "WRITE_CONCURRENCY", 1)
+    monkeypatch.setattr(
+        routes, "_write_plan_for_run",
+        lambda run, rebuild=False: (CachedWritePlan.build(_plan(), "idom", datetime.now(timezone.utc)), False),
+    )
+    FlakySummitAPI.sent, FlakySummitAPI.reject, FlakySummitAPI.crash = [], set(), set()
+    FlakySummitAPI.created, FlakySummitAPI.lost_reply = {}, False
+
+    run_id = client.post("/runs", json={"year": 2024, "report_type": "financial"}).json()["id"]
+    run = test_db.query(models.Run).filter(models.Run.id == routes.uuid_mod.UUID(run_id)).one()
+    run.status = "review"
+    test_db.commit()
+    return run_id
+
+
+def _logs(test_db, status=None):
+    q = test_db.query(models.WriteLog)
+    if status:
+        q = q.filter(models.WriteLog.status == status)
+    return q.all()
+
+
+def test_crash_halfway_then_resume_skips_written_ops(client, test_db, review_run):  # noqa: F811
+    FlakySummitAPI.crash = {1003}
+    with pytest.raises(RuntimeError):
+        client.post(f"/runs/{review_run}/write-back")
+    # Ops before the crash were checkpointed one by one
+    assert sorted(log.match_key for log in _logs(test_db, "success")) == ["111", "222"]
+    assert all(log.op_key for log in _logs(test_db))
+
+    FlakySummitAPI.crash = set()
+    FlakySummitAPI.sent = []
+    body = client.post(f"/runs/{review_run}/write-back").json()
+    # The create is not sent twice
+    assert FlakySummitAPI.sent == [1003, 1004]
+    assert [e["status"] for e in body["audit_log"]] == [
+        "already_written", "already_written", "success", "success", "skipped",
+    ]
+    assert body["succeeded"] == 2 and body["skipped"] == 3
+
+
+def test_retry_failed_resends_only_failed_ops(client, test_db, review_run):  # noqa: F811
+    FlakySummitAPI.reject = {1003, 1004}
+    body = client.post(f"/runs/{review_run}/write-back").json()
+    assert body["failed"] == 2
+
+    # 1004 recovers in a full re-run; 1003 is still failed afterwards
+    FlakySummitAPI.reject = {1003}
+    client.post(f"/runs/{review_run}/write-back")
+
+    FlakySummitAPI.reject = set()
+    FlakySummitAPI.sent = []
+    body = client.post(f"/runs/{review_run}/write-back/retry-failed").json()
+    assert body["retried"] == 1 and body["succeeded"] == 1
+    assert FlakySummitAPI.sent == [1003]
+
+    body = client.post(f"/runs/{review_run}/write-back/retry-failed").json()
+    assert body["retried"] == 0
+
+
+def test_retry_failed_keeps_held_ops_back(client, test_db, review_run, monkeypatch):  # noqa: F811
+    FlakySummitAPI.reject = {1003, 1004}
+    client.post(f"/runs/{review_run}/write-back")
+    held = next(op.op_key for op in _plan().operations if op.entity_id == 1003)
+    approval = PlanApproval()
+    approval.apply("exclude", _plan(), [held], {})
+    monkeypatch.setattr(routes, "_plan_approval", lambda run: approval)
+
+    FlakySummitAPI.reject = set()
+    FlakySummitAPI.sent = []
+    body = client.post(f"/runs/{review_run}/write-back/retry-failed").json()
+    assert FlakySummitAPI.sent == [1004]
+    assert [e["status"] for e in body["audit_log"]] == ["not_approved", "success"]
+    # Still failed: once approved, a retry sends it
+    assert [log.entity_id for log in routes._failed_write_logs(routes._to_uuid(review_run), test_db)] == [1003]
+
+
+def test_dry_run_failure_is_never_retried(client, test_db, review_run, monkeypatch):  # noqa: F811
+    def _reject_1001(self, op):
+        if op.entity_id == 1001:
+            raise ValueError("bad date")
+
+    monkeypatch.setattr(write_executor.WriteExecutor, "_validate_operation", _reject_1001)
+    body = client.post(f"/runs/{review_run}/write-back/dry-run").json()
+    assert body["failed"] == 1
+    (failed,) = _logs(test_db, "failed")
+    assert failed.entity_id == 1001 and failed.op_key and failed.dry_run
+
+    body = client.post(f"/runs/{review_run}/write-back/retry-failed").json()
+    assert body["retried"] == 0 and FlakySummitAPI.sent == []
+
+
+def test_create_cut_off_mid_call_is_found_not_sent_again(client, test_db, review_run, monkeypatch):  # noqa: F811
+    from src.core import sumit_api_client
+
+    monkeypatch.setattr(sumit_api_client, "SummitAPIClient", FlakySummitAPI)
+    FlakySummitAPI.lost_reply = True
+    with pytest.raises(RuntimeError):
+        client.post(f"/runs/{review_run}/write-back")
+    # Logged before it was sent — the outcome is unknown, not missing
+    (pending,) = _logs(test_db, "pending")
+    assert pending.op_type == "create_report"
+
+    FlakySummitAPI.lost_reply = False
+    FlakySummitAPI.sent = []
+    body = client.post(f"/runs/{review_run}/write-back").json()
+    assert FlakySummitAPI.sent == [1003, 1004]
+    assert [e["status"] for e in body["audit_log"]][:2] == ["already_written", "already_written"]
+    test_db.expire_all()
+    assert not _logs(test_db, "pending")
+    assert pending.status == "success" and pending.properties_written["_created_entity_id"] == 9001
+
+
+def test_unsaved_checkpoint_stops_the_write_back(client, test_db, review_run, monkeypatch):  # noqa: F811
+    row = routes._write_log_row
+
+    def _flaky_row(run_id, entry):
+        if entry["match_key"] == "333":
+            raise OSError("disk full")
+        return row(run_id, entry)
+
+    monkeypatch.setattr(routes, "_write_log_row", _flaky_row)
+    with pytest.raises(write_executor.CheckpointError):
+        client.post(f"/runs/{review_run}/write-back")
+    # Nothing is sent without its record
+    assert FlakySummitAPI.sent == [1001, ("create", 77)]
+    job = test_db.query(models.WriteJob).one()
+    assert job.status == "failed" and "disk full" in job.error_message
@@ -0,0 +1,162 @@
+"""Concurrent live writes: plan-order results, per-entity / per-client ordering."""
+import random
+import threading
+import time
+
+import pytest
+
+from src.core.write_executor import WriteExecutor
+from src.core.write_plan import OpType, WriteOperation, WritePlan
+
+FOLDER = "1124761700"
+CLIENTS = "557688522"
+
+
+class RecordingSummitAPI:
+    """Sleeps a random few ms per write and records what ran, and when."""
+
+    def __init__(self, fail_entities=(), crash_entity=None):
+        self.fail_entities = set(fail_entities)
+        self.crash_entity = crash_entity
+        self.events = []            # (key, "start"/"end", match_key)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(7)
+
+    def _write(self, key, props):
+        from src.core.sumit_api_client import SummitAPIError
+
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.events.append((key, "start", props["_mk"]))
+            delay = self._rng.uniform(0.001, 0.006)
+        time.sleep(delay)
+        with self._lock:
+            self.in_flight -= 1
+            self.events.append((key, "end", props["_mk"]))
+        if key[1] == self.crash_entity:
+            raise RuntimeError("connection reset")
+        if key[1] in self.fail_entities:
+            raise SummitAPIError(status=1, user_message="rejected")
+
+    def update_entity(self, entity_id, folder_id, properties):
+        self._write(("client" if folder_id == CLIENTS else "report", entity_id), properties)
+        return {"ID": entity_id}
+
+    def create_entity(self, folder_id, properties):
+        self._write(("client", properties["לקוח"]), properties)
+        return {"ID": 80000 + properties["לקוח"]}
+
+
+def _plan(n=120):
+    plan = WritePlan()
+    for i in range(n):
+        mk = str(i)
+        if i % 9 == 0:
+            plan.add(WriteOperation(OpType.SKIP, 5000 + i, FOLDER, "x", mk, {}, {}, "up to date"))
+        elif i % 4 == 0:
+            client = 100 + i % 7     # shared with UPDATE_CLIENT ops below
+            plan.add(WriteOperation(OpType.CREATE_REPORT, None, FOLDER, "x", mk,
+                                    {"לקוח": client, "_mk": mk}, {}, "new", client_entity_id=client))
+        elif i % 4 == 1:
+            plan.add(WriteOperation(OpType.UPDATE_CLIENT, 100 + i % 7, CLIENTS, "x", mk, {"_mk": mk}, {}, "refs"))
+        else:
+            # Few report IDs → many same-entity chains
+            plan.add(WriteOperation(OpType.UPDATE_REPORT, 5000 + i % 11, FOLDER, "x", mk, {"_mk": mk}, {}, "dates"))
+    return plan
+
+
+def _strip(log):
+    return [{k: v for k, v in e.items() if k != "timestamp"} for e in log]
+
+
+def test_concurrent_result_equals_serial_in_plan_order():
+    plan = _plan()
+    serial = WriteExecutor(client=RecordingSummitAPI(fail_entities={5003}), dry_run=False, concurrency=1).execute(plan)
+    api = RecordingSummitAPI(fail_entities={5003})
+    progress = []
+    concurrent = WriteExecutor(client=api, dry_run=False, concurrency=6).execute(
+        plan, progress_callback=lambda done, total: progress.append(done),
+    )
+
+    assert _strip(concurrent.audit_log) == _strip(serial.audit_log)
+    assert concurrent.errors == serial.errors and serial.failed > 0
+    assert (concurrent.succeeded, concurrent.failed, concurrent.skipped, concurrent.total_attempted) == (
+        serial.succeeded, serial.failed, serial.skipped, serial.total_attempted)
+    assert api.max_in_flight > 1
+    assert sorted(progress) == list(range(10, plan.total + 1, 10))
+
+
+def test_same_entity_and_same_client_ops_run_in_plan_order_never_overlapping():
+    plan = _plan()
+    api = RecordingSummitAPI()
+    WriteExecutor(client=api, dry_run=False, concurrency=8).execute(plan)
+
+    by_key = {}
+    for key, kind, mk in api.events:
+        by_key.setdefault(key, []).append((kind, mk))
+    for key, events in by_key.items():
+        # start/end strictly alternate → never two writes to one key at once
+        assert [k for k, _ in events] == ["start", "end"] * (len(events) // 2), key
+        started = [int(mk) for k, mk in events if k == "start"]
+        assert started == sorted(started), key
+    assert any(len(v) > 2 for k, v in by_key.items() if k[0] == "client")
+
+
+def test_unexpected_error_propagates_and_stops_writing():
+    plan = _plan()
+    api = RecordingSummitAPI(crash_entity=5002)
+    with pytest.raises(RuntimeError):
+        WriteExecutor(client=api, dry_run=False, concurrency=4).execute(plan)
+    assert sum(1 for _, kind, _ in api.events if kind == "start") < plan.total - plan.skips
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_written_op_keys_skipped_and_every_op_checkpointed(concurrency):
+    plan = _plan(40)
+    written = {op.op_key for op in plan.operations[:20] if op.op_type != OpType.SKIP}
+    api = RecordingSummitAPI()
+    checkpoints = []
+    lock = threading.Lock()
+
+    def _sink(entry):
+        with lock:
+            checkpoints.append(entry)
+
+    result = WriteExecutor(
+        client=api, dry_run=False, concurrency=concurrency, skip_op_keys=written, on_audit=_sink,
+    ).execute(plan)
+
+    sent = {mk for _, kind, mk in api.events if kind == "start"}
+    # Later creates for an already-created client × year share its key → not re-sent
+    expected = {op.match_key for op in plan.operations[20:] if op.op_type != OpType.SKIP and op.op_key not in written}
+    assert sent == expected and len(expected) > 5
+    statuses = {e["op_key"]: e["status"] for e in result.audit_log}
+    assert all(statuses[k] == "already_written" for k in written)
+    assert sorted(e["op_key"] for e in checkpoints) == sorted(e["op_key"] for e in result.audit_log)
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_every_write_is_checkpointed_before_it_is_sent(concurrency):
+    from src.core.write_executor import CheckpointError
+
+    plan = _plan(60)
+    api = RecordingSummitAPI()
+    pending = []
+    lock = threading.Lock()
+
+    def _on_send(entry):
+        with lock:
+            assert entry["status"] == "pending"
+            # The Summit call starts only after its record is saved
+            assert entry["match_key"] not in {mk for _, _, mk in api.events}
+            if len(pending) == 20:
+                raise CheckpointError("write log not saved")
+            pending.append(entry["match_key"])
+
+    with pytest.raises(CheckpointError):
+        WriteExecutor(client=api, dry_run=False, concurrency=concurrency, on_send=_on_send).execute(plan)
+    sent = {mk for _, kind, mk in api.events if kind == "start"}
+    assert sent == set(pending)
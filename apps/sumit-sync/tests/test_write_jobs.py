@@ -0,0 +1,176 @@
+"""Background live write-back: job row, per-op progress, polling endpoint."""
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.api import routes
+from src.core import mapping_store, report_cache, write_executor
+from src.core.plan_cache import CachedWritePlan, PlanApproval
+from src.core.write_plan import OpType, WriteOperation, WritePlan
+from src.db import connection, models
+from tests.test_api import client, test_db  # noqa: F401 — fixtures
+
+FOLDER = "1124761700"
+
+
+def _plan(n=6):
+    plan = WritePlan()
+    for i in range(n):
+        plan.add(WriteOperation(OpType.UPDATE_REPORT, 1000 + i, FOLDER, "x", str(i), {"סטטוס": 1}, {}, "dates"))
+    plan.add(WriteOperation(OpType.SKIP, 2000, FOLDER, "x", "s", {}, {}, "up to date"))
+    return plan
+
+
+class GatedSummitAPI:
+    """Blocks on the third write until released; rejects entity 1004."""
+
+    sent = []
+    gate = threading.Event()
+    blocked = threading.Event()
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update_entity(self, entity_id, folder_id, properties):
+        from src.core.sumit_api_client import SummitAPIError
+
+        if len(type(self).sent) == 2:
+            type(self).blocked.set()
+            assert type(self).gate.wait(5)
+        type(self).sent.append(entity_id)
+        if entity_id == 1004:
+            raise SummitAPIError(status=1, user_message="rejected")
+        return {"ID": entity_id}
+
+
+@pytest.fixture()
+def review_run(client, test_db, tmp_path, monkeypatch):  # noqa: F811
+    monkeypatch.setattr(write_executor, "SummitAPIClient", GatedSummitAPI)
+    # Write-through caches
+    monkeypatch.setattr(report_cache, "REPORT_CACHE_FILE", tmp_path / "reports.json")
+    monkeypatch.setattr(mapping_store, "MAPPING_FILE", tmp_path / "mapping.json")
+    monkeypatch.setattr(write_executor, "WRITE_CONCURRENCY", 1)
+    monkeypatch.setattr(connection, "SessionLocal", sessionmaker(bind=test_db.get_bind()))
+    monkeypatch.setattr(
+        routes, "_write_plan_for_run",
+        lambda run, rebuild=False: (CachedWritePlan.build(_plan(), "idom", datetime.now(timezone.utc)), False),
+    )
+    GatedSummitAPI.sent = []
+    GatedSummitAPI.gate, GatedSummitAPI.blocked = threading.Event(), threading.Event()
+
+    run_id = client.post("/runs", json={"year": 2024, "report_type": "financial"}).json()["id"]
+    run = test_db.query(models.Run).filter(models.Run.id == routes.uuid_mod.UUID(run_id)).one()
+    run.status = "review"
+    test_db.commit()
+    return run_id
+
+
+def _join_writer(job_id):
+    for t in threading.enumerate():
+        if t.name == f"write-{job_id[:8]}":
+            t.join(5)
+
+
+def test_background_write_back_reports_progress(client, test_db, review_run):  # noqa: F811
+    started = client.post(f"/runs/{review_run}/write-back?background=true").json()
+    assert started["status"] == "running"
+    job_id = started["job_id"]
+
+    assert GatedSummitAPI.blocked.wait(5)
+    mid = client.get(f"/runs/{review_run}/write-back/jobs/{job_id}").json()
+    assert mid["status"] == "running"
+    assert (mid["total_ops"], mid["done_ops"], mid["succeeded"]) == (7, 2, 2)
+    assert mid["ops_per_minute"] > 0 and mid["eta_seconds"] is not None
+
+    # Only one live write-back per run at a time, however it is started
+    assert client.post(f"/runs/{review_run}/write-back?background=true").status_code == 409
+    assert client.post(f"/runs/{review_run}/write-back").status_code == 409
+
+    GatedSummitAPI.gate.set()
+    _join_writer(job_id)
+    done = client.get(f"/runs/{review_run}/write-back/jobs/{job_id}").json()
+    assert done["status"] == "completed" and done["eta_seconds"] is None
+    assert (done["done_ops"], done["succeeded"], done["failed"], done["skipped"]) == (7, 5, 1, 1)
+    # Audit entries were saved as the job ran
+    assert test_db.query(models.WriteLog).count() == 7
+    assert [j["job_id"] for j in client.get(f"/runs/{review_run}/write-back/jobs").json()] == [job_id]
+
+
+def test_streaming_job_gets_its_total_once_planned(client, review_run, monkeypatch):  # noqa: F811
+    from src.core import write_stream
+
+    def _stream(config, year, idom_df, executor, on_planned=None, **kwargs):
+        # Planning ends before the writer is through
+        on_planned(_plan().total)
+        return write_stream.StreamedWriteBack(plan=_plan(), result=executor.execute_stream(iter(_plan().operations)))
+
+    monkeypatch.setattr(routes, "_write_back_inputs", lambda run: (None, None, None, None))
+    monkeypatch.setattr(routes, "_plan_approval", lambda run: PlanApproval())
+    monkeypatch.setattr(write_stream, "stream_write_back", _stream)
+
+    job_id = client.post(f"/runs/{review_run}/write-back?streaming=true&background=true").json()["job_id"]
+    assert GatedSummitAPI.blocked.wait(5)
+    mid = client.get(f"/runs/{review_run}/write-back/jobs/{job_id}").json()
+    assert mid["streaming"] and (mid["total_ops"], mid["done_ops"]) == (7, 2)
+    assert mid["eta_seconds"] is not None
+    GatedSummitAPI.gate.set()
+    _join_writer(job_id)
+
+
+def test_background_write_back_failure_is_recorded(client, review_run, monkeypatch):  # noqa: F811
+    def _boom(run, rebuild=False):
+        raise RuntimeError("Summit unreachable")
+
+    monkeypatch.setattr(routes, "_write_plan_for_run", _boom)
+    job_id = client.post(f"/runs/{review_run}/write-back?background=true").json()["job_id"]
+    _join_writer(job_id)
+    job = client.get(f"/runs/{review_run}/write-back/jobs/{job_id}").json()
+    assert job["status"] == "failed" and "Summit unreachable" in job["error"]
+    assert client.get(f"/runs/{review_run}/write-back/jobs/{'0' * 32}").status_code == 404
+
+
+def test_stopped_streaming_write_back_is_not_reported_done(client, review_run, monkeypatch):  # noqa: F811
+    stopped = {
+        "succeeded": 3, "status": "failed", "error": "Planning stopped early: timeout",
+        "streaming": {"warnings": ["Planning stopped early (timeout) — 3 ops were written; re-run to finish"]},
+    }
+    monkeypatch.setattr(routes, "_execute_live_write_back", lambda *args, **kwargs: dict(stopped))
+
+    resp = client.post(f"/runs/{review_run}/write-back?streaming=true")
+    assert resp.status_code == 502 and resp.json()["detail"]["succeeded"] == 3
+
+    job_id = client.post(f"/runs/{review_run}/write-back?streaming=true&background=true").json()["job_id"]
+    _join_writer(job_id)
+    job = client.get(f"/runs/{review_run}/write-back/jobs/{job_id}").json()
+    assert job["status"] == "failed" and "Planning stopped early" in job["error"]
+    assert job["warnings"] == stopped["streaming"]["warnings"]
+    # The synchronous run was a job too, and failed the same way
+    jobs = client.get(f"/runs/{review_run}/write-back/jobs").json()
+    assert [j["status"] for j in jobs] == ["failed", "failed"]
+
+
+def test_running_job_is_unique_per_run_and_cleared_on_startup(client, test_db, review_run):  # noqa: F811
+    from sqlalchemy.exc import IntegrityError
+
+    from src.main import _fail_interrupted_write_jobs
+
+    run_id = routes.uuid_mod.UUID(review_run)
+    test_db.add(models.WriteJob(run_id=run_id, status="running", streaming=False))
+    test_db.commit()
+    # The DB itself refuses a second running job, whatever the API checked
+    test_db.add(models.WriteJob(run_id=run_id, status="running", streaming=False))
+    with pytest.raises(IntegrityError):
+        test_db.commit()
+    test_db.rollback()
+    assert client.post(f"/runs/{review_run}/write-back/retry-failed").status_code == 409
+
+    # A restart left it running: startup fails it and the run is writable again
+    assert _fail_interrupted_write_jobs(test_db.get_bind()) == 1
+    test_db.expire_all()
+    job = test_db.query(models.WriteJob).filter(models.WriteJob.run_id == run_id).one()
+    assert (job.status, job.error_message) == ("failed", "interrupted")
+    GatedSummitAPI.gate.set()
+    resp = client.post(f"/runs/{review_run}/write-back")
+    assert resp.status_code == 200 and resp.json()["succeeded"] == 5
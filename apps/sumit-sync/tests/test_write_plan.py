@@ -1,6 +1,15 @@
-"""Tests for write plan data model."""
+"""Tests for write plan data model and the diff-aware planner."""
+from datetime import date
+
+import pandas as pd
 import pytest
-from src.core.write_plan import WritePlan, WriteOperation, WriteResult, OpType
+
+from src.core.config import get_config
+from src.core.mapping_store import MappingStore
+from src.core.sumit_parser import SUMITParser
+from src.core.sync_engine import SyncEngine, _israel_day
+from src.core.taxonomy import resolve_pkid_shoma
+from src.core.write_plan import CLIENTS_FOLDER_ID, WritePlan, WriteOperation, WriteResult, OpType
 
 
 def test_empty_plan():
@@ -139,3 +148,185 @@ def test_write_result():
     assert d["dry_run"] is True
     assert d["succeeded"] == 5
     assert d["failed"] == 1
+
+
+# ── Diff-aware planner ──────────────────────────────────────────
+
+IN_PROGRESS = "1125886200: 3) בעבודה"
+
+
+def test_israel_day_normalization():
+    # Naive midnight: the day itself
+    assert _israel_day(pd.Timestamp("2025-03-15")) == date(2025, 3, 15)
+    # API source: Israel midnight converted to UTC-naive (winter +02:00, summer +03:00)
+    assert _israel_day(pd.Timestamp("2025-03-14 22:00")) == date(2025, 3, 15)
+    assert _israel_day(pd.Timestamp("2025-06-29 21:00")) == date(2025, 6, 30)
+    # Raw wire value with offset
+    assert _israel_day("2025-12-31T00:00:00+02:00") == date(2025, 12, 31)
+    assert _israel_day(None) is None
+    assert _israel_day(pd.NaT) is None
+    assert _israel_day("") is None
+
+
+def _plan_frames(sumit_ext, sumit_sub, idom_ext="2025-03-15", idom_sub=None):
+    idom_df = pd.DataFrame({
+        "מספר_תיק": ["514000001"],
+        "שם": ["חברה"],
+        "תאריך_ארכה": pd.to_datetime([idom_ext]),
+        "תאריך_הגשה": pd.to_datetime([idom_sub]),
+        "פקיד_שומה": ["38"],
+        "סוג_תיק": [""],
+    })
+    sumit_df = pd.DataFrame({
+        "מזהה": ["9001"],
+        "סטטוס": [IN_PROGRESS],
+        'אורכה מ"ה': pd.to_datetime([sumit_ext]),
+        "הגשה": pd.to_datetime([sumit_sub]),
+        "_match_key": ["514000001"],
+    })
+    return idom_df, sumit_df
+
+
+def _build(idom_df, sumit_df, mapping=None):
+    config = get_config("financial")
+    lookup = SUMITParser(config).build_lookup(sumit_df)
+    return SyncEngine(config).build_write_plan(idom_df, sumit_df, lookup, 2024, client_mapping=mapping)
+
+
+def test_same_israel_day_becomes_skip():
+    # Summit holds 2025-03-15 Israel midnight, fetched through the API (UTC-naive)
+    plan = _build(*_plan_frames("2025-03-14 22:00", None))
+    assert [op.op_type for op in plan.operations] == [OpType.SKIP]
+    assert plan.writes_avoided == 1
+    assert plan.summary()["writes_avoided"] == 1
+
+
+def test_changed_day_is_written_with_old_value():
+    plan = _build(*_plan_frames("2025-03-13 22:00", None))
+    (op,) = plan.operations
+    assert op.op_type == OpType.UPDATE_REPORT
+    assert op.properties == {'תאריך אורכה מ"ה': "2025-03-15T00:00:00+02:00"}
+    assert op.old_values == {'תאריך אורכה מ"ה': "2025-03-13 22:00:00"}
+    assert plan.writes_avoided == 0
+
+
+def test_unchanged_date_dropped_but_other_changes_kept():
+    plan = _build(*_plan_frames("2025-03-14 22:00", None, idom_sub="2025-05-01"))
+    (op,) = plan.operations
+    assert op.op_type == OpType.UPDATE_REPORT
+    assert set(op.properties) == {"סטטוס", "תאריך הגשה"}
+    assert plan.writes_avoided == 0
+
+
+def test_client_update_compared_with_cached_refs(tmp_path):
+    mapping = MappingStore(tmp_path / "m.json")
+    mapping.add(777, "514000001")
+    ps_id = resolve_pkid_shoma("38")["id"]
+
+    # Unknown refs → written as before
+    plan = _build(*_plan_frames("2025-03-14 22:00", None), mapping=mapping)
+    assert [op.op_type for op in plan.operations] == [OpType.SKIP, OpType.UPDATE_CLIENT]
+    assert plan.operations[1].old_values == {"פקיד שומה": ""}
+
+    # Different ref → written, old value recorded
+    mapping.set_client_refs(777, {"פקיד שומה": 1, "סוג תיק": None})
+    plan = _build(*_plan_frames("2025-03-14 22:00", None), mapping=mapping)
+    assert plan.operations[1].op_type == OpType.UPDATE_CLIENT
+    assert plan.operations[1].old_values == {"פקיד שומה": 1}
+
+    # Same ref → skipped
+    mapping.set_client_refs(777, {"פקיד שומה": ps_id, "סוג תיק": None})
+    plan = _build(*_plan_frames("2025-03-14 22:00", None), mapping=mapping)
+    assert [op.op_type for op in plan.operations] == [OpType.SKIP, OpType.SKIP]
+    assert plan.writes_avoided == 2
+
+
+def test_unknown_taxonomy_code_is_flagged_not_dropped(tmp_path):
+    mapping = MappingStore(tmp_path / "m.json")
+    mapping.add(777, "514000001")
+    idom_df, sumit_df = _plan_frames("2025-03-14 22:00", None)
+    idom_df["סוג_תיק"] = "999"
+
+    plan = _build(idom_df, sumit_df, mapping=mapping)
+    assert [op.op_type for op in plan.operations] == [OpType.SKIP, OpType.UPDATE_CLIENT, OpType.FLAG]
+    assert plan.operations[1].properties == {"פקיד שומה": resolve_pkid_shoma("38")["id"]}
+    flag = plan.operations[2]
+    assert flag.entity_id == 777 and flag.folder_id == CLIENTS_FOLDER_ID and "סוג תיק 999" in flag.reason
+    assert plan.summary()["unresolved_codes"] == 1 and plan.summary()["flags"] == 1
+
+
+def test_mapping_store_client_refs_persist_and_expire(tmp_path, monkeypatch):
+    from src.core import mapping_store
+
+    path = tmp_path / "m.json"
+    store = MappingStore(path)
+    store.add(5, "123")
+    store.set_client_refs(5, {"פקיד שומה": 10, "סוג תיק": None})
+    store.save()
+
+    reloaded = MappingStore(path)
+    assert reloaded.get_client_refs(5) == {"פקיד שומה": 10, "סוג תיק": None}
+    assert reloaded.clients_missing_refs([5, 6, "6"]) == ["6"]
+
+    monkeypatch.setattr(mapping_store, "CLIENT_REFS_MAX_AGE_HOURS", 0)
+    assert reloaded.get_client_refs(5) is None
+
+
+def test_op_key_stable_across_rebuilds():
+    def op(**kw):
+        base = dict(op_type=OpType.UPDATE_REPORT, entity_id=1001, folder_id="1124761700",
+                    client_name="כהן", match_key="123", properties={"סטטוס": 1, "תאריך הגשה": "x"},
+                    old_values={}, reason="a")
+        base.update(kw)
+        return WriteOperation(**base)
+
+    key = op().op_key
+    assert len(key) == 32
+    # Audit-only fields and property order don't matter
+    assert op(old_values={"סטטוס": "old"}, reason="b", properties={"תאריך הגשה": "x", "סטטוס": 1}).op_key == key
+    assert op(properties={"סטטוס": 2, "תאריך הגשה": "x"}).op_key != key
+    assert op(entity_id=1002).op_key != key
+    assert op().to_dict()["op_key"] == key
+
+    # A create is identified by client × tax year — new dates don't make it a new report
+    create = lambda props: op(op_type=OpType.CREATE_REPORT, entity_id=None, client_entity_id=77,
+                              properties={"לקוח": 77, "שנת מס": 1125575564, **props})
+    assert create({"תאריך הגשה": "a"}).op_key == create({"תאריך הגשה": "b"}).op_key
+    assert create({}).op_key != op(op_type=OpType.CREATE_REPORT, entity_id=None, client_entity_id=78,
+                                   properties={"לקוח": 78, "שנת מס": 1125575564}).op_key
+
+
+def _indexed_plan():
+    ops = [
+        WriteOperation(OpType.UPDATE_REPORT, 1, "1124761700", "כהן יעקב", "123456789", {}, {}, ""),
+        WriteOperation(OpType.SKIP, 2, "1124761700", "Levi Ltd", "514000001", {}, {}, ""),
+        WriteOperation(OpType.CREATE_REPORT, None, "1124761700", "כהן שרה", "123456700", {}, {}, ""),
+    ]
+    plan = WritePlan(operations=ops[:2])
+    plan.add(ops[2])
+    return plan
+
+
+def test_counts_are_kept_through_constructor_and_add():
+    plan = _indexed_plan()
+    assert (plan.total, plan.updates, plan.skips, plan.creates, plan.flags) == (3, 1, 1, 1, 0)
+    assert plan.summary()["total"] == 3
+
+
+def test_select_filters_in_plan_order():
+    plan = _indexed_plan()
+    assert plan.select() == [0, 1, 2]
+    assert plan.select([OpType.CREATE_REPORT, OpType.UPDATE_REPORT]) == [0, 2]
+    assert plan.select(match_key="1234567") == [0, 2]
+    assert plan.select(client_name="levi") == [1]
+    assert plan.select([OpType.UPDATE_REPORT], client_name="שרה") == []
+
+
+def test_iter_ndjson_lines():
+    import json
+
+    plan = _indexed_plan()
+    lines = list(plan.iter_ndjson([2]))
+    assert len(lines) == 1 and lines[0].endswith("\n")
+    assert json.loads(lines[0])["client_name"] == "כהן שרה"
+    assert len(list(plan.iter_ndjson())) == 3
@@ -0,0 +1,240 @@
+"""Streaming write-back must write the same ops the batch plan would, with a full audit log."""
+import threading
+
+import pandas as pd
+import pytest
+
+from src.core import write_stream
+from src.core.config import get_config
+from src.core.mapping_store import MappingStore
+from src.core.report_cache import ReportCache
+from src.core.sumit_api_source import fetch_client_refs, fetch_sumit_data_targeted
+from src.core.sync_engine import SyncEngine
+from src.core.taxonomy import resolve_pkid_shoma, resolve_tax_year
+from src.core.write_executor import WriteExecutor
+from src.core.write_plan import OpType
+
+FOLDER = "1124761700"
+
+
+class FakeSummitAPI:
+    """SummitAPIClient stand-in: clients by ח.פ, one report per client, writes recorded."""
+
+    def __init__(self, clients, reports, refs=None, fail_writes=False):
+        self.clients = clients      # ח.פ → client ID
+        self.reports = reports      # client ID → report entity
+        self.refs = refs or {}
+        self.fail_writes = fail_writes
+        self.writes = []
+        self.call_count = 0
+        self._lock = threading.Lock()
+
+    def _call(self):
+        with self._lock:
+            self.call_count += 1
+
+    def find_client_id_by_company_number(self, cn):
+        self._call()
+        return self.clients.get(cn)
+
+    def find_report_id(self, folder_id, client_id, year_entity_id):
+        self._call()
+        report = self.reports.get(client_id)
+        return report["ID"] if report else None
+
+    def get_entity(self, entity_id, folder_id):
+        self._call()
+        return next((r for r in self.reports.values() if r["ID"] == entity_id), {})
+
+    def get_client_refs(self, client_id):
+        self._call()
+        return self.refs.get(client_id, {"פקיד שומה": None, "סוג תיק": None})
+
+    def update_entity(self, entity_id, folder_id, properties):
+        self._call()
+        if self.fail_writes:
+            raise RuntimeError("connection reset")
+        with self._lock:
+            self.writes.append(("update", entity_id))
+        return {"ID": entity_id}
+
+    def create_entity(self, folder_id, properties):
+        self._call()
+        with self._lock:
+            self.writes.append(("create", properties["לקוח"]))
+        return {"ID": 90000 + properties["לקוח"]}
+
+
+def _report(report_id, client_id, extension=None):
+    return {
+        "ID": report_id,
+        "לקוח": [{"ID": client_id, "Name": "לקוח"}],
+        "סטטוס": [{"ID": 1125886200, "Name": "3) בעבודה"}],
+        "שנת מס": [{"ID": resolve_tax_year(2024), "Name": "2024"}],
+        'תאריך אורכה מ"ה': [extension] if extension else None,
+    }
+
+
+def _fixture(n=60):
+    clients, reports, refs = {}, {}, {}
+    keys = []
+    for i in range(n):
+        cn = "5%08d" % i
+        keys.append(cn)
+        if i % 5 == 4:
+            continue                                    # no client → FLAG
+        clients[cn] = 1000 + i
+        if i % 5 == 3:
+            continue                                    # client, no report → CREATE
+        ext = "2024-06-30T00:00:00+03:00" if i % 2 else None
+        reports[1000 + i] = _report(7000 + i, 1000 + i, ext)
+        if i % 3 == 0:
+            refs[1000 + i] = {"פקיד שומה": resolve_pkid_shoma("38")["id"], "סוג תיק": None}
+    rows = keys + keys[:10]                             # duplicate keys
+    idom_df = pd.DataFrame({
+        "מספר_תיק": rows + ["", "n/a"],                # keyless rows
+        "שם": ["לקוח %d" % i for i in range(len(rows) + 2)],
+        "תאריך_ארכה": pd.to_datetime(["2024-06-30"] * (len(rows) + 2)),
+        "תאריך_הגשה": pd.to_datetime(["2024-05-01" if i % 4 == 0 else None for i in range(len(rows) + 2)]),
+        "קוד_שידור": "1",
+        "פקיד_שומה": ["38" if i % 2 == 0 else "" for i in range(len(rows) + 2)],
+        "סוג_תיק": "",
+    })
+    return idom_df, clients, reports, refs
+
+
+def _batch_plan(config, idom_df, api, tmp_path):
+    mapping = MappingStore(path=tmp_path / "batch_mapping.json")
+    reports = ReportCache(path=tmp_path / "batch_reports.json")
+    sumit_df, lookup, _ = fetch_sumit_data_targeted(
+        config, 2024, [str(v) for v in idom_df["מספר_תיק"] if str(v).strip()],
+        client=api, mapping=mapping, reports=reports,
+    )
+    fetch_client_refs([str(v) for v in idom_df["מספר_תיק"]], mapping, client=api)
+    return SyncEngine(config).build_write_plan(idom_df, sumit_df, lookup, 2024, client_mapping=mapping)
+
+
+def test_streamed_writes_equal_batch_plan(tmp_path):
+    config = get_config("financial")
+    idom_df, clients, reports, refs = _fixture()
+    batch = _batch_plan(config, idom_df, FakeSummitAPI(clients, reports, refs), tmp_path)
+
+    api = FakeSummitAPI(clients, reports, refs)
+    planned, progress = [], []
+    out = write_stream.stream_write_back(
+        config, 2024, idom_df, WriteExecutor(client=api, dry_run=False),
+        mapping=MappingStore(path=tmp_path / "mapping.json"),
+        reports=ReportCache(path=tmp_path / "reports.json"),
+        queue_size=3,
+        on_planned=planned.append,
+        progress_callback=lambda done, total: progress.append(total),
+    )
+    # The total is known once planning ends, and reported from then on
+    assert planned == [batch.total]
+    assert progress and set(progress) <= {None, batch.total}
+
+    assert [op.to_dict() for op in out.plan.operations] == [op.to_dict() for op in batch.operations]
+    assert out.plan.writes_avoided == batch.writes_avoided
+    assert batch.updates and batch.creates and batch.flags and batch.client_updates and batch.writes_avoided
+
+    # Every op executed exactly once, every one audited
+    audit = out.result.audit_log
+    assert len(audit) == batch.total
+    key = lambda e: (e["op_type"], e["match_key"], str(e["entity_id"]))
+    assert sorted(map(key, audit)) == sorted(key(op.to_dict()) for op in batch.operations)
+    written = batch.updates + batch.creates + batch.client_updates
+    assert out.result.succeeded == written == len(api.writes)
+    assert out.result.skipped == batch.skips + batch.flags
+    assert any("no matching Summit client" in w for w in out.warnings)
+    assert out.first_write_seconds is not None
+    assert out.status == "completed" and out.error is None
+
+
+def test_planning_reads_summit_not_the_caches(tmp_path):
+    config = get_config("financial")
+    idom_df, clients, reports, refs = _fixture(30)
+    batch = _batch_plan(config, idom_df, FakeSummitAPI(clients, reports, refs), tmp_path)
+
+    # Fresh-looking caches that disagree with Summit: every report already
+    # carries IDOM's extension date, every client IDOM's פקיד שומה
+    mapping = MappingStore(path=tmp_path / "mapping.json")
+    cache = ReportCache(path=tmp_path / "reports.json")
+    year = resolve_tax_year(2024)
+    for cn, client_id in clients.items():
+        mapping.add(client_id, cn)
+        mapping.set_client_refs(client_id, {"פקיד שומה": resolve_pkid_shoma("38")["id"], "סוג תיק": None})
+        if client_id in reports:
+            report_id = reports[client_id]["ID"]
+            cache.set_report_id(FOLDER, client_id, year, report_id)
+            cache.put_entity(FOLDER, _report(report_id, client_id, "2024-06-30T00:00:00+03:00"))
+
+    out = write_stream.stream_write_back(
+        config, 2024, idom_df, WriteExecutor(client=FakeSummitAPI(clients, reports, refs), dry_run=True),
+        mapping=mapping, reports=cache,
+    )
+    assert [op.to_dict() for op in out.plan.operations] == [op.to_dict() for op in batch.operations]
+    assert out.plan.writes_avoided == batch.writes_avoided
+
+
+def test_writer_crash_stops_planner(tmp_path):
+    config = get_config("financial")
+    idom_df, clients, reports, refs = _fixture(20)
+    api = FakeSummitAPI(clients, reports, refs, fail_writes=True)
+
+    with pytest.raises(RuntimeError):
+        # Non-Summit errors stop the writer; the planner thread must not hang
+        write_stream.stream_write_back(
+            config, 2024, idom_df, WriteExecutor(client=api, dry_run=False),
+            mapping=MappingStore(path=tmp_path / "mapping.json"),
+            reports=ReportCache(path=tmp_path / "reports.json"),
+            queue_size=1,
+        )
+    assert not any(t.name == "write-stream-planner" for t in threading.enumerate())
+
+
+def test_planning_failure_fails_the_run(tmp_path, monkeypatch):
+    config = get_config("financial")
+    idom_df, clients, reports, refs = _fixture(20)
+    api = FakeSummitAPI(clients, reports, refs)
+    frames = write_stream.entities_frame
+    calls = []
+
+    def _failing_frame(*args, **kwargs):
+        calls.append(1)
+        if len(calls) > 5:
+            raise ValueError("bad Summit payload")
+        return frames(*args, **kwargs)
+
+    monkeypatch.setattr(write_stream, "entities_frame", _failing_frame)
+    out = write_stream.stream_write_back(
+        config, 2024, idom_df, WriteExecutor(client=api, dry_run=False),
+        mapping=MappingStore(path=tmp_path / "mapping.json"),
+        reports=ReportCache(path=tmp_path / "reports.json"),
+    )
+
+    assert out.status == "failed" and "bad Summit payload" in out.error
+    assert out.to_dict()["status"] == "failed"
+    # What was planned before the failure was still written and audited
+    assert 0 < len(out.result.audit_log) == out.plan.total
+    assert out.result.succeeded == len(api.writes)
+
+
+def test_execute_stream_matches_execute():
+    from src.core.write_plan import WritePlan, WriteOperation
+
+    plan = WritePlan()
+    for i in range(25):
+        plan.add(WriteOperation(
+            op_type=OpType.UPDATE_REPORT if i % 3 else OpType.SKIP,
+            entity_id=100 + i, folder_id=FOLDER, client_name="x", match_key=str(i),
+            properties={"סטטוס": 1125886300} if i % 3 else {},
+            old_values={}, reason="",
+        ))
+    executor = WriteExecutor(client=FakeSummitAPI({}, {}), dry_run=True)
+    progress = []
+    a = executor.execute(plan, progress_callback=lambda done, total: progress.append((done, total)))
+    b = executor.execute_stream(iter(plan.operations))
+    assert progress == [(10, 25), (20, 25)]
+    strip = lambda log: [{k: v for k, v in e.items() if k != "timestamp"} for e in log]
+    assert strip(a.audit_log) == strip(b.audit_log)
+    assert (a.succeeded, a.skipped) == (b.succeeded, b.skipped) == (16, 9)
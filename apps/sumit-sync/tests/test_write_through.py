@@ -0,0 +1,169 @@
+"""Successful live writes update the report-ID index, folder mirror and client refs."""
+import time
+
+from src.core.config import get_config
+from src.core.mapping_store import MappingStore
+from src.core.report_cache import ReportCache
+from src.core.sumit_api_source import fetch_client_refs, fetch_sumit_data_targeted
+from src.core.sync_engine import SyncEngine
+from src.core.taxonomy import resolve_tax_year
+from src.core.write_executor import WriteExecutor
+from src.core.write_plan import CLIENTS_FOLDER_ID, OpType, WriteOperation
+from src.core.write_through import WriteThrough
+from tests.test_write_stream import FOLDER, FakeSummitAPI, _fixture, _report
+
+
+def _caches(tmp_path):
+    return ReportCache(path=tmp_path / "reports.json"), MappingStore(path=tmp_path / "mapping.json")
+
+
+def _update(entity_id, props):
+    return WriteOperation(OpType.UPDATE_REPORT, entity_id, FOLDER, "x", "1", props, {}, "dates")
+
+
+def test_update_patches_mirror_and_keeps_its_age(tmp_path):
+    reports, mapping = _caches(tmp_path)
+    fetched_at = time.time() - 3600
+    reports.put_entity(FOLDER, _report(7001, 1001), fetched_at=fetched_at)
+    wt = WriteThrough(reports, mapping)
+
+    wt.apply(_update(7001, {"סטטוס": 1125886300, "תאריך הגשה": "2024-05-01T00:00:00+03:00"}), {"ID": 7001})
+    entity = reports.get_entity(7001, FOLDER)
+    assert entity["סטטוס"][0]["ID"] == 1125886300
+    assert entity["תאריך הגשה"] == ["2024-05-01T00:00:00+03:00"]
+    assert entity["לקוח"] == [{"ID": 1001, "Name": "לקוח"}]
+    assert 0.99 < reports.entity_age_hours(7001, FOLDER) < 1.01
+
+    # Not mirrored → nothing to patch, nothing guessed
+    wt.apply(_update(7002, {"סטטוס": 1125886300}), {"ID": 7002})
+    assert reports.get_entity(7002, FOLDER) is None
+
+
+def test_full_returned_entity_is_mirrored_fresh(tmp_path):
+    reports, mapping = _caches(tmp_path)
+    wt = WriteThrough(reports, mapping)
+    returned = {"ID": 7003, "Folder": FOLDER, "Properties": _report(7003, 1003, "2024-06-30T00:00:00+03:00")}
+    wt.apply(_update(7003, {'תאריך אורכה מ"ה': "2024-06-30T00:00:00+03:00"}), returned)
+    assert reports.get_entity(7003, FOLDER)['תאריך אורכה מ"ה'] == ["2024-06-30T00:00:00+03:00"]
+    assert reports.entity_age_hours(7003, FOLDER) < 0.01
+
+
+def test_create_indexes_new_report_and_client_refs_merge(tmp_path):
+    reports, mapping = _caches(tmp_path)
+    wt = WriteThrough(reports, mapping)
+    year = resolve_tax_year(2024)
+    create = WriteOperation(OpType.CREATE_REPORT, None, FOLDER, "ב", "2", {"לקוח": 77, "שנת מס": year},
+                            {}, "new", client_entity_id=77)
+    wt.apply(create, {"ID": 9077}, created_id=9077)
+    assert reports.get_report_id(FOLDER, 77, year) == 9077
+    assert reports.get_entity(9077, FOLDER)["לקוח"] == [{"ID": 77, "Name": "ב"}]
+
+    mapping.set_client_refs(77, {"פקיד שומה": 1, "סוג תיק": 5})
+    wt.apply(WriteOperation(OpType.UPDATE_CLIENT, 77, CLIENTS_FOLDER_ID, "ב", "2", {"פקיד שומה": 2}, {}, "refs"), {})
+    assert mapping.get_client_refs(77) == {"פקיד שומה": 2, "סוג תיק": 5}
+    # Other ref unknown → drop rather than half-know
+    wt.apply(WriteOperation(OpType.UPDATE_CLIENT, 88, CLIENTS_FOLDER_ID, "ג", "3", {"פקיד שומה": 2}, {}, "refs"), {})
+    assert mapping.get_client_refs(88) is None
+
+    wt.save()
+    assert ReportCache(path=tmp_path / "reports.json").get_report_id(FOLDER, 77, year) == 9077
+
+
+def test_next_plan_after_live_write_back_reads_caches_not_summit(tmp_path):
+    config = get_config("financial")
+    idom_df, clients, summit_reports, refs = _fixture(30)
+    # Duplicate rows that disagree would legitimately re-plan
+    idom_df = idom_df.drop_duplicates("מספר_תיק")
+    keys = [str(v) for v in idom_df["מספר_תיק"] if str(v).strip()]
+
+    def _plan(api):
+        reports = ReportCache(path=tmp_path / "reports.json")
+        mapping = MappingStore(path=tmp_path / "mapping.json")
+        sumit_df, lookup, _ = fetch_sumit_data_targeted(config, 2024, keys, client=api, mapping=mapping, reports=reports)
+        fetch_client_refs(keys, mapping, client=api)
+        return SyncEngine(config).build_write_plan(idom_df, sumit_df, lookup, 2024, client_mapping=mapping)
+
+    first = _plan(FakeSummitAPI(clients, summit_reports, refs))
+    assert first.updates and first.creates and first.client_updates
+    api = FakeSummitAPI(clients, summit_reports, refs)
+    WriteExecutor(client=api, dry_run=False, write_through=WriteThrough(
+        ReportCache(path=tmp_path / "reports.json"), MappingStore(path=tmp_path / "mapping.json"),
+    )).execute(first)
+
+    # The fake Summit never changes — only the caches know about the writes
+    second = _plan(FakeSummitAPI(clients, summit_reports, refs))
+    assert second.updates == 0 and second.creates == 0 and second.client_updates == 0
+    assert second.flags == first.flags
+
+
+def test_dry_run_leaves_caches_alone(tmp_path):
+    reports, mapping = _caches(tmp_path)
+    reports.put_entity(FOLDER, _report(7001, 1001))
+    wt = WriteThrough(reports, mapping)
+    WriteExecutor(client=FakeSummitAPI({}, {}), dry_run=True, write_through=wt).execute_stream(
+        [_update(7001, {"סטטוס": 1125886300})])
+    assert wt.applied == 0 and reports.get_entity(7001, FOLDER)["סטטוס"][0]["ID"] == 1125886200
+
+
+def test_stale_holder_saving_last_keeps_write_through_patches(tmp_path):
+    # Prewarm loaded the files before the write-back; it saves after it
+    prewarm_reports, prewarm_mapping = _caches(tmp_path)
+    prewarm_reports.put_entity(FOLDER, _report(7001, 1001))   # fetched before the write
+    reports, mapping = _caches(tmp_path)
+    reports.put_entity(FOLDER, _report(7001, 1001))
+    mapping.add(1001, "123", "כהן")
+    mapping.set_client_refs(1001, {"פקיד שומה": 2, "סוג תיק": None})
+    WriteThrough(reports, mapping).apply(_update(7001, {"סטטוס": 1125886300}), {"ID": 7001})
+    reports.save()
+    mapping.save()
+
+    prewarm_reports.set_report_id(FOLDER, 1002, 5, 7002)
+    prewarm_mapping.add(1002, "456")
+    prewarm_mapping.mark_absent("123")
+    prewarm_reports.save()
+    prewarm_mapping.save()
+
+    reports, mapping = _caches(tmp_path)
+    assert reports.get_entity(7001, FOLDER)["סטטוס"][0]["ID"] == 1125886300
+    assert reports.get_report_id(FOLDER, 1002, 5) == 7002
+    assert mapping.get_client_id("123") == "1001" and mapping.get_client_id("456") == "1002"
+    assert not mapping.is_known_absent("123")
+    assert mapping.get_client_refs(1001) == {"פקיד שומה": 2, "סוג תיק": None}
+    assert prewarm_reports.get_entity(7001, FOLDER) is not None   # the saver adopts the merge
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_forgotten_entries_stay_forgotten_across_holders(tmp_path):
+    reports, mapping = _caches(tmp_path)
+    reports.put_entity(FOLDER, _report(7001, 1001), fetched_at=time.time() - 60)
+    mapping.set_client_refs(1001, {"פקיד שומה": 2, "סוג תיק": None})
+    mapping.mark_absent("999")
+    reports.save()
+    mapping.save()
+
+    other_reports, other_mapping = _caches(tmp_path)
+    other_reports.forget_entity(7001, FOLDER)
+    other_mapping.forget_client_refs(1001)
+    other_mapping.clear_absent()
+    other_reports.save()
+    other_mapping.save()
+    reports.save()   # still holds the old copies — must not bring them back
+    mapping.save()
+
+    reports, mapping = _caches(tmp_path)
+    assert reports.get_entity(7001, FOLDER) is None
+    assert mapping.get_client_refs(1001) is None and not mapping.is_known_absent("999")
+
+    # A copy fetched after the forget is kept
+    reports.put_entity(FOLDER, _report(7001, 1001))
+    reports.save()
+    assert ReportCache(path=tmp_path / "reports.json").get_entity(7001, FOLDER) is not None
+
+
+def test_unreadable_cache_file_is_replaced_whole(tmp_path):
+    (tmp_path / "reports.json").write_text('{"report_ids": {"a:1:2"', encoding="utf-8")
+    reports, _ = _caches(tmp_path)
+    assert reports.size == 0
+    reports.set_report_id(FOLDER, 1, 2, 3)
+    reports.save()
+    assert ReportCache(path=tmp_path / "reports.json").get_report_id(FOLDER, 1, 2) == 3